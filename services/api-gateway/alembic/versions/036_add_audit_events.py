@@ -0,0 +1,57 @@
+"""Add audit_events table for the durable audit log sink
+
+Revision ID: 036
+Revises: 035
+Create Date: 2026-10-18
+
+Backs PostgresAuditSink (app/core/audit_store.py), which bulk-inserts
+events from the append-only audit segment store. The full event is kept
+in the JSONB record column; the indexed columns serve HIPAA accounting
+queries by user, session, resource and time.
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import JSONB
+
+# revision identifiers, used by Alembic.
+revision = "036"
+down_revision = "035"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create audit_events with secondary indexes."""
+    op.create_table(
+        "audit_events",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("event_type", sa.String(64), nullable=False),
+        sa.Column("severity", sa.String(16), nullable=False),
+        sa.Column("timestamp", sa.DateTime(), nullable=False),
+        sa.Column("user_id", sa.String(255), nullable=True),
+        sa.Column("session_id", sa.String(255), nullable=True),
+        sa.Column("resource_type", sa.String(100), nullable=True),
+        sa.Column("resource_id", sa.String(255), nullable=True),
+        sa.Column("action", sa.String(100), nullable=True),
+        sa.Column("outcome", sa.String(20), nullable=True),
+        sa.Column("disclosure_recipient", sa.String(255), nullable=True),
+        sa.Column("correlation_id", sa.String(100), nullable=True),
+        sa.Column("record", JSONB, nullable=False),
+    )
+
+    op.create_index("idx_audit_events_timestamp", "audit_events", ["timestamp"])
+    op.create_index("idx_audit_events_user_time", "audit_events", ["user_id", "timestamp"])
+    op.create_index("idx_audit_events_session", "audit_events", ["session_id"])
+    op.create_index("idx_audit_events_resource_time", "audit_events", ["resource_id", "timestamp"])
+    op.create_index("idx_audit_events_type_time", "audit_events", ["event_type", "timestamp"])
+
+
+def downgrade() -> None:
+    """Drop audit_events."""
+    op.drop_index("idx_audit_events_type_time", table_name="audit_events")
+    op.drop_index("idx_audit_events_resource_time", table_name="audit_events")
+    op.drop_index("idx_audit_events_session", table_name="audit_events")
+    op.drop_index("idx_audit_events_user_time", table_name="audit_events")
+    op.drop_index("idx_audit_events_timestamp", table_name="audit_events")
+    op.drop_table("audit_events")
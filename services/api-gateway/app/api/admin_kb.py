@@ -30,6 +30,7 @@ from app.models.document import Document
 from app.models.user import User
 from app.services.admin_audit_log_service import admin_audit_log_service
 from app.services.kb_indexer import IndexingResult, KBIndexer
+from app.services.rag_cache import rag_cache
 from fastapi import APIRouter, Depends, File, Request, UploadFile, status
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
@@ -374,6 +375,7 @@ async def delete_document(
 
         # Delete from vector database
         vector_success = kb_indexer.delete_document(document_id)
+        await rag_cache.invalidate_document(document_id)
 
         # Delete from PostgreSQL (even if vector delete fails, cleanup metadata)
         db.delete(document)
@@ -25,6 +25,7 @@ from app.services.caldav_service import CalDAVService
 from app.services.carddav_service import AddressType, CardDAVService, Contact, ContactSearchQuery
 from app.services.carddav_service import EmailAddress as CardEmailAddress
 from app.services.carddav_service import EmailType, PhoneNumber, PhoneType, PostalAddress
+from app.services.document_queue import DocumentPriority, DocumentProcessingQueue
 from app.services.email_service import Email, EmailService
 from app.services.nextcloud_file_indexer import NextcloudFileIndexer
 from app.services.oidc_service import AuthorizationRequest, OIDCProvider, OIDCService
@@ -1365,10 +1366,15 @@ async def delete_email(
 # ===================================
 
 
+# Nextcloud directories synced into the knowledge base
+NEXTCLOUD_WATCH_DIRECTORIES = ["Medical Documents", "Guidelines", "Textbooks"]
+
+
 @router.post("/files/scan-and-index")
 async def scan_and_index_files(
     source_type: str = Query("note", description="Default source type for indexed documents"),
     force_reindex: bool = Query(False, description="Force re-indexing of all files"),
+    background: bool = Query(True, description="Run the crawl in the bulk document worker lane and return its job ID"),
     current_admin_user: dict = Depends(get_current_admin_user),
 ):
     """
@@ -1376,16 +1382,27 @@ async def scan_and_index_files(
 
     This endpoint triggers a full scan of configured watch directories
     and indexes all supported medical documents into the knowledge base.
+    By default the crawl is enqueued to the bulk document lane, so it does
+    not compete with interactive uploads; poll the returned job ID for the
+    summary. With background=false it runs in the request.
 
     Requires authentication (admin role recommended).
     """
     try:
-        indexer = NextcloudFileIndexer(
-            webdav_url=settings.NEXTCLOUD_URL + "/remote.php/dav/files/" + settings.NEXTCLOUD_ADMIN_USER + "/",
-            username=settings.NEXTCLOUD_ADMIN_USER,
-            password=settings.NEXTCLOUD_ADMIN_PASSWORD,
-            watch_directories=["Medical Documents", "Guidelines", "Textbooks"],
-        )
+        if background:
+            queue = DocumentProcessingQueue()
+            try:
+                job_id = await queue.enqueue_nextcloud_crawl(
+                    NEXTCLOUD_WATCH_DIRECTORIES,
+                    source_type=source_type,
+                    force_reindex=force_reindex,
+                    priority=DocumentPriority.BULK,
+                )
+            finally:
+                await queue.close()
+            return success_response(data={"job_id": job_id, "status": "queued", "lane": DocumentPriority.BULK.value})
+
+        indexer = NextcloudFileIndexer.from_settings(watch_directories=NEXTCLOUD_WATCH_DIRECTORIES)
 
         if not indexer.connect():
             return error_response(
@@ -195,9 +195,9 @@ async def generate_medical_embedding(
     - scibert: For general scientific text
     """
     try:
-        from app.services.medical_embedding_service import MedicalEmbeddingService, MedicalModelType
+        from app.services.medical_embedding_service import MedicalModelType, medical_embedding_service
 
-        service = MedicalEmbeddingService(lazy_load=True)
+        service = medical_embedding_service
 
         # Map string to enum
         model_map = {
@@ -245,9 +245,9 @@ async def generate_batch_embeddings(
     More efficient than individual calls for large numbers of texts.
     """
     try:
-        from app.services.medical_embedding_service import MedicalEmbeddingService, MedicalModelType
+        from app.services.medical_embedding_service import MedicalModelType, medical_embedding_service
 
-        service = MedicalEmbeddingService(lazy_load=True)
+        service = medical_embedding_service
 
         model_map = {
             "pubmedbert": MedicalModelType.PUBMEDBERT,
@@ -294,9 +294,9 @@ async def generate_medical_text(
     - Expanding medical concepts
     """
     try:
-        from app.services.medical_embedding_service import MedicalEmbeddingService
+        from app.services.medical_embedding_service import medical_embedding_service
 
-        service = MedicalEmbeddingService(lazy_load=True)
+        service = medical_embedding_service
 
         result = await service.generate_text(
             prompt=request.prompt,
@@ -479,9 +479,9 @@ async def compute_similarity(
     Returns a score between 0 (dissimilar) and 1 (identical meaning).
     """
     try:
-        from app.services.medical_embedding_service import MedicalEmbeddingService, MedicalModelType
+        from app.services.medical_embedding_service import MedicalModelType, medical_embedding_service
 
-        service = MedicalEmbeddingService(lazy_load=True)
+        service = medical_embedding_service
 
         model_map = {
             "pubmedbert": MedicalModelType.PUBMEDBERT,
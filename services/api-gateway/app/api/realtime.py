@@ -18,7 +18,7 @@ from typing import Any, Dict
 
 from app.core.business_metrics import rag_citations_per_query, rag_queries_total
 from app.core.database import get_db
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_user, get_user_roles
 from app.core.logging import get_logger
 from app.core.security import verify_token
 from app.models.message import Message
@@ -472,8 +472,9 @@ async def websocket_endpoint(websocket: WebSocket, db: Session = Depends(get_db)
                 # Override session_id with the authenticated conversation if not provided
                 if session_obj and not data.get("session_id"):
                     data["session_id"] = str(session_obj.id)
-                # Pass user_id for ownership validation
+                # Pass user_id for ownership validation and roles for answer-cache scoping
                 data["_user_id"] = user_id
+                data["_permissions"] = get_user_roles(user)
                 # Process chat message
                 await handle_chat_message(websocket, client_id, data, db)
 
@@ -614,7 +615,7 @@ async def handle_chat_message(websocket: WebSocket, client_id: str, data: Dict[s
 
         # Stream LLM response with real-time chunks
         query_response = await query_orchestrator.stream_query(
-            query_request, trace_id=message_id, on_chunk=stream_chunk
+            query_request, trace_id=message_id, on_chunk=stream_chunk, permissions=data.get("_permissions")
         )
 
         # Prepare citations for response with full structured data
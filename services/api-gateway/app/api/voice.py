@@ -40,7 +40,7 @@ from app.api.voice_schemas.schemas import (
 )
 from app.core.config import settings
 from app.core.database import get_db
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_user, get_user_roles
 from app.core.logging import get_logger
 from app.core.metrics import (
     external_api_duration_seconds,
@@ -1060,7 +1060,9 @@ async def relay_voice_transcript(
         clinical_context_id=payload.clinical_context_id,
     )
 
-    query_response = await voice_query_orchestrator.handle_query(query_request, trace_id=str(user_message.id))
+    query_response = await voice_query_orchestrator.handle_query(
+        query_request, trace_id=str(user_message.id), permissions=get_user_roles(current_user)
+    )
 
     # Persist assistant message
     assistant_message = Message(
@@ -1141,6 +1143,12 @@ async def voice_relay_websocket(websocket: WebSocket, db: Session = Depends(get_
             return
 
         user_id = payload.get("sub")
+        user = db.query(User).filter(User.id == user_id).first()
+        if not user or not user.is_active:
+            await websocket.send_json({"type": "error", "message": "Unauthorized: unknown or inactive user"})
+            await websocket.close(code=1008)
+            return
+        permissions = get_user_roles(user)
 
         while True:
             data = await websocket.receive_json()
@@ -1194,7 +1202,7 @@ async def voice_relay_websocket(websocket: WebSocket, db: Session = Depends(get_
                 await websocket.send_json({"type": "chunk", "content": chunk})
 
             query_response = await voice_query_orchestrator.stream_query(
-                query_request, trace_id=str(user_message.id), on_chunk=emit_chunk
+                query_request, trace_id=str(user_message.id), on_chunk=emit_chunk, permissions=permissions
             )
             voice_first_audio_latency_seconds.observe(time.monotonic() - ttfb_start)
 
@@ -10,15 +10,21 @@ Consolidates all audit logging for:
 - User data exports and deletions
 
 Supports HIPAA accounting of disclosures requirement.
+
+Events are stored in an AuditSegmentStore: durable append-only segments
+when a directory is configured (AUDIT_LOG_DIR), in memory otherwise.
 """
 
+import asyncio
 import json
 import logging
 import uuid
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
+
+from app.core.audit_store import AuditSegmentStore
 
 logger = logging.getLogger(__name__)
 
@@ -145,6 +151,31 @@ class AuditEvent:
             "parent_event_id": self.parent_event_id,
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AuditEvent":
+        """Rebuild an event from to_dict() output"""
+        return cls(
+            id=data["id"],
+            event_type=AuditEventType(data["event_type"]),
+            severity=AuditSeverity(data["severity"]),
+            timestamp=datetime.fromisoformat(data["timestamp"]),
+            user_id=data.get("user_id"),
+            session_id=data.get("session_id"),
+            actor_type=data.get("actor_type", "user"),
+            resource_type=data.get("resource_type"),
+            resource_id=data.get("resource_id"),
+            resource_name=data.get("resource_name"),
+            action=data.get("action", ""),
+            description=data.get("description", ""),
+            outcome=data.get("outcome", "success"),
+            metadata=data.get("metadata") or {},
+            phi_types=data.get("phi_types") or [],
+            phi_count=data.get("phi_count", 0),
+            disclosure_recipient=data.get("disclosure_recipient"),
+            correlation_id=data.get("correlation_id"),
+            parent_event_id=data.get("parent_event_id"),
+        )
+
 
 @dataclass
 class AccountingOfDisclosures:
@@ -193,6 +224,10 @@ class AuditService:
     - Accounting of disclosures for HIPAA
     - Query and export capabilities
     - Retention management
+
+    Call start() to run the store's background fsync and the retention
+    compactor; without it events are still written but only synced when
+    a segment is sealed or on stop().
     """
 
     # Events to automatically capture from event bus
@@ -210,23 +245,55 @@ class AuditService:
     # Default retention period (6 years for HIPAA)
     DEFAULT_RETENTION_DAYS = 365 * 6
 
+    # How often the retention compactor runs
+    COMPACTION_INTERVAL_SECONDS = 3600
+
     def __init__(
         self,
         event_bus=None,
         retention_days: int = DEFAULT_RETENTION_DAYS,
+        store: Optional[AuditSegmentStore] = None,
     ):
         self.event_bus = event_bus
         self.retention_days = retention_days
 
-        self._events: List[AuditEvent] = []
-        self._max_in_memory = 10000
-        self._phi_access_log: Dict[str, List[AuditEvent]] = {}  # resource_id -> events
+        self._store = store or AuditSegmentStore(None, decode=AuditEvent.from_dict, max_events=10000)
+        self._phi_resources: Set[str] = set()  # resource_ids with PHI events
+        self._compaction_task: Optional[asyncio.Task] = None
 
         if self.event_bus:
             self._subscribe_to_events()
 
         logger.info(f"AuditService initialized (retention: {retention_days} days)")
 
+    async def start(self) -> None:
+        """Open the store and start background fsync and retention compaction"""
+        await self._store.start()
+        if self._compaction_task is None:
+            self._compaction_task = asyncio.create_task(self._compaction_loop())
+
+    async def stop(self) -> None:
+        """Stop background work and flush the store"""
+        if self._compaction_task:
+            self._compaction_task.cancel()
+            try:
+                await self._compaction_task
+            except asyncio.CancelledError:
+                pass
+            self._compaction_task = None
+        await self._store.stop()
+
+    async def _compaction_loop(self) -> None:
+        while True:
+            try:
+                await self.cleanup_old_events()
+                await asyncio.sleep(self.COMPACTION_INTERVAL_SECONDS)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Audit retention compaction failed: {e}")
+                await asyncio.sleep(self.COMPACTION_INTERVAL_SECONDS)
+
     def _subscribe_to_events(self) -> None:
         """Subscribe to events for automatic capture"""
         from app.core.event_bus import VoiceEvent
@@ -289,20 +356,13 @@ class AuditService:
 
         Returns event ID.
         """
-        # Add to in-memory store
-        self._events.append(event)
-
-        # Limit in-memory storage
-        if len(self._events) > self._max_in_memory:
-            self._events = self._events[-self._max_in_memory :]
+        await self._store.open()
+        self._store.append(event)
 
         # Track PHI access by resource
         if event.phi_types and event.resource_id:
-            if event.resource_id not in self._phi_access_log:
-                self._phi_access_log[event.resource_id] = []
-            self._phi_access_log[event.resource_id].append(event)
+            self._phi_resources.add(event.resource_id)
 
-        # TODO: Persist to database
         logger.debug(f"Audit: {event.event_type.value} - {event.description[:100]}")
 
         return event.id
@@ -576,25 +636,16 @@ class AuditService:
         end_time: Optional[datetime] = None,
         limit: int = 100,
     ) -> List[AuditEvent]:
-        """Query audit events"""
-        events = self._events
-
-        if user_id:
-            events = [e for e in events if e.user_id == user_id]
-
-        if session_id:
-            events = [e for e in events if e.session_id == session_id]
-
-        if event_type:
-            events = [e for e in events if e.event_type == event_type]
-
-        if start_time:
-            events = [e for e in events if e.timestamp >= start_time]
-
-        if end_time:
-            events = [e for e in events if e.timestamp <= end_time]
-
-        return events[-limit:]
+        """Query audit events (the most recent `limit` matches, oldest first)"""
+        return await asyncio.to_thread(
+            self._store.query,
+            user_id=user_id,
+            session_id=session_id,
+            event_type=event_type.value if event_type else None,
+            start_time=start_time,
+            end_time=end_time,
+            limit=limit,
+        )
 
     async def get_phi_access_log(
         self,
@@ -603,15 +654,14 @@ class AuditService:
         end_time: Optional[datetime] = None,
     ) -> List[AuditEvent]:
         """Get PHI access log for a resource"""
-        events = self._phi_access_log.get(resource_id, [])
-
-        if start_time:
-            events = [e for e in events if e.timestamp >= start_time]
-
-        if end_time:
-            events = [e for e in events if e.timestamp <= end_time]
-
-        return events
+        return await asyncio.to_thread(
+            self._store.query,
+            resource_id=resource_id,
+            start_time=start_time,
+            end_time=end_time,
+            predicate=lambda e: bool(e.phi_types),
+            limit=None,
+        )
 
     async def get_accounting_of_disclosures(
         self,
@@ -638,20 +688,22 @@ class AuditService:
         )
 
         # Find all disclosures for this patient
-        events = await self.get_events(
-            event_type=AuditEventType.PHI_DISCLOSED,
+        events = await asyncio.to_thread(
+            self._store.query,
+            resource_id=patient_id,
+            event_type=AuditEventType.PHI_DISCLOSED.value,
             start_time=start_date,
             end_time=end_date,
+            limit=None,
         )
 
         for event in events:
-            if event.resource_id == patient_id:
-                accounting.add_disclosure(
-                    date=event.timestamp,
-                    recipient=event.disclosure_recipient or "Unknown",
-                    purpose=event.metadata.get("purpose", "Unknown"),
-                    description=event.description,
-                )
+            accounting.add_disclosure(
+                date=event.timestamp,
+                recipient=event.disclosure_recipient or "Unknown",
+                purpose=event.metadata.get("purpose", "Unknown"),
+                description=event.description,
+            )
 
         return accounting
 
@@ -687,13 +739,10 @@ class AuditService:
     # === Retention ===
 
     async def cleanup_old_events(self) -> int:
-        """Remove events older than retention period"""
+        """Remove events older than retention period (compacts the segment store)"""
         cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
 
-        original_count = len(self._events)
-        self._events = [e for e in self._events if e.timestamp >= cutoff]
-
-        removed = original_count - len(self._events)
+        removed = await self._store.compact(cutoff)
         if removed > 0:
             logger.info(f"Cleaned up {removed} audit events older than {self.retention_days} days")
 
@@ -701,16 +750,12 @@ class AuditService:
 
     def get_stats(self) -> Dict[str, Any]:
         """Get audit service statistics"""
-        event_counts = {}
-        for event in self._events:
-            key = event.event_type.value
-            event_counts[key] = event_counts.get(key, 0) + 1
-
         return {
-            "total_events": len(self._events),
-            "event_counts": event_counts,
-            "phi_resources_tracked": len(self._phi_access_log),
+            "total_events": self._store.total_events,
+            "event_counts": self._store.event_type_counts(),
+            "phi_resources_tracked": len(self._phi_resources),
             "retention_days": self.retention_days,
+            "store": self._store.get_stats(),
         }
 
 
@@ -722,9 +767,20 @@ def get_audit_service() -> AuditService:
     """Get the global audit service instance"""
     global _audit_service_instance
     if _audit_service_instance is None:
+        from app.core.config import settings
         from app.core.event_bus import get_event_bus
 
-        _audit_service_instance = AuditService(event_bus=get_event_bus())
+        store = None
+        if settings.AUDIT_LOG_DIR:
+            from app.core.audit_store import PostgresAuditSink
+
+            store = AuditSegmentStore(
+                settings.AUDIT_LOG_DIR,
+                decode=AuditEvent.from_dict,
+                fsync_interval_seconds=settings.AUDIT_LOG_FSYNC_INTERVAL_MS / 1000,
+                sink=PostgresAuditSink() if settings.AUDIT_LOG_POSTGRES_SINK else None,
+            )
+        _audit_service_instance = AuditService(event_bus=get_event_bus(), store=store)
     return _audit_service_instance
 
 
@@ -0,0 +1,798 @@
+"""
+Audit Segment Store - Durable Append-Only Audit Log
+
+Storage backend for AuditService.
+
+Events are appended as JSON lines to segment files. A segment is sealed
+when it reaches a size or age limit, and writes are fsynced on an interval
+(group commit) rather than per event. Each segment keeps in-memory indexes
+by user, session, resource and event type plus its time range, so queries
+skip segments outside the requested window and read only the matching
+records of the rest. The indexes are rebuilt from the files on open(),
+which also truncates a torn final record left by a crash.
+
+Retention is enforced by compact(): expired segments are deleted and
+segments straddling the cutoff are rewritten without the expired records.
+
+Records can additionally be shipped in batches to a sink, e.g.
+PostgresAuditSink, which bulk-inserts them into the audit_events table.
+
+Several processes (e.g. uvicorn workers) can share one directory. Each
+process writes its own segment files, named audit-<writer>-<segment>.log,
+and holds an flock on the segment it is appending to. Queries first pick up
+other writers' segments (new files, appended records, files rewritten by
+compaction) and merge results across segments by timestamp. A segment
+nobody holds a lock on is sealed and may be compacted by any process.
+
+Without a directory the store keeps segments in memory only, capped at
+max_events.
+"""
+
+import asyncio
+import fcntl
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Record fields with a secondary index
+INDEXED_FIELDS = ("user_id", "session_id", "resource_id", "event_type")
+
+
+@dataclass
+class AuditSegment:
+    """One append-only segment and its indexes"""
+
+    segment_id: int
+    path: Optional[str] = None
+    writer: str = ""
+    inode: Optional[int] = None  # Detects files replaced by another process's compaction
+    created_at: float = field(default_factory=time.time)
+    min_ts: Optional[datetime] = None
+    max_ts: Optional[datetime] = None
+    size_bytes: int = 0
+    offsets: List[int] = field(default_factory=list)  # Byte offset of each record
+    events: Optional[List[Any]] = None  # Decoded events while cached in memory
+    indexes: Dict[str, Dict[str, List[int]]] = field(default_factory=lambda: {f: {} for f in INDEXED_FIELDS})
+    type_counts: Dict[str, int] = field(default_factory=dict)
+    sealed: bool = False
+
+    @property
+    def count(self) -> int:
+        return len(self.offsets)
+
+    @property
+    def key(self):
+        return self.path or id(self)
+
+    def add(self, record: Dict[str, Any], timestamp: datetime, offset: int, size: int) -> int:
+        """Index a record stored at offset; returns its position"""
+        position = len(self.offsets)
+        self.offsets.append(offset)
+        self.size_bytes = offset + size
+
+        for name in INDEXED_FIELDS:
+            value = record.get(name)
+            if value is not None:
+                self.indexes[name].setdefault(value, []).append(position)
+
+        event_type = record.get("event_type")
+        self.type_counts[event_type] = self.type_counts.get(event_type, 0) + 1
+
+        if self.min_ts is None or timestamp < self.min_ts:
+            self.min_ts = timestamp
+        if self.max_ts is None or timestamp > self.max_ts:
+            self.max_ts = timestamp
+        return position
+
+    def overlaps(self, start: Optional[datetime], end: Optional[datetime]) -> bool:
+        if not self.count:
+            return False
+        if start is not None and self.max_ts < start:
+            return False
+        if end is not None and self.min_ts > end:
+            return False
+        return True
+
+    def candidates(self, filters: Dict[str, Any]) -> List[int]:
+        """Positions that may match, from the most selective index"""
+        if not filters:
+            return range(self.count)
+        return min((self.indexes[name].get(value, []) for name, value in filters.items()), key=len)
+
+
+class _SegmentChanged(Exception):
+    """A segment file was replaced or removed while it was being read"""
+
+
+class PostgresAuditSink:
+    """
+    Bulk-inserts audit records into the audit_events table.
+
+    Uses the shared async engine; each write() is a single multi-row
+    INSERT in one transaction.
+    """
+
+    def __init__(self, engine=None, table_name: str = "audit_events"):
+        self._engine = engine
+        self.table_name = table_name
+        self._table = None
+
+    async def write(self, records: List[Dict[str, Any]]) -> None:
+        if not records:
+            return
+
+        if self._engine is None:
+            from app.core.database import async_engine
+
+            self._engine = async_engine
+
+        rows = [self._row(record) for record in records]
+        async with self._engine.begin() as conn:
+            await conn.execute(self._get_table().insert(), rows)
+
+    def _get_table(self):
+        if self._table is None:
+            import sqlalchemy as sa
+            from sqlalchemy.dialects.postgresql import JSONB
+
+            self._table = sa.Table(
+                self.table_name,
+                sa.MetaData(),
+                sa.Column("id", sa.String(36), primary_key=True),
+                sa.Column("event_type", sa.String(64)),
+                sa.Column("severity", sa.String(16)),
+                sa.Column("timestamp", sa.DateTime),
+                sa.Column("user_id", sa.String(255)),
+                sa.Column("session_id", sa.String(255)),
+                sa.Column("resource_type", sa.String(100)),
+                sa.Column("resource_id", sa.String(255)),
+                sa.Column("action", sa.String(100)),
+                sa.Column("outcome", sa.String(20)),
+                sa.Column("disclosure_recipient", sa.String(255)),
+                sa.Column("correlation_id", sa.String(100)),
+                sa.Column("record", JSONB),
+            )
+        return self._table
+
+    @staticmethod
+    def _row(record: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": record["id"],
+            "event_type": record.get("event_type"),
+            "severity": record.get("severity"),
+            "timestamp": datetime.fromisoformat(record["timestamp"]),
+            "user_id": record.get("user_id"),
+            "session_id": record.get("session_id"),
+            "resource_type": record.get("resource_type"),
+            "resource_id": record.get("resource_id"),
+            "action": record.get("action"),
+            "outcome": record.get("outcome"),
+            "disclosure_recipient": record.get("disclosure_recipient"),
+            "correlation_id": record.get("correlation_id"),
+            "record": record,
+        }
+
+
+class AuditSegmentStore:
+    """
+    Append-only, indexed audit event store.
+
+    Usage:
+        store = AuditSegmentStore("/var/lib/voiceassist/audit", decode=AuditEvent.from_dict)
+        await store.open()
+        store.append(event)
+        events = await asyncio.to_thread(store.query, user_id="u1", start_time=since, limit=100)
+
+    append() runs on the event loop; query() and compact()'s rewrites do file
+    I/O and belong in a worker thread.
+    """
+
+    SEGMENT_FILE_PREFIX = "audit-"
+    SEGMENT_FILE_SUFFIX = ".log"
+
+    def __init__(
+        self,
+        directory: Optional[str],
+        decode: Callable[[Dict[str, Any]], Any],
+        segment_max_bytes: int = 64 * 1024 * 1024,
+        segment_max_events: int = 100_000,
+        segment_max_seconds: float = 3600.0,
+        fsync_interval_seconds: float = 0.2,
+        cached_segments: int = 4,
+        max_events: int = 10_000,
+        sink=None,
+        sink_batch_size: int = 500,
+        sink_max_pending: int = 50_000,
+    ):
+        """
+        Args:
+            directory: Segment directory; None keeps everything in memory
+            decode: Builds an event from a stored record (e.g. AuditEvent.from_dict)
+            segment_max_bytes / segment_max_events / segment_max_seconds: Seal limits
+            fsync_interval_seconds: Group commit interval of the background syncer
+            cached_segments: Recent sealed segments kept decoded in memory
+            max_events: Event cap for the in-memory store (ignored with a directory)
+            sink: Optional secondary sink with an async write(records) method
+        """
+        self.directory = directory
+        self.decode = decode
+        self.segment_max_bytes = segment_max_bytes
+        self.segment_max_events = segment_max_events if directory else min(segment_max_events, max(max_events // 10, 1))
+        self.segment_max_seconds = segment_max_seconds
+        self.fsync_interval_seconds = fsync_interval_seconds
+        self.cached_segments = cached_segments
+        self.max_events = max_events
+        self.sink = sink
+        self.sink_batch_size = sink_batch_size
+        self.sink_max_pending = sink_max_pending
+
+        self.writer_id: Optional[str] = None
+        self._segments: List[AuditSegment] = []
+        self._active: Optional[AuditSegment] = None
+        self._lock = threading.RLock()  # Guards self._segments against query threads
+        self._next_segment_id = 1
+        self._fd: Optional[int] = None
+        self._retiring: Set[asyncio.Task] = set()
+        self._dirty = False
+        self._sink_pending: List[Dict[str, Any]] = []
+        self._sink_flush: Optional[asyncio.Task] = None
+        self._sync_task: Optional[asyncio.Task] = None
+        self._running = False
+        self._opened = directory is None
+
+        self._stats = {"appended": 0, "fsyncs": 0, "sink_written": 0, "sink_errors": 0, "sink_dropped": 0}
+
+    # =========================================================================
+    # Lifecycle
+    # =========================================================================
+
+    async def open(self) -> None:
+        """Load existing segments and rebuild their indexes"""
+        if self._opened:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        # Chosen here rather than in __init__ so processes forked after construction get their own
+        self.writer_id = f"{os.getpid()}x{uuid.uuid4().hex[:8]}"
+        self._segments = await asyncio.to_thread(self._load_segments)
+        self._opened = True
+        logger.info(f"Audit store opened: {len(self._segments)} segments, {self.total_events} events")
+
+    async def start(self) -> None:
+        """Open the store and start the background fsync / sink loop"""
+        await self.open()
+        if self._running:
+            return
+        self._running = True
+        self._sync_task = asyncio.create_task(self._sync_loop())
+
+    async def stop(self) -> None:
+        """Stop background work, flush everything and close the active segment"""
+        self._running = False
+        if self._sync_task:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+            self._sync_task = None
+
+        await self.flush()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        if self._active is not None:
+            self._active.sealed = True
+            self._active = None
+        if self._retiring:
+            await asyncio.gather(*self._retiring, return_exceptions=True)
+
+    async def flush(self) -> None:
+        """fsync pending writes and ship pending records to the sink"""
+        await self.sync()
+        await self.flush_sink()
+
+    async def sync(self) -> None:
+        if self._fd is None or not self._dirty:
+            return
+        self._dirty = False
+        await asyncio.to_thread(os.fsync, self._fd)
+        self._stats["fsyncs"] += 1
+
+    async def _sync_loop(self) -> None:
+        while self._running:
+            try:
+                await asyncio.sleep(self.fsync_interval_seconds)
+                await self.sync()
+                if self._sink_pending:
+                    await self.flush_sink()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Audit store sync error: {e}")
+
+    # =========================================================================
+    # Writes
+    # =========================================================================
+
+    def append(self, event: Any) -> None:
+        """
+        Append an event.
+
+        The record reaches the OS before this returns; it is fsynced by the
+        background syncer within fsync_interval_seconds (or by flush()).
+        """
+        if not self._opened:
+            raise RuntimeError("AuditSegmentStore.open() must be called before append()")
+
+        record = event.to_dict()
+        segment = self._writable_segment()
+
+        if segment.path is not None:
+            line = (json.dumps(record, default=str, separators=(",", ":")) + "\n").encode("utf-8")
+            offset = segment.size_bytes
+            os.write(self._fd, line)
+            self._dirty = True
+            size = len(line)
+        else:
+            offset, size = segment.count, 1
+
+        segment.add(record, event.timestamp, offset, size)
+        if segment.events is not None:
+            segment.events.append(event)
+        self._stats["appended"] += 1
+
+        if self.directory is None and self.total_events > self.max_events:
+            self._evict_memory()
+
+        if self.sink is not None:
+            self._queue_for_sink(record)
+
+    def _writable_segment(self) -> AuditSegment:
+        segment = self._active
+        if segment is not None:
+            full = (
+                segment.size_bytes >= self.segment_max_bytes
+                or segment.count >= self.segment_max_events
+                or time.time() - segment.created_at >= self.segment_max_seconds
+            )
+            if not full:
+                return segment
+            self._seal(segment)
+
+        segment = AuditSegment(segment_id=self._next_segment_id, writer=self.writer_id or "", events=[])
+        self._next_segment_id += 1
+        if self.directory is not None:
+            segment.path = os.path.join(
+                self.directory,
+                f"{self.SEGMENT_FILE_PREFIX}{self.writer_id}-{segment.segment_id:012d}{self.SEGMENT_FILE_SUFFIX}",
+            )
+            self._fd = os.open(segment.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+            # Held until the segment is sealed; tells other processes it is still growing
+            fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            segment.inode = os.fstat(self._fd).st_ino
+        with self._lock:
+            self._segments.append(segment)
+        self._active = segment
+        return segment
+
+    def _seal(self, segment: AuditSegment) -> None:
+        segment.sealed = True
+        if segment is self._active:
+            self._active = None
+        if self._fd is not None:
+            # Sealed segments are immutable, so sync this one before moving on (off the event loop)
+            fd, self._fd = self._fd, None
+            self._dirty = False
+            try:
+                task = asyncio.get_running_loop().create_task(asyncio.to_thread(self._sync_and_close, fd))
+                self._retiring.add(task)
+                task.add_done_callback(self._retiring.discard)
+            except RuntimeError:
+                self._sync_and_close(fd)
+
+        if self.directory is not None:
+            cached = [s for s in self._segments if s.sealed and s.events is not None]
+            for old in cached[: max(len(cached) - self.cached_segments, 0)]:
+                old.events = None
+
+    def _sync_and_close(self, fd: int) -> None:
+        try:
+            os.fsync(fd)
+            self._stats["fsyncs"] += 1
+        except OSError as e:
+            logger.error(f"Audit segment fsync failed: {e}")
+        finally:
+            os.close(fd)  # Releases the writer lock
+
+    def _evict_memory(self) -> None:
+        while self.total_events > self.max_events and len(self._segments) > 1:
+            self._segments.pop(0)
+
+    def _queue_for_sink(self, record: Dict[str, Any]) -> None:
+        self._sink_pending.append(record)
+        overflow = len(self._sink_pending) - self.sink_max_pending
+        if overflow > 0:
+            # Records remain in the segment files; only the secondary copy is dropped
+            del self._sink_pending[:overflow]
+            self._stats["sink_dropped"] += overflow
+        if len(self._sink_pending) >= self.sink_batch_size and (self._sink_flush is None or self._sink_flush.done()):
+            try:
+                self._sink_flush = asyncio.get_running_loop().create_task(self.flush_sink())
+            except RuntimeError:
+                pass
+
+    async def flush_sink(self) -> int:
+        """Ship pending records to the sink in batches; returns records written"""
+        written = 0
+        while self.sink is not None and self._sink_pending:
+            batch = self._sink_pending[: self.sink_batch_size]
+            try:
+                await self.sink.write(batch)
+            except Exception as e:
+                self._stats["sink_errors"] += 1
+                logger.error(f"Audit sink write failed ({len(batch)} records pending retry): {e}")
+                break
+            del self._sink_pending[: len(batch)]
+            written += len(batch)
+            self._stats["sink_written"] += len(batch)
+        return written
+
+    # =========================================================================
+    # Queries
+    # =========================================================================
+
+    def query(
+        self,
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        resource_id: Optional[str] = None,
+        event_type: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        predicate: Optional[Callable[[Any], bool]] = None,
+        limit: Optional[int] = 100,
+    ) -> List[Any]:
+        """
+        Most recent matching events (at most limit), oldest first.
+
+        Segments outside [start_time, end_time] are skipped; within a
+        segment only the positions from the most selective index are read.
+        Segments of all writers are merged by timestamp. Does file I/O; call
+        it from a worker thread.
+        """
+        for attempt in range(3):
+            if self.directory is not None:
+                self.refresh()
+            try:
+                return self._query(user_id, session_id, resource_id, event_type, start_time, end_time, predicate, limit)
+            except _SegmentChanged:
+                # Compacted or removed by another process mid-read; pick up the new file and retry
+                continue
+        raise RuntimeError("Audit segments kept changing during query")
+
+    def _query(self, user_id, session_id, resource_id, event_type, start_time, end_time, predicate, limit):
+        filters = {
+            name: value
+            for name, value in (
+                ("user_id", user_id),
+                ("session_id", session_id),
+                ("resource_id", resource_id),
+                ("event_type", event_type),
+            )
+            if value
+        }
+
+        with self._lock:
+            segments = [s for s in self._segments if s.overlaps(start_time, end_time)]
+
+        # Newest `limit` matches as (timestamp, -read order, event); within a segment
+        # records are read newest first, so ties keep append order
+        heap: List[Any] = []
+        read = 0
+        for segment in sorted(segments, key=lambda s: s.max_ts, reverse=True):
+            if limit is not None and len(heap) >= limit and segment.max_ts < heap[0][0]:
+                break  # Every remaining segment is older than what we already have
+
+            positions = segment.candidates(filters)
+            if not positions:
+                continue
+
+            taken = 0
+            for event in self._read_reversed(segment, positions):
+                record_time = event.timestamp
+                if start_time is not None and record_time < start_time:
+                    continue
+                if end_time is not None and record_time > end_time:
+                    continue
+                if not self._matches(event, filters):
+                    continue
+                if predicate is not None and not predicate(event):
+                    continue
+                read += 1
+                item = (record_time, -read, event)
+                if limit is None or len(heap) < limit:
+                    heapq.heappush(heap, item)
+                else:
+                    heapq.heappushpop(heap, item)
+                taken += 1
+                if limit is not None and taken >= limit:
+                    break
+
+        return [event for _, _, event in sorted(heap, key=lambda item: item[:2])]
+
+    def _read_reversed(self, segment: AuditSegment, positions: Iterable[int]):
+        if segment.events is not None:
+            for position in reversed(positions):
+                yield segment.events[position]
+            return
+
+        try:
+            f = open(segment.path, "rb")
+        except FileNotFoundError:
+            raise _SegmentChanged(segment.path)
+        with f:
+            if segment.inode is not None and os.fstat(f.fileno()).st_ino != segment.inode:
+                raise _SegmentChanged(segment.path)
+            for position in reversed(positions):
+                f.seek(segment.offsets[position])
+                yield self.decode(json.loads(f.readline()))
+
+    def refresh(self) -> None:
+        """
+        Pick up changes made by other processes sharing the directory.
+
+        Adds new segment files, indexes records appended to other writers'
+        active segments, reloads files rewritten by compaction and drops
+        deleted ones. Does file I/O; call it from a worker thread.
+        """
+        if self.directory is None:
+            return
+        with self._lock:
+            known = {s.path: s for s in self._segments if s.path is not None}
+            listed = {}
+            for entry in os.scandir(self.directory):
+                parsed = self._parse_segment_name(entry.name)
+                if parsed is not None:
+                    listed[entry.path] = (parsed, entry.inode())
+
+            segments = []
+            for segment in self._segments:
+                if segment is self._active or segment.path is None:
+                    segments.append(segment)
+                    continue
+                if segment.path not in listed:
+                    continue  # Removed by another process's compaction
+                (writer, segment_id), inode = listed[segment.path]
+                if inode != segment.inode:
+                    segment = self._load_segment(segment.path, writer, segment_id)
+                elif not segment.sealed:
+                    self._follow(segment)
+                segments.append(segment)
+
+            for path, ((writer, segment_id), _) in sorted(listed.items()):
+                if path not in known:
+                    segments.append(self._load_segment(path, writer, segment_id))
+
+            self._segments = segments
+
+    @staticmethod
+    def _matches(event: Any, filters: Dict[str, Any]) -> bool:
+        for name, value in filters.items():
+            actual = getattr(event, name, None)
+            if name == "event_type" and actual is not None:
+                actual = getattr(actual, "value", actual)
+            if actual != value:
+                return False
+        return True
+
+    @property
+    def total_events(self) -> int:
+        return sum(segment.count for segment in self._segments)
+
+    def event_type_counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for segment in self._segments:
+            for event_type, count in segment.type_counts.items():
+                counts[event_type] = counts.get(event_type, 0) + count
+        return counts
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "segments": len(self._segments),
+            "total_events": self.total_events,
+            "sink_pending": len(self._sink_pending),
+            "durable": self.directory is not None,
+        }
+
+    # =========================================================================
+    # Retention
+    # =========================================================================
+
+    async def compact(self, cutoff: datetime) -> int:
+        """
+        Remove events older than cutoff; returns the number removed.
+
+        Whole segments are deleted when possible; a segment straddling the
+        cutoff is rewritten to a temporary file and swapped in atomically.
+        """
+        active = self._active
+        if active is not None and active.min_ts is not None and active.min_ts < cutoff:
+            self._seal(active)
+        if self._retiring:
+            # Let the sealed segment's writer lock go so it can be rewritten below
+            await asyncio.gather(*self._retiring, return_exceptions=True)
+
+        if self.directory is not None:
+            await asyncio.to_thread(self.refresh)
+
+        removed = 0
+        with self._lock:
+            snapshot = list(self._segments)
+        kept: List[AuditSegment] = []
+        for segment in snapshot:
+            # Unsealed segments include other writers' active ones; their owner compacts those
+            if not segment.sealed or segment.min_ts is None or segment.min_ts >= cutoff:
+                kept.append(segment)
+                continue
+
+            if segment.max_ts < cutoff:
+                removed += segment.count
+                if segment.path is not None:
+                    try:
+                        await asyncio.to_thread(os.remove, segment.path)
+                    except FileNotFoundError:
+                        pass  # Another process got there first
+                continue
+
+            replacement = await asyncio.to_thread(self._rewrite_segment, segment, cutoff)
+            removed += segment.count - replacement.count
+            kept.append(replacement)
+
+        # Segments created while compacting are kept as-is
+        seen = {segment.key for segment in snapshot}
+        with self._lock:
+            self._segments = kept + [s for s in self._segments if s.key not in seen]
+        return removed
+
+    def _rewrite_segment(self, segment: AuditSegment, cutoff: datetime) -> AuditSegment:
+        replacement = AuditSegment(
+            segment_id=segment.segment_id,
+            path=segment.path,
+            writer=segment.writer,
+            created_at=segment.created_at,
+            sealed=True,
+        )
+        if segment.path is None:
+            replacement.events = []
+            for event in segment.events:
+                if event.timestamp >= cutoff:
+                    replacement.add(event.to_dict(), event.timestamp, replacement.count, 1)
+                    replacement.events.append(event)
+            return replacement
+
+        try:
+            src = open(segment.path, "rb")
+        except FileNotFoundError:
+            return AuditSegment(segment_id=segment.segment_id, writer=segment.writer, sealed=True)
+        with src:
+            try:
+                # Keeps two processes from rewriting the same segment at once
+                fcntl.flock(src.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return segment
+            rewritten = os.fstat(src.fileno()).st_ino != segment.inode
+            if not rewritten:
+                self._write_compacted(src, segment.path, replacement, cutoff)
+        if rewritten:
+            # Already compacted by another process
+            return self._load_segment(segment.path, segment.writer, segment.segment_id)
+        return replacement
+
+    @staticmethod
+    def _write_compacted(src, path: str, replacement: AuditSegment, cutoff: datetime) -> None:
+        tmp_path = f"{path}.{os.getpid()}.compact"
+        offset = 0
+        with open(tmp_path, "wb") as dst:
+            for line in src:
+                record = json.loads(line)
+                timestamp = datetime.fromisoformat(record["timestamp"])
+                if timestamp < cutoff:
+                    continue
+                dst.write(line)
+                replacement.add(record, timestamp, offset, len(line))
+                offset += len(line)
+            dst.flush()
+            os.fsync(dst.fileno())
+            replacement.inode = os.fstat(dst.fileno()).st_ino
+        os.replace(tmp_path, path)
+
+    # =========================================================================
+    # Recovery
+    # =========================================================================
+
+    def _parse_segment_name(self, name: str):
+        """(writer, segment_id) for a segment file name, else None"""
+        if not (name.startswith(self.SEGMENT_FILE_PREFIX) and name.endswith(self.SEGMENT_FILE_SUFFIX)):
+            return None
+        stem = name[len(self.SEGMENT_FILE_PREFIX) : -len(self.SEGMENT_FILE_SUFFIX)]
+        writer, _, segment_id = stem.rpartition("-")  # Single-writer layouts have no writer part
+        if not segment_id.isdigit():
+            return None
+        return writer, int(segment_id)
+
+    def _load_segments(self) -> List[AuditSegment]:
+        segments = []
+        for name in sorted(os.listdir(self.directory)):
+            parsed = self._parse_segment_name(name)
+            if parsed is not None:
+                segments.append(self._load_segment(os.path.join(self.directory, name), *parsed))
+        return segments
+
+    def _load_segment(self, path: str, writer: str, segment_id: int) -> AuditSegment:
+        """
+        Index a segment file.
+
+        A segment another process still holds the writer lock on is left
+        unsealed and followed by refresh(); otherwise a torn final record
+        (from a crash) is truncated.
+        """
+        segment = AuditSegment(segment_id=segment_id, path=path, writer=writer, sealed=True)
+        try:
+            with open(path, "rb") as f:
+                stat = os.fstat(f.fileno())
+                segment.inode, segment.created_at = stat.st_ino, stat.st_mtime
+                try:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_SH | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    segment.sealed = False
+                self._index_records(segment, f)
+                if segment.sealed and segment.size_bytes < stat.st_size:
+                    logger.warning(f"Truncating audit segment {os.path.basename(path)} at byte {segment.size_bytes}")
+                    with open(path, "r+b") as w:
+                        w.truncate(segment.size_bytes)
+        except FileNotFoundError:
+            pass
+        return segment
+
+    def _follow(self, segment: AuditSegment) -> None:
+        """Index records appended to another writer's active segment"""
+        try:
+            with open(segment.path, "rb") as f:
+                try:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_SH | fcntl.LOCK_NB)
+                    sealed = True
+                except BlockingIOError:
+                    sealed = False
+                f.seek(segment.size_bytes)
+                self._index_records(segment, f)
+                segment.sealed = sealed
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _index_records(segment: AuditSegment, f) -> None:
+        """Index complete records from f's position; stops at a torn or corrupt one"""
+        offset = segment.size_bytes
+        for line in f:
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("incomplete record")
+                record = json.loads(line)
+                timestamp = datetime.fromisoformat(record["timestamp"])
+            except (ValueError, KeyError):
+                break
+            segment.add(record, timestamp, offset, len(line))
+            offset += len(line)
+
+
+__all__ = ["AuditSegment", "AuditSegmentStore", "PostgresAuditSink"]
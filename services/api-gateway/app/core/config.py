@@ -67,6 +67,8 @@ class Settings(BaseSettings):
     NEXTCLOUD_URL: str = "http://nextcloud"
     NEXTCLOUD_ADMIN_USER: str = "admin"
     NEXTCLOUD_ADMIN_PASSWORD: str
+    NEXTCLOUD_CRAWL_MANIFEST_PATH: Optional[str] = None  # JSON manifest for incremental crawls (in memory if unset)
+    NEXTCLOUD_CRAWL_CONCURRENCY: int = 4  # Files fetched and indexed at once
 
     # OpenAI
     OPENAI_API_KEY: Optional[str] = None
@@ -212,6 +214,58 @@ class Settings(BaseSettings):
     CACHE_L1_MAX_SIZE: int = 1000  # Max entries in L1 cache
     CACHE_DEFAULT_TTL: int = 600  # Default TTL in seconds (10 minutes)
 
+    # Semantic answer cache for near-duplicate RAG queries (app/services/rag_cache.py)
+    RAG_SEMANTIC_CACHE_ENABLED: bool = False
+    RAG_SEMANTIC_CACHE_THRESHOLD: float = 0.95  # Minimum cosine similarity for a hit
+    RAG_SEMANTIC_CACHE_MAX_ENTRIES: int = 2048
+    RAG_SEMANTIC_CACHE_TTL: int = 3600  # Seconds
+
+    # Hybrid search latency budget (app/services/hybrid_search_service.py)
+    HYBRID_SEARCH_LATENCY_BUDGET_MS: float = 1500.0  # Caps every leg's deadline; 0 = wait for all legs
+    HYBRID_SEARCH_VECTOR_DEADLINE_MS: float = 1500.0  # Vector/semantic leg
+    HYBRID_SEARCH_BM25_DEADLINE_MS: float = 500.0  # BM25/keyword leg
+    HYBRID_SEARCH_LATE_LEG_CACHE_TTL: int = 300  # Seconds to keep results of legs that missed the budget
+
+    # Local cross-encoder re-ranking (app/services/reranking_service.py)
+    RERANKER_CROSS_ENCODER_BACKEND: str = "torch"  # torch | onnx
+    RERANKER_CROSS_ENCODER_ONNX_FILE: Optional[str] = None  # e.g. onnx/model_qint8_avx512.onnx
+    RERANKER_BATCH_WINDOW_MS: float = 5.0  # Coalescing window for concurrent queries
+    RERANKER_MAX_BATCH_PAIRS: int = 256
+
+    # Local medical embedding models (app/services/medical_embedding_service.py)
+    MEDICAL_EMBEDDING_MAX_BATCH_TOKENS: int = 8192  # Padded tokens per forward pass
+
+    # Document text extraction (app/services/file_processor.py)
+    FILE_PROCESSOR_WORKERS: int = 2  # Extraction processes (0 = thread, no process pool)
+    FILE_PROCESSOR_PAGES_PER_TASK: int = 8  # PDF pages per worker task
+    FILE_PROCESSOR_MAX_FILE_MB: int = 100  # Larger files are rejected before parsing
+    FILE_PROCESSOR_MAX_PAGES: int = 2000  # PDF pages beyond this are skipped
+    FILE_PROCESSOR_MAX_TEXT_CHARS: int = 10_000_000  # Extraction stops after this much text
+    FILE_PROCESSOR_MAX_IMAGE_PIXELS: int = 100_000_000  # Pillow decompression-bomb limit for OCR
+
+    # Document processing worker (app/services/document_queue.py)
+    DOCUMENT_INTERACTIVE_MAX_JOBS: int = 5  # Concurrent jobs per interactive-lane worker
+    DOCUMENT_BULK_MAX_JOBS: int = 2  # Concurrent jobs per bulk-lane worker
+    DOCUMENT_PIPELINE_EMBED_BATCH: int = 64  # Chunks per embeddings request
+    DOCUMENT_PIPELINE_QUEUE_SIZE: int = 4  # Batches buffered between pipeline stages
+
+    # UMLS concept cache for medical NER normalization
+    UMLS_CONCEPT_TABLE_PATH: Optional[str] = None  # Prebuilt table (scripts/build_umls_concept_table.py)
+    UMLS_CONCEPT_CACHE_SIZE: int = 50000  # Max concepts in the in-process LRU
+
+    # Database query profiling (app/core/query_profiler.py)
+    QUERY_PROFILER_ENABLED: bool = True
+    QUERY_PROFILER_SAMPLE_RATE: float = 0.05  # Fraction of requests tracked for N+1 patterns
+    QUERY_PROFILER_DB_TIME_HEADER: bool = False  # Report DB time in a Server-Timing header
+    SLOW_QUERY_THRESHOLD_MS: int = 100
+    N_PLUS_ONE_THRESHOLD: int = 10
+    QUERY_BUDGET_PER_REQUEST: int = 50  # Warn when a request runs more queries (0 disables)
+
+    # Durable audit log (app/core/audit_store.py)
+    AUDIT_LOG_DIR: Optional[str] = None  # Segment directory; audit events stay in memory when unset
+    AUDIT_LOG_FSYNC_INTERVAL_MS: int = 200  # Group commit interval
+    AUDIT_LOG_POSTGRES_SINK: bool = False  # Also bulk-insert events into audit_events
+
     # External evidence sources
     EXTERNAL_SYNC_ENABLED: bool = True
     EXTERNAL_SYNC_INTERVAL_MINUTES: int = 180
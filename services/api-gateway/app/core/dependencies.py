@@ -9,7 +9,7 @@ JWT takes priority if both are provided.
 """
 
 from datetime import timezone
-from typing import Optional
+from typing import List, Optional
 
 from app.core.database import get_db
 from app.core.logging import get_logger
@@ -288,6 +288,15 @@ def ensure_admin_privileges(user: User) -> None:
         )
 
 
+def get_user_roles(user: User) -> List[str]:
+    """Roles that scope what a user may be shown, e.g. cached RAG answers."""
+
+    roles = {user.admin_role or "user"}
+    if user.is_admin:
+        roles.add("admin")
+    return sorted(roles)
+
+
 async def get_optional_current_user(
     request: Request,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
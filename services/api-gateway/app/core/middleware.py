@@ -185,6 +185,40 @@ class RequestTracingMiddleware(BaseHTTPMiddleware):
             raise
 
 
+class QueryProfilingMiddleware(BaseHTTPMiddleware):
+    """
+    Attribute database queries to the route serving each request
+
+    Records per-route query count and DB time histograms, flags N+1
+    patterns and query budget overruns (see app.core.query_profiler), and
+    optionally reports DB time in a Server-Timing response header. Add it
+    inside RequestTracingMiddleware so warnings carry the correlation ID.
+    """
+
+    def __init__(self, app, profiler=None, db_time_header: bool = False):
+        super().__init__(app)
+        if profiler is None:
+            from app.core.query_profiler import get_query_profiler
+
+            profiler = get_query_profiler()
+        self.profiler = profiler
+        self.db_time_header = db_time_header
+
+    async def dispatch(self, request: Request, call_next):
+        if not self.profiler.enabled:
+            return await call_next(request)
+
+        with self.profiler.profile_request(request.method, request.url.path) as stats:
+            response = await call_next(request)
+            route = request.scope.get("route")
+            stats.route = getattr(route, "path", None)
+
+        if self.db_time_header:
+            response.headers["Server-Timing"] = f'db;dur={stats.query_time_ms:.1f};desc="{stats.query_count} queries"'
+
+        return response
+
+
 class MetricsMiddleware(BaseHTTPMiddleware):
     """
     Track request metrics for Prometheus
@@ -71,6 +71,8 @@ class VoicePolicyConfig:
     phi_ensemble_weight_regex: float = 0.4  # Weight for regex in ensemble
     phi_calibration_enabled: bool = True  # Enable Platt scaling calibration
     phi_context_filter_enabled: bool = True  # Enable context-aware filtering
+    phi_ner_chunk_overlap_chars: int = 64  # Overlap between NER chunks for span stitching
+    phi_ner_max_parallel_batches: int = 4  # NER inference threads, each with its own pipeline
 
     # Phase 4: De-identification
     deidentification_default_method: str = "redact"  # redact, mask, surrogate, token
@@ -89,6 +91,7 @@ class VoicePolicyConfig:
 
     # ===== Analytics Engine =====
     latency_anomaly_threshold: float = 0.2  # 20% deviation from baseline
+    anomaly_batch_interval_ms: int = 0  # >0 checks anomalies in batches on a timer instead of per sample
     error_rate_alert_threshold: float = 0.05  # 5% error rate triggers alert
     circuit_breaker_threshold: int = 5  # Consecutive errors to open circuit
 
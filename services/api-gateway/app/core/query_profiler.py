@@ -9,6 +9,14 @@ Features:
 - Prometheus metrics for query performance
 - Query execution time tracking
 - Connection pool monitoring integration
+- Request-scoped query counts/time per route, with N+1 detection and a
+  per-request query budget (see QueryProfilingMiddleware)
+
+Per-request N+1 tracking is sampled (sample_rate) so profiling can stay on
+in production: every request still gets its query count and DB time, but
+only sampled requests normalize statements. Normalized patterns are cached
+in an LRU keyed by statement text, which SQLAlchemy reuses across
+executions, so the regexes run once per distinct statement.
 
 Usage:
     from app.core.query_profiler import QueryProfiler
@@ -21,10 +29,15 @@ Usage:
 
 from __future__ import annotations
 
+import random
+import re
 import time
 from collections import defaultdict
 from contextlib import contextmanager
-from typing import Any, Dict, Optional
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from app.core.config import settings
 from app.core.logging import get_logger
@@ -54,6 +67,116 @@ n_plus_one_warnings_total = Counter(
 
 active_queries_gauge = Gauge("db_active_queries", "Number of currently executing database queries")
 
+request_query_count_histogram = Histogram(
+    "db_request_query_count",
+    "Database queries executed per HTTP request",
+    ["route"],
+    buckets=[0, 1, 2, 5, 10, 20, 50, 100, 250],
+)
+
+request_query_duration_histogram = Histogram(
+    "db_request_query_duration_seconds",
+    "Total database time per HTTP request in seconds",
+    ["route"],
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5],
+)
+
+request_n_plus_one_total = Counter(
+    "db_request_n_plus_one_total",
+    "Requests with a potential N+1 query pattern, by route",
+    ["route"],
+)
+
+request_query_budget_exceeded_total = Counter(
+    "db_request_query_budget_exceeded_total",
+    "Requests that executed more queries than the per-request budget, by route",
+    ["route"],
+)
+
+
+# =============================================================================
+# Statement Classification
+# =============================================================================
+
+_QUERY_TYPES = ("SELECT", "INSERT", "UPDATE", "DELETE", "BEGIN", "COMMIT", "ROLLBACK")
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_BIND = r"(?:%\(\w+\)s|%s|\$\d+|:\w+|\?|__\[\w+\])"
+_PARAM_LIST = re.compile(rf"\(\s*{_BIND}(?:\s*,\s*{_BIND})*\s*\)")
+_BIND_PARAM = re.compile(_BIND)
+_WHITESPACE = re.compile(r"\s+")
+
+# Max length of a normalized pattern
+PATTERN_MAX_LENGTH = 300
+
+
+@lru_cache(maxsize=4096)
+def classify_statement(statement: str) -> Tuple[str, str]:
+    """Query type and normalized pattern of a statement (LRU cached).
+
+    The pattern keeps the statement structure and replaces literals, bind
+    parameters and IN lists of any length with placeholders, so the same
+    query with different values (or list sizes) maps to one pattern.
+
+    Args:
+        statement: SQL statement string
+
+    Returns:
+        (query_type, pattern)
+    """
+    stripped = statement.strip()
+    head = stripped[:8].upper()
+    query_type = next((t for t in _QUERY_TYPES if head.startswith(t)), "OTHER")
+
+    pattern = _STRING_LITERAL.sub("?", stripped)
+    pattern = _PARAM_LIST.sub("(?)", pattern)
+    pattern = _BIND_PARAM.sub("?", pattern)
+    pattern = _NUMBER_LITERAL.sub("?", pattern)
+    pattern = _WHITESPACE.sub(" ", pattern).upper()
+    return query_type, pattern[:PATTERN_MAX_LENGTH]
+
+
+# =============================================================================
+# Request-Scoped Profiling
+# =============================================================================
+
+
+# Route label for requests no route matched (404s, scanners); raw paths would
+# give the per-route metrics unbounded cardinality
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+@dataclass
+class RequestQueryStats:
+    """Queries executed while serving one request."""
+
+    method: str
+    path: str
+    route: Optional[str] = None
+    sampled: bool = False
+    query_count: int = 0
+    query_time: float = 0.0  # seconds
+    patterns: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    n_plus_one: List[str] = field(default_factory=list)
+    started_at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def route_label(self) -> str:
+        return f"{self.method} {self.route or UNMATCHED_ROUTE}"
+
+    @property
+    def query_time_ms(self) -> float:
+        return self.query_time * 1000
+
+
+_current_request: ContextVar[Optional[RequestQueryStats]] = ContextVar("query_profiler_request", default=None)
+
+
+def get_current_request_stats() -> Optional[RequestQueryStats]:
+    """Query stats of the request being served in this context, if any."""
+    return _current_request.get()
+
 
 class QueryProfiler:
     """Database query profiler with slow query detection and N+1 detection.
@@ -72,6 +195,8 @@ class QueryProfiler:
         slow_query_threshold_ms: int = 100,
         n_plus_one_threshold: int = 10,
         enabled: bool = True,
+        sample_rate: float = 1.0,
+        query_budget: int = 0,
     ):
         """Initialize query profiler.
 
@@ -79,15 +204,21 @@ class QueryProfiler:
             slow_query_threshold_ms: Queries taking longer than this are logged as slow
             n_plus_one_threshold: Number of similar queries to trigger N+1 warning
             enabled: Whether to enable profiling (can be disabled in production)
+            sample_rate: Fraction of requests tracked for N+1 patterns
+            query_budget: Queries per request before a budget warning (0 disables)
         """
         self.slow_query_threshold_ms = slow_query_threshold_ms
         self.slow_query_threshold_sec = slow_query_threshold_ms / 1000.0
         self.n_plus_one_threshold = n_plus_one_threshold
         self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.query_budget = query_budget
 
-        # Track query patterns for N+1 detection
+        # Track query patterns for N+1 detection outside profile_request(),
+        # only while a track_request_queries() window is open
         self._query_patterns: Dict[str, int] = defaultdict(int)
         self._request_query_count: Dict[str, int] = defaultdict(int)
+        self._tracking_windows = 0
 
         self.logger = get_logger(__name__)
 
@@ -128,7 +259,7 @@ class QueryProfiler:
 
         Records the start time for query duration calculation.
         """
-        conn.info.setdefault("query_start_time", []).append(time.time())
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
         active_queries_gauge.inc()
 
     def _after_cursor_execute(
@@ -148,10 +279,10 @@ class QueryProfiler:
 
         # Calculate query duration
         start_time = conn.info["query_start_time"].pop()
-        duration = time.time() - start_time
+        duration = time.perf_counter() - start_time
 
         # Extract query type (SELECT, INSERT, UPDATE, DELETE)
-        query_type = self._extract_query_type(statement)
+        query_type, pattern = classify_statement(statement)
 
         # Update metrics
         query_duration_histogram.labels(query_type=query_type).observe(duration)
@@ -162,36 +293,19 @@ class QueryProfiler:
             self._log_slow_query(statement, parameters, duration, query_type)
             slow_queries_total.labels(query_type=query_type).inc()
 
-        # Track query patterns for N+1 detection
-        self._track_query_pattern(statement, query_type)
-
-    def _extract_query_type(self, statement: str) -> str:
-        """Extract the query type from SQL statement.
+        # Track query patterns for N+1 detection. Queries outside a request
+        # (startup, background jobs) are only tracked in an explicit window, so
+        # the process-wide counts stay bounded and warnings are not one-shot
+        request = _current_request.get()
+        if request is None:
+            if self._tracking_windows:
+                self._track_query_pattern(statement, query_type)
+            return
 
-        Args:
-            statement: SQL statement string
-
-        Returns:
-            Query type (SELECT, INSERT, UPDATE, DELETE, OTHER)
-        """
-        statement_upper = statement.strip().upper()
-
-        if statement_upper.startswith("SELECT"):
-            return "SELECT"
-        elif statement_upper.startswith("INSERT"):
-            return "INSERT"
-        elif statement_upper.startswith("UPDATE"):
-            return "UPDATE"
-        elif statement_upper.startswith("DELETE"):
-            return "DELETE"
-        elif statement_upper.startswith("BEGIN"):
-            return "BEGIN"
-        elif statement_upper.startswith("COMMIT"):
-            return "COMMIT"
-        elif statement_upper.startswith("ROLLBACK"):
-            return "ROLLBACK"
-        else:
-            return "OTHER"
+        request.query_count += 1
+        request.query_time += duration
+        if request.sampled and query_type == "SELECT":
+            self._track_request_pattern(request, pattern)
 
     def _log_slow_query(self, statement: str, parameters: Any, duration: float, query_type: str) -> None:
         """Log details of a slow query.
@@ -257,42 +371,40 @@ class QueryProfiler:
         Returns:
             Normalized query pattern
         """
-        # Simple normalization: extract table and column names
-        # More sophisticated pattern matching could be added
-        statement_upper = statement.strip().upper()
-
-        # Extract the main components
-        if "FROM" in statement_upper:
-            # Find table name
-            from_idx = statement_upper.find("FROM")
-            where_idx = statement_upper.find("WHERE", from_idx)
-
-            if where_idx > 0:
-                table_part = statement_upper[from_idx:where_idx].strip()
-            else:
-                table_part = (
-                    statement_upper[from_idx:].split()[1] if len(statement_upper[from_idx:].split()) > 1 else ""
-                )
+        return classify_statement(statement)[1]
 
-            return f"SELECT FROM {table_part}"  # nosec B608 - logging description, not executed SQL
+    def _track_request_pattern(self, request: RequestQueryStats, pattern: str) -> None:
+        """Count a SELECT pattern within the current request.
 
-        return statement_upper[:100]  # Fallback to first 100 chars
+        Args:
+            request: Stats of the request being served
+            pattern: Normalized query pattern
+        """
+        request.patterns[pattern] += 1
+        count = request.patterns[pattern]
+        if count == self.n_plus_one_threshold:
+            request.n_plus_one.append(pattern)
+            n_plus_one_warnings_total.inc()
+            request_n_plus_one_total.labels(route=request.route_label).inc()
+            self._log_n_plus_one_warning(pattern, count, route=request.route_label)
 
-    def _log_n_plus_one_warning(self, pattern: str, count: int) -> None:
+    def _log_n_plus_one_warning(self, pattern: str, count: int, route: Optional[str] = None) -> None:
         """Log a warning about potential N+1 query pattern.
 
         Args:
             pattern: Query pattern
             count: Number of times this pattern was executed
+            route: Route being served, when detected within a request
         """
         self.logger.warning(
-            f"POTENTIAL N+1 QUERY DETECTED\n"
+            f"POTENTIAL N+1 QUERY DETECTED{f' in {route}' if route else ''}\n"
             f"Pattern executed {count} times: {pattern}\n"
             f"Consider using eager loading (selectinload/joinedload) or joins to optimize.",
             extra={
                 "pattern": pattern,
                 "execution_count": count,
                 "threshold": self.n_plus_one_threshold,
+                "route": route,
             },
         )
 
@@ -317,6 +429,55 @@ class QueryProfiler:
         self._query_patterns.clear()
         self._request_query_count.clear()
 
+    @contextmanager
+    def profile_request(self, method: str, path: str) -> Iterator[RequestQueryStats]:
+        """Context manager that attributes queries in this context to a request.
+
+        Queries run by the request (including in threadpool workers and
+        async engine greenlets, which inherit the context) are counted into
+        the yielded stats. On exit the per-route histograms are updated and
+        the query budget is checked. Set stats.route to the route template
+        before exit; requests without one are labelled "<unmatched>".
+
+        Args:
+            method: HTTP method
+            path: Request path (logged; not used as a metric label)
+
+        Yields:
+            RequestQueryStats for the request
+        """
+        stats = RequestQueryStats(
+            method=method,
+            path=path,
+            sampled=self.sample_rate >= 1.0 or random.random() < self.sample_rate,  # nosec B311 - sampling
+        )
+        token = _current_request.set(stats)
+        try:
+            yield stats
+        finally:
+            _current_request.reset(token)
+            self._finish_request(stats)
+
+    def _finish_request(self, stats: RequestQueryStats) -> None:
+        """Record per-route metrics and enforce the query budget."""
+        route = stats.route_label
+        request_query_count_histogram.labels(route=route).observe(stats.query_count)
+        request_query_duration_histogram.labels(route=route).observe(stats.query_time)
+
+        if self.query_budget and stats.query_count > self.query_budget:
+            request_query_budget_exceeded_total.labels(route=route).inc()
+            self.logger.warning(
+                f"QUERY BUDGET EXCEEDED in {route}: {stats.query_count} queries "
+                f"(budget {self.query_budget}, {stats.query_time_ms:.1f}ms DB time)",
+                extra={
+                    "route": route,
+                    "path": stats.path,
+                    "query_count": stats.query_count,
+                    "query_budget": self.query_budget,
+                    "db_time_ms": stats.query_time_ms,
+                },
+            )
+
     @contextmanager
     def track_request_queries(self, request_id: str):
         """Context manager to track queries for a specific request.
@@ -333,10 +494,12 @@ class QueryProfiler:
             None
         """
         self.reset_pattern_tracking()
+        self._tracking_windows += 1
 
         try:
             yield
         finally:
+            self._tracking_windows -= 1
             # Log summary for request
             if self._query_patterns:
                 total_queries = sum(self._query_patterns.values())
@@ -371,11 +534,15 @@ def get_query_profiler() -> QueryProfiler:
         slow_threshold = getattr(settings, "SLOW_QUERY_THRESHOLD_MS", 100)
         n_plus_one_threshold = getattr(settings, "N_PLUS_ONE_THRESHOLD", 10)
         profiler_enabled = getattr(settings, "QUERY_PROFILER_ENABLED", True)
+        sample_rate = getattr(settings, "QUERY_PROFILER_SAMPLE_RATE", 1.0)
+        query_budget = getattr(settings, "QUERY_BUDGET_PER_REQUEST", 0)
 
         _global_profiler = QueryProfiler(
             slow_query_threshold_ms=slow_threshold,
             n_plus_one_threshold=n_plus_one_threshold,
             enabled=profiler_enabled,
+            sample_rate=sample_rate,
+            query_budget=query_budget,
         )
 
     return _global_profiler
@@ -79,6 +79,7 @@ class AnalyticsEngine:
 
         self._collector = MetricsCollector()
         self._anomaly_detector = AnomalyDetector(self.policy_config)
+        await self._anomaly_detector.start(self._handle_anomaly)
         self._adaptive_tuning = AdaptiveTuning(self.event_bus)
         self._provider_monitor = ProviderMonitor(self.event_bus)
         self._realtime_tuning = RealTimeTuning(
@@ -111,6 +112,10 @@ class AnalyticsEngine:
         await self._collector.record(sample)
 
         # Check for anomalies
+        if self._anomaly_detector.batch_mode:
+            self._anomaly_detector.enqueue(sample)
+            return
+
         anomaly = await self._anomaly_detector.check(sample)
         if anomaly:
             await self._handle_anomaly(anomaly)
@@ -240,6 +245,8 @@ class AnalyticsEngine:
         """Shutdown analytics engine"""
         if self._realtime_tuning:
             await self._realtime_tuning.stop()
+        if self._anomaly_detector:
+            await self._anomaly_detector.stop()
         logger.info("AnalyticsEngine shutdown")
 
     async def _handle_anomaly(self, anomaly: AnomalyAlert) -> None:
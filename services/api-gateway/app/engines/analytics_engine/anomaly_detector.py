@@ -2,16 +2,25 @@
 Anomaly Detector - Real-Time Anomaly Detection
 
 Detects anomalies in metrics using statistical methods.
+
+Baselines are running statistics updated in O(1) per sample: Welford's
+algorithm until BASELINE_WINDOW samples have been seen, then an
+exponentially weighted mean/variance with the same effective window. Each
+metric also keeps hour-of-day baselines so daily load patterns are not
+flagged. Baselines for all metrics are stored column-wise in numpy arrays,
+which lets batch mode score every pending sample in one vectorized pass.
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import math
-from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -28,19 +37,108 @@ class BaselineStats:
     last_update: datetime = field(default_factory=datetime.utcnow)
 
 
+class _BaselineTable:
+    """
+    Running mean/variance for many baselines, one row each.
+
+    update_one() is the scalar path used by check(); update() applies one
+    value to each of a set of distinct rows at once.
+    """
+
+    def __init__(self, window: int, capacity: int = 64):
+        self.window = window
+        self.alpha = 2.0 / (window + 1)
+        self.count = np.zeros(capacity, dtype=np.int64)
+        self.mean = np.zeros(capacity)
+        self.var = np.zeros(capacity)
+        self.min = np.full(capacity, np.inf)
+        self.max = np.full(capacity, -np.inf)
+
+    def ensure(self, size: int) -> None:
+        capacity = len(self.count)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        extra = capacity - len(self.count)
+        self.count = np.concatenate([self.count, np.zeros(extra, dtype=np.int64)])
+        self.mean = np.concatenate([self.mean, np.zeros(extra)])
+        self.var = np.concatenate([self.var, np.zeros(extra)])
+        self.min = np.concatenate([self.min, np.full(extra, np.inf)])
+        self.max = np.concatenate([self.max, np.full(extra, -np.inf)])
+
+    def reset(self, rows) -> None:
+        self.count[rows] = 0
+        self.mean[rows] = 0.0
+        self.var[rows] = 0.0
+        self.min[rows] = np.inf
+        self.max[rows] = -np.inf
+
+    def stats(self, row: int) -> Tuple[int, float, float]:
+        """(count, mean, std_dev) of one row"""
+        return int(self.count[row]), float(self.mean[row]), math.sqrt(self.var[row])
+
+    def update_one(self, row: int, value: float) -> None:
+        n = int(self.count[row]) + 1
+        mean = float(self.mean[row])
+        delta = value - mean
+        if n <= self.window:
+            # Welford
+            mean += delta / n
+            var = ((n - 2) * float(self.var[row]) + delta * (value - mean)) / (n - 1) if n > 1 else 0.0
+        else:
+            # EWMA
+            mean += self.alpha * delta
+            var = (1 - self.alpha) * (float(self.var[row]) + self.alpha * delta * delta)
+
+        self.count[row] = n
+        self.mean[row] = mean
+        self.var[row] = var
+        if value < self.min[row]:
+            self.min[row] = value
+        if value > self.max[row]:
+            self.max[row] = value
+
+    def update(self, rows: np.ndarray, values: np.ndarray) -> None:
+        """Vectorized update_one(); rows must be distinct"""
+        n = self.count[rows] + 1
+        mean = self.mean[rows]
+        var = self.var[rows]
+        delta = values - mean
+
+        warm = n <= self.window
+        alpha = np.where(warm, 1.0 / n, self.alpha)
+        new_mean = mean + alpha * delta
+        welford = np.where(n > 1, ((n - 2) * var + delta * (values - new_mean)) / np.maximum(n - 1, 1), 0.0)
+        ewma = (1 - alpha) * (var + alpha * delta * delta)
+
+        self.count[rows] = n
+        self.mean[rows] = new_mean
+        self.var[rows] = np.where(warm, welford, ewma)
+        self.min[rows] = np.minimum(self.min[rows], values)
+        self.max[rows] = np.maximum(self.max[rows], values)
+
+
 class AnomalyDetector:
     """
     Real-time anomaly detection service.
 
     Uses statistical methods:
     - Z-score for deviation detection
-    - Moving average for baseline
+    - Welford / EWMA running baselines, global and per hour of day
     - Percentile-based thresholds
 
+    Samples are scored against the baseline as it was before the sample,
+    so a spike does not dampen its own z-score.
+
     Anomaly severity levels:
     - low: 2-3 standard deviations
     - medium: 3-4 standard deviations
     - high: >4 standard deviations or critical threshold exceeded
+
+    Batch mode (batch_interval_seconds > 0): samples are queued with
+    enqueue() and scored together by a timer, with alerts passed to the
+    handler given to start().
     """
 
     # Z-score thresholds for severity
@@ -50,105 +148,221 @@ class AnomalyDetector:
         "high": 4.0,
     }
 
-    # Window size for baseline calculation
+    # Effective window of the running baselines
     BASELINE_WINDOW = 100
     MIN_SAMPLES_FOR_DETECTION = 20
 
-    def __init__(self, policy_config=None):
+    HOURS_PER_DAY = 24
+
+    def __init__(
+        self,
+        policy_config=None,
+        seasonal: bool = True,
+        batch_interval_seconds: Optional[float] = None,
+    ):
         self.policy_config = policy_config
-        self._baselines: Dict[str, BaselineStats] = {}
-        self._samples: Dict[str, deque] = {}
+        self.seasonal = seasonal
+
+        self._keys: Dict[str, int] = {}
+        self._last_update: List[datetime] = []
+        self._global = _BaselineTable(self.BASELINE_WINDOW)
+        self._hourly = _BaselineTable(self.BASELINE_WINDOW, capacity=64 * self.HOURS_PER_DAY)
 
         # Get config thresholds
         if policy_config:
             self.deviation_threshold = getattr(policy_config, "latency_anomaly_threshold", 0.2)
+            interval_ms = getattr(policy_config, "anomaly_batch_interval_ms", 0)
         else:
             self.deviation_threshold = 0.2
+            interval_ms = 0
+
+        if batch_interval_seconds is None:
+            batch_interval_seconds = (interval_ms or 0) / 1000
+        self.batch_interval_seconds = batch_interval_seconds
+
+        self._pending: List["MetricSample"] = []
+        self._on_alert: Optional[Callable[["AnomalyAlert"], Awaitable[None]]] = None
+        self._is_running = False
+        self._batch_task: Optional[asyncio.Task] = None
 
         logger.info("AnomalyDetector initialized")
 
+    @property
+    def batch_mode(self) -> bool:
+        return self.batch_interval_seconds > 0
+
+    # =========================================================================
+    # Per-sample detection
+    # =========================================================================
+
     async def check(self, sample: "MetricSample") -> Optional["AnomalyAlert"]:
         """
         Check if a metric sample is anomalous.
 
         Returns AnomalyAlert if anomaly detected, None otherwise.
         """
-        from . import AnomalyAlert
-
-        metric_key = sample.name
+        row = self._key_index(sample.name)
+        hourly_row = row * self.HOURS_PER_DAY + sample.timestamp.hour
 
-        # Initialize if needed
-        if metric_key not in self._samples:
-            self._samples[metric_key] = deque(maxlen=self.BASELINE_WINDOW)
-            self._baselines[metric_key] = BaselineStats()
+        count, mean, std_dev = self._global.stats(row)
+        if self.seasonal:
+            hourly = self._hourly.stats(hourly_row)
+            if hourly[0] >= self.MIN_SAMPLES_FOR_DETECTION:
+                count, mean, std_dev = hourly
 
-        # Add sample to window
-        self._samples[metric_key].append(sample.value)
-
-        # Update baseline
-        baseline = await self._update_baseline(metric_key)
+        self._global.update_one(row, sample.value)
+        if self.seasonal:
+            self._hourly.update_one(hourly_row, sample.value)
+        self._last_update[row] = sample.timestamp
 
         # Skip if not enough samples
-        if baseline.sample_count < self.MIN_SAMPLES_FOR_DETECTION:
+        if count < self.MIN_SAMPLES_FOR_DETECTION or std_dev <= 0:
             return None
 
-        # Calculate z-score
-        if baseline.std_dev > 0:
-            z_score = abs(sample.value - baseline.mean) / baseline.std_dev
-        else:
-            z_score = 0.0
-
-        # Check for anomaly
-        if z_score >= self.SEVERITY_THRESHOLDS["low"]:
-            # Determine severity
-            if z_score >= self.SEVERITY_THRESHOLDS["high"]:
-                severity = "high"
-            elif z_score >= self.SEVERITY_THRESHOLDS["medium"]:
-                severity = "medium"
-            else:
-                severity = "low"
-
-            deviation_percent = (sample.value - baseline.mean) / baseline.mean * 100 if baseline.mean != 0 else 0
-
-            return AnomalyAlert(
-                metric_name=metric_key,
-                current_value=sample.value,
-                expected_value=baseline.mean,
-                deviation_percent=abs(deviation_percent),
-                severity=severity,
-            )
+        z_score = abs(sample.value - mean) / std_dev
+        severity = self._severity(z_score)
+        if severity is None:
+            return None
+        return self._alert(sample, mean, severity)
 
-        return None
+    # =========================================================================
+    # Batch detection
+    # =========================================================================
 
-    async def _update_baseline(self, metric_key: str) -> BaselineStats:
-        """Update baseline statistics for a metric"""
-        samples = list(self._samples[metric_key])
-        baseline = self._baselines[metric_key]
+    def check_batch(self, samples: Sequence["MetricSample"]) -> List["AnomalyAlert"]:
+        """
+        Score a batch of samples in vectorized passes.
 
+        Equivalent to calling check() on each sample in order. Samples of
+        distinct metrics are scored and applied together; a metric with k
+        samples in the batch takes k passes.
+        """
         if not samples:
-            return baseline
-
-        n = len(samples)
-        mean = sum(samples) / n
-
-        if n > 1:
-            variance = sum((x - mean) ** 2 for x in samples) / (n - 1)
-            std_dev = math.sqrt(variance)
-        else:
-            std_dev = 0.0
+            return []
+
+        rows = np.empty(len(samples), dtype=np.int64)
+        hours = np.empty(len(samples), dtype=np.int64)
+        ranks = np.empty(len(samples), dtype=np.int64)
+        seen: Dict[int, int] = {}
+        for i, sample in enumerate(samples):
+            row = self._key_index(sample.name)
+            rank = seen.get(row, 0)
+            seen[row] = rank + 1
+            rows[i] = row
+            hours[i] = sample.timestamp.hour
+            ranks[i] = rank
+            self._last_update[row] = sample.timestamp
+
+        values = np.fromiter((sample.value for sample in samples), dtype=float, count=len(samples))
+        hourly_rows = rows * self.HOURS_PER_DAY + hours
+        z_scores = np.zeros(len(samples))
+        expected = np.zeros(len(samples))
+
+        passes = int(ranks.max()) + 1
+        for rank in range(passes):
+            sel = np.nonzero(ranks == rank)[0] if passes > 1 else np.arange(len(samples))
+            g_rows, h_rows, x = rows[sel], hourly_rows[sel], values[sel]
+
+            count = self._global.count[g_rows]
+            mean = self._global.mean[g_rows]
+            var = self._global.var[g_rows]
+            if self.seasonal:
+                use_hourly = self._hourly.count[h_rows] >= self.MIN_SAMPLES_FOR_DETECTION
+                count = np.where(use_hourly, self._hourly.count[h_rows], count)
+                mean = np.where(use_hourly, self._hourly.mean[h_rows], mean)
+                var = np.where(use_hourly, self._hourly.var[h_rows], var)
+
+            std_dev = np.sqrt(var)
+            scored = (count >= self.MIN_SAMPLES_FOR_DETECTION) & (std_dev > 0)
+            z_scores[sel] = np.where(scored, np.abs(x - mean) / np.where(scored, std_dev, 1.0), 0.0)
+            expected[sel] = mean
+
+            self._global.update(g_rows, x)
+            if self.seasonal:
+                self._hourly.update(h_rows, x)
+
+        alerts = []
+        for i in np.nonzero(z_scores >= self.SEVERITY_THRESHOLDS["low"])[0]:
+            alerts.append(self._alert(samples[i], float(expected[i]), self._severity(float(z_scores[i]))))
+        return alerts
+
+    def enqueue(self, sample: "MetricSample") -> None:
+        """Queue a sample for the next batch"""
+        self._pending.append(sample)
+
+    async def flush(self) -> List["AnomalyAlert"]:
+        """Score all queued samples"""
+        pending, self._pending = self._pending, []
+        return self.check_batch(pending)
+
+    async def start(self, on_alert: Callable[["AnomalyAlert"], Awaitable[None]]) -> None:
+        """Start the batch timer; on_alert is awaited for each alert"""
+        if self._is_running or not self.batch_mode:
+            return
+
+        self._on_alert = on_alert
+        self._is_running = True
+        self._batch_task = asyncio.create_task(self._batch_loop())
+
+        logger.info(f"AnomalyDetector batch mode started ({self.batch_interval_seconds}s interval)")
+
+    async def stop(self) -> None:
+        """Stop the batch timer and score anything still queued"""
+        self._is_running = False
+
+        if self._batch_task:
+            self._batch_task.cancel()
+            try:
+                await self._batch_task
+            except asyncio.CancelledError:
+                pass
+            self._batch_task = None
+
+        if self._pending:
+            await self._dispatch(await self.flush())
+
+    async def _batch_loop(self) -> None:
+        while self._is_running:
+            try:
+                await asyncio.sleep(self.batch_interval_seconds)
+                await self._dispatch(await self.flush())
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Anomaly batch loop error: {e}")
+
+    async def _dispatch(self, alerts: List["AnomalyAlert"]) -> None:
+        if not self._on_alert:
+            return
+        for alert in alerts:
+            await self._on_alert(alert)
+
+    # =========================================================================
+    # Baselines
+    # =========================================================================
+
+    async def get_baseline(self, metric_name: str, hour: Optional[int] = None) -> Optional[BaselineStats]:
+        """Get current baseline for a metric, or its baseline for one hour of the day"""
+        row = self._keys.get(metric_name)
+        if row is None:
+            return None
 
-        baseline.mean = mean
-        baseline.std_dev = std_dev
-        baseline.min_val = min(samples)
-        baseline.max_val = max(samples)
-        baseline.sample_count = n
-        baseline.last_update = datetime.utcnow()
+        table = self._global
+        if hour is not None:
+            table, row = self._hourly, row * self.HOURS_PER_DAY + hour
 
-        return baseline
+        count, mean, std_dev = table.stats(row)
+        if not count:
+            return None
 
-    async def get_baseline(self, metric_name: str) -> Optional[BaselineStats]:
-        """Get current baseline for a metric"""
-        return self._baselines.get(metric_name)
+        return BaselineStats(
+            mean=mean,
+            std_dev=std_dev,
+            min_val=float(table.min[row]),
+            max_val=float(table.max[row]),
+            sample_count=count,
+            last_update=self._last_update[self._keys[metric_name]],
+        )
 
     async def set_threshold(
         self,
@@ -161,11 +375,43 @@ class AnomalyDetector:
 
     async def reset_baseline(self, metric_name: str) -> bool:
         """Reset baseline for a metric"""
-        if metric_name in self._baselines:
-            del self._baselines[metric_name]
-        if metric_name in self._samples:
-            del self._samples[metric_name]
+        row = self._keys.get(metric_name)
+        if row is not None:
+            self._global.reset(row)
+            start = row * self.HOURS_PER_DAY
+            self._hourly.reset(slice(start, start + self.HOURS_PER_DAY))
         return True
 
+    def _key_index(self, metric_key: str) -> int:
+        row = self._keys.get(metric_key)
+        if row is None:
+            row = self._keys[metric_key] = len(self._keys)
+            self._last_update.append(datetime.utcnow())
+            self._global.ensure(row + 1)
+            self._hourly.ensure((row + 1) * self.HOURS_PER_DAY)
+        return row
+
+    def _severity(self, z_score: float) -> Optional[str]:
+        if z_score >= self.SEVERITY_THRESHOLDS["high"]:
+            return "high"
+        if z_score >= self.SEVERITY_THRESHOLDS["medium"]:
+            return "medium"
+        if z_score >= self.SEVERITY_THRESHOLDS["low"]:
+            return "low"
+        return None
+
+    def _alert(self, sample: "MetricSample", expected: float, severity: str) -> "AnomalyAlert":
+        from . import AnomalyAlert
+
+        deviation_percent = (sample.value - expected) / expected * 100 if expected != 0 else 0
+
+        return AnomalyAlert(
+            metric_name=sample.name,
+            current_value=sample.value,
+            expected_value=expected,
+            deviation_percent=abs(deviation_percent),
+            severity=severity,
+        )
+
 
 __all__ = ["AnomalyDetector", "BaselineStats"]
@@ -2,6 +2,12 @@
 Metrics Collector - Metrics Collection and Aggregation
 
 Collects and aggregates metrics from the voice pipeline.
+
+Histogram percentiles come from streaming quantile sketches (see sketch.py)
+over a rotating time window, so recording is O(1), memory does not grow
+with traffic, and sketches can be exported and merged across pods. When no
+sample arrived within the window, percentiles fall back to all-time values
+(get_stats reports which was used) rather than going missing.
 """
 
 from __future__ import annotations
@@ -10,16 +16,17 @@ import logging
 from collections import defaultdict
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, Dict, Optional
+
+from .sketch import WindowedSketch
 
 logger = logging.getLogger(__name__)
 
 
 @dataclass
 class MetricBucket:
-    """Aggregated metric bucket"""
+    """Aggregated metric bucket (all-time totals; percentiles come from sketches)"""
 
-    samples: List[float] = field(default_factory=list)
     count: int = 0
     sum: float = 0.0
     min_val: float = float("inf")
@@ -41,10 +48,11 @@ class MetricsCollector:
 
     # Time window for aggregation
     AGGREGATION_WINDOW_SECONDS = 60
-    MAX_SAMPLES_PER_BUCKET = 1000
+    WINDOW_SLOTS = 6
+    SKETCH_RELATIVE_ACCURACY = 0.01
 
     def __init__(self):
-        self._histograms: Dict[str, List[float]] = defaultdict(list)
+        self._histograms: Dict[str, WindowedSketch] = {}
         self._counters: Dict[str, float] = defaultdict(float)
         self._gauges: Dict[str, float] = {}
         self._buckets: Dict[str, MetricBucket] = {}
@@ -57,18 +65,20 @@ class MetricsCollector:
         metric_key = self._build_key(sample.name, sample.labels)
 
         # Add to histogram
-        self._histograms[metric_key].append(sample.value)
-
-        # Trim if too large
-        if len(self._histograms[metric_key]) > self.MAX_SAMPLES_PER_BUCKET:
-            self._histograms[metric_key] = self._histograms[metric_key][-self.MAX_SAMPLES_PER_BUCKET :]
+        histogram = self._histograms.get(metric_key)
+        if histogram is None:
+            histogram = self._histograms[metric_key] = WindowedSketch(
+                window_seconds=self.AGGREGATION_WINDOW_SECONDS,
+                slots=self.WINDOW_SLOTS,
+                relative_accuracy=self.SKETCH_RELATIVE_ACCURACY,
+            )
+        histogram.add(sample.value)
 
         # Update bucket
-        if metric_key not in self._buckets:
-            self._buckets[metric_key] = MetricBucket()
+        bucket = self._buckets.get(metric_key)
+        if bucket is None:
+            bucket = self._buckets[metric_key] = MetricBucket()
 
-        bucket = self._buckets[metric_key]
-        bucket.samples.append(sample.value)
         bucket.count += 1
         bucket.sum += sample.value
         bucket.min_val = min(bucket.min_val, sample.value)
@@ -109,18 +119,20 @@ class MetricsCollector:
         percentile: float,
         labels: Optional[Dict[str, str]] = None,
     ) -> Optional[float]:
-        """Get percentile value for a metric"""
+        """
+        Get percentile value for a metric over the aggregation window.
+
+        Falls back to all samples ever recorded when the window is empty;
+        None only for metrics never recorded.
+        """
         metric_key = self._build_key(name, labels or {})
-        samples = self._histograms.get(metric_key, [])
+        histogram = self._histograms.get(metric_key)
 
-        if not samples:
+        if histogram is None:
             return None
 
-        sorted_samples = sorted(samples)
-        idx = int(len(sorted_samples) * percentile / 100)
-        idx = min(idx, len(sorted_samples) - 1)
-
-        return sorted_samples[idx]
+        sketch, _ = histogram.current()
+        return sketch.quantile(percentile / 100)
 
     async def get_rate(
         self,
@@ -148,8 +160,14 @@ class MetricsCollector:
         self,
         name: str,
         labels: Optional[Dict[str, str]] = None,
-    ) -> Dict[str, float]:
-        """Get statistics for a metric"""
+    ) -> Dict[str, Any]:
+        """
+        Get statistics for a metric.
+
+        Percentiles cover the aggregation window, or all samples when the
+        window is empty; percentile_window says which ("window" or
+        "cumulative").
+        """
         metric_key = self._build_key(name, labels or {})
         bucket = self._buckets.get(metric_key)
 
@@ -163,10 +181,10 @@ class MetricsCollector:
                 "p50": 0.0,
                 "p95": 0.0,
                 "p99": 0.0,
+                "percentile_window": None,
             }
 
-        samples = bucket.samples
-        sorted_samples = sorted(samples)
+        window, window_used = self._histograms[metric_key].current()
 
         return {
             "count": bucket.count,
@@ -174,11 +192,21 @@ class MetricsCollector:
             "avg": bucket.sum / bucket.count,
             "min": bucket.min_val,
             "max": bucket.max_val,
-            "p50": self._percentile(sorted_samples, 50),
-            "p95": self._percentile(sorted_samples, 95),
-            "p99": self._percentile(sorted_samples, 99),
+            "p50": window.quantile(0.50) or 0.0,
+            "p95": window.quantile(0.95) or 0.0,
+            "p99": window.quantile(0.99) or 0.0,
+            "percentile_window": window_used,
         }
 
+    def export_sketches(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Export each histogram's windowed sketch in serializable form.
+
+        Combine exports from several pods with sketch.merge_sketches() to
+        get fleet-wide percentiles.
+        """
+        return {key: histogram.snapshot().to_dict() for key, histogram in self._histograms.items()}
+
     def _build_key(self, name: str, labels: Dict[str, str]) -> str:
         """Build metric key from name and labels"""
         if not labels:
@@ -186,14 +214,6 @@ class MetricsCollector:
         label_str = ",".join(f"{k}={v}" for k, v in sorted(labels.items()))
         return f"{name}{{{label_str}}}"
 
-    def _percentile(self, sorted_samples: List[float], p: float) -> float:
-        """Calculate percentile from sorted samples"""
-        if not sorted_samples:
-            return 0.0
-        idx = int(len(sorted_samples) * p / 100)
-        idx = min(idx, len(sorted_samples) - 1)
-        return sorted_samples[idx]
-
     async def reset(self) -> None:
         """Reset all metrics"""
         self._histograms.clear()
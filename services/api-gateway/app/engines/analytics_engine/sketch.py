@@ -0,0 +1,297 @@
+"""
+Quantile Sketches - Streaming Percentiles for Metrics
+
+Mergeable quantile sketches used by MetricsCollector.
+
+QuantileSketch is a DDSketch: values are counted in logarithmic bins, so
+recording is O(1), memory is bounded by the value range rather than the
+sample count, and any quantile is returned within a fixed relative error
+(1% by default). Sketches with the same accuracy merge exactly, which lets
+per-pod sketches be combined into fleet-wide percentiles.
+
+WindowedSketch rotates a ring of sketches to answer "percentile over the
+last N seconds" without keeping raw samples.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+
+class QuantileSketch:
+    """
+    DDSketch with relative-error quantiles.
+
+    Usage:
+        sketch = QuantileSketch()
+        for latency in latencies:
+            sketch.add(latency)
+        p95 = sketch.quantile(0.95)
+    """
+
+    # Values closer to zero than this are counted as zero
+    MIN_INDEXABLE_VALUE = 1e-9
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._multiplier = 1 / math.log(self._gamma)
+
+        self._positive: Dict[int, int] = {}
+        self._negative: Dict[int, int] = {}
+        self._sorted_keys: Optional[Tuple[List[int], List[int]]] = None  # Rebuilt when bins are added
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        """Record a value"""
+        if value > self.MIN_INDEXABLE_VALUE:
+            bins = self._positive
+            key = math.ceil(math.log(value) * self._multiplier)
+        elif value < -self.MIN_INDEXABLE_VALUE:
+            bins = self._negative
+            key = math.ceil(math.log(-value) * self._multiplier)
+        else:
+            self.zero_count += 1
+            bins = None
+
+        if bins is not None:
+            if key in bins:
+                bins[key] += 1
+            else:
+                bins[key] = 1
+                self._sorted_keys = None
+                if len(bins) > self.max_bins:
+                    self._collapse(bins)
+
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Merge another sketch into this one (in place); returns self"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        if not other.count:
+            return self
+
+        for bins, other_bins in ((self._positive, other._positive), (self._negative, other._negative)):
+            for key, count in other_bins.items():
+                bins[key] = bins.get(key, 0) + count
+            if len(bins) > self.max_bins:
+                self._collapse(bins)
+        self._sorted_keys = None
+
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def copy(self) -> "QuantileSketch":
+        sketch = QuantileSketch(self.relative_accuracy, self.max_bins)
+        return sketch.merge(self)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Value at quantile q (0-1), or None if the sketch is empty.
+
+        Uses the same rank convention as indexing a sorted list at
+        int(count * q), so results match the previous exact percentiles
+        to within the relative accuracy.
+        """
+        if not self.count:
+            return None
+
+        rank = min(int(self.count * q), self.count - 1)
+        if rank <= 0:
+            return self.min
+        if rank == self.count - 1:
+            return self.max
+
+        if self._sorted_keys is None:
+            self._sorted_keys = (sorted(self._negative, reverse=True), sorted(self._positive))
+        negative_keys, positive_keys = self._sorted_keys
+        seen = 0
+
+        for key in negative_keys:
+            seen += self._negative[key]
+            if seen > rank:
+                return self._clamp(-self._bin_value(key))
+
+        seen += self.zero_count
+        if seen > rank:
+            return self._clamp(0.0)
+
+        for key in positive_keys:
+            seen += self._positive[key]
+            if seen > rank:
+                return self._clamp(self._bin_value(key))
+
+        return self.max
+
+    def quantiles(self, qs: Iterable[float]) -> Dict[float, Optional[float]]:
+        """Several quantiles at once"""
+        return {q: self.quantile(q) for q in qs}
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    @property
+    def bin_count(self) -> int:
+        return len(self._positive) + len(self._negative)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable form, for merging sketches across pods"""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "positive": {str(k): v for k, v in self._positive.items()},
+            "negative": {str(k): v for k, v in self._negative.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], max_bins: int = 2048) -> "QuantileSketch":
+        sketch = cls(data["relative_accuracy"], max_bins)
+        sketch._positive = {int(k): v for k, v in data.get("positive", {}).items()}
+        sketch._negative = {int(k): v for k, v in data.get("negative", {}).items()}
+        sketch.zero_count = data.get("zero_count", 0)
+        sketch.count = data.get("count", 0)
+        sketch.sum = data.get("sum", 0.0)
+        if sketch.count:
+            sketch.min = data["min"]
+            sketch.max = data["max"]
+        return sketch
+
+    def _bin_value(self, key: int) -> float:
+        # Midpoint (in relative terms) of the bin (gamma^(key-1), gamma^key]
+        return 2 * self._gamma**key / (self._gamma + 1)
+
+    def _clamp(self, value: float) -> float:
+        return min(max(value, self.min), self.max)
+
+    def _collapse(self, bins: Dict[int, int]) -> None:
+        """Fold the smallest-magnitude bins together to respect max_bins"""
+        keys = sorted(bins)
+        excess = len(keys) - self.max_bins
+        if excess <= 0:
+            return
+        folded = sum(bins.pop(k) for k in keys[: excess + 1])
+        bins[keys[excess]] = folded
+
+
+class WindowedSketch:
+    """
+    Quantiles over a sliding time window.
+
+    The window is split into slots, each with its own QuantileSketch, plus
+    a running sketch of the whole window. Recording adds to the current
+    slot and the running sketch; when a slot expires the running sketch is
+    rebuilt from the remaining slots. Queries read the running sketch
+    directly. A cumulative sketch of every value ever recorded is kept as
+    well, for readers that need an answer while the window is empty.
+    """
+
+    WINDOW = "window"
+    CUMULATIVE = "cumulative"
+
+    def __init__(
+        self,
+        window_seconds: float = 60.0,
+        slots: int = 6,
+        relative_accuracy: float = 0.01,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.window_seconds = window_seconds
+        self.slots = slots
+        self.relative_accuracy = relative_accuracy
+        self._slot_seconds = window_seconds / slots
+        self._clock = clock
+        self._ring: Deque[Tuple[int, QuantileSketch]] = deque()
+        self._total = QuantileSketch(relative_accuracy)
+        self._cumulative = QuantileSketch(relative_accuracy)
+
+    def add(self, value: float) -> None:
+        """Record a value in the current slot"""
+        index = self._slot_index()
+        if not self._ring or self._ring[-1][0] != index:
+            self._rotate(index)
+            self._ring.append((index, QuantileSketch(self.relative_accuracy)))
+        self._ring[-1][1].add(value)
+        self._total.add(value)
+        self._cumulative.add(value)
+
+    def snapshot(self) -> QuantileSketch:
+        """Copy of the sketch of every value recorded within the window"""
+        self._rotate(self._slot_index())
+        return self._total.copy()
+
+    def quantile(self, q: float) -> Optional[float]:
+        self._rotate(self._slot_index())
+        return self._total.quantile(q)
+
+    def current(self) -> Tuple[QuantileSketch, str]:
+        """
+        The window's running sketch, or the cumulative one if the window is
+        empty, with WINDOW or CUMULATIVE naming which was returned (not a copy).
+        """
+        self._rotate(self._slot_index())
+        if self._total.count:
+            return self._total, self.WINDOW
+        return self._cumulative, self.CUMULATIVE
+
+    def clear(self) -> None:
+        self._ring.clear()
+        self._total = QuantileSketch(self.relative_accuracy)
+        self._cumulative = QuantileSketch(self.relative_accuracy)
+
+    def _slot_index(self) -> int:
+        return int(self._clock() // self._slot_seconds)
+
+    def _rotate(self, index: int) -> None:
+        oldest = index - self.slots + 1
+        if not self._ring or self._ring[0][0] >= oldest:
+            return
+        while self._ring and self._ring[0][0] < oldest:
+            self._ring.popleft()
+        self._total = QuantileSketch(self.relative_accuracy)
+        for _, sketch in self._ring:
+            self._total.merge(sketch)
+
+
+def merge_sketches(exports: Iterable[Dict[str, Dict[str, Any]]]) -> Dict[str, QuantileSketch]:
+    """
+    Merge exported sketches (e.g. MetricsCollector.export_sketches() from
+    several pods) into one sketch per metric key.
+    """
+    merged: Dict[str, QuantileSketch] = {}
+    for export in exports:
+        for key, data in export.items():
+            sketch = QuantileSketch.from_dict(data)
+            if key in merged:
+                merged[key].merge(sketch)
+            else:
+                merged[key] = sketch
+    return merged
+
+
+__all__ = ["QuantileSketch", "WindowedSketch", "merge_sketches"]
@@ -225,6 +225,8 @@ class ClinicalEngine:
         try:
             from app.integrations.fhir import EHRDataService, EpicAdapter, EpicConfig, EpicEnvironment
             from app.integrations.fhir.provider_monitor import EpicProviderMonitor
+            from app.services.cache_service import cache_service
+            from app.services.fhir_subscription_service import get_fhir_subscription_service
 
             # Get Epic configuration from policy config
             environment = EpicEnvironment.SANDBOX
@@ -239,11 +241,13 @@ class ClinicalEngine:
                 max_retries=(getattr(self.policy_config, "epic_max_retries", 3) if self.policy_config else 3),
             )
 
-            # Initialize Epic adapter
+            # Initialize Epic adapter; the shared Redis client carries FHIR cache
+            # invalidations to every instance
             self._epic_adapter = EpicAdapter(
                 epic_config=epic_config,
                 event_bus=self.event_bus,
                 audit_service=self.audit_service,
+                redis_client=await cache_service.get_redis_client(),
             )
             await self._epic_adapter.initialize()
 
@@ -253,6 +257,7 @@ class ClinicalEngine:
                 event_bus=self.event_bus,
                 audit_service=self.audit_service,
                 policy_service=self.policy_service,
+                subscription_service=get_fhir_subscription_service(),
             )
 
             # Initialize provider monitor
@@ -912,6 +917,7 @@ class ClinicalEngine:
                 "enabled": self._use_epic_fhir,
                 "available": self.is_epic_available(),
                 "health": (self.get_epic_health_status() if self._provider_monitor else None),
+                "ehr_data": (self._ehr_data_service.get_stats() if self._ehr_data_service else None),
             },
         }
 
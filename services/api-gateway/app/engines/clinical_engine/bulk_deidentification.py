@@ -0,0 +1,350 @@
+"""
+Bulk De-identification - Streaming Corpus Export
+
+Runs DeidentificationService over large note corpora (JSONL or CSV) for
+research dataset exports.
+
+Features:
+- Streaming input/output: records are read and written incrementally,
+  with a bounded number of batches in flight
+- Process pool of workers, each holding its own detector and service
+- Consistent per-patient surrogates and date shifts across workers via a
+  shared keyed PatientSurrogateStore
+- Throughput (notes/sec) and memory high-water mark reporting
+
+Notes that fail de-identification are dropped from the output and counted,
+never written through with their original text.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import json
+import logging
+import os
+import resource
+import secrets
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from .deidentification_service import (
+    DeidentificationConfig,
+    DeidentificationMethod,
+    DeidentificationService,
+    PatientSurrogateStore,
+)
+
+logger = logging.getLogger(__name__)
+
+# (patient_id, text) in; (deidentified_text or None on failure, phi_count) out
+NoteInput = Tuple[str, str]
+NoteOutput = Tuple[Optional[str], int]
+
+
+@dataclass
+class BulkDeidentificationConfig:
+    """Configuration for bulk de-identification"""
+
+    method: DeidentificationMethod = DeidentificationMethod.SURROGATE
+    text_field: str = "text"
+    patient_id_field: str = "patient_id"
+    input_format: Optional[str] = None  # "jsonl" or "csv"; inferred from extension if None
+    workers: int = field(default_factory=lambda: os.cpu_count() or 1)  # 0 = run in-process
+    batch_size: int = 64
+    max_pending_batches: int = 0  # 0 = 2 x workers
+    confidence_threshold: float = 0.5  # Detector threshold (favours recall for export)
+    preserve_format: bool = True
+    progress_every: int = 10_000  # Log progress every N notes (0 = disabled)
+
+
+@dataclass
+class BulkDeidentificationStats:
+    """Throughput and resource statistics for a bulk run"""
+
+    notes_read: int = 0
+    notes_written: int = 0
+    notes_failed: int = 0
+    phi_replaced: int = 0
+    elapsed_seconds: float = 0.0
+    peak_memory_mb: float = 0.0
+    peak_worker_memory_mb: float = 0.0
+
+    @property
+    def notes_per_second(self) -> float:
+        return self.notes_read / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "notes_read": self.notes_read,
+            "notes_written": self.notes_written,
+            "notes_failed": self.notes_failed,
+            "phi_replaced": self.phi_replaced,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "notes_per_second": round(self.notes_per_second, 1),
+            "peak_memory_mb": round(self.peak_memory_mb, 1),
+            "peak_worker_memory_mb": round(self.peak_worker_memory_mb, 1),
+        }
+
+
+# ===== Worker side =====
+
+_worker_service: Optional[DeidentificationService] = None
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+_worker_method: DeidentificationMethod = DeidentificationMethod.SURROGATE
+
+
+def _create_service(secret: bytes, config: BulkDeidentificationConfig) -> DeidentificationService:
+    """Create a de-identification service for a worker"""
+    from app.core.policy_config import VoicePolicyConfig
+
+    from .enhanced_phi_detector import EnhancedPHIDetector
+
+    detector = EnhancedPHIDetector(
+        policy_config=VoicePolicyConfig(phi_confidence_threshold=config.confidence_threshold)
+    )
+    return DeidentificationService(
+        phi_detector=detector,
+        config=DeidentificationConfig(
+            default_method=config.method,
+            preserve_format=config.preserve_format,
+            enable_audit=False,  # Export runs are audited once, not per note
+        ),
+        surrogate_store=PatientSurrogateStore(secret),
+    )
+
+
+def _init_worker(secret: bytes, config: BulkDeidentificationConfig) -> None:
+    """Process pool initializer: build one service and event loop per worker"""
+    global _worker_service, _worker_loop, _worker_method
+
+    _worker_service = _create_service(secret, config)
+    _worker_loop = asyncio.new_event_loop()
+    _worker_method = config.method
+    _worker_loop.run_until_complete(_worker_service._detector.initialize())
+
+
+async def _deidentify_notes(
+    service: DeidentificationService,
+    notes: List[NoteInput],
+    method: DeidentificationMethod,
+) -> List[NoteOutput]:
+    results: List[NoteOutput] = []
+    for patient_id, text in notes:
+        try:
+            result = await service.deidentify(text, session_id=patient_id, method=method)
+            results.append((result.deidentified_text, result.phi_count))
+        except Exception as e:
+            logger.error(f"Bulk de-identification failed for a note: {type(e).__name__}")
+            results.append((None, 0))
+    return results
+
+
+def _deidentify_batch(notes: List[NoteInput]) -> List[NoteOutput]:
+    """Process pool task: de-identify a batch of notes"""
+    return _worker_loop.run_until_complete(_deidentify_notes(_worker_service, notes, _worker_method))
+
+
+# ===== Reader / writer =====
+
+
+def _infer_format(path: str, explicit: Optional[str]) -> str:
+    if explicit:
+        return explicit.lower()
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    raise ValueError(f"Cannot infer input format from {path}; set input_format to 'jsonl' or 'csv'")
+
+
+class _RecordWriter:
+    """Incremental JSONL/CSV writer"""
+
+    def __init__(self, f, fmt: str, fieldnames: Optional[List[str]] = None):
+        self._f = f
+        self._csv = csv.DictWriter(f, fieldnames=fieldnames) if fmt == "csv" else None
+        if self._csv:
+            self._csv.writeheader()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        if self._csv:
+            self._csv.writerow(record)
+        else:
+            self._f.write(json.dumps(record, ensure_ascii=False))
+            self._f.write("\n")
+
+
+def _read_records(f, fmt: str) -> Tuple[Iterator[Dict[str, Any]], Optional[List[str]]]:
+    if fmt == "csv":
+        reader = csv.DictReader(f)
+        return iter(reader), list(reader.fieldnames or [])
+
+    def iter_jsonl() -> Iterator[Dict[str, Any]]:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+    return iter_jsonl(), None
+
+
+def _peak_memory_mb(who: int) -> float:
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(who).ru_maxrss / 1024
+
+
+# ===== Driver =====
+
+
+class BulkDeidentifier:
+    """
+    Streams a note corpus through de-identification with a worker pool.
+
+    Usage:
+        deidentifier = BulkDeidentifier(BulkDeidentificationConfig(workers=8), secret=key)
+        stats = deidentifier.run("notes.jsonl", "notes.deid.jsonl")
+    """
+
+    def __init__(
+        self,
+        config: Optional[BulkDeidentificationConfig] = None,
+        secret: Optional[bytes] = None,
+    ):
+        self.config = config or BulkDeidentificationConfig()
+        if self.config.method == DeidentificationMethod.TOKEN:
+            # Token maps live in per-worker memory and would not be reversible after export
+            raise ValueError("TOKEN de-identification is not supported for bulk export")
+        if secret is None:
+            logger.warning(
+                "No surrogate secret supplied; surrogates are consistent within this run only. "
+                "Pass a persistent secret to keep mappings stable across exports."
+            )
+            secret = secrets.token_bytes(32)
+        self._secret = secret
+
+    def run(self, input_path: str, output_path: str) -> BulkDeidentificationStats:
+        """
+        De-identify every record in input_path, writing results to output_path.
+
+        Args:
+            input_path: JSONL or CSV corpus
+            output_path: Destination file (same format as input)
+
+        Returns:
+            BulkDeidentificationStats for the run
+        """
+        fmt = _infer_format(input_path, self.config.input_format)
+        stats = BulkDeidentificationStats()
+        start = time.perf_counter()
+
+        executor = self._create_executor()
+        try:
+            with open(input_path, "r", encoding="utf-8", newline="") as fin, open(
+                output_path, "w", encoding="utf-8", newline=""
+            ) as fout:
+                records, fieldnames = _read_records(fin, fmt)
+                writer = _RecordWriter(fout, fmt, fieldnames)
+                self._process(records, writer, executor, stats, start)
+        finally:
+            if executor:
+                executor.shutdown(wait=True)
+
+        stats.elapsed_seconds = time.perf_counter() - start
+        stats.peak_memory_mb = _peak_memory_mb(resource.RUSAGE_SELF)
+        stats.peak_worker_memory_mb = _peak_memory_mb(resource.RUSAGE_CHILDREN) if executor else 0.0
+
+        logger.info(f"Bulk de-identification complete: {stats.to_dict()}")
+        return stats
+
+    def _create_executor(self) -> Optional[Executor]:
+        if self.config.workers <= 0:
+            return None
+        return ProcessPoolExecutor(
+            max_workers=self.config.workers,
+            initializer=_init_worker,
+            initargs=(self._secret, self.config),
+        )
+
+    def _process(
+        self,
+        records: Iterator[Dict[str, Any]],
+        writer: _RecordWriter,
+        executor: Optional[Executor],
+        stats: BulkDeidentificationStats,
+        start: float,
+    ) -> None:
+        """Read batches, dispatch them, and write results in input order"""
+        max_pending = self.config.max_pending_batches or 2 * max(1, self.config.workers)
+        pending: Deque[Tuple[List[Dict[str, Any]], Future]] = deque()
+
+        local_service = None
+        local_loop = None
+        if executor is None:
+            local_service = _create_service(self._secret, self.config)
+            local_loop = asyncio.new_event_loop()
+
+        def drain_one() -> None:
+            batch, outputs = pending.popleft()
+            results = outputs.result() if isinstance(outputs, Future) else outputs
+            for record, (text, phi_count) in zip(batch, results):
+                if text is None:
+                    stats.notes_failed += 1
+                    continue
+                record[self.config.text_field] = text
+                writer.write(record)
+                stats.notes_written += 1
+                stats.phi_replaced += phi_count
+
+        try:
+            for batch in self._batches(records, stats, start):
+                notes = [
+                    (str(record.get(self.config.patient_id_field) or ""), record.get(self.config.text_field) or "")
+                    for record in batch
+                ]
+                if executor is None:
+                    outputs = local_loop.run_until_complete(_deidentify_notes(local_service, notes, self.config.method))
+                else:
+                    outputs = executor.submit(_deidentify_batch, notes)
+                pending.append((batch, outputs))
+
+                while len(pending) >= max_pending:
+                    drain_one()
+
+            while pending:
+                drain_one()
+        finally:
+            if local_loop:
+                local_loop.close()
+
+    def _batches(
+        self,
+        records: Iterator[Dict[str, Any]],
+        stats: BulkDeidentificationStats,
+        start: float,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        batch: List[Dict[str, Any]] = []
+        for record in records:
+            batch.append(record)
+            stats.notes_read += 1
+            if self.config.progress_every and stats.notes_read % self.config.progress_every == 0:
+                elapsed = time.perf_counter() - start
+                logger.info(
+                    f"Bulk de-identification progress: {stats.notes_read} notes "
+                    f"({stats.notes_read / elapsed:.1f} notes/sec)"
+                )
+            if len(batch) >= self.config.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+__all__ = [
+    "BulkDeidentifier",
+    "BulkDeidentificationConfig",
+    "BulkDeidentificationStats",
+]
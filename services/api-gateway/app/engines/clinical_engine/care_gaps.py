@@ -11,7 +11,7 @@ Phase 5: Complete interface definitions (implementation requires EHR integration
 
 import logging
 from dataclasses import dataclass, field
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from enum import Enum
 from typing import Any, Dict, List, Optional
 
@@ -231,6 +231,18 @@ class CareGapsService:
         "depression_screen": 365,  # Annual
     }
 
+    # Procedures that satisfy each measure (any one, within its screening interval).
+    # Measures without an entry have no date-based compliance rule yet.
+    MEASURE_COMPLETIONS = {
+        "BCS": ["mammogram"],
+        "CCS": ["pap_smear", "hpv_test"],
+        "COL": ["colonoscopy", "fit_fobt"],
+        "FLU": ["flu_vaccine"],
+        "HBD": ["a1c"],
+        "KED": ["microalbumin"],
+        "PHQ9": ["depression_screen"],
+    }
+
     def __init__(self, event_bus=None):
         self.event_bus = event_bus
         self._patient_data: Dict[str, Dict[str, Any]] = {}
@@ -371,9 +383,26 @@ class CareGapsService:
         conditions: List[str],
     ) -> tuple:
         """Check if measure is compliant, return (is_met, last_date, next_due)"""
-        # Placeholder - would check actual procedure dates
-        # Returns (False, None, today) to indicate gap
-        return (False, None, date.today())
+        today = date.today()
+        best_last, best_due = None, None
+
+        for procedure in self.MEASURE_COMPLETIONS.get(measure.measure_id, []):
+            last = procedures.get(procedure)
+            interval = self.SCREENING_INTERVALS.get(procedure)
+            if not last or not interval:
+                continue
+            if isinstance(last, str):
+                last = date.fromisoformat(last[:10])
+            elif isinstance(last, datetime):
+                last = last.date()
+            due = last + timedelta(days=interval)
+            if best_due is None or due > best_due:
+                best_last, best_due = last, due
+
+        if best_due is None:
+            # No qualifying completion on record - gap due now
+            return (False, None, today)
+        return (best_due >= today, best_last, best_due)
 
     def _determine_priority(
         self,
@@ -528,9 +557,6 @@ class CareGapsService:
         }
 
 
-# Import timedelta for date calculations
-from datetime import timedelta
-
 __all__ = [
     "CareGapsService",
     "QualityMeasure",
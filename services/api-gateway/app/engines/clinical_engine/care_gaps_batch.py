@@ -0,0 +1,438 @@
+"""
+Care Gaps Batch - Population-Scale Gap Evaluation
+
+Evaluates CareGapsService quality measures across large patient
+populations for nightly gap reports.
+
+Architecture:
+- PatientTable: columnar patient chunk (age, sex, condition bitmask,
+  last-completion day ordinals per procedure) built from the same patient
+  dicts CareGapsService.detect_gaps() accepts
+- CompiledMeasure: a QualityMeasure compiled into vectorized NumPy
+  predicates (applicability, compliance, priority) over a PatientTable,
+  with the same rules as _measure_applies/_check_compliance/_determine_priority
+- PopulationGapEvaluator: streams patients in chunks through a process
+  pool and writes gap rows incrementally to a CSV report
+"""
+
+from __future__ import annotations
+
+import csv
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .care_gaps import CareGapsService, GapPriority, MeasureCategory, MeasureStatus, QualityMeasure
+
+logger = logging.getLogger(__name__)
+
+# Day ordinal used for "never completed"; real ordinals are >= 1
+NEVER = 0
+
+REPORT_COLUMNS = [
+    "patient_id",
+    "measure_id",
+    "measure_name",
+    "status",
+    "priority",
+    "last_completed",
+    "due_date",
+]
+
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _iso_dates(ordinals: np.ndarray) -> np.ndarray:
+    """Format day ordinals as ISO date strings, "" for NEVER"""
+    iso = (ordinals - _EPOCH_ORDINAL).astype("datetime64[D]").astype(str)
+    return np.where(ordinals != NEVER, iso, "")
+
+
+def _to_ordinal(value: Any) -> int:
+    if not value:
+        return NEVER
+    if isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    elif isinstance(value, datetime):
+        value = value.date()
+    return value.toordinal()
+
+
+@dataclass
+class PatientTable:
+    """Columnar chunk of patients for vectorized measure evaluation"""
+
+    patient_ids: List[str]
+    age: np.ndarray  # int16
+    female: np.ndarray  # bool
+    conditions: np.ndarray  # uint64 bitmask over condition_vocab
+    last_completed: np.ndarray  # int32 (n_patients, n_procedures) day ordinals, NEVER if absent
+    condition_vocab: Dict[str, int] = field(default_factory=dict)
+    procedure_index: Dict[str, int] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.patient_ids)
+
+    @classmethod
+    def from_records(
+        cls,
+        records: List[Dict[str, Any]],
+        condition_vocab: Dict[str, int],
+        procedure_index: Dict[str, int],
+    ) -> "PatientTable":
+        """
+        Build a table from patient dicts.
+
+        Records use the detect_gaps() patient_data shape plus "patient_id":
+        {"patient_id", "age", "sex", "conditions": [...], "procedures": {name: date}}.
+        Conditions outside the vocabulary are ignored since no measure uses them.
+        """
+        n = len(records)
+        age = np.zeros(n, dtype=np.int16)
+        female = np.zeros(n, dtype=bool)
+        conditions = np.zeros(n, dtype=np.uint64)
+        last_completed = np.full((n, len(procedure_index)), NEVER, dtype=np.int32)
+        patient_ids = []
+
+        for i, record in enumerate(records):
+            patient_ids.append(str(record.get("patient_id", "")))
+            age[i] = record.get("age", 0) or 0
+            female[i] = str(record.get("sex", "unknown")).lower() in ("female", "f")
+            mask = 0
+            for condition in record.get("conditions", []):
+                bit = condition_vocab.get(condition.lower())
+                if bit is not None:
+                    mask |= 1 << bit
+            conditions[i] = mask
+            for procedure, completed in (record.get("procedures") or {}).items():
+                col = procedure_index.get(procedure)
+                if col is not None:
+                    last_completed[i, col] = _to_ordinal(completed)
+
+        return cls(
+            patient_ids=patient_ids,
+            age=age,
+            female=female,
+            conditions=conditions,
+            last_completed=last_completed,
+            condition_vocab=condition_vocab,
+            procedure_index=procedure_index,
+        )
+
+
+class CompiledMeasure:
+    """A QualityMeasure compiled into vectorized predicates over a PatientTable"""
+
+    # Mirrors CareGapsService._measure_applies
+    FEMALE_ONLY = ("BCS", "CCS")
+
+    def __init__(
+        self,
+        measure: QualityMeasure,
+        completions: List[Tuple[int, int]],
+        condition_mask: int,
+    ):
+        self.measure = measure
+        self.completions = completions  # (procedure column, interval days)
+        self.condition_mask = np.uint64(condition_mask)
+
+    def applies(self, table: PatientTable) -> np.ndarray:
+        """Boolean mask of patients in the measure denominator"""
+        mask = np.ones(len(table), dtype=bool)
+        if self.measure.age_range:
+            min_age, max_age = self.measure.age_range
+            mask &= (table.age >= min_age) & (table.age <= max_age)
+        if self.measure.measure_id in self.FEMALE_ONLY:
+            mask &= table.female
+        if self.measure.applicable_conditions:
+            mask &= (table.conditions & self.condition_mask) != 0
+        return mask
+
+    def compliance(self, table: PatientTable, as_of: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Evaluate compliance for all patients.
+
+        Returns:
+            (is_met, last_completed, next_due) with day ordinals; last is NEVER
+            and next_due is as_of when no qualifying completion exists
+        """
+        n = len(table)
+        best_last = np.full(n, NEVER, dtype=np.int32)
+        best_due = np.full(n, NEVER, dtype=np.int32)
+
+        for col, interval in self.completions:
+            last = table.last_completed[:, col]
+            due = np.where(last != NEVER, last + interval, NEVER)
+            better = due > best_due
+            best_last = np.where(better, last, best_last)
+            best_due = np.where(better, due, best_due)
+
+        has_completion = best_due != NEVER
+        next_due = np.where(has_completion, best_due, as_of)
+        return has_completion & (best_due >= as_of), best_last, next_due
+
+    def priority(self, next_due: np.ndarray, as_of: int) -> np.ndarray:
+        """Vectorized CareGapsService._determine_priority (as GapPriority values)"""
+        if self.measure.category == MeasureCategory.CHRONIC:
+            return np.full(len(next_due), GapPriority.HIGH.value)
+        overdue = as_of - next_due
+        return np.select(
+            [overdue > 365, overdue > 180],
+            [GapPriority.HIGH.value, GapPriority.MEDIUM.value],
+            default=GapPriority.LOW.value,
+        )
+
+
+def compile_measures(
+    service: Optional[CareGapsService] = None,
+    measure_ids: Optional[List[str]] = None,
+) -> Tuple[List[CompiledMeasure], Dict[str, int], Dict[str, int]]:
+    """
+    Compile quality measures into vectorized predicates.
+
+    Returns:
+        (compiled measures, condition vocabulary, procedure column index)
+    """
+    service = service or CareGapsService()
+    measures = [service.MEASURES[m] for m in (measure_ids or list(service.MEASURES)) if m in service.MEASURES]
+
+    condition_vocab: Dict[str, int] = {}
+    procedure_index: Dict[str, int] = {}
+    for measure in measures:
+        for condition in measure.applicable_conditions:
+            condition_vocab.setdefault(condition.lower(), len(condition_vocab))
+        for procedure in service.MEASURE_COMPLETIONS.get(measure.measure_id, []):
+            procedure_index.setdefault(procedure, len(procedure_index))
+    if len(condition_vocab) > 64:
+        raise ValueError("Condition bitmask supports at most 64 distinct measure conditions")
+
+    compiled = []
+    for measure in measures:
+        completions = [
+            (procedure_index[p], service.SCREENING_INTERVALS[p])
+            for p in service.MEASURE_COMPLETIONS.get(measure.measure_id, [])
+            if service.SCREENING_INTERVALS.get(p)
+        ]
+        condition_mask = 0
+        for condition in measure.applicable_conditions:
+            condition_mask |= 1 << condition_vocab[condition.lower()]
+        compiled.append(CompiledMeasure(measure, completions, condition_mask))
+
+    return compiled, condition_vocab, procedure_index
+
+
+def evaluate_table(
+    table: PatientTable,
+    compiled: List[CompiledMeasure],
+    as_of: date,
+    include_met: bool = False,
+) -> List[List[str]]:
+    """
+    Evaluate all compiled measures over a patient table.
+
+    Returns:
+        Report rows (see REPORT_COLUMNS); gaps only unless include_met
+    """
+    as_of_ordinal = as_of.toordinal()
+    rows: List[List[str]] = []
+
+    for measure in compiled:
+        applies = measure.applies(table)
+        if not applies.any():
+            continue
+        is_met, last, next_due = measure.compliance(table, as_of_ordinal)
+        priority = measure.priority(next_due, as_of_ordinal)
+        selected = applies if include_met else applies & ~is_met
+
+        idx = np.flatnonzero(selected)
+        if not len(idx):
+            continue
+
+        # Format columns once per measure, then zip into rows
+        met = is_met[idx]
+        status = np.where(met, MeasureStatus.MET.value, MeasureStatus.NOT_MET.value)
+        priority = np.where(met, "", priority[idx])
+        patient_ids = [table.patient_ids[i] for i in idx.tolist()]
+        measure_id = measure.measure.measure_id
+        measure_name = measure.measure.measure_name
+        rows.extend(
+            [pid, measure_id, measure_name, st, pr, lc, due]
+            for pid, st, pr, lc, due in zip(
+                patient_ids,
+                status.tolist(),
+                priority.tolist(),
+                _iso_dates(last[idx]).tolist(),
+                _iso_dates(next_due[idx]).tolist(),
+            )
+        )
+
+    return rows
+
+
+@dataclass
+class PopulationGapStats:
+    """Statistics for a population gap run"""
+
+    patients: int = 0
+    gap_rows: int = 0
+    chunks: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def patients_per_second(self) -> float:
+        return self.patients / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "patients": self.patients,
+            "gap_rows": self.gap_rows,
+            "chunks": self.chunks,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "patients_per_second": round(self.patients_per_second, 1),
+        }
+
+
+# ===== Worker side =====
+
+_worker_state: Optional[Tuple[List[CompiledMeasure], Dict[str, int], Dict[str, int], date, bool]] = None
+
+
+def _init_worker(measure_ids: Optional[List[str]], as_of: date, include_met: bool) -> None:
+    global _worker_state
+    compiled, condition_vocab, procedure_index = compile_measures(measure_ids=measure_ids)
+    _worker_state = (compiled, condition_vocab, procedure_index, as_of, include_met)
+
+
+def _evaluate_chunk(records: List[Dict[str, Any]]) -> List[List[str]]:
+    compiled, condition_vocab, procedure_index, as_of, include_met = _worker_state
+    table = PatientTable.from_records(records, condition_vocab, procedure_index)
+    return evaluate_table(table, compiled, as_of, include_met)
+
+
+# ===== Driver =====
+
+
+class PopulationGapEvaluator:
+    """
+    Nightly care gap evaluation across a patient population.
+
+    Usage:
+        evaluator = PopulationGapEvaluator(workers=8)
+        stats = evaluator.run(iter_patient_records(), "gaps.csv")
+    """
+
+    def __init__(
+        self,
+        measure_ids: Optional[List[str]] = None,
+        chunk_size: int = 10_000,
+        workers: Optional[int] = None,
+        include_met: bool = False,
+        as_of: Optional[date] = None,
+    ):
+        """
+        Args:
+            measure_ids: Measures to evaluate (default: all)
+            chunk_size: Patients per columnar chunk
+            workers: Process pool size (0 = evaluate in-process)
+            include_met: Also write rows for met measures
+            as_of: Evaluation date (default: today)
+        """
+        self.measure_ids = measure_ids
+        self.chunk_size = chunk_size
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.include_met = include_met
+        self.as_of = as_of or date.today()
+
+    def run(self, patients: Iterable[Dict[str, Any]], output_path: str) -> PopulationGapStats:
+        """
+        Evaluate all patients and stream report rows to a CSV file.
+
+        Args:
+            patients: Iterable of patient dicts (see PatientTable.from_records)
+            output_path: Destination CSV path
+
+        Returns:
+            PopulationGapStats for the run
+        """
+        stats = PopulationGapStats()
+        start = time.perf_counter()
+        executor = self._create_executor()
+
+        try:
+            with open(output_path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(REPORT_COLUMNS)
+                self._process(patients, writer, executor, stats)
+        finally:
+            if executor:
+                executor.shutdown(wait=True)
+
+        stats.elapsed_seconds = time.perf_counter() - start
+        logger.info(f"Population care gap evaluation complete: {stats.to_dict()}")
+        return stats
+
+    def _create_executor(self) -> Optional[Executor]:
+        if self.workers <= 0:
+            return None
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.measure_ids, self.as_of, self.include_met),
+        )
+
+    def _process(
+        self,
+        patients: Iterable[Dict[str, Any]],
+        writer: Any,
+        executor: Optional[Executor],
+        stats: PopulationGapStats,
+    ) -> None:
+        max_pending = 2 * max(1, self.workers)
+        pending: Deque[Any] = deque()
+
+        if executor is None:
+            _init_worker(self.measure_ids, self.as_of, self.include_met)
+
+        def drain_one() -> None:
+            outputs = pending.popleft()
+            rows = outputs.result() if isinstance(outputs, Future) else outputs
+            writer.writerows(rows)
+            stats.gap_rows += len(rows)
+
+        for chunk in self._chunks(patients):
+            stats.patients += len(chunk)
+            stats.chunks += 1
+            pending.append(_evaluate_chunk(chunk) if executor is None else executor.submit(_evaluate_chunk, chunk))
+            while len(pending) >= max_pending:
+                drain_one()
+
+        while pending:
+            drain_one()
+
+    def _chunks(self, patients: Iterable[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+        chunk: List[Dict[str, Any]] = []
+        for patient in patients:
+            chunk.append(patient)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+__all__ = [
+    "CompiledMeasure",
+    "PatientTable",
+    "PopulationGapEvaluator",
+    "PopulationGapStats",
+    "compile_measures",
+    "evaluate_table",
+]
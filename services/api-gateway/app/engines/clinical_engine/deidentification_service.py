@@ -10,10 +10,13 @@ Phase 4 Features:
 - Date shifting (preserve temporal relationships)
 - Reversible de-identification with secure tokens
 - Audit logging of all operations
+- Keyed surrogate store for consistent per-patient surrogates across workers
 """
 
 from __future__ import annotations
 
+import hashlib
+import hmac
 import logging
 import random
 import secrets
@@ -222,6 +225,56 @@ class SurrogateGenerator:
         return f"{month:02d}/{day:02d}/{year}"
 
 
+class PatientSurrogateStore:
+    """
+    Compact, shareable mapping store for per-patient surrogates and date shifts.
+
+    Rather than recording every original -> surrogate pair, mappings are
+    derived from a keyed HMAC of (patient, PHI type, original value). Any
+    process holding the same secret produces the same surrogate for the
+    same patient value and the same date shift for the same patient, so a
+    worker pool stays consistent without coordination and the store's
+    memory footprint is just the key plus a bounded shift cache.
+
+    The secret must be kept out of exported data; anyone holding it can
+    test guesses against surrogates.
+    """
+
+    def __init__(
+        self,
+        secret: bytes,
+        min_shift_days: int = 30,
+        max_shift_days: int = 365,
+        max_cached_shifts: int = 100_000,
+    ):
+        if not secret:
+            raise ValueError("PatientSurrogateStore requires a non-empty secret")
+        self._secret = secret
+        self._min_shift_days = min_shift_days
+        self._max_shift_days = max_shift_days
+        self._max_cached_shifts = max_cached_shifts
+        self._shift_cache: Dict[str, int] = {}
+
+    def _digest(self, *parts: str) -> int:
+        message = "\x1f".join(parts).encode("utf-8")
+        return int.from_bytes(hmac.new(self._secret, message, hashlib.sha256).digest()[:8], "big")
+
+    def date_shift(self, patient_id: str) -> int:
+        """Get the date shift (days) for a patient"""
+        shift = self._shift_cache.get(patient_id)
+        if shift is None:
+            span = self._max_shift_days - self._min_shift_days + 1
+            shift = self._min_shift_days + self._digest("date_shift", patient_id) % span
+            if len(self._shift_cache) >= self._max_cached_shifts:
+                self._shift_cache.clear()
+            self._shift_cache[patient_id] = shift
+        return shift
+
+    def surrogate_seed(self, patient_id: str, phi_type: str, original: str) -> int:
+        """Get the deterministic surrogate seed for a patient's PHI value"""
+        return self._digest("surrogate", patient_id, phi_type, original.strip().lower())
+
+
 class DeidentificationService:
     """
     De-identifies text by removing or replacing PHI.
@@ -235,6 +288,10 @@ class DeidentificationService:
 
     Integrates with audit service for compliance logging.
 
+    When a PatientSurrogateStore is supplied, surrogates and date shifts are
+    derived from it (keyed by session_id, typically the patient ID), so the
+    same patient value maps to the same surrogate across notes and processes.
+
     Usage:
         service = DeidentificationService(detector, audit_service)
         result = await service.deidentify(text, session_id)
@@ -258,11 +315,13 @@ class DeidentificationService:
         phi_detector=None,
         audit_service=None,
         config: Optional[DeidentificationConfig] = None,
+        surrogate_store: Optional[PatientSurrogateStore] = None,
     ):
         self._detector = phi_detector
         self._audit_service = audit_service
         self.config = config or DeidentificationConfig()
         self._surrogate_generator = SurrogateGenerator()
+        self._surrogate_store = surrogate_store
         self._token_store: Dict[str, Dict[str, str]] = {}  # session_id -> token_map
         self._date_shifts: Dict[str, int] = {}  # session_id -> shift_days
 
@@ -395,21 +454,26 @@ class DeidentificationService:
         """Generate a surrogate value for PHI"""
         phi_type = detection.phi_category.value
 
+        if self._surrogate_store:
+            generator = SurrogateGenerator(self._surrogate_store.surrogate_seed(session_id, phi_type, detection.text))
+        else:
+            generator = self._surrogate_generator
+
         if phi_type == "name":
-            return self._surrogate_generator.generate_name()
+            return generator.generate_name()
         elif phi_type == "phone":
-            return self._surrogate_generator.generate_phone(self.config.preserve_format)
+            return generator.generate_phone(self.config.preserve_format)
         elif phi_type == "ssn":
-            return self._surrogate_generator.generate_ssn(self.config.preserve_format)
+            return generator.generate_ssn(self.config.preserve_format)
         elif phi_type == "mrn":
-            return self._surrogate_generator.generate_mrn()
+            return generator.generate_mrn()
         elif phi_type == "email":
-            return self._surrogate_generator.generate_email()
+            return generator.generate_email()
         elif phi_type in ("address", "city", "state", "zip"):
-            return self._surrogate_generator.generate_address()
+            return generator.generate_address()
         elif phi_type in ("date", "dob"):
             shift = self._get_date_shift(session_id)
-            return self._surrogate_generator.generate_date(detection.text, shift)
+            return generator.generate_date(detection.text, shift)
         else:
             return self.REDACTION_MARKERS.get(phi_type, self.REDACTION_MARKERS["default"])
 
@@ -430,6 +494,8 @@ class DeidentificationService:
 
     def _get_date_shift(self, session_id: str) -> int:
         """Get consistent date shift for session"""
+        if self._surrogate_store and not self.config.date_shift_days:
+            return self._surrogate_store.date_shift(session_id)
         if session_id not in self._date_shifts:
             if self.config.date_shift_days:
                 self._date_shifts[session_id] = self.config.date_shift_days
@@ -520,5 +586,6 @@ __all__ = [
     "DeidentificationConfig",
     "DeidentificationResult",
     "DeidentificationMethod",
+    "PatientSurrogateStore",
     "SurrogateGenerator",
 ]
@@ -6,6 +6,7 @@ with regex patterns for comprehensive PHI detection.
 
 Phase 4 Features:
 - NER model inference with batch processing
+- Parallel chunk inference with overlap-aware span stitching for long documents
 - Confidence calibration using Platt scaling
 - Context-aware PHI filtering
 - Event publishing for PHI alerts
@@ -13,6 +14,9 @@ Phase 4 Features:
 
 import asyncio
 import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
@@ -20,6 +24,12 @@ from typing import Any, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+_WHITESPACE_RE = re.compile(r"\s")
+
+
+class PHIDetectionError(RuntimeError):
+    """PHI detection could not complete; the text must not be treated as PHI-free"""
+
 
 class PHICategory(Enum):
     """HIPAA Safe Harbor PHI categories"""
@@ -134,6 +144,8 @@ class EnhancedPHIDetector:
     DEFAULT_MODEL_REVISION = "main"  # Local/fine-tuned model uses "main"
     MAX_SEQUENCE_LENGTH = 512
     BATCH_SIZE = 8
+    CHUNK_OVERLAP_CHARS = 64  # Context shared by neighbouring chunks; boundary spans are merged across them
+    MAX_PARALLEL_BATCHES = 4
 
     def __init__(
         self,
@@ -152,6 +164,12 @@ class EnhancedPHIDetector:
         self._tokenizer = None
         self._model_loaded = False
 
+        # NER inference: one pipeline per inference thread (fast tokenizers are not thread-safe)
+        self._ner_pipelines: List[Any] = []
+        self._idle_ner_pipelines: List[Any] = []
+        self._ner_executor: Optional[ThreadPoolExecutor] = None
+        self._ner_thread = threading.local()
+
         # Regex detector (from existing implementation)
         self._regex_detector = None
 
@@ -160,6 +178,8 @@ class EnhancedPHIDetector:
         self._confidence_threshold = self._get_config("phi_confidence_threshold", 0.85)
         self._ensemble_weight_ner = 0.6
         self._ensemble_weight_regex = 0.4
+        self._chunk_overlap = self._get_config("phi_ner_chunk_overlap_chars", self.CHUNK_OVERLAP_CHARS)
+        self._max_parallel_batches = max(1, self._get_config("phi_ner_max_parallel_batches", self.MAX_PARALLEL_BATCHES))
 
         logger.info(
             f"EnhancedPHIDetector initialized (NER: {self._use_ner}, " f"threshold: {self._confidence_threshold})"
@@ -223,13 +243,23 @@ class EnhancedPHIDetector:
                 model_path, revision=model_revision
             )
 
-            # Create pipeline for easier inference
-            self._ner_pipeline = pipeline(
-                "ner",
-                model=self._model,
-                tokenizer=self._tokenizer,
-                aggregation_strategy="simple",
-            )
+            # Create pipelines for easier inference. The model weights are shared;
+            # each inference thread gets its own tokenizer
+            self._ner_pipelines = [
+                pipeline(
+                    "ner",
+                    model=self._model,
+                    tokenizer=(
+                        self._tokenizer
+                        if i == 0
+                        else AutoTokenizer.from_pretrained(  # nosec B615 - revision pinned
+                            model_path, revision=model_revision
+                        )
+                    ),
+                    aggregation_strategy="simple",
+                )
+                for i in range(self._max_parallel_batches)
+            ]
 
             self._model_loaded = True
             logger.info("NER model loaded successfully")
@@ -257,6 +287,9 @@ class EnhancedPHIDetector:
 
         Returns:
             List of enhanced PHI detections with calibrated confidence
+
+        Raises:
+            PHIDetectionError: if the NER model is enabled and inference fails
         """
         if not self._regex_detector:
             await self.initialize()
@@ -317,29 +350,37 @@ class EnhancedPHIDetector:
         return enhanced
 
     async def _detect_ner(self, text: str) -> List[EnhancedPHIDetection]:
-        """Detect PHI using NER model"""
+        """
+        Detect PHI using NER model.
+
+        Long texts are split into overlapping chunks which are grouped into
+        batches of BATCH_SIZE and run on the NER inference threads (one per
+        pipeline, shared by all concurrent calls), then stitched back into
+        document coordinates.
+
+        Raises:
+            PHIDetectionError: if inference fails; a failed scan is never
+                reported as "no PHI found"
+        """
         if not self._model_loaded:
             return []
 
         try:
             # Handle long texts by chunking
             chunks = self._chunk_text(text)
-            all_predictions = []
-
-            for chunk_text, chunk_offset in chunks:
-                predictions = await asyncio.to_thread(self._ner_pipeline, chunk_text)
-
-                for pred in predictions:
-                    # Adjust positions for chunk offset
-                    all_predictions.append(
-                        NERPrediction(
-                            text=pred.get("word", ""),
-                            entity_type=pred.get("entity_group", "O"),
-                            start_pos=pred.get("start", 0) + chunk_offset,
-                            end_pos=pred.get("end", 0) + chunk_offset,
-                            raw_score=pred.get("score", 0.0),
-                        )
-                    )
+            batches = [chunks[i : i + self.BATCH_SIZE] for i in range(0, len(chunks), self.BATCH_SIZE)]
+            loop = asyncio.get_running_loop()
+            executor = self._get_ner_executor()
+
+            batch_results = await asyncio.gather(
+                *(
+                    loop.run_in_executor(executor, self._run_ner_batch, [chunk_text for chunk_text, _ in batch])
+                    for batch in batches
+                )
+            )
+            chunk_predictions = [predictions for batch_result in batch_results for predictions in batch_result]
+
+            all_predictions = self._stitch_chunk_predictions(chunks, chunk_predictions, text)
 
             # Convert NER predictions to enhanced detections
             enhanced = []
@@ -363,36 +404,112 @@ class EnhancedPHIDetector:
 
         except Exception as e:
             logger.error(f"NER detection failed: {e}")
-            return []
+            raise PHIDetectionError("NER PHI detection failed") from e
+
+    def _get_ner_executor(self) -> ThreadPoolExecutor:
+        """Inference threads, one per pipeline instance"""
+        if self._ner_executor is None:
+            self._idle_ner_pipelines = list(self._ner_pipelines)
+            self._ner_executor = ThreadPoolExecutor(max_workers=len(self._ner_pipelines), thread_name_prefix="phi-ner")
+        return self._ner_executor
+
+    def _run_ner_batch(self, texts: List[str]) -> List[List[Dict[str, Any]]]:
+        """Run the NER pipeline over a batch of chunk texts (on an inference thread)"""
+        ner_pipeline = getattr(self._ner_thread, "pipeline", None)
+        if ner_pipeline is None:
+            # The executor never has more threads than pipelines, so each thread claims its own
+            ner_pipeline = self._ner_thread.pipeline = self._idle_ner_pipelines.pop()
+        outputs = ner_pipeline(texts, batch_size=len(texts))
+
+        # The pipeline returns a flat prediction list for single-element input
+        if len(texts) == 1 and (not outputs or isinstance(outputs[0], dict)):
+            return [outputs]
+        return outputs
+
+    def _stitch_chunk_predictions(
+        self,
+        chunks: List[Tuple[str, int]],
+        chunk_predictions: List[List[Dict[str, Any]]],
+        text: str,
+    ) -> List[NERPrediction]:
+        """
+        Map chunk-relative predictions to document offsets and merge them.
+
+        Same-type predictions that overlap in document coordinates are
+        merged into their union. Entities in an overlap region are predicted
+        by both neighbouring chunks and collapse to one; an entity cut by a
+        chunk boundary is rebuilt from the part each chunk saw, as long as
+        those parts meet inside the overlap. This holds for spans longer
+        than the overlap too, so no minimum overlap is required.
+        """
+        spans: Dict[str, List[NERPrediction]] = {}
+        for (chunk_text, chunk_offset), predictions in zip(chunks, chunk_predictions):
+            for pred in predictions:
+                entity_type = pred.get("entity_group", "O")
+                spans.setdefault(entity_type, []).append(
+                    NERPrediction(
+                        text=pred.get("word", ""),
+                        entity_type=entity_type,
+                        start_pos=pred.get("start", 0) + chunk_offset,
+                        end_pos=pred.get("end", 0) + chunk_offset,
+                        raw_score=pred.get("score", 0.0),
+                    )
+                )
+
+        stitched = []
+        for predictions in spans.values():
+            predictions.sort(key=lambda p: p.start_pos)
+            current = None
+            for pred in predictions:
+                if current is not None and pred.start_pos < current.end_pos:
+                    current.end_pos = max(current.end_pos, pred.end_pos)
+                    current.raw_score = max(current.raw_score, pred.raw_score)
+                    continue
+                current = pred
+                stitched.append(current)
+
+        for pred in stitched:
+            pred.text = text[pred.start_pos : pred.end_pos]
+        stitched.sort(key=lambda p: p.start_pos)
+        return stitched
 
     def _chunk_text(self, text: str) -> List[Tuple[str, int]]:
-        """Split text into chunks for model processing"""
-        chunks = []
+        """
+        Split text into overlapping chunks for model processing.
+
+        Chunks are slices of the original text, so offsets stay exact
+        regardless of newlines or repeated whitespace. Boundaries fall on
+        whitespace where possible, and consecutive chunks overlap by
+        ``_chunk_overlap`` characters for span stitching.
+        """
         max_len = self.MAX_SEQUENCE_LENGTH - 10  # Leave room for special tokens
+        if len(text) <= max_len:
+            return [(text, 0)]
 
-        # Simple word-boundary chunking
-        words = text.split()
-        current_chunk = []
-        current_len = 0
-        current_offset = 0
-
-        for word in words:
-            word_len = len(word) + 1  # +1 for space
-            if current_len + word_len > max_len and current_chunk:
-                chunk_text = " ".join(current_chunk)
-                chunks.append((chunk_text, current_offset))
-                current_offset += len(chunk_text) + 1
-                current_chunk = [word]
-                current_len = len(word)
-            else:
-                current_chunk.append(word)
-                current_len += word_len
+        overlap = min(self._chunk_overlap, max_len // 4)
+        chunks = []
+        start = 0
+
+        while start < len(text):
+            end = min(start + max_len, len(text))
+            if end < len(text):
+                # Break on the last whitespace that leaves room for the overlap
+                split = max(text.rfind(ws, start + overlap + 1, end) for ws in (" ", "\n", "\t", "\r"))
+                if split > start:
+                    end = split
+
+            chunks.append((text[start:end], start))
+            if end >= len(text):
+                break
 
-        # Add remaining chunk
-        if current_chunk:
-            chunks.append((" ".join(current_chunk), current_offset))
+            # Start the next chunk on a word boundary inside the overlap window
+            next_start = end - overlap
+            match = _WHITESPACE_RE.search(text, next_start, end)
+            if match:
+                next_start = match.end()
+            start = max(next_start, start + 1)
 
-        return chunks if chunks else [(text, 0)]
+        return chunks
 
     def _merge_detections(
         self,
@@ -548,6 +665,7 @@ class EnhancedPHIDetector:
 
 __all__ = [
     "EnhancedPHIDetector",
+    "PHIDetectionError",
     "EnhancedPHIDetection",
     "PHICategory",
     "NERPrediction",
@@ -7,14 +7,20 @@ Monitors laboratory values and detects:
 - Trends indicating disease progression
 - Values outside target ranges
 
+Full patient histories are kept in a columnar per-patient store
+(LabTimeSeriesStore) so trends for every test can be computed in one
+vectorized pass when a chart is opened.
+
 Phase 5 Implementation for VoiceAssist Voice Mode.
 """
 
 import logging
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -78,6 +84,126 @@ class LabAlert:
     reference_range: Optional[str] = None
 
 
+@dataclass
+class LabTrendSummary:
+    """Vectorized trend summary for one test over a patient's full history"""
+
+    test_name: str
+    unit: str
+    count: int
+    first_value: float
+    last_value: float
+    first_timestamp: datetime
+    last_timestamp: datetime
+    time_span_days: int
+    percent_change: float  # First -> last
+    recent_percent_change: Optional[float]  # Previous -> last
+    slope_per_day: float  # Least-squares slope
+    direction: TrendDirection
+    is_significant: bool
+    below_reference_count: int
+    above_reference_count: int
+    latest_out_of_range: bool
+    latest_critical: bool
+
+
+class LabTimeSeriesStore:
+    """
+    Columnar store of a single patient's lab history.
+
+    Observations are kept as flat NumPy columns (test index, timestamp,
+    value, reference bounds) sorted by (test, time), so each normalized
+    lab name occupies one contiguous segment. New observations are
+    buffered and merged on the next read; ``version`` increments on every
+    append so derived results can be cached against it.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self.test_names: List[str] = []
+        self.units: Dict[str, str] = {}
+        self._test_index: Dict[str, int] = {}
+        self._pending: List[Tuple[int, float, float, float, float]] = []
+        self._test_idx = np.empty(0, dtype=np.int32)
+        self._timestamps = np.empty(0, dtype=np.float64)  # POSIX seconds
+        self._values = np.empty(0, dtype=np.float64)
+        self._ref_low = np.empty(0, dtype=np.float64)  # NaN = not reported
+        self._ref_high = np.empty(0, dtype=np.float64)
+        self._segment_starts = np.empty(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self._values) + len(self._pending)
+
+    def append(self, test_name: str, lab: LabValue) -> None:
+        """Buffer an observation under its normalized test name."""
+        idx = self._test_index.get(test_name)
+        if idx is None:
+            idx = len(self.test_names)
+            self._test_index[test_name] = idx
+            self.test_names.append(test_name)
+        if lab.unit:
+            self.units[test_name] = lab.unit
+        self._pending.append(
+            (
+                idx,
+                _to_epoch(lab.timestamp),
+                float(lab.value),
+                np.nan if lab.reference_low is None else float(lab.reference_low),
+                np.nan if lab.reference_high is None else float(lab.reference_high),
+            )
+        )
+        self.version += 1
+
+    def columns(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get the sorted columns, merging any buffered observations.
+
+        Returns:
+            (test_idx, timestamps, values, ref_low, ref_high, segment_starts)
+        """
+        if self._pending:
+            pending = np.array(self._pending, dtype=np.float64)
+            self._pending = []
+            test_idx = np.concatenate([self._test_idx, pending[:, 0].astype(np.int32)])
+            timestamps = np.concatenate([self._timestamps, pending[:, 1]])
+            order = np.lexsort((timestamps, test_idx))
+            self._test_idx = test_idx[order]
+            self._timestamps = timestamps[order]
+            self._values = np.concatenate([self._values, pending[:, 2]])[order]
+            self._ref_low = np.concatenate([self._ref_low, pending[:, 3]])[order]
+            self._ref_high = np.concatenate([self._ref_high, pending[:, 4]])[order]
+            self._segment_starts = np.flatnonzero(np.r_[True, np.diff(self._test_idx) != 0])
+
+        return (
+            self._test_idx,
+            self._timestamps,
+            self._values,
+            self._ref_low,
+            self._ref_high,
+            self._segment_starts,
+        )
+
+    def get_series(self, test_name: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Get (timestamps, values) views for one normalized test, ordered by time."""
+        idx = self._test_index.get(test_name)
+        if idx is None:
+            return None
+        test_idx, timestamps, values, _, _, _ = self.columns()
+        lo, hi = np.searchsorted(test_idx, [idx, idx + 1])
+        return timestamps[lo:hi], values[lo:hi]
+
+
+def _to_epoch(timestamp: datetime) -> float:
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
+
+def _from_epoch(seconds: float) -> datetime:
+    # Naive UTC, matching the datetime.utcnow() timestamps used elsewhere
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).replace(tzinfo=None)
+
+
 class LabTrendingService:
     """
     Lab trending and alerting service.
@@ -246,7 +372,8 @@ class LabTrendingService:
 
     def __init__(self, event_bus=None):
         self.event_bus = event_bus
-        self._lab_history: Dict[str, List[LabValue]] = {}  # patient_id -> labs
+        self._lab_history: Dict[str, LabTimeSeriesStore] = {}  # patient_id -> columnar labs
+        self._trend_cache: Dict[str, Tuple[int, Dict[str, LabTrendSummary]]] = {}  # patient_id -> (version, trends)
         logger.info("LabTrendingService initialized")
 
     def _normalize_lab_name(self, name: str) -> str:
@@ -605,6 +732,159 @@ class LabTrendingService:
 
         return None
 
+    def record_values(self, patient_id: str, values: List[LabValue]) -> None:
+        """
+        Add observations to a patient's lab history.
+
+        Invalidates the patient's cached trend summaries.
+
+        Args:
+            patient_id: Patient identifier
+            values: New lab observations (any order, any tests)
+        """
+        store = self._lab_history.get(patient_id)
+        if store is None:
+            store = self._lab_history[patient_id] = LabTimeSeriesStore()
+        for lab in values:
+            store.append(self._normalize_lab_name(lab.test_name), lab)
+
+    def clear_patient_history(self, patient_id: str) -> bool:
+        """Drop a patient's lab history and cached trends"""
+        self._trend_cache.pop(patient_id, None)
+        return self._lab_history.pop(patient_id, None) is not None
+
+    def get_lab_series(self, patient_id: str, test_name: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Get (POSIX timestamps, values) arrays for one of a patient's tests"""
+        store = self._lab_history.get(patient_id)
+        if store is None:
+            return None
+        return store.get_series(self._normalize_lab_name(test_name))
+
+    def analyze_patient_trends(self, patient_id: str) -> Dict[str, LabTrendSummary]:
+        """
+        Summarize trends for every test in a patient's history at once.
+
+        Slope, rate of change, direction and reference/critical breaches are
+        computed for all tests in one vectorized pass over the columnar store.
+        Results are cached until new observations are recorded.
+
+        Args:
+            patient_id: Patient identifier
+
+        Returns:
+            Mapping of normalized test name to LabTrendSummary
+        """
+        store = self._lab_history.get(patient_id)
+        if store is None or not len(store):
+            return {}
+
+        cached = self._trend_cache.get(patient_id)
+        if cached and cached[0] == store.version:
+            return cached[1]
+
+        summaries = self._summarize_store(store)
+        self._trend_cache[patient_id] = (store.version, summaries)
+        return summaries
+
+    def _summarize_store(self, store: LabTimeSeriesStore) -> Dict[str, LabTrendSummary]:
+        """Vectorized per-test trend computation over a patient's columns"""
+        test_idx, timestamps, values, ref_low, ref_high, starts = store.columns()
+        n_groups = len(starts)
+        ends = np.r_[starts[1:], len(values)] - 1
+        counts = ends - starts + 1
+        group = np.repeat(np.arange(n_groups), counts)
+        names = [store.test_names[i] for i in test_idx[starts]]
+
+        # Least-squares slope per test (days relative to each test's first sample)
+        t = (timestamps - timestamps[starts][group]) / 86400.0
+        sum_t = np.add.reduceat(t, starts)
+        sum_v = np.add.reduceat(values, starts)
+        sum_tt = np.add.reduceat(t * t, starts)
+        sum_tv = np.add.reduceat(t * values, starts)
+        denom = counts * sum_tt - sum_t * sum_t
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = np.where(denom > 0, (counts * sum_tv - sum_t * sum_v) / denom, 0.0)
+
+        # Rate of change (first -> last, previous -> last)
+        first, last = values[starts], values[ends]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percent_change = np.where(first != 0, (last - first) / first, 0.0)
+            previous = values[np.maximum(ends - 1, starts)]
+            recent_change = np.where((counts > 1) & (previous != 0), (last - previous) / previous, np.nan)
+        span_days = np.maximum(np.floor((timestamps[ends] - timestamps[starts]) / 86400.0), 1).astype(int)
+
+        # Step directions within each test, matching analyze_trend()
+        same_group = group[1:] == group[:-1]
+        steps = np.diff(values)
+        increases = np.bincount(group[1:][same_group & (steps > 0)], minlength=n_groups)
+        decreases = np.bincount(group[1:][same_group & (steps < 0)], minlength=n_groups)
+
+        # Reference and critical bounds: reported per-sample bounds, else table defaults
+        default_low, default_high, critical_low, critical_high, thresholds = (
+            np.array(column, dtype=np.float64) for column in zip(*(self._bounds_for(name) for name in names))
+        )
+        low = np.where(np.isnan(ref_low), default_low[group], ref_low)
+        high = np.where(np.isnan(ref_high), default_high[group], ref_high)
+        below = np.bincount(group, weights=values < low, minlength=n_groups).astype(int)
+        above = np.bincount(group, weights=values > high, minlength=n_groups).astype(int)
+        latest_out = (last < low[ends]) | (last > high[ends])
+        latest_critical = (last < critical_low) | (last > critical_high)
+        significant = np.abs(percent_change) >= thresholds
+
+        summaries = {}
+        for g, name in enumerate(names):
+            count = int(counts[g])
+            if count >= 3:
+                total = count - 1
+                if increases[g] / total > 0.6:
+                    direction = TrendDirection.INCREASING
+                elif decreases[g] / total > 0.6:
+                    direction = TrendDirection.DECREASING
+                elif increases[g] > 0 and decreases[g] > 0:
+                    direction = TrendDirection.FLUCTUATING
+                else:
+                    direction = TrendDirection.STABLE
+            elif percent_change[g] > 0.05:
+                direction = TrendDirection.INCREASING
+            elif percent_change[g] < -0.05:
+                direction = TrendDirection.DECREASING
+            else:
+                direction = TrendDirection.STABLE
+
+            summaries[name] = LabTrendSummary(
+                test_name=name,
+                unit=store.units.get(name, self.REFERENCE_RANGES.get(name, {}).get("unit", "")),
+                count=count,
+                first_value=float(first[g]),
+                last_value=float(last[g]),
+                first_timestamp=_from_epoch(timestamps[starts[g]]),
+                last_timestamp=_from_epoch(timestamps[ends[g]]),
+                time_span_days=int(span_days[g]),
+                percent_change=float(percent_change[g]),
+                recent_percent_change=None if np.isnan(recent_change[g]) else float(recent_change[g]),
+                slope_per_day=float(slope[g]),
+                direction=direction,
+                is_significant=count >= 2 and bool(significant[g]),
+                below_reference_count=int(below[g]),
+                above_reference_count=int(above[g]),
+                latest_out_of_range=bool(latest_out[g]),
+                latest_critical=bool(latest_critical[g]),
+            )
+
+        return summaries
+
+    def _bounds_for(self, test_name: str) -> Tuple[float, float, float, float, float]:
+        """(ref_low, ref_high, critical_low, critical_high, change_threshold); missing bounds never breach"""
+        ref = self.REFERENCE_RANGES.get(test_name, {})
+        critical = self.CRITICAL_VALUES.get(test_name, {})
+        return (
+            ref.get("low", -np.inf),
+            ref.get("high", np.inf),
+            critical.get("low", -np.inf),
+            critical.get("high", np.inf),
+            self.SIGNIFICANT_CHANGE.get(test_name, 0.2),
+        )
+
     def get_reference_range(self, test_name: str) -> Optional[Dict[str, Any]]:
         """Get reference range for a lab test"""
         test_name = self._normalize_lab_name(test_name)
@@ -623,6 +903,8 @@ class LabTrendingService:
 
 __all__ = [
     "LabTrendingService",
+    "LabTimeSeriesStore",
+    "LabTrendSummary",
     "LabValue",
     "LabTrend",
     "LabAlert",
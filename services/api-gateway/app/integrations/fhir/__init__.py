@@ -44,6 +44,7 @@ from .epic_adapter import EpicAdapter, EpicConfig, EpicEnvironment, EpicToken, c
 from .fhir_client import (
     FHIRAuthenticationError,
     FHIRAuthorizationError,
+    FHIRBatchRequest,
     FHIRCache,
     FHIRClient,
     FHIRClientConfig,
@@ -78,8 +79,19 @@ from .fhir_models import (
     Reference,
 )
 
+# Lazy views
+from .fhir_views import (
+    AllergyIntoleranceView,
+    ConditionView,
+    LazyResourceView,
+    MedicationView,
+    ObservationView,
+    loads_fhir_json,
+)
+
 __all__ = [
     # Client
+    "FHIRBatchRequest",
     "FHIRClient",
     "FHIRClientConfig",
     "FHIRClientStats",
@@ -122,4 +134,11 @@ __all__ = [
     "FHIRObservation",
     "FHIRProcedure",
     "FHIRAllergyIntolerance",
+    # Lazy views
+    "LazyResourceView",
+    "ObservationView",
+    "MedicationView",
+    "ConditionView",
+    "AllergyIntoleranceView",
+    "loads_fhir_json",
 ]
@@ -8,14 +8,18 @@ Bridges the FHIR client with VoiceAssist engines:
 - Handles missing/partial data gracefully
 - Provides voice command handlers for EHR queries
 - Manages EHR data caching per session
+- Incremental refresh: per-section meta.lastUpdated watermarks, deltas
+  merged into session contexts in place, one sync per patient at a time
+- Push updates: with a subscription service, observations streamed for a
+  loaded patient are merged into their sessions as they arrive
 """
 
 import asyncio
 import logging
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Collection, Dict, List, Optional, Tuple
 
 from .epic_adapter import EpicAdapter
 from .fhir_models import (
@@ -29,6 +33,48 @@ from .fhir_models import (
 
 logger = logging.getLogger(__name__)
 
+# Chart sections holding resource lists (the "patient" section is a single resource)
+LIST_SECTIONS = ("medications", "conditions", "allergies", "vitals", "labs")
+
+# Push updates: resource type -> chart section (Observations split by category)
+_PUSH_SECTIONS = {
+    "MedicationRequest": ("medications", FHIRMedication),
+    "Condition": ("conditions", FHIRCondition),
+    "AllergyIntolerance": ("allergies", FHIRAllergyIntolerance),
+}
+
+
+def _last_updated(resource: Any) -> Optional[str]:
+    """meta.lastUpdated of a parsed model or view"""
+    raw = getattr(resource, "_raw", None) or {}
+    return (raw.get("meta") or {}).get("lastUpdated")
+
+
+def _version(resource: Any) -> Tuple[Optional[str], Optional[str]]:
+    raw = getattr(resource, "_raw", None) or {}
+    meta = raw.get("meta") or {}
+    return meta.get("versionId"), meta.get("lastUpdated")
+
+
+def _instant(value: str) -> datetime:
+    """Parse a FHIR instant for ordering watermarks"""
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return datetime.min.replace(tzinfo=timezone.utc)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _is_current(section: str, resource: Any) -> bool:
+    """Whether a merged resource still belongs in its section"""
+    raw = getattr(resource, "_raw", None) or {}
+    verification = (raw.get("verificationStatus") or {}).get("coding") or [{}]
+    if raw.get("status") == "entered-in-error" or verification[0].get("code") == "entered-in-error":
+        return False
+    if section in ("medications", "conditions"):
+        return resource.is_active
+    return True
+
 
 # ==============================================================================
 # Data Classes
@@ -74,6 +120,12 @@ class EHRSessionContext:
     # Data freshness
     data_ttl_minutes: int = 15
 
+    # Incremental sync
+    sync_watermarks: Dict[str, str] = field(default_factory=dict)  # section -> meta.lastUpdated
+    last_full_sync: Optional[datetime] = None
+    full_sync_minutes: int = 120  # Deleted resources only drop out on a full reload
+    sync_lag_seconds: Optional[float] = None  # Server write -> merge delay of the newest change
+
     @property
     def is_stale(self) -> bool:
         """Check if data needs refresh"""
@@ -82,6 +134,75 @@ class EHRSessionContext:
         age = datetime.utcnow() - self.last_updated
         return age > timedelta(minutes=self.data_ttl_minutes)
 
+    @property
+    def needs_full_sync(self) -> bool:
+        """Check if the next refresh must reload everything"""
+        if not self.sync_watermarks or not self.last_full_sync:
+            return True
+        return datetime.utcnow() - self.last_full_sync > timedelta(minutes=self.full_sync_minutes)
+
+    @property
+    def staleness_seconds(self) -> Optional[float]:
+        """Seconds since data was last refreshed"""
+        if not self.last_updated:
+            return None
+        return (datetime.utcnow() - self.last_updated).total_seconds()
+
+    def apply_patient(self, patient: FHIRPatient) -> int:
+        """Replace the patient resource; returns the number of resources changed"""
+        self.patient = patient
+        self._advance_watermark("patient", [patient], incremental=False)
+        return 1
+
+    def apply_section(self, section: str, resources: List[Any], incremental: bool) -> int:
+        """
+        Apply fetched resources to a list section and advance its watermark.
+
+        A full load replaces the section. An incremental load upserts by
+        resource id in place; resources that were entered in error (or, for
+        medications and conditions, are no longer active) are dropped.
+
+        Returns:
+            Number of resources changed
+        """
+        current = getattr(self, section)
+        if not incremental:
+            current[:] = [r for r in resources if _is_current(section, r)]
+            self._advance_watermark(section, resources, incremental)
+            return len(resources)
+
+        # Watermarks are inclusive, so resources at the boundary come back unchanged
+        positions = {r.id: i for i, r in enumerate(current)}
+        changed = []
+        for resource in resources:
+            i = positions.get(resource.id)
+            if i is None:
+                positions[resource.id] = len(current)
+                current.append(resource)
+            elif _version(current[i]) != _version(resource) or _version(resource) == (None, None):
+                current[i] = resource
+            else:
+                continue
+            changed.append(resource)
+
+        if changed:
+            current[:] = [r for r in current if _is_current(section, r)]
+        self._advance_watermark(section, changed, incremental)
+        return len(changed)
+
+    def _advance_watermark(self, section: str, resources: List[Any], incremental: bool) -> None:
+        stamps = [ts for ts in map(_last_updated, resources) if ts]
+        if incremental and section in self.sync_watermarks:
+            stamps.append(self.sync_watermarks[section])
+        if not stamps:
+            self.sync_watermarks.pop(section, None)
+            return
+
+        newest = max(stamps, key=_instant)
+        if incremental and resources:
+            self.sync_lag_seconds = (datetime.now(timezone.utc) - _instant(newest)).total_seconds()
+        self.sync_watermarks[section] = newest
+
     @property
     def has_data(self) -> bool:
         """Check if any data is loaded"""
@@ -256,14 +377,25 @@ class EHRDataService:
         event_bus=None,
         audit_service=None,
         policy_service=None,
+        subscription_service=None,
     ):
         self.epic_adapter = epic_adapter
         self.event_bus = event_bus
         self.audit_service = audit_service
         self.policy_service = policy_service
+        self.subscription_service = subscription_service  # FHIRSubscriptionService for push updates
 
         self._session_contexts: Dict[str, EHRSessionContext] = {}
         self._loading_locks: Dict[str, asyncio.Lock] = {}
+        self._patient_syncs: Dict[str, asyncio.Future] = {}  # patient_fhir_id -> in-flight sync
+        self._patient_followers: Dict[str, asyncio.Task] = {}  # patient_fhir_id -> subscription stream
+        self._sync_stats = {
+            "full_refreshes": 0,
+            "incremental_refreshes": 0,
+            "coalesced_refreshes": 0,
+            "resources_merged": 0,
+            "pushed_updates": 0,
+        }
 
         logger.info("EHRDataService initialized")
 
@@ -324,6 +456,9 @@ class EHRDataService:
         if not context:
             context = await self.initialize_session(session_id, patient_fhir_id, user_id)
         else:
+            if context.patient_fhir_id != patient_fhir_id:
+                context.sync_watermarks.clear()
+                context.last_full_sync = None
             context.patient_fhir_id = patient_fhir_id
             await self._fetch_patient_data(session_id, patient_fhir_id, user_id)
 
@@ -346,6 +481,7 @@ class EHRDataService:
 
         async with self._loading_locks[session_id]:
             context.status = EHRDataStatus.LOADING
+            context.errors = []
 
             if not self.epic_adapter:
                 context.status = EHRDataStatus.UNAVAILABLE
@@ -353,56 +489,12 @@ class EHRDataService:
                 return
 
             try:
-                # Fetch all data in parallel
-                results = await asyncio.gather(
-                    self.epic_adapter.get_patient(patient_fhir_id),
-                    self.epic_adapter.get_patient_medications(patient_fhir_id),
-                    self.epic_adapter.get_patient_conditions(patient_fhir_id),
-                    self.epic_adapter.get_patient_allergies(patient_fhir_id),
-                    self.epic_adapter.get_patient_vitals(patient_fhir_id),
-                    self.epic_adapter.get_patient_labs(patient_fhir_id),
-                    return_exceptions=True,
-                )
-
-                # Process results
-                patient, meds, conditions, allergies, vitals, labs = results
-
-                if isinstance(patient, FHIRPatient):
-                    context.patient = patient
-                elif isinstance(patient, Exception):
-                    context.errors.append(f"Patient fetch error: {patient}")
-
-                if isinstance(meds, list):
-                    context.medications = meds
-                elif isinstance(meds, Exception):
-                    context.errors.append(f"Medications fetch error: {meds}")
-
-                if isinstance(conditions, list):
-                    context.conditions = conditions
-                elif isinstance(conditions, Exception):
-                    context.errors.append(f"Conditions fetch error: {conditions}")
-
-                if isinstance(allergies, list):
-                    context.allergies = allergies
-                elif isinstance(allergies, Exception):
-                    context.errors.append(f"Allergies fetch error: {allergies}")
-
-                if isinstance(vitals, list):
-                    context.vitals = vitals
-                elif isinstance(vitals, Exception):
-                    context.errors.append(f"Vitals fetch error: {vitals}")
-
-                if isinstance(labs, list):
-                    context.labs = labs
-                elif isinstance(labs, Exception):
-                    context.errors.append(f"Labs fetch error: {labs}")
-
-                # Set status
-                context.last_updated = datetime.utcnow()
-                if context.errors:
-                    context.status = EHRDataStatus.PARTIAL if context.has_data else EHRDataStatus.ERROR
-                else:
-                    context.status = EHRDataStatus.LOADED
+                # Fetch the whole chart in one batch Bundle where supported
+                chart = await self.epic_adapter.get_patient_chart(patient_fhir_id)
+                self._apply_chart(context, chart, incremental_sections=())
+                context.last_full_sync = context.last_updated
+                self._sync_stats["full_refreshes"] += 1
+                self._follow_patient(patient_fhir_id)
 
                 # Audit log
                 if self.audit_service and user_id:
@@ -456,19 +548,204 @@ class EHRDataService:
             source_engine="integration",
         )
 
+    def _apply_chart(
+        self,
+        context: EHRSessionContext,
+        chart: Dict[str, Any],
+        incremental_sections: Collection[str],
+    ) -> int:
+        """
+        Apply get_patient_chart() results to a context.
+
+        Sections in incremental_sections are merged as deltas, others replace
+        what the context holds. context.errors is replaced with this fetch's
+        errors. Returns the number of resources changed.
+        """
+        changed = 0
+        context.errors = []
+        for section, result in chart.items():
+            if isinstance(result, Exception):
+                context.errors.append(f"{section.capitalize()} fetch error: {result}")
+            elif section == "patient":
+                if isinstance(result, FHIRPatient):
+                    changed += context.apply_patient(result)
+            elif isinstance(result, list):
+                changed += context.apply_section(section, result, incremental=section in incremental_sections)
+
+        context.last_updated = datetime.utcnow()
+        if context.errors:
+            context.status = EHRDataStatus.PARTIAL if context.has_data else EHRDataStatus.ERROR
+        else:
+            context.status = EHRDataStatus.LOADED
+        return changed
+
     async def refresh_session_data(
         self,
         session_id: str,
         user_id: Optional[str] = None,
     ) -> Optional[EHRSessionContext]:
-        """Refresh EHR data for a session"""
+        """
+        Refresh EHR data for a session.
+
+        Only resources changed since the context's watermarks are fetched,
+        falling back to a full reload when the context has none or its
+        full_sync_minutes have elapsed.
+        """
         context = self._session_contexts.get(session_id)
         if not context or not context.patient_fhir_id:
             return None
 
-        await self._fetch_patient_data(session_id, context.patient_fhir_id, user_id)
+        if context.needs_full_sync or not self.epic_adapter:
+            await self._fetch_patient_data(session_id, context.patient_fhir_id, user_id)
+            return context
+
+        await self._sync_patient(context.patient_fhir_id)
+
+        if self.audit_service and user_id:
+            await self.audit_service.log_ehr_access(
+                user_id=user_id,
+                session_id=session_id,
+                action="read",
+                resource_type="patient_summary",
+                resource_id=context.patient_fhir_id,
+                details={"incremental": True, "watermarks": dict(context.sync_watermarks)},
+            )
         return context
 
+    async def _sync_patient(self, patient_fhir_id: str) -> None:
+        """Incrementally sync the patient, joining a sync already in flight"""
+        sync = self._patient_syncs.get(patient_fhir_id)
+        if sync is not None:
+            self._sync_stats["coalesced_refreshes"] += 1
+        else:
+            sync = asyncio.ensure_future(self._run_patient_sync(patient_fhir_id))
+            self._patient_syncs[patient_fhir_id] = sync
+
+            def done(_):
+                if self._patient_syncs.get(patient_fhir_id) is sync:
+                    del self._patient_syncs[patient_fhir_id]
+
+            sync.add_done_callback(done)
+
+        # Shielded so one cancelled caller does not cancel the others
+        await asyncio.shield(sync)
+
+    async def _run_patient_sync(self, patient_fhir_id: str) -> None:
+        """Fetch changes once and merge them into every loaded session for the patient"""
+        contexts = [
+            c
+            for c in self._session_contexts.values()
+            if c.patient_fhir_id == patient_fhir_id and c.last_full_sync is not None
+        ]
+        if not contexts:
+            return
+
+        # A section is fetched incrementally only if every context has a watermark for it;
+        # merging is idempotent, so the oldest watermark serves them all
+        since: Dict[str, str] = {}
+        for section in ("patient",) + LIST_SECTIONS:
+            marks = [c.sync_watermarks.get(section) for c in contexts]
+            if all(marks):
+                since[section] = min(marks, key=_instant)
+
+        try:
+            chart = await self.epic_adapter.get_patient_chart(patient_fhir_id, since=since)
+        except Exception as e:
+            logger.error(f"Error syncing EHR data for patient {patient_fhir_id}: {e}")
+            for context in contexts:
+                # Only the latest cycle's errors; earlier data is kept
+                context.errors = [str(e)]
+                context.status = EHRDataStatus.PARTIAL if context.has_data else EHRDataStatus.ERROR
+            return
+
+        self._sync_stats["incremental_refreshes"] += 1
+        for context in contexts:
+            changed = self._apply_chart(context, chart, incremental_sections=since)
+            self._sync_stats["resources_merged"] += changed
+            if changed:
+                await self._publish_context_update(context.session_id, context)
+
+    async def apply_resource_updates(
+        self,
+        patient_fhir_id: str,
+        resources: List[Dict[str, Any]],
+    ) -> int:
+        """
+        Merge pushed resource changes into every loaded session for a patient.
+
+        Intended for subscription notifications (for example the raw
+        resources carried by FHIRSubscriptionService events), so sessions
+        stay current without polling the chart.
+
+        Args:
+            patient_fhir_id: Patient the resources belong to
+            resources: Raw FHIR resources (Patient, MedicationRequest,
+                Condition, AllergyIntolerance or Observation)
+
+        Returns:
+            Number of sessions updated
+        """
+        chart: Dict[str, Any] = {}
+        for raw in resources:
+            resource_type = raw.get("resourceType")
+            if resource_type == "Patient":
+                chart["patient"] = FHIRPatient.from_fhir(raw)
+            elif resource_type == "Observation":
+                observation = FHIRObservation.from_fhir(raw)
+                section = "vitals" if observation.is_vital else "labs" if observation.is_lab else None
+                if section:
+                    chart.setdefault(section, []).append(observation)
+            elif resource_type in _PUSH_SECTIONS:
+                section, model = _PUSH_SECTIONS[resource_type]
+                chart.setdefault(section, []).append(model.from_fhir(raw))
+
+        updated = 0
+        for context in list(self._session_contexts.values()):
+            if context.patient_fhir_id != patient_fhir_id or context.last_full_sync is None:
+                continue
+            changed = self._apply_chart(context, chart, incremental_sections=LIST_SECTIONS)
+            self._sync_stats["resources_merged"] += changed
+            if changed:
+                updated += 1
+                await self._publish_context_update(context.session_id, context)
+        return updated
+
+    def _follow_patient(self, patient_fhir_id: str) -> None:
+        """Start merging the patient's subscription notifications, once per patient"""
+        self._release_followers()
+        if self.subscription_service is None or patient_fhir_id in self._patient_followers:
+            return
+        task = asyncio.create_task(self._follow_subscription(patient_fhir_id))
+        self._patient_followers[patient_fhir_id] = task
+
+        def done(_):
+            if self._patient_followers.get(patient_fhir_id) is task:
+                del self._patient_followers[patient_fhir_id]
+
+        task.add_done_callback(done)
+
+    async def _follow_subscription(self, patient_fhir_id: str) -> None:
+        subscription = await self.subscription_service.subscribe_to_patient(patient_fhir_id)
+        if subscription is None:
+            return
+        try:
+            async for observation in self.subscription_service.stream_observations(patient_fhir_id):
+                if observation.raw_resource:
+                    self._sync_stats["pushed_updates"] += 1
+                    await self.apply_resource_updates(patient_fhir_id, [observation.raw_resource])
+        except Exception as e:
+            logger.error(f"EHR subscription stream for patient {patient_fhir_id} failed: {e}")
+        finally:
+            await self.subscription_service.unsubscribe(subscription.subscription_id)
+
+    def _release_followers(self) -> None:
+        """Stop subscription streams for patients no session has loaded"""
+        loaded = {c.patient_fhir_id for c in self._session_contexts.values()}
+        for patient_fhir_id, task in list(self._patient_followers.items()):
+            if patient_fhir_id not in loaded:
+                del self._patient_followers[patient_fhir_id]
+                task.cancel()
+
     def get_memory_context(self, session_id: str) -> Dict[str, Any]:
         """Get EHR data formatted for Memory Engine context"""
         context = self._session_contexts.get(session_id)
@@ -780,11 +1057,13 @@ class EHRDataService:
             del self._session_contexts[session_id]
         if session_id in self._loading_locks:
             del self._loading_locks[session_id]
+        self._release_followers()
 
     def clear_all_sessions(self) -> None:
         """Clear all session data"""
         self._session_contexts.clear()
         self._loading_locks.clear()
+        self._release_followers()
 
     def get_stats(self) -> Dict[str, Any]:
         """Get service statistics"""
@@ -795,6 +1074,18 @@ class EHRDataService:
             "partial_sessions": sum(1 for c in contexts if c.status == EHRDataStatus.PARTIAL),
             "error_sessions": sum(1 for c in contexts if c.status == EHRDataStatus.ERROR),
             "adapter_healthy": (self.epic_adapter.is_healthy() if self.epic_adapter else False),
+            **self._sync_stats,
+            "syncs_in_flight": len(self._patient_syncs),
+            "max_staleness_seconds": max(
+                (c.staleness_seconds for c in contexts if c.last_updated),
+                default=None,
+            ),
+            "max_sync_lag_seconds": max(
+                (c.sync_lag_seconds for c in contexts if c.sync_lag_seconds is not None),
+                default=None,
+            ),
+            "followed_patients": len(self._patient_followers),
+            "subscription_sync": (self.subscription_service.get_sync_stats() if self.subscription_service else None),
         }
 
 
@@ -140,6 +140,7 @@ class EpicAdapter(FHIRClient):
         epic_config: EpicConfig,
         event_bus=None,
         audit_service=None,
+        redis_client=None,
     ):
         self.epic_config = epic_config
 
@@ -154,6 +155,7 @@ class EpicAdapter(FHIRClient):
             config=fhir_config,
             event_bus=event_bus,
             audit_service=audit_service,
+            redis_client=redis_client,
         )
 
         self._private_key: Optional[str] = None
@@ -331,7 +333,7 @@ class EpicAdapter(FHIRClient):
         Get comprehensive patient summary.
 
         Fetches patient demographics, medications, conditions, allergies,
-        recent vitals, and recent labs in parallel.
+        recent vitals, and recent labs in one batch request.
 
         Args:
             patient_id: Epic patient FHIR ID
@@ -339,18 +341,14 @@ class EpicAdapter(FHIRClient):
         Returns:
             Dictionary with all patient data
         """
-        # Fetch all data in parallel
-        results = await asyncio.gather(
-            self.get_patient(patient_id),
-            self.get_patient_medications(patient_id, active_only=True),
-            self.get_patient_conditions(patient_id, active_only=True),
-            self.get_patient_allergies(patient_id),
-            self.get_patient_vitals(patient_id, days_back=7),
-            self.get_patient_labs(patient_id, days_back=30),
-            return_exceptions=True,
-        )
+        chart = await self.get_patient_chart(patient_id, active_only=True, vitals_days_back=7, labs_days_back=30)
 
-        patient, medications, conditions, allergies, vitals, labs = results
+        patient = chart["patient"]
+        medications = chart["medications"]
+        conditions = chart["conditions"]
+        allergies = chart["allergies"]
+        vitals = chart["vitals"]
+        labs = chart["labs"]
 
         # Handle errors gracefully
         summary = {
@@ -1167,6 +1165,7 @@ def create_epic_adapter(
     token_url: Optional[str] = None,
     event_bus=None,
     audit_service=None,
+    redis_client=None,
 ) -> EpicAdapter:
     """
     Factory function to create Epic adapter.
@@ -1180,6 +1179,8 @@ def create_epic_adapter(
         EPIC_PRIVATE_KEY: PEM-encoded private key (alternative)
         EPIC_BASE_URL: FHIR base URL (production only)
         EPIC_TOKEN_URL: Token endpoint URL (production only)
+
+    Pass an async redis_client to share FHIR cache invalidations across pods.
     """
     env = EpicEnvironment(environment or os.environ.get("EPIC_ENVIRONMENT", "sandbox"))
 
@@ -1196,6 +1197,7 @@ def create_epic_adapter(
         epic_config=config,
         event_bus=event_bus,
         audit_service=audit_service,
+        redis_client=redis_client,
     )
 
 
@@ -2,7 +2,7 @@
 FHIR R4 Client Service
 
 Generic FHIR R4 client with:
-- Resource read, search, and bundle operations
+- Resource read, search, and batch Bundle operations
 - Retry logic with exponential backoff
 - Response caching
 - Rate limiting
@@ -13,11 +13,17 @@ Designed to be extended by EHR-specific adapters (Epic, Cerner, etc.)
 """
 
 import asyncio
+import contextlib
+import json
 import logging
+import sys
 import time
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, TypeVar
+from itertools import zip_longest
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple, TypeVar
+from urllib.parse import urlencode
 
 import aiohttp
 
@@ -30,11 +36,21 @@ from .fhir_models import (
     FHIRProcedure,
     FHIRResourceType,
 )
+from .fhir_views import RESOURCE_VIEWS, loads_fhir_json
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar("T")
 
+# Marks the end of a paginated search in the search_iter page queue
+_END_OF_PAGES = object()
+
+# Batch Bundle POST statuses meaning "batch not supported here": single requests from then on
+_BATCH_UNSUPPORTED_STATUSES = (405, 501)
+
+# Statuses that may be transient (proxy, gateway, config): fall back, re-probe after batch_retry_seconds
+_BATCH_FALLBACK_STATUSES = (400, 404, 415)
+
 
 # ==============================================================================
 # Exceptions
@@ -144,10 +160,22 @@ class FHIRClientConfig:
     # Caching
     cache_enabled: bool = True
     cache_ttl_seconds: int = 300  # 5 minutes
+    cache_max_entries: int = 1000
+    cache_max_bytes: Optional[int] = 64 * 1024 * 1024  # Approximate, by JSON payload size
+    cache_version_check_seconds: float = 1.0  # Max staleness vs. writes on other pods (with Redis)
 
     # Pagination
     default_page_size: int = 50
     max_page_size: int = 200
+    prefetch_pages: int = 1  # Bundles buffered ahead of the consumer in search_iter
+
+    # Opt-in: return lazy views (fhir_views) from searches instead of fully parsed
+    # models. Views expose the same fields but are not FHIRObservation etc. instances
+    lazy_models: bool = False
+
+    # Batch Bundles (batch() falls back to concurrent requests if unsupported)
+    batch_enabled: bool = True
+    batch_retry_seconds: float = 600.0  # Re-probe after a rejection other than 405/501
 
     # Headers
     default_headers: Dict[str, str] = field(
@@ -158,6 +186,33 @@ class FHIRClientConfig:
     )
 
 
+@dataclass
+class FHIRBatchRequest:
+    """A read or search to execute as part of FHIRClient.batch()"""
+
+    resource_type: FHIRResourceType
+    resource_id: Optional[str] = None  # Read when set, search otherwise
+    params: Dict[str, Any] = field(default_factory=dict)
+    max_results: Optional[int] = None
+
+    @classmethod
+    def read(cls, resource_type: FHIRResourceType, resource_id: str) -> "FHIRBatchRequest":
+        return cls(resource_type=resource_type, resource_id=resource_id)
+
+    @classmethod
+    def search(
+        cls,
+        resource_type: FHIRResourceType,
+        params: Dict[str, Any],
+        max_results: Optional[int] = None,
+    ) -> "FHIRBatchRequest":
+        return cls(resource_type=resource_type, params=params, max_results=max_results)
+
+    @property
+    def is_read(self) -> bool:
+        return self.resource_id is not None
+
+
 @dataclass
 class FHIRRequestMetrics:
     """Metrics for a FHIR request"""
@@ -181,6 +236,8 @@ class FHIRClientStats:
     cache_hits: int = 0
     cache_misses: int = 0
     total_retries: int = 0
+    batch_requests: int = 0
+    batched_operations: int = 0
     avg_latency_ms: float = 0.0
     requests_by_resource: Dict[str, int] = field(default_factory=dict)
     errors_by_type: Dict[str, int] = field(default_factory=dict)
@@ -190,70 +247,272 @@ class FHIRClientStats:
 # Cache
 # ==============================================================================
 
+# Approximate per-entry bookkeeping overhead (entry object, OrderedDict node, key)
+_CACHE_ENTRY_OVERHEAD_BYTES = 256
+
+
+def _estimate_size(value: Any) -> int:
+    """Approximate cached size in bytes, measured as the JSON payload size"""
+    if isinstance(value, list):
+        return 64 + sum(_estimate_size(v) for v in value)
+    raw = value if isinstance(value, dict) else getattr(value, "_raw", None)
+    if raw is not None:
+        try:
+            return len(json.dumps(raw, separators=(",", ":"), default=str))
+        except (TypeError, ValueError):
+            pass
+    return sys.getsizeof(value)
+
 
 @dataclass
 class CacheEntry:
-    """Cache entry with TTL"""
+    """Cache entry with TTL, size and invalidation tags"""
 
     data: Any
-    expires_at: datetime
+    expires_at: float  # time.monotonic() deadline
+    size: int = 0
+    tags: Tuple[str, ...] = ()
+    stamps: Dict[str, Tuple[int, int]] = field(default_factory=dict)  # patient_id -> (local, shared) version
 
 
 class FHIRCache:
-    """Simple in-memory cache for FHIR responses"""
+    """
+    In-memory TTL-LRU cache for FHIR responses.
+
+    - O(1) get/set/evict (OrderedDict in recency order)
+    - Entry count and approximate byte limits
+    - Tag index (patient, unscoped search type) for invalidation proportional
+      to the number of affected keys rather than the cache size
+    - Optional cross-pod invalidation: patient version counters in Redis are
+      bumped on writes; entries stamped with an older version are dropped.
+      Cached payloads (PHI) never leave process memory.
+    """
 
-    def __init__(self, ttl_seconds: int = 300, max_entries: int = 1000):
+    def __init__(
+        self,
+        ttl_seconds: int = 300,
+        max_entries: int = 1000,
+        max_bytes: Optional[int] = None,
+        redis_client: Any = None,
+        version_check_seconds: float = 1.0,
+    ):
         self.ttl_seconds = ttl_seconds
         self.max_entries = max_entries
-        self._cache: Dict[str, CacheEntry] = {}
-        self._access_order: List[str] = []
+        self.max_bytes = max_bytes
+        self.redis_client = redis_client
+        self.version_check_seconds = version_check_seconds
+
+        self._cache: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._tag_index: Dict[str, Set[str]] = {}
+        self._bytes = 0
+
+        # Version stamps: local epochs bump on local invalidation, shared
+        # versions mirror the Redis counters written by any pod
+        self._local_versions: Dict[str, int] = {}
+        self._shared_versions: Dict[str, int] = {}
+        self._version_checked_at: Dict[str, float] = {}
+
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    @staticmethod
+    def patient_tag(patient_id: str) -> str:
+        return f"patient:{patient_id}"
 
     def get(self, key: str) -> Optional[Any]:
-        """Get cached value if not expired"""
+        """Get cached value if not expired or invalidated"""
         entry = self._cache.get(key)
         if entry is None:
             return None
 
-        if datetime.utcnow() > entry.expires_at:
-            del self._cache[key]
-            self._access_order.remove(key)
+        if time.monotonic() > entry.expires_at:
+            self._remove(key)
+            self.expirations += 1
             return None
 
+        for patient_id, stamp in entry.stamps.items():
+            if stamp != self._stamp(patient_id):
+                self._remove(key)
+                return None
+
+        self._cache.move_to_end(key)
         return entry.data
 
-    def set(self, key: str, value: Any) -> None:
-        """Set cache value with TTL"""
-        if len(self._cache) >= self.max_entries:
-            # Evict oldest entry
-            if self._access_order:
-                oldest = self._access_order.pop(0)
-                del self._cache[oldest]
+    def set(
+        self,
+        key: str,
+        value: Any,
+        tags: Iterable[str] = (),
+        patient_ids: Iterable[str] = (),
+        stamps: Optional[Dict[str, Tuple[int, int]]] = None,
+    ) -> None:
+        """
+        Set cache value with TTL.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            tags: Extra invalidation tags
+            patient_ids: Patients the value belongs to (indexed for invalidation)
+            stamps: Version stamps taken before the value was fetched (see stamp());
+                defaults to the current versions
+        """
+        patient_ids = tuple(patient_ids)
+        if stamps is None:
+            stamps = self.stamp(patient_ids)
+        if any(stamps.get(p) != self._stamp(p) for p in patient_ids):
+            # Patient data changed while this value was being fetched
+            return
+
+        if key in self._cache:
+            self._remove(key)
 
-        self._cache[key] = CacheEntry(
+        entry = CacheEntry(
             data=value,
-            expires_at=datetime.utcnow() + timedelta(seconds=self.ttl_seconds),
+            expires_at=time.monotonic() + self.ttl_seconds,
+            size=_estimate_size(value) + _CACHE_ENTRY_OVERHEAD_BYTES,
+            tags=tuple(tags) + tuple(self.patient_tag(p) for p in patient_ids),
+            stamps={p: stamps[p] for p in patient_ids},
         )
-        if key in self._access_order:
-            self._access_order.remove(key)
-        self._access_order.append(key)
+        self._cache[key] = entry
+        self._bytes += entry.size
+        for tag in entry.tags:
+            self._tag_index.setdefault(tag, set()).add(key)
 
-    def invalidate(self, key: str) -> None:
-        """Remove specific cache entry"""
-        if key in self._cache:
-            del self._cache[key]
-            self._access_order.remove(key)
+        self._evict()
+
+    def stamp(self, patient_ids: Iterable[str]) -> Dict[str, Tuple[int, int]]:
+        """Current version stamps, to take before fetching data to cache"""
+        return {p: self._stamp(p) for p in patient_ids}
+
+    def invalidate(self, key: str) -> Tuple[str, ...]:
+        """Remove specific cache entry, returning its tags"""
+        entry = self._cache.get(key)
+        if entry is None:
+            return ()
+        self._remove(key)
+        return entry.tags
+
+    def invalidate_tag(self, tag: str) -> int:
+        """Invalidate all entries carrying a tag"""
+        keys = self._tag_index.pop(tag, set())
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def invalidate_patient(self, patient_id: str) -> int:
+        """
+        Invalidate a patient's entries on this instance.
+
+        Also bumps the patient's local version so in-flight fetches started
+        before the invalidation are not cached.
+        """
+        self._local_versions[patient_id] = self._local_versions.get(patient_id, 0) + 1
+        return self.invalidate_tag(self.patient_tag(patient_id))
+
+    async def publish_patient_write(self, patient_id: str) -> int:
+        """Invalidate a patient locally and, with Redis, on every other instance"""
+        removed = self.invalidate_patient(patient_id)
+        if self.redis_client is None:
+            return removed
+
+        try:
+            key = self._version_key(patient_id)
+            version = int(await self.redis_client.incr(key))
+            await self.redis_client.expire(key, max(60, 2 * self.ttl_seconds))
+            self._shared_versions[patient_id] = version
+            self._version_checked_at[patient_id] = time.monotonic()
+        except Exception as e:
+            logger.warning(f"Failed to publish FHIR cache invalidation: {e}")
+        return removed
+
+    async def refresh_versions(self, patient_ids: Iterable[str]) -> None:
+        """
+        Pick up writes made by other instances.
+
+        Reads shared patient versions from Redis at most once per
+        version_check_seconds per patient; no-op without Redis.
+        """
+        if self.redis_client is None:
+            return
+
+        now = time.monotonic()
+        due = [
+            p for p in patient_ids if now - self._version_checked_at.get(p, float("-inf")) >= self.version_check_seconds
+        ]
+        if not due:
+            return
+
+        try:
+            values = await self.redis_client.mget([self._version_key(p) for p in due])
+        except Exception as e:
+            logger.warning(f"Failed to read FHIR cache versions: {e}")
+            return
+
+        for patient_id, value in zip(due, values):
+            version = int(value or 0)
+            self._version_checked_at[patient_id] = now
+            if version != self._shared_versions.get(patient_id, 0):
+                self._shared_versions[patient_id] = version
+                self.invalidate_tag(self.patient_tag(patient_id))
 
     def invalidate_pattern(self, pattern: str) -> int:
-        """Invalidate all entries matching pattern"""
-        keys_to_remove = [k for k in self._cache.keys() if pattern in k]
+        """Invalidate all entries whose key contains pattern (scans every key)"""
+        keys_to_remove = [k for k in self._cache if pattern in k]
         for key in keys_to_remove:
-            self.invalidate(key)
+            self._remove(key)
         return len(keys_to_remove)
 
     def clear(self) -> None:
         """Clear all cache entries"""
         self._cache.clear()
-        self._access_order.clear()
+        self._tag_index.clear()
+        self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._cache),
+            "size_bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "shared_invalidation": self.redis_client is not None,
+        }
+
+    def _stamp(self, patient_id: str) -> Tuple[int, int]:
+        return (self._local_versions.get(patient_id, 0), self._shared_versions.get(patient_id, 0))
+
+    def _version_key(self, patient_id: str) -> str:
+        return f"fhir:cache:patient_version:{patient_id}"
+
+    def _remove(self, key: str) -> None:
+        entry = self._cache.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+
+    def _evict(self) -> None:
+        """Evict least recently used entries until within limits"""
+        while self._cache and (
+            len(self._cache) > self.max_entries or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            oldest = next(iter(self._cache))
+            self._remove(oldest)
+            self.evictions += 1
 
 
 # ==============================================================================
@@ -327,6 +586,7 @@ class FHIRClient:
         config: FHIRClientConfig,
         event_bus=None,
         audit_service=None,
+        redis_client=None,
     ):
         self.config = config
         self.event_bus = event_bus
@@ -335,7 +595,10 @@ class FHIRClient:
         self._session: Optional[aiohttp.ClientSession] = None
         self._cache = FHIRCache(
             ttl_seconds=config.cache_ttl_seconds,
-            max_entries=1000,
+            max_entries=config.cache_max_entries,
+            max_bytes=config.cache_max_bytes,
+            redis_client=redis_client,
+            version_check_seconds=config.cache_version_check_seconds,
         )
         self._rate_limiter = TokenBucketRateLimiter(
             rate=config.requests_per_second,
@@ -346,6 +609,11 @@ class FHIRClient:
         self._metrics: List[FHIRRequestMetrics] = []
         self._max_metrics = 1000
 
+        # None until the first batch Bundle tells us whether the server accepts them;
+        # False only after a 405/501, other rejections pause batching until _batch_retry_at
+        self._batch_supported: Optional[bool] = None
+        self._batch_retry_at = 0.0
+
         self._initialized = False
 
     async def initialize(self) -> None:
@@ -421,15 +689,18 @@ class FHIRClient:
             Parsed resource model or None if not found
         """
         cache_key = f"{resource_type.value}/{resource_id}"
+        patient_ids = self._resource_patient_ids(resource_type, resource_id)
 
         # Check cache
         if use_cache and self.config.cache_enabled:
+            await self._cache.refresh_versions(patient_ids)
             cached = self._cache.get(cache_key)
             if cached is not None:
                 self._stats.cache_hits += 1
                 return cached
 
         self._stats.cache_misses += 1
+        stamps = self._cache.stamp(patient_ids)
 
         # Make request
         url = f"{self.config.base_url}/{resource_type.value}/{resource_id}"
@@ -447,7 +718,10 @@ class FHIRClient:
 
         # Cache result
         if self.config.cache_enabled:
-            self._cache.set(cache_key, result)
+            if not patient_ids:
+                patient_ids = self._resource_patient_ids(resource_type, resource=response_data)
+                stamps = None
+            self._cache.set(cache_key, result, patient_ids=patient_ids, stamps=stamps)
 
         return result
 
@@ -470,74 +744,121 @@ class FHIRClient:
         Returns:
             List of parsed resource models
         """
-        # Build cache key
-        param_str = "&".join(f"{k}={v}" for k, v in sorted(params.items()))
-        cache_key = f"search:{resource_type.value}?{param_str}"
+        cache_key = self._search_cache_key(resource_type, params)
+        patient_ids = self._search_patient_ids(params)
 
         # Check cache
         if use_cache and self.config.cache_enabled:
+            await self._cache.refresh_versions(patient_ids)
             cached = self._cache.get(cache_key)
             if cached is not None:
                 self._stats.cache_hits += 1
                 return cached
 
         self._stats.cache_misses += 1
+        stamps = self._cache.stamp(patient_ids)
 
-        # Make request
-        url = f"{self.config.base_url}/{resource_type.value}"
+        results = [resource async for resource in self.search_iter(resource_type, params, max_results=max_results)]
 
-        # Add pagination
-        if "_count" not in params:
-            params["_count"] = min(
-                max_results or self.config.default_page_size,
-                self.config.max_page_size,
+        # Cache result
+        if self.config.cache_enabled:
+            self._cache.set(
+                cache_key,
+                results,
+                tags=self._search_cache_tags(resource_type, patient_ids),
+                patient_ids=patient_ids,
+                stamps=stamps,
             )
 
-        response_data = await self._request("GET", url, resource_type.value, "search", params=params)
+        return results
 
-        if response_data is None:
-            return []
+    async def search_iter(
+        self,
+        resource_type: FHIRResourceType,
+        params: Dict[str, Any],
+        max_results: Optional[int] = None,
+        prefetch_pages: Optional[int] = None,
+    ) -> AsyncIterator[Any]:
+        """
+        Stream search results, following bundle next links.
 
-        # Parse bundle
-        results = []
-        model_class = self.RESOURCE_MODELS.get(resource_type)
+        The next page is requested as soon as the current one arrives, so
+        round-trips to the server overlap with parsing and with the caller's
+        processing. At most prefetch_pages bundles are buffered ahead of the
+        consumer. Breaking out of the loop cancels any in-flight page request.
 
-        entries = response_data.get("entry", [])
-        for entry in entries:
-            resource = entry.get("resource", {})
-            if model_class:
-                results.append(model_class.from_fhir(resource))
-            else:
-                results.append(resource)
+        Results are not cached; use search() for small, repeatable queries.
 
-            if max_results and len(results) >= max_results:
-                break
+        Args:
+            resource_type: FHIR resource type
+            params: Search parameters (not modified)
+            max_results: Maximum results to yield
+            prefetch_pages: Bundles to buffer ahead (default: config.prefetch_pages)
+
+        Yields:
+            Lazy resource views or parsed models (see _parse_search_resource)
+        """
+        params = self._with_page_size(params, max_results)
+        url = f"{self.config.base_url}/{resource_type.value}"
+        pages: asyncio.Queue = asyncio.Queue(maxsize=max(1, prefetch_pages or self.config.prefetch_pages))
+        fetcher = asyncio.create_task(self._fetch_search_pages(resource_type, url, params, max_results, pages))
 
-        # Handle pagination if needed
-        if max_results is None or len(results) < max_results:
-            next_url = self._get_next_link(response_data)
-            while next_url and (max_results is None or len(results) < max_results):
-                page_data = await self._request("GET", next_url, resource_type.value, "search")
+        count = 0
+        try:
+            while True:
+                page = await pages.get()
+                if page is _END_OF_PAGES:
+                    return
+                if isinstance(page, Exception):
+                    raise page
+
+                for entry in page.get("entry", []):
+                    yield self._parse_search_resource(resource_type, entry.get("resource", {}))
+                    count += 1
+                    if max_results and count >= max_results:
+                        return
+        finally:
+            fetcher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await fetcher
+
+    async def _fetch_search_pages(
+        self,
+        resource_type: FHIRResourceType,
+        url: str,
+        params: Dict[str, Any],
+        max_results: Optional[int],
+        pages: asyncio.Queue,
+    ) -> None:
+        """Fetch search bundles into a bounded queue for search_iter"""
+        fetched = 0
+        try:
+            next_url: Optional[str] = url
+            while next_url:
+                page_data = await self._request("GET", next_url, resource_type.value, "search", params=params)
                 if page_data is None:
                     break
+                await pages.put(page_data)
 
-                for entry in page_data.get("entry", []):
-                    resource = entry.get("resource", {})
-                    if model_class:
-                        results.append(model_class.from_fhir(resource))
-                    else:
-                        results.append(resource)
-
-                    if max_results and len(results) >= max_results:
-                        break
-
-                next_url = self._get_next_link(page_data)
+                fetched += len(page_data.get("entry", []))
+                if max_results and fetched >= max_results:
+                    break
+                # Next links carry the full query, including paging state
+                next_url, params = self._get_next_link(page_data), None
+        except Exception as e:
+            await pages.put(e)
+            return
 
-        # Cache result
-        if self.config.cache_enabled:
-            self._cache.set(cache_key, results)
+        await pages.put(_END_OF_PAGES)
 
-        return results
+    def _parse_search_resource(self, resource_type: FHIRResourceType, resource: Dict[str, Any]) -> Any:
+        """Wrap a search result in a lazy view, or parse it into a model (raw dict if unmapped)"""
+        if self.config.lazy_models:
+            view_class = RESOURCE_VIEWS.get(resource_type)
+            if view_class:
+                return view_class(resource)
+        model_class = self.RESOURCE_MODELS.get(resource_type)
+        return model_class.from_fhir(resource) if model_class else resource
 
     def _get_next_link(self, bundle: Dict[str, Any]) -> Optional[str]:
         """Get next page URL from bundle"""
@@ -547,6 +868,264 @@ class FHIRClient:
                 return link.get("url")
         return None
 
+    def _with_page_size(self, params: Dict[str, Any], max_results: Optional[int]) -> Dict[str, Any]:
+        """Copy search params, adding _count if not set"""
+        params = dict(params)
+        if "_count" not in params:
+            params["_count"] = min(
+                max_results or self.config.default_page_size,
+                self.config.max_page_size,
+            )
+        return params
+
+    def _search_cache_key(self, resource_type: FHIRResourceType, params: Dict[str, Any]) -> str:
+        param_str = "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+        return f"search:{resource_type.value}?{param_str}"
+
+    def _search_cache_tags(self, resource_type: FHIRResourceType, patient_ids: Tuple[str, ...]) -> Tuple[str, ...]:
+        # Searches not scoped to a patient can be affected by a write to any patient
+        return () if patient_ids else (f"unscoped:{resource_type.value}",)
+
+    def _search_patient_ids(self, params: Dict[str, Any]) -> Tuple[str, ...]:
+        """Patient a search is scoped to, from its patient/subject parameter"""
+        for name in ("patient", "subject"):
+            value = str(params.get(name) or "")
+            if value and (name == "patient" or value.startswith("Patient/")):
+                return (value.split("/")[-1],)
+        return ()
+
+    def _resource_patient_ids(
+        self,
+        resource_type: FHIRResourceType,
+        resource_id: Optional[str] = None,
+        resource: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[str, ...]:
+        """Patient a resource belongs to, from its ID or subject/patient reference"""
+        if resource_type == FHIRResourceType.PATIENT:
+            patient_id = resource_id or (resource or {}).get("id")
+            return (patient_id,) if patient_id else ()
+        for name in ("subject", "patient"):
+            reference = ((resource or {}).get(name) or {}).get("reference", "")
+            if reference.startswith("Patient/"):
+                return (reference.split("/", 1)[1],)
+        return ()
+
+    async def _invalidate_after_write(
+        self,
+        resource_type: FHIRResourceType,
+        resource_id: Optional[str] = None,
+        resource: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Invalidate cached data affected by a write, on all instances sharing Redis"""
+        if not self.config.cache_enabled:
+            return
+
+        tags = self._cache.invalidate(f"{resource_type.value}/{resource_id}") if resource_id else ()
+        patient_ids = set(self._resource_patient_ids(resource_type, resource_id, resource))
+        patient_ids.update(tag.split(":", 1)[1] for tag in tags if tag.startswith("patient:"))
+
+        if not patient_ids:
+            # Owning patient unknown - drop every cached search of this type
+            self._cache.invalidate_pattern(f"search:{resource_type.value}")
+            return
+
+        for patient_id in patient_ids:
+            await self._cache.publish_patient_write(patient_id)
+        self._cache.invalidate_tag(f"unscoped:{resource_type.value}")
+
+    # =========================================================================
+    # Batch Operations
+    # =========================================================================
+
+    async def batch(
+        self,
+        requests: List[FHIRBatchRequest],
+        use_cache: bool = True,
+    ) -> List[Any]:
+        """
+        Execute several reads and searches together.
+
+        Uncached requests are packed into a single FHIR batch Bundle POST (one
+        round-trip, one auth header, one rate-limit token). Search pages beyond
+        the first are then followed per search. If the server rejects batch
+        Bundles, requests run concurrently instead: for good after a 405 or
+        501, otherwise for batch_retry_seconds before batching is tried again.
+
+        Args:
+            requests: Reads and searches to execute
+            use_cache: Whether to use cache
+
+        Returns:
+            One result per request, in order: a model (or None) for reads, a
+            list for searches, or the exception raised for that request
+        """
+        if (
+            not self.config.batch_enabled
+            or self._batch_supported is False
+            or time.monotonic() < self._batch_retry_at
+            or len(requests) < 2
+        ):
+            return await self._batch_concurrently(requests, use_cache)
+
+        results: List[Any] = [None] * len(requests)
+        pending: List[int] = []
+        if use_cache and self.config.cache_enabled:
+            await self._cache.refresh_versions({p for r in requests for p in self._batch_patient_ids(r)})
+        for i, request in enumerate(requests):
+            cached = (
+                self._cache.get(self._batch_cache_key(request)) if use_cache and self.config.cache_enabled else None
+            )
+            if cached is not None:
+                self._stats.cache_hits += 1
+                results[i] = cached
+            else:
+                pending.append(i)
+
+        if len(pending) < 2:
+            outcomes = await self._batch_concurrently([requests[i] for i in pending], use_cache=False)
+        else:
+            outcomes = await self._execute_batch_bundle([requests[i] for i in pending])
+            if outcomes is None:
+                outcomes = await self._batch_concurrently([requests[i] for i in pending], use_cache=False)
+
+        for i, outcome in zip(pending, outcomes):
+            results[i] = outcome
+
+        return results
+
+    async def _batch_concurrently(self, requests: List[FHIRBatchRequest], use_cache: bool) -> List[Any]:
+        """Run batch requests as individual concurrent reads/searches"""
+        return await asyncio.gather(
+            *(
+                (
+                    self.read(r.resource_type, r.resource_id, use_cache=use_cache)
+                    if r.is_read
+                    else self.search(r.resource_type, r.params, max_results=r.max_results, use_cache=use_cache)
+                )
+                for r in requests
+            ),
+            return_exceptions=True,
+        )
+
+    async def _execute_batch_bundle(self, requests: List[FHIRBatchRequest]) -> Optional[List[Any]]:
+        """
+        POST requests as a batch Bundle.
+
+        Returns:
+            Per-request outcomes, or None if the server does not support batch
+        """
+        bundle = {
+            "resourceType": "Bundle",
+            "type": "batch",
+            "entry": [{"request": {"method": "GET", "url": self._batch_entry_url(r)}} for r in requests],
+        }
+        stamps = [self._cache.stamp(self._batch_patient_ids(r)) for r in requests]
+
+        try:
+            response = await self._request("POST", self.config.base_url, "Bundle", "batch", data=bundle)
+        except FHIRError as e:
+            if e.status_code in _BATCH_UNSUPPORTED_STATUSES:
+                logger.info(f"FHIR server {self.config.base_url} does not support batch Bundles, using single requests")
+                self._batch_supported = False
+                return None
+            if e.status_code not in _BATCH_FALLBACK_STATUSES:
+                self._stats.cache_misses += len(requests)
+                return [e] * len(requests)
+            response = None
+
+        if not response or response.get("type") != "batch-response":
+            logger.info(
+                f"FHIR server {self.config.base_url} rejected a batch Bundle, "
+                f"using single requests for {self.config.batch_retry_seconds:.0f}s"
+            )
+            self._batch_retry_at = time.monotonic() + self.config.batch_retry_seconds
+            return None
+
+        self._batch_supported = True
+        self._batch_retry_at = 0.0
+        self._stats.cache_misses += len(requests)
+        self._stats.batch_requests += 1
+        self._stats.batched_operations += len(requests)
+
+        return await asyncio.gather(
+            *(
+                self._resolve_batch_entry(request, entry or {}, request_stamps)
+                for request, entry, request_stamps in zip_longest(
+                    requests, response.get("entry", [])[: len(requests)], stamps
+                )
+            ),
+            return_exceptions=True,
+        )
+
+    async def _resolve_batch_entry(
+        self,
+        request: FHIRBatchRequest,
+        entry: Dict[str, Any],
+        stamps: Dict[str, Tuple[int, int]],
+    ) -> Any:
+        """Parse one batch-response entry, following search pagination"""
+        status_text = str(entry.get("response", {}).get("status", ""))
+        status = int(status_text.split()[0]) if status_text[:3].isdigit() else 0
+        resource = entry.get("resource") or {}
+
+        if status == 404:
+            return None if request.is_read else []
+        if not 200 <= status < 300:
+            raise FHIRError(f"Batch entry failed with status {status_text or 'missing'}", status or None)
+
+        model_class = self.RESOURCE_MODELS.get(request.resource_type)
+
+        patient_ids = self._batch_patient_ids(request)
+
+        if request.is_read:
+            result = model_class.from_fhir(resource) if model_class else resource
+            if self.config.cache_enabled:
+                if not patient_ids:
+                    patient_ids = self._resource_patient_ids(request.resource_type, resource=resource)
+                    stamps = None
+                self._cache.set(self._batch_cache_key(request), result, patient_ids=patient_ids, stamps=stamps)
+            return result
+
+        max_results = request.max_results
+        results: List[Any] = []
+        page: Optional[Dict[str, Any]] = resource
+        while page:
+            for page_entry in page.get("entry", []):
+                results.append(self._parse_search_resource(request.resource_type, page_entry.get("resource", {})))
+                if max_results and len(results) >= max_results:
+                    break
+            next_url = self._get_next_link(page)
+            if not next_url or (max_results and len(results) >= max_results):
+                break
+            page = await self._request("GET", next_url, request.resource_type.value, "search")
+
+        if self.config.cache_enabled:
+            self._cache.set(
+                self._batch_cache_key(request),
+                results,
+                tags=self._search_cache_tags(request.resource_type, patient_ids),
+                patient_ids=patient_ids,
+                stamps=stamps,
+            )
+        return results
+
+    def _batch_entry_url(self, request: FHIRBatchRequest) -> str:
+        """Relative request URL for a batch Bundle entry"""
+        if request.is_read:
+            return f"{request.resource_type.value}/{request.resource_id}"
+        params = self._with_page_size(request.params, request.max_results)
+        return f"{request.resource_type.value}?{urlencode(params)}"
+
+    def _batch_patient_ids(self, request: FHIRBatchRequest) -> Tuple[str, ...]:
+        if request.is_read:
+            return self._resource_patient_ids(request.resource_type, request.resource_id)
+        return self._search_patient_ids(request.params)
+
+    def _batch_cache_key(self, request: FHIRBatchRequest) -> str:
+        if request.is_read:
+            return f"{request.resource_type.value}/{request.resource_id}"
+        return self._search_cache_key(request.resource_type, request.params)
+
     # =========================================================================
     # Write Operations (Phase 6b)
     # =========================================================================
@@ -587,9 +1166,7 @@ class FHIRClient:
             extra_headers=extra_headers,
         )
 
-        # Invalidate cache for this resource type
-        if self.config.cache_enabled:
-            self._cache.invalidate_pattern(f"search:{resource_type.value}")
+        await self._invalidate_after_write(resource_type, resource=resource)
 
         # Extract result info
         result = FHIRWriteResult(
@@ -654,11 +1231,7 @@ class FHIRClient:
             extra_headers=extra_headers,
         )
 
-        # Invalidate cache for this resource
-        if self.config.cache_enabled:
-            cache_key = f"{resource_type.value}/{resource_id}"
-            self._cache.invalidate(cache_key)
-            self._cache.invalidate_pattern(f"search:{resource_type.value}")
+        await self._invalidate_after_write(resource_type, resource_id, resource)
 
         # Extract result info
         result = FHIRWriteResult(
@@ -706,11 +1279,7 @@ class FHIRClient:
             extra_headers=extra_headers,
         )
 
-        # Invalidate cache
-        if self.config.cache_enabled:
-            cache_key = f"{resource_type.value}/{resource_id}"
-            self._cache.invalidate(cache_key)
-            self._cache.invalidate_pattern(f"search:{resource_type.value}")
+        await self._invalidate_after_write(resource_type, resource_id)
 
         return FHIRWriteResult(
             success=True,
@@ -750,9 +1319,7 @@ class FHIRClient:
             data=resource,
         )
 
-        # Invalidate search cache
-        if self.config.cache_enabled:
-            self._cache.invalidate_pattern(f"search:{resource_type.value}")
+        await self._invalidate_after_write(resource_type, resource=resource)
 
         result = FHIRWriteResult(
             success=True,
@@ -854,7 +1421,7 @@ class FHIRClient:
                     # Success responses
                     if response.status in (200, 201):
                         self._stats.successful_requests += 1
-                        response_data = await response.json()
+                        response_data = await response.json(loads=loads_fhir_json)
                         return response_data, resp_headers
 
                     elif response.status == 204:
@@ -997,7 +1564,7 @@ class FHIRClient:
                     # Handle response
                     if response.status == 200:
                         self._stats.successful_requests += 1
-                        return await response.json()
+                        return await response.json(loads=loads_fhir_json)
 
                     elif response.status == 401:
                         # Try token refresh
@@ -1106,10 +1673,10 @@ class FHIRClient:
         active_only: bool = True,
     ) -> List[FHIRMedication]:
         """Get patient's medications"""
-        params = {"patient": patient_id}
-        if active_only:
-            params["status"] = "active"
-        return await self.search(FHIRResourceType.MEDICATION_REQUEST, params)
+        return await self.search(
+            FHIRResourceType.MEDICATION_REQUEST,
+            self._medication_params(patient_id, active_only),
+        )
 
     async def get_patient_conditions(
         self,
@@ -1117,10 +1684,10 @@ class FHIRClient:
         active_only: bool = True,
     ) -> List[FHIRCondition]:
         """Get patient's conditions/problems"""
-        params = {"patient": patient_id}
-        if active_only:
-            params["clinical-status"] = "active"
-        return await self.search(FHIRResourceType.CONDITION, params)
+        return await self.search(
+            FHIRResourceType.CONDITION,
+            self._condition_params(patient_id, active_only),
+        )
 
     async def get_patient_observations(
         self,
@@ -1130,17 +1697,10 @@ class FHIRClient:
         days_back: int = 30,
     ) -> List[FHIRObservation]:
         """Get patient's observations (labs, vitals)"""
-        params = {"patient": patient_id}
-        if category:
-            params["category"] = category
-        if code:
-            params["code"] = code
-
-        # Date filter
-        date_from = datetime.utcnow() - timedelta(days=days_back)
-        params["date"] = f"ge{date_from.strftime('%Y-%m-%d')}"
-
-        return await self.search(FHIRResourceType.OBSERVATION, params)
+        return await self.search(
+            FHIRResourceType.OBSERVATION,
+            self._observation_params(patient_id, category, code, days_back),
+        )
 
     async def get_patient_vitals(
         self,
@@ -1187,13 +1747,100 @@ class FHIRClient:
         params["date"] = f"ge{date_from.strftime('%Y-%m-%d')}"
         return await self.search(FHIRResourceType.PROCEDURE, params)
 
+    async def get_patient_chart(
+        self,
+        patient_id: str,
+        active_only: bool = True,
+        vitals_days_back: int = 7,
+        labs_days_back: int = 30,
+        since: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Load a patient's chart with a single batch() call.
+
+        Args:
+            patient_id: Patient FHIR ID
+            active_only: Only active medications and conditions
+            vitals_days_back: Vitals window
+            labs_days_back: Labs window
+            since: Per-section meta.lastUpdated watermarks for an incremental
+                load. Listed sections return only resources changed at or
+                after the watermark (status filters are dropped so that
+                deactivations are seen), "patient" is skipped, and results
+                are never served from the cache.
+
+        Returns:
+            Dict with "patient", "medications", "conditions", "allergies",
+            "vitals" and "labs"; each value is the result or the exception
+            raised while fetching it
+        """
+        since = since or {}
+        sections = {
+            "patient": FHIRBatchRequest.read(FHIRResourceType.PATIENT, patient_id),
+            "medications": FHIRBatchRequest.search(
+                FHIRResourceType.MEDICATION_REQUEST,
+                self._medication_params(patient_id, active_only and "medications" not in since),
+            ),
+            "conditions": FHIRBatchRequest.search(
+                FHIRResourceType.CONDITION,
+                self._condition_params(patient_id, active_only and "conditions" not in since),
+            ),
+            "allergies": FHIRBatchRequest.search(FHIRResourceType.ALLERGY_INTOLERANCE, {"patient": patient_id}),
+            "vitals": FHIRBatchRequest.search(
+                FHIRResourceType.OBSERVATION,
+                self._observation_params(patient_id, "vital-signs", None, vitals_days_back),
+            ),
+            "labs": FHIRBatchRequest.search(
+                FHIRResourceType.OBSERVATION,
+                self._observation_params(patient_id, "laboratory", None, labs_days_back),
+            ),
+        }
+        if "patient" in since:
+            del sections["patient"]
+        for name, request in sections.items():
+            if name in since:
+                request.params["_lastUpdated"] = f"ge{since[name]}"
+
+        results = await self.batch(list(sections.values()), use_cache=not since)
+        return dict(zip(sections.keys(), results))
+
+    def _medication_params(self, patient_id: str, active_only: bool) -> Dict[str, Any]:
+        params = {"patient": patient_id}
+        if active_only:
+            params["status"] = "active"
+        return params
+
+    def _condition_params(self, patient_id: str, active_only: bool) -> Dict[str, Any]:
+        params = {"patient": patient_id}
+        if active_only:
+            params["clinical-status"] = "active"
+        return params
+
+    def _observation_params(
+        self,
+        patient_id: str,
+        category: Optional[str],
+        code: Optional[str],
+        days_back: int,
+    ) -> Dict[str, Any]:
+        params = {"patient": patient_id}
+        if category:
+            params["category"] = category
+        if code:
+            params["code"] = code
+
+        # Date filter
+        date_from = datetime.utcnow() - timedelta(days=days_back)
+        params["date"] = f"ge{date_from.strftime('%Y-%m-%d')}"
+        return params
+
     # =========================================================================
     # Cache Management
     # =========================================================================
 
     def invalidate_patient_cache(self, patient_id: str) -> int:
-        """Invalidate all cached data for a patient"""
-        return self._cache.invalidate_pattern(patient_id)
+        """Invalidate all cached data for a patient on this instance"""
+        return self._cache.invalidate_patient(patient_id)
 
     def clear_cache(self) -> None:
         """Clear all cached data"""
@@ -1213,9 +1860,12 @@ class FHIRClient:
             "cache_misses": self._stats.cache_misses,
             "cache_hit_rate": (self._stats.cache_hits / max(1, self._stats.cache_hits + self._stats.cache_misses)),
             "total_retries": self._stats.total_retries,
+            "batch_requests": self._stats.batch_requests,
+            "batched_operations": self._stats.batched_operations,
             "avg_latency_ms": self._stats.avg_latency_ms,
             "requests_by_resource": self._stats.requests_by_resource,
             "errors_by_type": self._stats.errors_by_type,
+            "cache": self._cache.get_stats(),
         }
 
     def get_recent_metrics(self, limit: int = 100) -> List[Dict[str, Any]]:
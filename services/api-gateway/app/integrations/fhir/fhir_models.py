@@ -772,6 +772,9 @@ class FHIRObservation:
     # Raw FHIR data
     _raw: Dict[str, Any] = field(default_factory=dict)
 
+    # Interpretation codes flagged as abnormal
+    ABNORMAL_INTERPRETATION_CODES = ("H", "HH", "L", "LL", "A", "AA", "C")
+
     @classmethod
     def from_fhir(cls, data: Dict[str, Any]) -> "FHIRObservation":
         """Parse from FHIR JSON"""
@@ -815,8 +818,7 @@ class FHIRObservation:
             obs.interpretation = CodeableConcept.from_fhir(interps[0])
             # Check for abnormal interpretations
             if obs.interpretation:
-                abnormal_codes = ["H", "HH", "L", "LL", "A", "AA", "C"]
-                obs.is_abnormal = obs.interpretation.code in abnormal_codes
+                obs.is_abnormal = obs.interpretation.code in cls.ABNORMAL_INTERPRETATION_CODES
 
         # Timing
         if data.get("effectiveDateTime"):
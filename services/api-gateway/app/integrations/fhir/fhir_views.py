@@ -0,0 +1,283 @@
+"""
+FHIR Lazy Resource Views
+
+Read-only views over parsed FHIR JSON that decode fields on first access.
+
+Search results are often read for a handful of fields (the voice path needs
+display names and values), so building full fhir_models dataclasses for
+every bundle entry wastes time and memory. A view wraps the resource dict
+without copying it:
+
+- Fields used on hot paths are decoded individually and memoized
+- Model properties (observation_name, display_value, ...) and to_dict()
+  are shared with the dataclass models, so output is identical
+- Any other attribute materializes the full model once via from_fhir()
+
+FHIRClient returns views from searches only with lazy_models=True; views
+are not instances of the dataclass models.
+
+Also provides loads_fhir_json(), a fast JSON parser for bundle bodies
+(orjson when installed, stdlib json otherwise).
+"""
+
+import json
+import logging
+from typing import Any, Callable, Dict, Optional
+
+from .fhir_models import (
+    AllergyCriticality,
+    CodeableConcept,
+    ConditionStatus,
+    FHIRAllergyIntolerance,
+    FHIRCondition,
+    FHIRMedication,
+    FHIRObservation,
+    FHIRResourceType,
+    MedicationStatus,
+    ObservationStatus,
+    Quantity,
+    Reference,
+    _parse_fhir_datetime,
+)
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def loads_fhir_json(data: Any) -> Any:
+    """Parse a FHIR JSON body (bytes or str)."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# ==============================================================================
+# Base View
+# ==============================================================================
+
+
+class _lazy:
+    """Decode a field from the raw resource on first access, then memoize it"""
+
+    def __init__(self, decode: Callable[[Dict[str, Any]], Any]):
+        self.decode = decode
+
+    def __set_name__(self, owner, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = self.decode(instance._raw)
+        # Instance attribute shadows this (non-data) descriptor from now on
+        instance.__dict__[self.name] = value
+        return value
+
+
+class LazyResourceView:
+    """Base lazy view; subclasses set MODEL and declare _lazy fields"""
+
+    MODEL: Any = None
+
+    def __init__(self, raw: Dict[str, Any]):
+        self._raw = raw
+        self._model = None
+
+    @property
+    def id(self) -> str:
+        return self._raw.get("id", "")
+
+    @property
+    def resource_type(self) -> str:
+        return self._raw.get("resourceType", "")
+
+    @property
+    def model(self) -> Any:
+        """Fully parsed dataclass model (built once)"""
+        if self._model is None:
+            self._model = self.MODEL.from_fhir(self._raw)
+        return self._model
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for attributes the view does not decode itself
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(id={self.id!r})"
+
+
+def _codeable(key: str) -> Callable[[Dict[str, Any]], Optional[CodeableConcept]]:
+    return lambda raw: CodeableConcept.from_fhir(raw.get(key))
+
+
+def _first_codeable(key: str) -> Callable[[Dict[str, Any]], Optional[CodeableConcept]]:
+    return lambda raw: CodeableConcept.from_fhir(raw[key][0]) if raw.get(key) else None
+
+
+def _codeable_list(key: str) -> Callable[[Dict[str, Any]], list]:
+    return lambda raw: [cc for cc in (CodeableConcept.from_fhir(c) for c in raw.get(key, [])) if cc]
+
+
+def _datetime(key: str) -> Callable[[Dict[str, Any]], Any]:
+    return lambda raw: _parse_fhir_datetime(raw[key]) if raw.get(key) else None
+
+
+def _reference(key: str) -> Callable[[Dict[str, Any]], Optional[Reference]]:
+    return lambda raw: Reference.from_fhir(raw[key]) if raw.get(key) else None
+
+
+def _quantity(key: str) -> Callable[[Dict[str, Any]], Optional[Quantity]]:
+    return lambda raw: Quantity.from_fhir(raw[key]) if raw.get(key) else None
+
+
+def _first_coding_code(raw: Dict[str, Any], key: str) -> Optional[str]:
+    codings = (raw.get(key) or {}).get("coding", [])
+    return codings[0].get("code") if codings else None
+
+
+def _condition_status(raw: Dict[str, Any]) -> ConditionStatus:
+    code = _first_coding_code(raw, "clinicalStatus")
+    if code is None:
+        return ConditionStatus.ACTIVE
+    try:
+        return ConditionStatus(code or "active")
+    except ValueError:
+        return ConditionStatus.ACTIVE
+
+
+def _criticality(raw: Dict[str, Any]) -> AllergyCriticality:
+    try:
+        return AllergyCriticality(raw["criticality"]) if raw.get("criticality") else AllergyCriticality.LOW
+    except ValueError:
+        return AllergyCriticality.LOW
+
+
+def _is_abnormal(raw: Dict[str, Any]) -> bool:
+    interpretations = raw.get("interpretation", [])
+    interpretation = CodeableConcept.from_fhir(interpretations[0]) if interpretations else None
+    return bool(interpretation) and interpretation.code in FHIRObservation.ABNORMAL_INTERPRETATION_CODES
+
+
+def _reference_range(key: str) -> Callable[[Dict[str, Any]], Any]:
+    def decode(raw: Dict[str, Any]) -> Any:
+        ranges = raw.get("referenceRange") or [{}]
+        value = ranges[0].get(key)
+        if key == "text":
+            return value
+        return Quantity.from_fhir(value) if value else None
+
+    return decode
+
+
+# ==============================================================================
+# Resource Views
+# ==============================================================================
+
+
+class ObservationView(LazyResourceView):
+    """Lazy view of an Observation (see FHIRObservation)"""
+
+    MODEL = FHIRObservation
+
+    status = _lazy(lambda raw: ObservationStatus(raw.get("status", "unknown")))
+    code = _lazy(_codeable("code"))
+    category = _lazy(_codeable_list("category"))
+    value_quantity = _lazy(_quantity("valueQuantity"))
+    value_string = _lazy(lambda raw: raw.get("valueString") or None)
+    value_codeable_concept = _lazy(_codeable("valueCodeableConcept"))
+    reference_range_low = _lazy(_reference_range("low"))
+    reference_range_high = _lazy(_reference_range("high"))
+    reference_range_text = _lazy(_reference_range("text"))
+    interpretation = _lazy(_first_codeable("interpretation"))
+    is_abnormal = _lazy(_is_abnormal)
+    effective_datetime = _lazy(_datetime("effectiveDateTime"))
+    issued = _lazy(_datetime("issued"))
+    patient = _lazy(_reference("subject"))
+
+    observation_name = FHIRObservation.observation_name
+    loinc_code = FHIRObservation.loinc_code
+    is_vital = FHIRObservation.is_vital
+    is_lab = FHIRObservation.is_lab
+    display_value = FHIRObservation.display_value
+    reference_range_display = FHIRObservation.reference_range_display
+    to_dict = FHIRObservation.to_dict
+
+
+class MedicationView(LazyResourceView):
+    """Lazy view of a MedicationRequest (see FHIRMedication)"""
+
+    MODEL = FHIRMedication
+
+    status = _lazy(lambda raw: MedicationStatus(raw.get("status", "unknown")))
+    medication_code = _lazy(_codeable("medicationCodeableConcept"))
+    medication_reference = _lazy(_reference("medicationReference"))
+    authored_on = _lazy(_datetime("authoredOn"))
+    patient = _lazy(_reference("subject"))
+
+    medication_name = FHIRMedication.medication_name
+    is_active = FHIRMedication.is_active
+    rxnorm_code = FHIRMedication.rxnorm_code
+    to_dict = FHIRMedication.to_dict
+
+
+class ConditionView(LazyResourceView):
+    """Lazy view of a Condition (see FHIRCondition)"""
+
+    MODEL = FHIRCondition
+
+    clinical_status = _lazy(_condition_status)
+    code = _lazy(_codeable("code"))
+    category = _lazy(_codeable_list("category"))
+    severity = _lazy(_codeable("severity"))
+    onset_datetime = _lazy(_datetime("onsetDateTime"))
+    abatement_datetime = _lazy(_datetime("abatementDateTime"))
+    recorded_date = _lazy(_datetime("recordedDate"))
+    patient = _lazy(_reference("subject"))
+
+    condition_name = FHIRCondition.condition_name
+    icd10_code = FHIRCondition.icd10_code
+    is_active = FHIRCondition.is_active
+    is_chronic = FHIRCondition.is_chronic
+    to_dict = FHIRCondition.to_dict
+
+
+class AllergyIntoleranceView(LazyResourceView):
+    """Lazy view of an AllergyIntolerance (see FHIRAllergyIntolerance)"""
+
+    MODEL = FHIRAllergyIntolerance
+
+    code = _lazy(_codeable("code"))
+    criticality = _lazy(_criticality)
+    patient = _lazy(_reference("patient"))
+
+    allergen_name = FHIRAllergyIntolerance.allergen_name
+    is_severe = FHIRAllergyIntolerance.is_severe
+    to_dict = FHIRAllergyIntolerance.to_dict
+
+
+RESOURCE_VIEWS = {
+    FHIRResourceType.OBSERVATION: ObservationView,
+    FHIRResourceType.MEDICATION_REQUEST: MedicationView,
+    FHIRResourceType.CONDITION: ConditionView,
+    FHIRResourceType.ALLERGY_INTOLERANCE: AllergyIntoleranceView,
+}
+
+
+__all__ = [
+    "ORJSON_AVAILABLE",
+    "loads_fhir_json",
+    "LazyResourceView",
+    "ObservationView",
+    "MedicationView",
+    "ConditionView",
+    "AllergyIntoleranceView",
+    "RESOURCE_VIEWS",
+]
@@ -63,7 +63,12 @@ from app.api import (
 from app.core import business_metrics  # noqa: F401
 from app.core.config import settings
 from app.core.logging import configure_logging, get_logger
-from app.core.middleware import MetricsMiddleware, RequestTracingMiddleware, SecurityHeadersMiddleware
+from app.core.middleware import (
+    MetricsMiddleware,
+    QueryProfilingMiddleware,
+    RequestTracingMiddleware,
+    SecurityHeadersMiddleware,
+)
 from app.core.sentry import init_sentry
 from app.middleware.voice_auth import VoiceAuthMiddleware
 from app.services.external_connectors import ExternalSyncScheduler, OpenEvidenceConnector, PubMedConnector
@@ -132,13 +137,16 @@ app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 # 1. Security headers should be added first
 app.add_middleware(SecurityHeadersMiddleware)
 
-# 2. Request tracing for correlation IDs
+# 2. Per-route DB query profiling, inside request tracing so warnings carry the correlation ID
+app.add_middleware(QueryProfilingMiddleware, db_time_header=settings.QUERY_PROFILER_DB_TIME_HEADER)
+
+# 3. Request tracing for correlation IDs
 app.add_middleware(RequestTracingMiddleware)
 
-# 3. Metrics middleware
+# 4. Metrics middleware
 app.add_middleware(MetricsMiddleware)
 
-# 4. CORS middleware
+# 5. CORS middleware
 # Parse ALLOWED_ORIGINS from environment (comma-separated string)
 allowed_origins = [origin.strip() for origin in settings.ALLOWED_ORIGINS.split(",")]
 
@@ -154,7 +162,7 @@ app.add_middleware(
     expose_headers=["X-Correlation-ID"],
 )
 
-# 5. Voice auth middleware to validate voice session headers
+# 6. Voice auth middleware to validate voice session headers
 app.add_middleware(VoiceAuthMiddleware)
 
 # Include routers
@@ -223,6 +231,18 @@ async def startup_event():
         absolute_timeout_hours=settings.SESSION_ABSOLUTE_TIMEOUT_HOURS,
     )
 
+    # Attach query profiler listeners (per-route query metrics, N+1 detection)
+    from app.core.database import async_engine, engine
+    from app.core.query_profiler import setup_query_profiling
+
+    setup_query_profiling(engine)
+    setup_query_profiling(async_engine.sync_engine)
+
+    # Open the audit store and start its group-commit fsync, sink flushing and retention compaction
+    from app.core.audit_service import get_audit_service
+
+    await get_audit_service().start()
+
     # Warm prompt cache for fast AI prompt lookups
     try:
         from app.services.prompt_service import prompt_service
@@ -278,7 +298,7 @@ async def startup_event():
     logger.info("redis_pool_configured", max_connections=50)
     logger.info(
         "middleware_configured",
-        middleware=["SecurityHeaders", "RequestTracing", "Metrics", "CORS"],
+        middleware=["SecurityHeaders", "QueryProfiling", "RequestTracing", "Metrics", "CORS"],
     )
     logger.info("rate_limiting_enabled", default_limit="100/minute")
     logger.info(
@@ -326,6 +346,11 @@ async def shutdown_event():
     if scheduler:
         await scheduler.stop()
 
+    # Flush pending audit events to disk and the sink
+    from app.core.audit_service import get_audit_service
+
+    await get_audit_service().stop()
+
 
 if __name__ == "__main__":
     uvicorn.run(
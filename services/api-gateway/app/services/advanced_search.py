@@ -21,7 +21,7 @@ from typing import Any, Dict, List, Optional
 from app.services.hybrid_search_service import HybridSearchConfig, HybridSearchService, SearchStrategy
 from app.services.medical_embeddings import EmbeddingConfig, MedicalEmbeddingService, MedicalModelType
 from app.services.query_expansion import QueryExpansionConfig, QueryExpansionService
-from app.services.reranking_service import RerankerConfig, RerankerType, RerankingService
+from app.services.reranking_service import DiversityMethod, RerankerConfig, RerankerType, RerankingService
 
 logger = logging.getLogger(__name__)
 
@@ -204,6 +204,15 @@ class AdvancedSearchAggregator:
         # Step 2: Search
         search_start = time.time()
 
+        # Stored chunk vectors feed the embedding re-ranker and embedding MMR
+        with_vectors = bool(self.reranker and settings_for_mode["rerank"]) and (
+            self.config.reranker_type == RerankerType.OPENAI
+            or (
+                settings_for_mode["diverse"]
+                and self.reranker.config.diversity_method in (DiversityMethod.AUTO, DiversityMethod.EMBEDDING)
+            )
+        )
+
         if settings_for_mode["hybrid"]:
             # Use hybrid search
             strategy = SearchStrategy.HYBRID if settings_for_mode["use_bm25"] else SearchStrategy.VECTOR_ONLY
@@ -212,6 +221,7 @@ class AdvancedSearchAggregator:
                 top_k=top_k * 3,  # Get more for re-ranking
                 strategy=strategy,
                 filters=filters,
+                with_vectors=with_vectors,
             )
         else:
             # Fall back to vector-only search
@@ -220,6 +230,7 @@ class AdvancedSearchAggregator:
                 top_k=top_k * 3,
                 strategy=SearchStrategy.VECTOR_ONLY,
                 filters=filters,
+                with_vectors=with_vectors,
             )
 
         metrics.search_time_ms = (time.time() - search_start) * 1000
@@ -238,6 +249,7 @@ class AdvancedSearchAggregator:
                     "content": r.content,
                     "score": r.score,
                     "metadata": r.metadata,
+                    "embedding": r.embedding,
                 }
                 for r in search_results
             ]
@@ -7,20 +7,70 @@ Architecture:
 - Enqueue document processing tasks from API endpoints
 - Background worker processes tasks from Redis queue
 - Job status tracking for monitoring upload progress
+
+Priority lanes: interactive uploads and bulk imports go to separate ARQ
+queues served by separate workers (WorkerSettings, BulkWorkerSettings),
+so a large import cannot starve single-file uploads. Nextcloud crawls are
+enqueued to the bulk lane.
+
+Each job runs as a pipeline of stages (extract -> chunk -> embed ->
+upsert) connected by bounded queues, so CPU-bound extraction overlaps
+network-bound embedding and upserts. Per-stage throughput and queue
+depth are exported as Prometheus metrics.
 """
 
-from datetime import timedelta
-from typing import Any, Dict, Optional
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
 
+from app.core.business_metrics import safe_counter, safe_gauge
 from app.core.config import settings
 from app.core.logging import get_logger
-from app.services.kb_indexer import IndexingResult, KBIndexer
+from app.services.file_processor import FileProcessor, get_file_processor
+from app.services.kb_indexer import DocumentChunk, KBIndexer
+from app.services.rag_cache import rag_cache
 from arq import ArqRedis, create_pool
 from arq.connections import RedisSettings
+from arq.constants import default_queue_name
+from qdrant_client.models import PointStruct
 
 logger = get_logger(__name__)
 
 
+class DocumentPriority(str, Enum):
+    """Processing lane for a document job"""
+
+    INTERACTIVE = "interactive"  # Single-file uploads a user is waiting on
+    BULK = "bulk"  # Imports and re-indexing
+
+
+QUEUE_NAMES = {
+    DocumentPriority.INTERACTIVE: default_queue_name,
+    DocumentPriority.BULK: f"{default_queue_name}:bulk",
+}
+
+MIME_TYPES = {".pdf": "application/pdf", ".txt": "text/plain"}
+
+document_jobs_enqueued_total = safe_counter(
+    "voiceassist_document_jobs_enqueued_total", "Document processing jobs enqueued", ["lane"]
+)
+document_queue_depth = safe_gauge(
+    "voiceassist_document_queue_depth", "Document processing jobs waiting per lane", ["lane"]
+)
+document_stage_items_total = safe_counter(
+    "voiceassist_document_pipeline_items_total", "Items processed by document pipeline stage", ["stage"]
+)
+document_stage_seconds_total = safe_counter(
+    "voiceassist_document_pipeline_busy_seconds_total", "Time spent working per document pipeline stage", ["stage"]
+)
+document_stage_queue_depth = safe_gauge(
+    "voiceassist_document_pipeline_queue_depth", "Items buffered between document pipeline stages", ["queue"]
+)
+
+
 # ARQ Redis settings
 ARQ_REDIS_SETTINGS = RedisSettings(
     host=settings.REDIS_HOST,
@@ -50,6 +100,7 @@ class DocumentProcessingQueue:
         title: str,
         source_type: str,
         metadata: Dict[str, Any],
+        priority: DocumentPriority = DocumentPriority.INTERACTIVE,
     ) -> str:
         """
         Enqueue a document for async processing.
@@ -61,11 +112,13 @@ class DocumentProcessingQueue:
             title: Document title
             source_type: Source type (uploaded, guideline, etc.)
             metadata: Additional metadata
+            priority: Lane to run in; bulk imports should use DocumentPriority.BULK
 
         Returns:
             Job ID for tracking status
         """
         redis = await self.get_redis_pool()
+        priority = DocumentPriority(priority)
 
         job = await redis.enqueue_job(
             "process_document",
@@ -75,7 +128,9 @@ class DocumentProcessingQueue:
             title,
             source_type,
             metadata,
+            _queue_name=QUEUE_NAMES[priority],
         )
+        document_jobs_enqueued_total.labels(lane=priority.value).inc()
 
         logger.info(
             "document_enqueued",
@@ -85,11 +140,64 @@ class DocumentProcessingQueue:
                 "title": title,
                 "size_bytes": len(file_content),
                 "file_extension": file_extension,
+                "lane": priority.value,
             },
         )
 
         return job.job_id
 
+    async def enqueue_nextcloud_crawl(
+        self,
+        watch_directories: List[str],
+        source_type: str = "note",
+        force_reindex: bool = False,
+        priority: DocumentPriority = DocumentPriority.BULK,
+    ) -> str:
+        """
+        Enqueue an incremental crawl of Nextcloud watch directories.
+
+        Args:
+            watch_directories: Nextcloud directories to sync
+            source_type: Default source type for indexed documents
+            force_reindex: Re-index files even if unchanged
+            priority: Lane to run in; crawls are bulk work
+
+        Returns:
+            Job ID for tracking status
+        """
+        redis = await self.get_redis_pool()
+        priority = DocumentPriority(priority)
+
+        job = await redis.enqueue_job(
+            "crawl_nextcloud",
+            watch_directories,
+            source_type,
+            force_reindex,
+            _queue_name=QUEUE_NAMES[priority],
+        )
+        document_jobs_enqueued_total.labels(lane=priority.value).inc()
+
+        logger.info(
+            "nextcloud_crawl_enqueued",
+            extra={"job_id": job.job_id, "watch_directories": watch_directories, "lane": priority.value},
+        )
+
+        return job.job_id
+
+    async def get_queue_depths(self) -> Dict[str, int]:
+        """
+        Count jobs waiting in each lane and update the queue depth gauge.
+
+        Returns:
+            Mapping of lane name to queued job count
+        """
+        redis = await self.get_redis_pool()
+        depths = {}
+        for priority, queue_name in QUEUE_NAMES.items():
+            depths[priority.value] = await redis.zcard(queue_name)
+            document_queue_depth.labels(lane=priority.value).set(depths[priority.value])
+        return depths
+
     async def get_job_status(self, job_id: str) -> Dict[str, Any]:
         """
         Get status of a document processing job.
@@ -135,6 +243,277 @@ class DocumentProcessingQueue:
 document_queue = DocumentProcessingQueue()
 
 
+@dataclass
+class StageStats:
+    """Work done by one pipeline stage for one document"""
+
+    items: int = 0
+    busy_seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "items": self.items,
+            "busy_seconds": round(self.busy_seconds, 4),
+            "items_per_second": round(self.items / self.busy_seconds, 2) if self.busy_seconds > 0 else 0.0,
+        }
+
+
+class StreamingChunker:
+    """
+    Incremental version of KBIndexer.chunk_text.
+
+    Pages are fed as they are extracted (joined with newlines, as
+    KBIndexer.extract_text_from_pdf does) and every window that is complete
+    is emitted immediately; the result matches chunk_text over the full text.
+    """
+
+    def __init__(self, chunk_size: int, chunk_overlap: int, document_id: str, metadata: Dict[str, Any]):
+        self.chunk_size = chunk_size
+        self.step = chunk_size - chunk_overlap
+        self.document_id = document_id
+        self.metadata = metadata
+        self._buffer = ""
+        self._buffer_start = 0  # Offset of _buffer[0] in the full text
+        self._next_start = 0
+        self._started = False
+
+    def feed(self, text: str) -> List[DocumentChunk]:
+        """Add a page of text and return the chunks it completes"""
+        if self._started:
+            text = "\n" + text
+        self._started = True
+        self._buffer += text
+        total = self._buffer_start + len(self._buffer)
+
+        chunks = []
+        while self._next_start + self.chunk_size <= total:
+            chunks.extend(self._emit(self._next_start + self.chunk_size))
+            self._next_start += self.step
+
+        # Drop text no later window can include
+        cut = self._next_start - self._buffer_start
+        self._buffer = self._buffer[cut:]
+        self._buffer_start = self._next_start
+        return chunks
+
+    def finish(self) -> List[DocumentChunk]:
+        """Return the trailing chunks once the whole document has been fed"""
+        total = self._buffer_start + len(self._buffer)
+        chunks = []
+        while self._next_start < total:
+            chunks.extend(self._emit(total))
+            self._next_start += self.step
+        return chunks
+
+    def _emit(self, total: int) -> List[DocumentChunk]:
+        start = self._next_start
+        offset = start - self._buffer_start
+        chunk_text = self._buffer[offset : offset + self.chunk_size]
+
+        # Skip very small chunks at the end
+        if len(chunk_text) < 50:
+            return []
+
+        chunk_index = start // self.step
+        return [
+            DocumentChunk(
+                chunk_id=KBIndexer.chunk_point_id(self.document_id, str(chunk_index)),
+                document_id=self.document_id,
+                content=chunk_text,
+                chunk_index=chunk_index,
+                metadata={
+                    **self.metadata,
+                    "chunk_index": chunk_index,
+                    "char_start": start,
+                    "char_end": min(start + self.chunk_size, total),
+                },
+            )
+        ]
+
+
+_DONE = object()
+
+
+class DocumentPipeline:
+    """
+    Extract -> chunk -> embed -> upsert, one asyncio task per stage.
+
+    Stages hand work downstream through bounded queues, so extraction of
+    later pages (in the FileProcessor process pool) overlaps embedding and
+    upserting of earlier chunks, while memory stays bounded.
+
+    Point ids are derived from (document_id, chunk_index), so a retried job
+    overwrites its own chunks; a failed run deletes whatever it upserted.
+    """
+
+    STAGES = ("extract", "chunk", "embed", "upsert")
+
+    def __init__(
+        self,
+        kb_indexer: KBIndexer,
+        file_processor: Optional[FileProcessor] = None,
+        embed_batch_size: Optional[int] = None,
+        queue_size: Optional[int] = None,
+    ):
+        self.kb_indexer = kb_indexer
+        self.file_processor = file_processor or get_file_processor()
+        self.embed_batch_size = embed_batch_size or settings.DOCUMENT_PIPELINE_EMBED_BATCH
+        self.queue_size = queue_size or settings.DOCUMENT_PIPELINE_QUEUE_SIZE
+
+    async def run(
+        self,
+        document_id: str,
+        file_content: bytes,
+        file_extension: str,
+        title: str,
+        source_type: str,
+        metadata: Dict[str, Any],
+    ) -> Tuple[int, Dict[str, Dict[str, Any]]]:
+        """
+        Index one document.
+
+        Returns:
+            Tuple of (chunks indexed, per-stage stats)
+
+        Raises:
+            ValueError: For unsupported file types or documents without text
+        """
+        mime_type = MIME_TYPES.get(file_extension)
+        if mime_type is None:
+            raise ValueError(f"Unsupported file extension: {file_extension}")
+
+        doc_metadata = {
+            "document_id": document_id,
+            "title": title,
+            "source_type": source_type,
+            "indexed_at": datetime.now(timezone.utc).isoformat(),
+            **(metadata or {}),
+        }
+        stats = {stage: StageStats() for stage in self.STAGES}
+        pages: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        chunk_batches: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        vector_batches: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        indexed = 0
+
+        async def put(queue: asyncio.Queue, name: str, item: Any) -> None:
+            await queue.put(item)
+            document_stage_queue_depth.labels(queue=name).inc()
+
+        async def get(queue: asyncio.Queue, name: str) -> Any:
+            item = await queue.get()
+            document_stage_queue_depth.labels(queue=name).dec()
+            return item
+
+        def record(stage: str, items: int, started: float) -> None:
+            elapsed = time.perf_counter() - started
+            stats[stage].items += items
+            stats[stage].busy_seconds += elapsed
+            document_stage_items_total.labels(stage=stage).inc(items)
+            document_stage_seconds_total.labels(stage=stage).inc(elapsed)
+
+        async def extract() -> None:
+            started = time.perf_counter()
+            async for page in self.file_processor.iter_pages(file_content, f"{title}{file_extension}", mime_type):
+                record("extract", 1, started)
+                await put(pages, "pages", page.text)
+                started = time.perf_counter()
+            await put(pages, "pages", _DONE)
+
+        async def chunk() -> None:
+            chunker = StreamingChunker(
+                self.kb_indexer.chunk_size, self.kb_indexer.chunk_overlap, document_id, doc_metadata
+            )
+            batch: List[DocumentChunk] = []
+            while True:
+                text = await get(pages, "pages")
+                started = time.perf_counter()
+                new_chunks = chunker.finish() if text is _DONE else chunker.feed(text)
+                record("chunk", len(new_chunks), started)
+                batch.extend(new_chunks)
+                while len(batch) >= self.embed_batch_size or (text is _DONE and batch):
+                    await put(chunk_batches, "chunks", batch[: self.embed_batch_size])
+                    batch = batch[self.embed_batch_size :]
+                if text is _DONE:
+                    await put(chunk_batches, "chunks", _DONE)
+                    return
+
+        async def embed() -> None:
+            while (batch := await get(chunk_batches, "chunks")) is not _DONE:
+                started = time.perf_counter()
+                vectors = await self.kb_indexer.generate_embeddings([c.content for c in batch])
+                record("embed", len(batch), started)
+                await put(vector_batches, "vectors", (batch, vectors))
+            await put(vector_batches, "vectors", _DONE)
+
+        async def upsert() -> None:
+            nonlocal indexed
+            while (item := await get(vector_batches, "vectors")) is not _DONE:
+                batch, vectors = item
+                started = time.perf_counter()
+                points = [
+                    PointStruct(
+                        id=c.chunk_id,
+                        vector=vector,
+                        payload={
+                            "document_id": c.document_id,
+                            "content": c.content,
+                            "chunk_index": c.chunk_index,
+                            **c.metadata,
+                        },
+                    )
+                    for c, vector in zip(batch, vectors)
+                ]
+                # Shielded: a cancelled stage can't stop the thread, and cleanup must wait for it
+                write = asyncio.ensure_future(
+                    asyncio.to_thread(
+                        self.kb_indexer.qdrant_client.upsert,
+                        collection_name=self.kb_indexer.collection_name,
+                        points=points,
+                    )
+                )
+                writes.append(write)
+                await asyncio.shield(write)
+                record("upsert", len(points), started)
+                indexed += len(points)
+
+        writes: List[asyncio.Future] = []
+        tasks = [asyncio.create_task(stage()) for stage in (extract, chunk, embed, upsert)]
+        completed = False
+        try:
+            await asyncio.gather(*tasks)
+            completed = True
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, *writes, return_exceptions=True)
+            # Items left behind by a failed run no longer count as buffered
+            for queue, name in ((pages, "pages"), (chunk_batches, "chunks"), (vector_batches, "vectors")):
+                document_stage_queue_depth.labels(queue=name).dec(queue.qsize())
+            if writes and not completed:
+                # Don't leave a partial document searchable
+                await asyncio.to_thread(self.kb_indexer.delete_document, document_id)
+                await rag_cache.invalidate_document(document_id)
+
+        if indexed == 0:
+            raise ValueError("No chunks generated from document")
+        await rag_cache.invalidate_document(document_id)
+
+        return indexed, {stage: s.to_dict() for stage, s in stats.items()}
+
+
+async def startup(ctx: Dict[str, Any]) -> None:
+    """ARQ worker startup: share one KB indexer and file processor across jobs"""
+    ctx["kb_indexer"] = KBIndexer()
+    ctx["file_processor"] = get_file_processor()
+
+
+async def shutdown(ctx: Dict[str, Any]) -> None:
+    """ARQ worker shutdown: stop extraction worker processes"""
+    file_processor = ctx.get("file_processor")
+    if file_processor is not None:
+        file_processor.shutdown()
+
+
 async def process_document(
     ctx: Dict[str, Any],
     document_id: str,
@@ -171,61 +550,36 @@ async def process_document(
     )
 
     try:
-        # Initialize KB Indexer
-        kb_indexer = KBIndexer()
-
-        # Process based on file type
-        if file_extension == ".pdf":
-            result: IndexingResult = await kb_indexer.index_pdf_document(
-                pdf_bytes=file_content,
-                document_id=document_id,
-                title=title,
-                source_type=source_type,
-                metadata=metadata,
-            )
-        elif file_extension == ".txt":
-            text_content = file_content.decode("utf-8")
-            result: IndexingResult = await kb_indexer.index_document(
-                content=text_content,
-                document_id=document_id,
-                title=title,
-                source_type=source_type,
-                metadata=metadata,
-            )
-        else:
-            raise ValueError(f"Unsupported file extension: {file_extension}")
-
-        if result.success:
-            logger.info(
-                "document_processing_completed",
-                extra={
-                    "document_id": document_id,
-                    "chunks_indexed": result.chunks_indexed,
-                    "title": title,
-                },
-            )
+        pipeline = DocumentPipeline(
+            kb_indexer=ctx.get("kb_indexer") or KBIndexer(),
+            file_processor=ctx.get("file_processor"),
+        )
+        chunks_indexed, stage_stats = await pipeline.run(
+            document_id=document_id,
+            file_content=file_content,
+            file_extension=file_extension,
+            title=title,
+            source_type=source_type,
+            metadata=metadata,
+        )
 
-            return {
-                "success": True,
+        logger.info(
+            "document_processing_completed",
+            extra={
                 "document_id": document_id,
+                "chunks_indexed": chunks_indexed,
                 "title": title,
-                "chunks_indexed": result.chunks_indexed,
-            }
-        else:
-            logger.error(
-                "document_processing_failed",
-                extra={
-                    "document_id": document_id,
-                    "error": result.error_message,
-                    "title": title,
-                },
-            )
+                "stages": stage_stats,
+            },
+        )
 
-            return {
-                "success": False,
-                "document_id": document_id,
-                "error": result.error_message,
-            }
+        return {
+            "success": True,
+            "document_id": document_id,
+            "title": title,
+            "chunks_indexed": chunks_indexed,
+            "stages": stage_stats,
+        }
 
     except Exception as e:
         logger.error(
@@ -245,12 +599,52 @@ async def process_document(
         }
 
 
+async def crawl_nextcloud(
+    ctx: Dict[str, Any],
+    watch_directories: List[str],
+    source_type: str,
+    force_reindex: bool,
+) -> Dict[str, Any]:
+    """
+    ARQ task function to sync Nextcloud watch directories into the KB.
+
+    Args:
+        ctx: ARQ context dict
+        watch_directories: Nextcloud directories to sync
+        source_type: Default source type for indexed documents
+        force_reindex: Re-index files even if unchanged
+
+    Returns:
+        Crawl summary, or an error dict if Nextcloud is unreachable
+    """
+    from app.services.nextcloud_file_indexer import NextcloudFileIndexer
+
+    indexer = NextcloudFileIndexer.from_settings(watch_directories=watch_directories)
+    if not await asyncio.to_thread(indexer.connect):
+        return {"success": False, "error": "Failed to connect to Nextcloud"}
+
+    summary = await indexer.scan_and_index(source_type=source_type, force_reindex=force_reindex)
+    logger.info("nextcloud_crawl_complete", extra={"summary": summary})
+    return {"success": True, **summary}
+
+
 # ARQ Worker class configuration
 class WorkerSettings:
-    """ARQ worker settings."""
+    """ARQ worker settings for the interactive lane."""
 
     redis_settings = ARQ_REDIS_SETTINGS
-    functions = [process_document]
+    queue_name = QUEUE_NAMES[DocumentPriority.INTERACTIVE]
+    functions = [process_document, crawl_nextcloud]
+    on_startup = startup
+    on_shutdown = shutdown
     job_timeout = timedelta(minutes=30)  # 30 minutes for large documents
-    max_jobs = 5  # Process up to 5 documents concurrently
+    max_jobs = settings.DOCUMENT_INTERACTIVE_MAX_JOBS
     keep_result = timedelta(hours=24)  # Keep job results for 24 hours
+
+
+class BulkWorkerSettings(WorkerSettings):
+    """ARQ worker settings for the bulk lane (run as a separate worker process)."""
+
+    queue_name = QUEUE_NAMES[DocumentPriority.BULK]
+    job_timeout = timedelta(hours=2)
+    max_jobs = settings.DOCUMENT_BULK_MAX_JOBS
@@ -5,21 +5,150 @@ This service provides:
 - Async event logging with batching
 - Event querying for inspection/replay
 - Background flush to avoid blocking main request flow
+
+Buffered events are written in bulk by SessionEventBulkWriter: one asyncpg
+COPY per batch (multi-row INSERT when COPY is unavailable), encoded in a
+worker thread so the event loop is never blocked on the database. When the
+buffer passes its high-water mark, log_event() waits for a flush to drain
+it. Batches that cannot be written, and events still turned away after
+the wait (collected into one batch per second), are spilled to disk and
+replayed once the database accepts writes again. Rows the database
+rejects for their data are isolated and moved to a dead-letter directory
+so they cannot hold up the rest. Each process spills to its own
+directory and adopts the files of exited workers on start.
 """
 
 import asyncio
+import json
+import os
+import tempfile
+import time
 import uuid
 from collections import deque
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from app.core.database import get_db
 from app.core.logging import get_logger
+from app.core.metrics import _safe_counter, _safe_gauge, _safe_histogram
 from app.models.session_event import EventType, SessionEvent
+from sqlalchemy.exc import DataError, IntegrityError
 from sqlalchemy.orm import Session
 
 logger = get_logger(__name__)
 
+# Column order of buffered rows, COPY and spill files
+SESSION_EVENT_COLUMNS = (
+    "id",
+    "conversation_id",
+    "session_id",
+    "branch_id",
+    "user_id",
+    "event_type",
+    "payload",
+    "source",
+    "trace_id",
+    "created_at",
+)
+_UUID_COLUMNS = (0, 1, 4)
+_CREATED_AT = 9
+
+EventRow = Tuple[Any, ...]
+
+session_events_persisted_total = _safe_counter(
+    "voiceassist_session_events_persisted_total",
+    "Session events leaving the logging buffer",
+    ["outcome"],  # outcome: "written", "spilled", "replayed", "rejected", "dropped"
+)
+
+session_event_flush_seconds = _safe_histogram(
+    "voiceassist_session_event_flush_seconds",
+    "Latency of one bulk session event write",
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5],
+)
+
+session_event_buffer_depth = _safe_gauge(
+    "voiceassist_session_event_buffer_depth",
+    "Session events buffered awaiting flush",
+)
+
+
+def _copy_record(row: EventRow) -> EventRow:
+    """Row as COPY expects it: JSONB payload as text"""
+    payload = row[6]
+    if payload is None:
+        return row
+    return row[:6] + (json.dumps(payload, default=str),) + row[7:]
+
+
+def _row_to_json(row: EventRow) -> str:
+    return json.dumps(list(row), default=str)
+
+
+def _is_row_error(exc: BaseException) -> bool:
+    """True if the database refused the data (constraint or value), not the connection"""
+    if isinstance(exc, (IntegrityError, DataError)):
+        return True
+    # asyncpg errors raised from COPY carry the SQLSTATE; class 22 = data, 23 = integrity
+    for error in (exc, getattr(exc, "orig", None), exc.__cause__):
+        sqlstate = getattr(error, "sqlstate", None)
+        if isinstance(sqlstate, str) and sqlstate[:2] in ("22", "23"):
+            return True
+    return False
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _row_from_json(line: str) -> EventRow:
+    values = json.loads(line)
+    for i in _UUID_COLUMNS:
+        if values[i] is not None:
+            values[i] = uuid.UUID(values[i])
+    values[_CREATED_AT] = datetime.fromisoformat(values[_CREATED_AT])
+    return tuple(values)
+
+
+class SessionEventBulkWriter:
+    """
+    Writes batches of session event rows.
+
+    Uses asyncpg's binary COPY through the shared async engine, falling
+    back to a single multi-row INSERT if the driver has no COPY support.
+    """
+
+    def __init__(self, engine=None, table_name: str = SessionEvent.__tablename__):
+        self._engine = engine
+        self.table_name = table_name
+
+    async def write(self, rows: List[EventRow]) -> None:
+        if not rows:
+            return
+
+        if self._engine is None:
+            from app.core.database import async_engine
+
+            self._engine = async_engine
+
+        async with self._engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            driver = getattr(raw, "driver_connection", None)
+
+            if hasattr(driver, "copy_records_to_table"):
+                records = await asyncio.to_thread(lambda: [_copy_record(row) for row in rows])
+                await driver.copy_records_to_table(self.table_name, records=records, columns=SESSION_EVENT_COLUMNS)
+                return
+
+            params = [dict(zip(SESSION_EVENT_COLUMNS, row)) for row in rows]
+            await conn.execute(SessionEvent.__table__.insert(), params)
+            await conn.commit()
+
 
 class EventLoggingService:
     """
@@ -28,29 +157,98 @@ class EventLoggingService:
     Features:
     - Buffered async logging to reduce DB pressure
     - Periodic flush to ensure events are persisted
+    - Bulk COPY writes, backpressure and spill-to-disk
     - Query interface for event inspection
     """
 
-    def __init__(self, buffer_size: int = 100, flush_interval_seconds: float = 5.0):
+    # Max rows per COPY
+    MAX_BATCH_SIZE = 5000
+
+    # Spill files replayed per flush, so recovery does not starve new events
+    REPLAY_FILES_PER_FLUSH = 10
+
+    # Max age of an event held for the overflow spill batch
+    OVERFLOW_SPILL_SECONDS = 1.0
+
+    # Per-process spill directories live under this one
+    DEFAULT_SPILL_ROOT = os.path.join(tempfile.gettempdir(), "voiceassist-session-events")
+
+    def __init__(
+        self,
+        buffer_size: int = 100,
+        flush_interval_seconds: float = 5.0,
+        high_water_mark: Optional[int] = None,
+        backpressure_timeout_seconds: float = 1.0,
+        spill_dir: Optional[str] = None,
+        writer=None,
+    ):
         """
         Initialize the event logging service.
 
         Args:
-            buffer_size: Max events to buffer before forcing a flush
+            buffer_size: Buffered events that trigger a flush
             flush_interval_seconds: Interval for periodic flushes
+            high_water_mark: Buffered events at which log_event() waits for
+                a flush (default 20 x buffer_size)
+            backpressure_timeout_seconds: Max wait before the event is
+                spilled to disk instead (overflow events are spilled together,
+                every buffer_size events or OVERFLOW_SPILL_SECONDS)
+            spill_dir: Directory for batches the database did not accept
+                (default: a per-process directory under the system temp dir)
+            writer: Bulk writer (default SessionEventBulkWriter)
         """
         self.buffer_size = buffer_size
         self.flush_interval = flush_interval_seconds
-        self._buffer: deque = deque(maxlen=buffer_size * 2)  # Extra room
-        self._lock = asyncio.Lock()
+        self.high_water_mark = high_water_mark or buffer_size * 20
+        self.backpressure_timeout = backpressure_timeout_seconds
+        self._spill_dir = spill_dir
+        self._writer = writer or SessionEventBulkWriter()
+
+        self._buffer: List[EventRow] = []
+        self._overflow: List[EventRow] = []  # Rejected by backpressure, waiting to be spilled
+        self._overflow_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        self._drained = asyncio.Event()
+        self._pending_flush: Optional[asyncio.Task] = None
         self._flush_task: Optional[asyncio.Task] = None
         self._running = False
+        self._spill_seq = 0
+
+        self._started_at = time.monotonic()
+        self._recent_writes: deque = deque()  # (monotonic time, events) within the rate window
+        self._flush_latencies_ms: deque = deque(maxlen=200)
+        self._stats = {
+            "events_logged": 0,
+            "events_written": 0,
+            "batches_written": 0,
+            "write_seconds": 0.0,
+            "flush_errors": 0,
+            "events_spilled": 0,
+            "events_replayed": 0,
+            "events_rejected": 0,
+            "events_dropped": 0,
+            "backpressure_waits": 0,
+        }
+
+    @property
+    def spill_dir(self) -> str:
+        """Spill directory; by default one per process, so workers only replay their own files"""
+        if self._spill_dir:
+            return self._spill_dir
+        return os.path.join(self.DEFAULT_SPILL_ROOT, str(os.getpid()))
+
+    @property
+    def dead_letter_dir(self) -> str:
+        """Rows the database rejected (e.g. FK to a deleted conversation), kept for inspection"""
+        return os.path.join(self.spill_dir, "dead-letter")
 
     async def start(self):
         """Start the background flush task."""
         if self._running:
             return
         self._running = True
+        if not self._spill_dir:
+            await asyncio.to_thread(self._adopt_orphaned_spills)
         self._flush_task = asyncio.create_task(self._periodic_flush())
         logger.info("EventLoggingService started")
 
@@ -63,7 +261,11 @@ class EventLoggingService:
                 await self._flush_task
             except asyncio.CancelledError:
                 pass
-        # Final flush
+        if self._overflow_task:
+            self._overflow_task.cancel()
+        # Final flush; held overflow events get another chance at the database
+        self._buffer.extend(self._overflow)
+        self._overflow = []
         await self._flush_buffer()
         logger.info("EventLoggingService stopped")
 
@@ -82,6 +284,7 @@ class EventLoggingService:
         Log a session event asynchronously.
 
         Events are buffered and flushed periodically or when buffer is full.
+        Above the high-water mark this waits for a flush (backpressure).
 
         Args:
             conversation_id: ID of the conversation
@@ -93,23 +296,34 @@ class EventLoggingService:
             source: Source of the event
             trace_id: Optional trace ID for correlation
         """
-        event = SessionEvent.create(
-            conversation_id=conversation_id,
-            event_type=event_type,
-            payload=payload,
-            session_id=session_id,
-            branch_id=branch_id,
-            user_id=user_id,
-            source=source,
-            trace_id=trace_id,
+        row = (
+            uuid.uuid4(),
+            conversation_id,
+            session_id,
+            branch_id,
+            user_id,
+            event_type.value if isinstance(event_type, EventType) else event_type,
+            payload,
+            source,
+            trace_id,
+            datetime.utcnow(),
         )
+        self._stats["events_logged"] += 1
+
+        if len(self._buffer) >= self.high_water_mark:
+            await self._wait_for_capacity()
+            if len(self._buffer) >= self.high_water_mark:
+                self._hold_overflow(row)
+                if len(self._overflow) >= self.buffer_size:
+                    await self._spill_overflow()
+                return
 
-        async with self._lock:
-            self._buffer.append(event)
+        self._buffer.append(row)
+        session_event_buffer_depth.set(len(self._buffer))
 
-            # Flush if buffer is getting full
-            if len(self._buffer) >= self.buffer_size:
-                asyncio.create_task(self._flush_buffer())
+        # Flush if buffer is getting full
+        if len(self._buffer) >= self.buffer_size:
+            self._schedule_flush()
 
     async def log_event_sync(
         self,
@@ -159,44 +373,278 @@ class EventLoggingService:
 
         return event
 
-    async def _flush_buffer(self) -> None:
-        """Flush buffered events to the database."""
-        async with self._lock:
-            if not self._buffer:
-                return
+    # =========================================================================
+    # Flushing
+    # =========================================================================
 
-            events = list(self._buffer)
-            self._buffer.clear()
+    def _schedule_flush(self) -> None:
+        if self._pending_flush is None or self._pending_flush.done():
+            self._pending_flush = asyncio.create_task(self._flush_buffer())
 
-        if not events:
-            return
+    async def _wait_for_capacity(self) -> None:
+        self._stats["backpressure_waits"] += 1
+        self._drained.clear()
+        self._schedule_flush()
+        try:
+            await asyncio.wait_for(self._drained.wait(), timeout=self.backpressure_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Session event buffer above high-water mark ({len(self._buffer)} events) "
+                f"after {self.backpressure_timeout}s"
+            )
 
+    async def _flush_buffer(self) -> None:
+        """Flush buffered events to the database in bulk batches."""
+        async with self._flush_lock:
+            healthy = True
+            while self._buffer:
+                batch = self._buffer[: self.MAX_BATCH_SIZE]
+                del self._buffer[: len(batch)]
+                if len(self._buffer) < self.high_water_mark:
+                    self._drained.set()
+
+                unwritten = await self._write_batch(batch)
+                if unwritten:
+                    # Database unavailable: keep the rest off the buffer too
+                    rest, self._buffer = self._buffer, []
+                    await self._spill(unwritten + rest)
+                    healthy = False
+                    break
+
+            session_event_buffer_depth.set(len(self._buffer))
+            self._drained.set()
+
+            if healthy:
+                await self._replay_spilled()
+
+    async def _write_batch(self, rows: List[EventRow], outcome: str = "written") -> List[EventRow]:
+        """
+        Write rows, isolating any the database rejects.
+
+        COPY is all-or-nothing, so a batch refused for its data (a row whose
+        conversation or user was deleted, say) is bisected until the bad rows
+        are found; those go to the dead-letter directory and the rest are
+        written.
+
+        Returns:
+            Rows not written because the database is unavailable (empty on success)
+        """
+        start = time.perf_counter()
         try:
-            # Get a database session
-            db_gen = get_db()
-            db = next(db_gen)
-            try:
-                for event in events:
-                    db.add(event)
-                db.commit()
-                logger.debug(f"Flushed {len(events)} events to database")
-            finally:
-                try:
-                    next(db_gen)
-                except StopIteration:
-                    pass
+            await self._writer.write(rows)
         except Exception as e:
-            logger.error(f"Error flushing events to database: {e}")
-            # Re-add events to buffer for retry
-            async with self._lock:
-                for event in events:
-                    self._buffer.appendleft(event)
+            if len(rows) > 1 and _is_row_error(e):
+                middle = len(rows) // 2
+                unwritten = await self._write_batch(rows[:middle], outcome)
+                if unwritten:
+                    return unwritten + rows[middle:]
+                return await self._write_batch(rows[middle:], outcome)
+            if _is_row_error(e):
+                await self._dead_letter(rows, e)
+                return []
+            self._stats["flush_errors"] += 1
+            logger.error(f"Error flushing {len(rows)} events to database: {e}")
+            return rows
+
+        elapsed = time.perf_counter() - start
+        self._flush_latencies_ms.append(elapsed * 1000)
+        self._recent_writes.append((time.monotonic(), len(rows)))
+        self._stats["events_written"] += len(rows)
+        self._stats["batches_written"] += 1
+        self._stats["write_seconds"] += elapsed
+        session_event_flush_seconds.observe(elapsed)
+        session_events_persisted_total.labels(outcome=outcome).inc(len(rows))
+        logger.debug(f"Flushed {len(rows)} events to database in {elapsed * 1000:.1f}ms")
+        return []
 
     async def _periodic_flush(self) -> None:
         """Background task to periodically flush events."""
         while self._running:
-            await asyncio.sleep(self.flush_interval)
-            await self._flush_buffer()
+            try:
+                await asyncio.sleep(self.flush_interval)
+                await self._flush_buffer()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Event flush loop error: {e}")
+
+    # =========================================================================
+    # Spill to disk
+    # =========================================================================
+
+    def _hold_overflow(self, row: EventRow) -> None:
+        """Queue an event for the next overflow spill batch, bounding its wait"""
+        self._overflow.append(row)
+        if self._overflow_task is None or self._overflow_task.done():
+            self._overflow_task = asyncio.create_task(self._spill_overflow_later())
+
+    async def _spill_overflow_later(self) -> None:
+        await asyncio.sleep(self.OVERFLOW_SPILL_SECONDS)
+        await self._spill_overflow()
+
+    async def _spill_overflow(self) -> None:
+        """Spill held overflow events as one file"""
+        rows, self._overflow = self._overflow, []
+        if rows:
+            await self._spill(rows)
+
+    async def _spill(self, rows: List[EventRow]) -> None:
+        """Write rows to a new spill file for later replay"""
+        self._spill_seq += 1
+        name = f"spill-{time.time_ns()}-{self._spill_seq:06d}.jsonl"
+        try:
+            await asyncio.to_thread(self._write_spill_file, name, rows)
+        except OSError as e:
+            self._stats["events_dropped"] += len(rows)
+            session_events_persisted_total.labels(outcome="dropped").inc(len(rows))
+            logger.error(f"Dropped {len(rows)} session events: spill to {self.spill_dir} failed: {e}")
+            return
+
+        self._stats["events_spilled"] += len(rows)
+        session_events_persisted_total.labels(outcome="spilled").inc(len(rows))
+        logger.warning(f"Spilled {len(rows)} session events to {name}")
+
+    async def _dead_letter(self, rows: List[EventRow], error: Exception) -> None:
+        """Set aside rows the database refused, so they stop blocking the rest"""
+        self._spill_seq += 1
+        name = f"rejected-{time.time_ns()}-{self._spill_seq:06d}.jsonl"
+        try:
+            await asyncio.to_thread(self._write_spill_file, name, rows, self.dead_letter_dir)
+        except OSError as e:
+            self._stats["events_dropped"] += len(rows)
+            session_events_persisted_total.labels(outcome="dropped").inc(len(rows))
+            logger.error(f"Dropped {len(rows)} rejected session events: write to {self.dead_letter_dir} failed: {e}")
+            return
+
+        self._stats["events_rejected"] += len(rows)
+        session_events_persisted_total.labels(outcome="rejected").inc(len(rows))
+        logger.warning(f"Database rejected {len(rows)} session events, moved to {name}: {error}")
+
+    def _write_spill_file(self, name: str, rows: List[EventRow], directory: Optional[str] = None) -> None:
+        directory = directory or self.spill_dir
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = os.path.join(directory, name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(_row_to_json(row) + "\n" for row in rows)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(directory, name))
+
+    def _spill_files(self, directory: Optional[str] = None) -> List[str]:
+        try:
+            names = os.listdir(directory or self.spill_dir)
+        except FileNotFoundError:
+            return []
+        return sorted(name for name in names if name.startswith("spill-") and name.endswith(".jsonl"))
+
+    async def _replay_spilled(self) -> None:
+        """Write spilled batches back to the database, oldest first"""
+        for name in self._spill_files()[: self.REPLAY_FILES_PER_FLUSH]:
+            path = os.path.join(self.spill_dir, name)
+            try:
+                rows = await asyncio.to_thread(self._read_spill_file, path)
+            except (OSError, ValueError, IndexError) as e:
+                logger.error(f"Unreadable spill file {name} moved to dead-letter: {e}")
+                os.makedirs(self.dead_letter_dir, exist_ok=True)
+                os.replace(path, os.path.join(self.dead_letter_dir, name))
+                continue
+
+            rejected_before = self._stats["events_rejected"]
+            unwritten = await self._write_batch(rows, outcome="replayed")
+            replayed = len(rows) - len(unwritten) - (self._stats["events_rejected"] - rejected_before)
+            if unwritten:
+                # Database went away mid-file: keep only what is still unwritten
+                if len(unwritten) < len(rows):
+                    await asyncio.to_thread(self._write_spill_file, name, unwritten)
+                self._stats["events_replayed"] += replayed
+                return
+            os.remove(path)
+            self._stats["events_replayed"] += replayed
+            logger.info(f"Replayed {replayed} spilled session events from {name}")
+
+    def _adopt_orphaned_spills(self) -> None:
+        """
+        Take over spill files left by exited workers.
+
+        Each process replays only its own directory; files from a process
+        that is gone would otherwise never be written.
+        """
+        try:
+            entries = os.listdir(self.DEFAULT_SPILL_ROOT)
+        except FileNotFoundError:
+            return
+
+        own = str(os.getpid())
+        # Files written before spill directories were per-process sit in the root
+        sources = [self.DEFAULT_SPILL_ROOT]
+        for entry in entries:
+            if entry.isdigit() and entry != own and not _pid_alive(int(entry)):
+                sources.append(os.path.join(self.DEFAULT_SPILL_ROOT, entry))
+
+        adopted = 0
+        for source in sources:
+            for subdir, names in (
+                ("", self._spill_files(source)),
+                ("dead-letter", self._dead_letter_files(os.path.join(source, "dead-letter"))),
+            ):
+                if not names:
+                    continue
+                target = os.path.join(self.spill_dir, subdir)
+                os.makedirs(target, exist_ok=True)
+                for name in names:
+                    try:
+                        os.replace(os.path.join(source, subdir, name), os.path.join(target, name))
+                    except FileNotFoundError:
+                        continue  # another worker adopted it first
+                    adopted += 1
+            if source != self.DEFAULT_SPILL_ROOT:
+                for directory in (os.path.join(source, "dead-letter"), source):
+                    try:
+                        os.rmdir(directory)
+                    except OSError:
+                        pass
+        if adopted:
+            logger.info(f"Adopted {adopted} session event spill files from exited workers")
+
+    @staticmethod
+    def _dead_letter_files(directory: str) -> List[str]:
+        try:
+            return [name for name in os.listdir(directory) if name.endswith(".jsonl")]
+        except FileNotFoundError:
+            return []
+
+    @staticmethod
+    def _read_spill_file(path: str) -> List[EventRow]:
+        with open(path, encoding="utf-8") as f:
+            return [_row_from_json(line) for line in f if line.strip()]
+
+    # =========================================================================
+    # Stats
+    # =========================================================================
+
+    def get_stats(self, rate_window_seconds: float = 60.0) -> Dict[str, Any]:
+        """Throughput, flush latency and buffer / spill counters"""
+        now = time.monotonic()
+        while self._recent_writes and self._recent_writes[0][0] < now - rate_window_seconds:
+            self._recent_writes.popleft()
+        window = min(rate_window_seconds, max(now - self._started_at, 1e-6))
+
+        latencies = sorted(self._flush_latencies_ms)
+        written, write_seconds = self._stats["events_written"], self._stats["write_seconds"]
+
+        return {
+            **self._stats,
+            "buffered": len(self._buffer),
+            "overflow_pending": len(self._overflow),
+            "high_water_mark": self.high_water_mark,
+            "spill_files": len(self._spill_files()),
+            "events_per_sec": sum(count for _, count in self._recent_writes) / window,
+            "write_events_per_sec": written / write_seconds if write_seconds else 0.0,
+            "flush_latency_ms_avg": sum(latencies) / len(latencies) if latencies else 0.0,
+            "flush_latency_ms_p95": (
+                latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)] if latencies else 0.0
+            ),
+        }
 
     # =========================================================================
     # Query Methods
@@ -9,6 +9,8 @@ Features:
 - PHI-aware routing for streamed data
 - Integration with Thinker context
 - Reconnection and error handling
+- Incremental polling: one poller per patient shared by all of its
+  subscriptions, driven by server meta.lastUpdated watermarks
 
 Reference: docs/voice/phase3-implementation-plan.md
 
@@ -150,6 +152,66 @@ class StreamingEvent:
     raw_payload: Dict[str, Any] = field(default_factory=dict)
 
 
+@dataclass
+class PatientSyncState:
+    """Incremental polling state for one patient, shared by its subscriptions."""
+
+    patient_id: str
+    # resource type -> newest meta.lastUpdated seen (server clock)
+    watermarks: Dict[str, str] = field(default_factory=dict)
+    # resource type -> {resource id: version} of resources at the watermark,
+    # which an inclusive (ge) query returns again
+    boundary: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    polls: int = 0
+    not_modified: int = 0
+    changes: int = 0
+    errors: int = 0
+    last_poll_at: Optional[datetime] = None
+    last_success_at: Optional[datetime] = None
+    lag_seconds: Optional[float] = None  # Server write -> local emit delay of the newest change
+
+    @property
+    def staleness_seconds(self) -> Optional[float]:
+        if not self.last_success_at:
+            return None
+        return (datetime.now(timezone.utc) - self.last_success_at).total_seconds()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "patientId": self.patient_id,
+            "watermarks": dict(self.watermarks),
+            "polls": self.polls,
+            "notModified": self.not_modified,
+            "changes": self.changes,
+            "errors": self.errors,
+            "lastPollAt": self.last_poll_at.isoformat() if self.last_poll_at else None,
+            "stalenessSeconds": self.staleness_seconds,
+            "lagSeconds": self.lag_seconds,
+        }
+
+
+_POLLING_CATEGORIES = {
+    FHIRResourceType.VITAL_SIGNS: "vital-signs",
+    FHIRResourceType.LAB_RESULT: "laboratory",
+}
+
+
+def _resource_version(resource: Dict[str, Any]) -> str:
+    meta = resource.get("meta") or {}
+    return f"{meta.get('versionId', '')}|{meta.get('lastUpdated', '')}"
+
+
+def _parse_instant(value: str) -> datetime:
+    """Parse a FHIR instant; naive values are taken as UTC."""
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return datetime.min.replace(tzinfo=timezone.utc)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
 # ==============================================================================
 # Configuration
 # ==============================================================================
@@ -221,6 +283,8 @@ class FHIRSubscriptionService:
         self._initialized = False
         self._ws_connections: Dict[str, Any] = {}
         self._lock = asyncio.Lock()
+        self._pollers: Dict[str, asyncio.Task] = {}  # patient_id -> poller task
+        self._sync_states: Dict[str, PatientSyncState] = {}
 
     async def initialize(self) -> bool:
         """Initialize the FHIR service."""
@@ -387,6 +451,13 @@ class FHIRSubscriptionService:
             patient_subs = self._patient_subscriptions.get(subscription.patient_id, set())
             patient_subs.discard(subscription_id)
 
+            # Stop the shared poller once its last subscription is gone
+            if not self._active_subscriptions(subscription.patient_id):
+                poller = self._pollers.pop(subscription.patient_id, None)
+                self._sync_states.pop(subscription.patient_id, None)
+                if poller and poller is not asyncio.current_task():
+                    poller.cancel()
+
             # Close WebSocket if exists
             ws = self._ws_connections.pop(subscription_id, None)
             if ws:
@@ -542,77 +613,85 @@ class FHIRSubscriptionService:
 
         entries = bundle.get("entry", [])
         for entry in entries:
-            resource = entry.get("resource", {})
-            if resource.get("resourceType") != "Observation":
-                continue
-
-            try:
-                # Extract code
-                code_obj = resource.get("code", {})
-                coding = code_obj.get("coding", [{}])[0]
-
-                # Extract value
-                value = None
-                value_quantity = None
-                value_unit = None
-
-                if "valueQuantity" in resource:
-                    vq = resource["valueQuantity"]
-                    value_quantity = vq.get("value")
-                    value_unit = vq.get("unit")
-                elif "valueString" in resource:
-                    value = resource["valueString"]
-                elif "valueCodeableConcept" in resource:
-                    cc = resource["valueCodeableConcept"]
-                    value = cc.get("text") or cc.get("coding", [{}])[0].get("display")
-
-                # Extract interpretation
-                interpretation = None
-                if "interpretation" in resource:
-                    interp = resource["interpretation"]
-                    if isinstance(interp, list) and interp:
-                        interpretation = interp[0].get("text") or interp[0].get("coding", [{}])[0].get("display")
-
-                # Extract reference range
-                reference_range = None
-                if "referenceRange" in resource:
-                    rr = resource["referenceRange"]
-                    if isinstance(rr, list) and rr:
-                        low = rr[0].get("low", {}).get("value")
-                        high = rr[0].get("high", {}).get("value")
-                        if low is not None and high is not None:
-                            reference_range = f"{low}-{high}"
-
-                # Parse effective datetime
-                effective_datetime = None
-                if "effectiveDateTime" in resource:
-                    from dateutil.parser import parse
-
-                    effective_datetime = parse(resource["effectiveDateTime"])
-
-                observation = FHIRObservation(
-                    resource_id=resource.get("id", ""),
-                    resource_type=FHIRResourceType.OBSERVATION,
-                    patient_id=patient_id,
-                    code=coding.get("code", ""),
-                    code_display=coding.get("display", code_obj.get("text", "")),
-                    value=value,
-                    value_quantity=value_quantity,
-                    value_unit=value_unit,
-                    effective_datetime=effective_datetime,
-                    status=resource.get("status", "final"),
-                    interpretation=interpretation,
-                    reference_range=reference_range,
-                    raw_resource=resource,
-                )
+            observation = self._parse_observation(entry.get("resource", {}), patient_id)
+            if observation:
                 observations.append(observation)
 
-            except Exception as e:
-                logger.warning(f"Failed to parse observation: {e}")
-                continue
-
         return observations
 
+    def _parse_observation(
+        self,
+        resource: Dict[str, Any],
+        patient_id: str,
+    ) -> Optional[FHIRObservation]:
+        """Parse a FHIR Observation resource; None if it is not one or is malformed."""
+        if resource.get("resourceType") != "Observation":
+            return None
+
+        try:
+            # Extract code
+            code_obj = resource.get("code", {})
+            coding = code_obj.get("coding", [{}])[0]
+
+            # Extract value
+            value = None
+            value_quantity = None
+            value_unit = None
+
+            if "valueQuantity" in resource:
+                vq = resource["valueQuantity"]
+                value_quantity = vq.get("value")
+                value_unit = vq.get("unit")
+            elif "valueString" in resource:
+                value = resource["valueString"]
+            elif "valueCodeableConcept" in resource:
+                cc = resource["valueCodeableConcept"]
+                value = cc.get("text") or cc.get("coding", [{}])[0].get("display")
+
+            # Extract interpretation
+            interpretation = None
+            if "interpretation" in resource:
+                interp = resource["interpretation"]
+                if isinstance(interp, list) and interp:
+                    interpretation = interp[0].get("text") or interp[0].get("coding", [{}])[0].get("display")
+
+            # Extract reference range
+            reference_range = None
+            if "referenceRange" in resource:
+                rr = resource["referenceRange"]
+                if isinstance(rr, list) and rr:
+                    low = rr[0].get("low", {}).get("value")
+                    high = rr[0].get("high", {}).get("value")
+                    if low is not None and high is not None:
+                        reference_range = f"{low}-{high}"
+
+            # Parse effective datetime
+            effective_datetime = None
+            if "effectiveDateTime" in resource:
+                from dateutil.parser import parse
+
+                effective_datetime = parse(resource["effectiveDateTime"])
+
+            return FHIRObservation(
+                resource_id=resource.get("id", ""),
+                resource_type=FHIRResourceType.OBSERVATION,
+                patient_id=patient_id,
+                code=coding.get("code", ""),
+                code_display=coding.get("display", code_obj.get("text", "")),
+                value=value,
+                value_quantity=value_quantity,
+                value_unit=value_unit,
+                effective_datetime=effective_datetime,
+                status=resource.get("status", "final"),
+                interpretation=interpretation,
+                reference_range=reference_range,
+                raw_resource=resource,
+            )
+
+        except Exception as e:
+            logger.warning(f"Failed to parse observation: {e}")
+            return None
+
     async def _start_websocket_subscription(self, subscription: FHIRSubscription):
         """
         Start WebSocket-based subscription with reconnection support.
@@ -778,98 +857,231 @@ class FHIRSubscriptionService:
 
     async def _start_polling_subscription(self, subscription: FHIRSubscription):
         """
-        Start polling-based subscription with change detection.
+        Start polling-based subscription with incremental change detection.
+
+        All subscriptions for a patient share one poller: if one is already
+        running, this subscription joins it and returns immediately.
+        """
+        patient_id = subscription.patient_id
+        poller = self._pollers.get(patient_id)
+        current = asyncio.current_task()
+        if poller and not poller.done() and poller is not current:
+            logger.info(f"Polling subscription {subscription.subscription_id} joined existing patient poller")
+            return
+
+        self._pollers[patient_id] = current
+        try:
+            await self._poll_patient(patient_id)
+        finally:
+            if self._pollers.get(patient_id) is current:
+                del self._pollers[patient_id]
+                self._sync_states.pop(patient_id, None)
+
+    async def _poll_patient(self, patient_id: str):
+        """
+        Poll a patient's observations until it has no active subscriptions.
 
         Implements efficient polling with:
-        - Last-Modified tracking to detect changes
-        - ETag support for conditional requests
-        - Rate limiting with adaptive intervals
+        - meta.lastUpdated watermarks on the server clock, queried inclusively
+          (ge) in ascending order so no change is skipped
+        - Resources at the watermark remembered by version, so only real
+          changes are parsed and emitted (including amended results)
+        - ETag / Last-Modified conditional requests while nothing changes
         """
-        logger.info(f"Polling subscription started: {subscription.subscription_id}")
+        state = self._sync_states.setdefault(patient_id, PatientSyncState(patient_id=patient_id))
+        logger.info(f"Polling started for patient {patient_id}")
 
-        last_modified: Optional[str] = None
-        etag: Optional[str] = None
-        seen_ids: Set[str] = set()
-        last_poll_time: Optional[datetime] = None
+        while True:
+            subscriptions = self._active_subscriptions(patient_id)
+            if not subscriptions:
+                break
 
-        while subscription.status == SubscriptionStatus.ACTIVE:
             try:
                 import httpx
 
                 async with httpx.AsyncClient() as client:
-                    # Build query parameters
-                    params = {
-                        "patient": subscription.patient_id,
-                        "_sort": "-_lastUpdated",
-                        "_count": self.config.max_polling_results,
-                    }
+                    await self._poll_observations(client, state, subscriptions)
 
-                    # Filter by resource types
-                    categories = []
-                    for rt in subscription.resource_types:
-                        if rt == FHIRResourceType.VITAL_SIGNS:
-                            categories.append("vital-signs")
-                        elif rt == FHIRResourceType.LAB_RESULT:
-                            categories.append("laboratory")
-
-                    if categories:
-                        params["category"] = ",".join(categories)
-
-                    # Add time filter if we have a last poll time
-                    if last_poll_time:
-                        params["_lastUpdated"] = f"gt{last_poll_time.isoformat()}"
-
-                    # Build headers with conditional request support
-                    headers = self._get_auth_headers()
-                    if last_modified:
-                        headers["If-Modified-Since"] = last_modified
-                    if etag:
-                        headers["If-None-Match"] = etag
-
-                    response = await client.get(
-                        f"{self.config.fhir_server_url}/Observation",
-                        params=params,
-                        headers=headers,
-                        timeout=30.0,
-                    )
-
-                    # Handle conditional response
-                    if response.status_code == 304:
-                        # Not modified - no new data
-                        logger.debug(f"No changes detected for {subscription.subscription_id}")
-                    elif response.status_code == 200:
-                        # Update cache headers
-                        last_modified = response.headers.get("Last-Modified")
-                        etag = response.headers.get("ETag")
-
-                        # Parse and emit new observations
-                        bundle = response.json()
-                        observations = self._parse_observation_bundle(bundle, subscription.patient_id)
-
-                        for obs in observations:
-                            # Check if we've seen this observation
-                            if obs.resource_id not in seen_ids:
-                                seen_ids.add(obs.resource_id)
-                                self._emit_event(subscription, obs)
-
-                        # Limit seen_ids size
-                        if len(seen_ids) > 1000:
-                            seen_ids = set(list(seen_ids)[-500:])
-
-                    elif response.status_code >= 400:
-                        logger.error(
-                            f"Polling request failed: {response.status_code}",
-                            extra={"response": response.text[:500]},
-                        )
-
-                last_poll_time = datetime.now(timezone.utc)
                 await asyncio.sleep(self.config.polling_interval_seconds)
 
             except Exception as e:
                 logger.error(f"Polling error: {e}")
-                subscription.error_message = str(e)
+                state.errors += 1
+                for subscription in subscriptions:
+                    subscription.error_message = str(e)
                 await asyncio.sleep(self.config.retry_delay_seconds)
 
+        logger.info(f"Polling stopped for patient {patient_id}")
+
+    def _active_subscriptions(self, patient_id: str) -> List[FHIRSubscription]:
+        subscriptions = (self._subscriptions.get(sid) for sid in self._patient_subscriptions.get(patient_id, ()))
+        return [sub for sub in subscriptions if sub and sub.status == SubscriptionStatus.ACTIVE]
+
+    def _polling_categories(self, subscriptions: List[FHIRSubscription]) -> List[str]:
+        """Observation categories to poll; empty means all observations."""
+        categories: Set[str] = set()
+        for subscription in subscriptions:
+            wanted = {_POLLING_CATEGORIES[rt] for rt in subscription.resource_types if rt in _POLLING_CATEGORIES}
+            if not wanted:
+                return []
+            categories |= wanted
+        return sorted(categories)
+
+    async def _poll_observations(
+        self,
+        client: Any,
+        state: PatientSyncState,
+        subscriptions: List[FHIRSubscription],
+    ) -> None:
+        """Run one incremental poll and emit changed observations."""
+        categories = self._polling_categories(subscriptions)
+        # Watermarks are per query, so widening the categories starts a fresh snapshot
+        key = f"Observation?category={','.join(categories)}"
+        watermark = state.watermarks.get(key)
+
+        params: Dict[str, Any] = {
+            "patient": state.patient_id,
+            "_count": self.config.max_polling_results,
+        }
+        if categories:
+            params["category"] = ",".join(categories)
+        if watermark:
+            params["_lastUpdated"] = f"ge{watermark}"
+            params["_sort"] = "_lastUpdated"
+        else:
+            # Initial snapshot: most recent results only
+            params["_sort"] = "-_lastUpdated"
+
+        headers = self._get_auth_headers()
+        if state.last_modified:
+            headers["If-Modified-Since"] = state.last_modified
+        if state.etag:
+            headers["If-None-Match"] = state.etag
+
+        poll_started = datetime.now(timezone.utc)
+        state.polls += 1
+        state.last_poll_at = poll_started
+
+        response = await client.get(
+            f"{self.config.fhir_server_url}/Observation",
+            params=params,
+            headers=headers,
+            timeout=30.0,
+        )
+
+        if response.status_code == 304:
+            state.not_modified += 1
+            state.last_success_at = poll_started
+            return
+        if response.status_code >= 400:
+            state.errors += 1
+            logger.error(
+                f"Polling request failed: {response.status_code}",
+                extra={"response": response.text[:500]},
+            )
+            return
+
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        bundle = response.json()
+        resources = self._bundle_observations(bundle)
+
+        # Catching up: follow pages so a burst larger than _count is not split across polls
+        next_url = self._next_link(bundle) if watermark else None
+        while next_url:
+            response = await client.get(next_url, headers=self._get_auth_headers(), timeout=30.0)
+            if response.status_code != 200:
+                break
+            page = response.json()
+            resources.extend(self._bundle_observations(page))
+            next_url = self._next_link(page)
+
+        boundary = state.boundary.setdefault(key, {})
+        changed = [r for r in resources if boundary.get(r.get("id", "")) != _resource_version(r)]
+
+        self._advance_watermark(state, key, resources, poll_started)
+        if changed:
+            # Conditional headers only hold while the query (watermark) is unchanged
+            state.etag = state.last_modified = None
+        else:
+            state.etag, state.last_modified = etag, last_modified
+
+        for resource in changed:
+            observation = self._parse_observation(resource, state.patient_id)
+            if observation:
+                self._emit_patient_event(subscriptions, observation)
+
+        stamps = [(r.get("meta") or {}).get("lastUpdated") for r in changed]
+        stamps = [ts for ts in stamps if ts]
+        if watermark and stamps:
+            newest = max(_parse_instant(ts) for ts in stamps)
+            state.lag_seconds = (datetime.now(timezone.utc) - newest).total_seconds()
+
+        state.changes += len(changed)
+        state.last_success_at = poll_started
+
+    def _advance_watermark(
+        self,
+        state: PatientSyncState,
+        key: str,
+        resources: List[Dict[str, Any]],
+        poll_started: datetime,
+    ) -> None:
+        """Move the watermark to the newest lastUpdated and remember its resources."""
+        stamps = {}
+        for resource in resources:
+            stamp = (resource.get("meta") or {}).get("lastUpdated")
+            if stamp:
+                stamps[stamp] = _parse_instant(stamp)
+
+        watermark = state.watermarks.get(key)
+        boundary = state.boundary.setdefault(key, {})
+
+        if stamps:
+            newest = max(stamps, key=stamps.get)
+            if newest != watermark:
+                boundary.clear()
+            state.watermarks[key] = newest
+        elif not watermark:
+            # Server omits meta.lastUpdated: fall back to the local poll time
+            newest = poll_started.isoformat()
+            state.watermarks[key] = newest
+        else:
+            newest = watermark
+
+        for resource in resources:
+            stamp = (resource.get("meta") or {}).get("lastUpdated")
+            if stamp in (None, newest):
+                boundary[resource.get("id", "")] = _resource_version(resource)
+
+        # Resources without lastUpdated never leave the boundary on their own
+        if len(boundary) > 1000:
+            for rid in list(boundary)[:500]:
+                del boundary[rid]
+
+    def _bundle_observations(self, bundle: Dict[str, Any]) -> List[Dict[str, Any]]:
+        resources = (entry.get("resource") or {} for entry in bundle.get("entry", []))
+        return [r for r in resources if r.get("resourceType") == "Observation"]
+
+    def _next_link(self, bundle: Dict[str, Any]) -> Optional[str]:
+        for link in bundle.get("link", []):
+            if link.get("relation") == "next":
+                return link.get("url")
+        return None
+
+    def get_sync_stats(self) -> Dict[str, Any]:
+        """Polling sync metrics: pollers, per-patient watermarks, staleness and lag."""
+        states = list(self._sync_states.values())
+        staleness = [s.staleness_seconds for s in states if s.staleness_seconds is not None]
+        lags = [s.lag_seconds for s in states if s.lag_seconds is not None]
+        return {
+            "pollers": len(self._pollers),
+            "polledSubscriptions": sum(len(self._active_subscriptions(s.patient_id)) for s in states),
+            "maxStalenessSeconds": max(staleness, default=None),
+            "maxLagSeconds": max(lags, default=None),
+            "patients": {s.patient_id: s.to_dict() for s in states},
+        }
+
     def _register_callback(self, patient_id: str, callback: Callable):
         """Register callback for patient events."""
         if patient_id not in self._event_callbacks:
@@ -884,11 +1096,15 @@ class FHIRSubscriptionService:
 
     def _emit_event(self, subscription: FHIRSubscription, observation: FHIRObservation):
         """Emit event to registered callbacks."""
+        self._emit_patient_event([subscription], observation)
+
+    def _emit_patient_event(self, subscriptions: List[FHIRSubscription], observation: FHIRObservation):
+        """Emit one event for a patient's subscriptions; callbacks run once."""
         import uuid
 
         event = StreamingEvent(
             event_id=f"evt-{uuid.uuid4().hex[:8]}",
-            subscription_id=subscription.subscription_id,
+            subscription_id=subscriptions[0].subscription_id,
             resource_type=observation.resource_type,
             resource_id=observation.resource_id,
             action="update",
@@ -896,10 +1112,11 @@ class FHIRSubscriptionService:
             observation=observation,
         )
 
-        subscription.event_count += 1
-        subscription.last_event_at = event.timestamp
+        for subscription in subscriptions:
+            subscription.event_count += 1
+            subscription.last_event_at = event.timestamp
 
-        callbacks = self._event_callbacks.get(subscription.patient_id, [])
+        callbacks = self._event_callbacks.get(subscriptions[0].patient_id, [])
         for callback in callbacks:
             try:
                 callback(event)
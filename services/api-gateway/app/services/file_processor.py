@@ -1,21 +1,160 @@
 """
 File processing service for OCR, text extraction, and document parsing
+
+Parsing (pypdf, OCR, python-docx) is CPU-bound, so it runs in a process
+pool rather than on the event loop. PDFs are split into page ranges that
+are extracted in parallel and streamed back in page order (``iter_pages``),
+so chunking can start before the whole file is parsed. File size, page
+count and extracted text are capped to bound memory on huge uploads.
 """
 
+import asyncio
 import mimetypes
+import multiprocessing
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
 from io import BytesIO
-from typing import Optional, Tuple
+from typing import AsyncIterator, Deque, List, Optional, Tuple, Union
 
+from app.core.config import settings
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+PDF_MIME_TYPE = "application/pdf"
+IMAGE_MIME_TYPES = ["image/png", "image/jpeg", "image/jpg", "image/tiff", "image/bmp"]
+DOCX_MIME_TYPES = [
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "application/msword",
+]
+
+# Workers start from a clean interpreter: forking the API or ARQ process, with
+# its event loop, threads and connection pools, can copy locks held by other
+# threads into the child and deadlock it
+WORKER_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+@dataclass
+class ExtractedPage:
+    """Text of one page (or of a whole non-paginated document)"""
+
+    page_number: int
+    text: str
+
+
+def _pdf_reader(source: Union[bytes, str]):
+    """Open a PDF from bytes or a file path (pypdf, falling back to PyPDF2)"""
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        from PyPDF2 import PdfReader
+
+    return PdfReader(BytesIO(source) if isinstance(source, bytes) else source)
+
+
+def _read_pdf_info(source: Union[bytes, str]) -> Tuple[int, dict]:
+    """Page count and document info (runs in a worker)"""
+    reader = _pdf_reader(source)
+    metadata = {"page_count": len(reader.pages), "format": "pdf"}
+    if reader.metadata:
+        metadata["title"] = reader.metadata.get("/Title", "")
+        metadata["author"] = reader.metadata.get("/Author", "")
+        metadata["subject"] = reader.metadata.get("/Subject", "")
+    return len(reader.pages), metadata
+
+
+def _extract_pdf_pages(source: Union[bytes, str], start: int, end: int) -> List[Tuple[int, str]]:
+    """Extract text from pages [start, end) as (1-based page number, text) (runs in a worker)"""
+    reader = _pdf_reader(source)
+    pages = []
+    for index in range(start, end):
+        try:
+            pages.append((index + 1, reader.pages[index].extract_text() or ""))
+        except Exception as e:
+            logger.warning(f"Error extracting page {index + 1}: {e}")
+            pages.append((index + 1, ""))
+    return pages
+
+
+def _extract_image_text(file_content: bytes, max_pixels: int) -> Tuple[str, dict]:
+    """OCR an image (runs in a worker)"""
+    import pytesseract
+    from PIL import Image
+
+    Image.MAX_IMAGE_PIXELS = max_pixels  # Decompression-bomb guard for huge scans
+    image = Image.open(BytesIO(file_content))
+    metadata = {
+        "format": "image",
+        "width": image.width,
+        "height": image.height,
+        "mode": image.mode,
+    }
+    text = pytesseract.image_to_string(image)
+    metadata["ocr_performed"] = True
+    return text, metadata
+
+
+def _extract_docx_text(file_content: bytes) -> Tuple[str, dict]:
+    """Extract paragraphs and tables from a DOCX file (runs in a worker)"""
+    from docx import Document
+
+    doc = Document(BytesIO(file_content))
+
+    metadata = {
+        "format": "docx",
+        "paragraph_count": len(doc.paragraphs),
+    }
+
+    # Extract document properties
+    if doc.core_properties.title:
+        metadata["title"] = doc.core_properties.title
+    if doc.core_properties.author:
+        metadata["author"] = doc.core_properties.author
+
+    # Extract text from paragraphs
+    text_parts = [para.text for para in doc.paragraphs if para.text.strip()]
+
+    # Extract text from tables
+    for table in doc.tables:
+        for row in table.rows:
+            text_parts.append(" | ".join(cell.text for cell in row.cells))
+
+    return "\n\n".join(text_parts), metadata
+
 
 class FileProcessor:
     """Service for processing uploaded files and extracting text content"""
 
-    def __init__(self):
-        """Initialize file processor with optional OCR support"""
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        pages_per_task: Optional[int] = None,
+        max_file_mb: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        max_text_chars: Optional[int] = None,
+    ):
+        """
+        Initialize file processor with optional OCR support
+
+        Args:
+            workers: Extraction processes (0 runs extraction in a thread instead)
+            pages_per_task: PDF pages extracted per worker task
+            max_file_mb: Files larger than this are rejected
+            max_pages: PDF pages beyond this are not extracted
+            max_text_chars: Extraction stops once this much text is collected
+
+        Unset limits come from the FILE_PROCESSOR_* settings.
+        """
+        self.workers = settings.FILE_PROCESSOR_WORKERS if workers is None else workers
+        self.pages_per_task = max(1, pages_per_task or settings.FILE_PROCESSOR_PAGES_PER_TASK)
+        self.max_file_bytes = (max_file_mb or settings.FILE_PROCESSOR_MAX_FILE_MB) * 1024 * 1024
+        self.max_pages = max_pages or settings.FILE_PROCESSOR_MAX_PAGES
+        self.max_text_chars = max_text_chars or settings.FILE_PROCESSOR_MAX_TEXT_CHARS
+        self._executor: Optional[Executor] = None
+
         self.ocr_available = False
         try:
             import pytesseract  # noqa: F401
@@ -48,19 +187,18 @@ class FileProcessor:
             "size_bytes": len(file_content),
         }
 
+        if len(file_content) > self.max_file_bytes:
+            logger.warning(f"File too large to extract: {filename} ({len(file_content)} bytes)")
+            metadata["error"] = f"File exceeds extraction limit of {self.max_file_bytes // (1024 * 1024)}MB"
+            return "", metadata
+
         try:
-            if mime_type == "application/pdf":
+            if mime_type == PDF_MIME_TYPE:
                 text, pdf_metadata = await self._extract_from_pdf(file_content)
                 metadata.update(pdf_metadata)
                 return text, metadata
 
-            elif mime_type in [
-                "image/png",
-                "image/jpeg",
-                "image/jpg",
-                "image/tiff",
-                "image/bmp",
-            ]:
+            elif mime_type in IMAGE_MIME_TYPES:
                 text, img_metadata = await self._extract_from_image(file_content)
                 metadata.update(img_metadata)
                 return text, metadata
@@ -74,10 +212,7 @@ class FileProcessor:
                 metadata["format"] = "markdown"
                 return text, metadata
 
-            elif mime_type in [
-                "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                "application/msword",
-            ]:
+            elif mime_type in DOCX_MIME_TYPES:
                 text, doc_metadata = await self._extract_from_docx(file_content)
                 metadata.update(doc_metadata)
                 return text, metadata
@@ -91,38 +226,121 @@ class FileProcessor:
             metadata["error"] = str(e)
             return "", metadata
 
+    async def iter_pages(
+        self, file_content: bytes, filename: str, mime_type: Optional[str] = None
+    ) -> AsyncIterator[ExtractedPage]:
+        """
+        Stream extracted text page by page.
+
+        PDF pages are yielded in order as soon as their page range has been
+        extracted; other formats yield a single page. Extraction errors are
+        raised to the caller.
+
+        Args:
+            file_content: File content as bytes
+            filename: Original filename
+            mime_type: MIME type of file
+        """
+        if not mime_type:
+            mime_type, _ = mimetypes.guess_type(filename)
+
+        if len(file_content) > self.max_file_bytes:
+            raise ValueError(f"File exceeds extraction limit of {self.max_file_bytes // (1024 * 1024)}MB")
+
+        if mime_type == PDF_MIME_TYPE:
+            async for page in self._iter_pdf_pages(file_content, {}):
+                yield page
+            return
+
+        text, metadata = await self.extract_text(file_content, filename, mime_type)
+        if metadata.get("error"):
+            raise ValueError(metadata["error"])
+        yield ExtractedPage(page_number=1, text=text)
+
+    async def _iter_pdf_pages(self, file_content: bytes, metadata: dict) -> AsyncIterator[ExtractedPage]:
+        """Extract PDF page ranges in parallel, yielding pages in order and filling in metadata"""
+        source: Union[bytes, str] = file_content
+        tmp_path = None
+        if self.workers > 0:
+            # Workers read pages from a shared temp file instead of each receiving a copy of the bytes
+            fd, tmp_path = tempfile.mkstemp(suffix=".pdf")
+            with os.fdopen(fd, "wb") as f:
+                f.write(file_content)
+            source = tmp_path
+
+        try:
+            page_count, info = await self._run(_read_pdf_info, source)
+            metadata.update(info)
+            if page_count > self.max_pages:
+                logger.warning(f"PDF has {page_count} pages; extracting the first {self.max_pages}")
+                metadata["pages_truncated"] = True
+                page_count = self.max_pages
+
+            ranges = [(i, min(i + self.pages_per_task, page_count)) for i in range(0, page_count, self.pages_per_task)]
+            max_in_flight = max(1, self.workers) + 1
+            pending: Deque[asyncio.Future] = deque()
+            next_range = 0
+            text_chars = 0
+
+            try:
+                while next_range < len(ranges) or pending:
+                    while next_range < len(ranges) and len(pending) < max_in_flight:
+                        start, end = ranges[next_range]
+                        pending.append(asyncio.ensure_future(self._run(_extract_pdf_pages, source, start, end)))
+                        next_range += 1
+
+                    for page_number, text in await pending.popleft():
+                        text_chars += len(text)
+                        yield ExtractedPage(page_number=page_number, text=text)
+                        if text_chars >= self.max_text_chars:
+                            break
+
+                    if text_chars >= self.max_text_chars:
+                        logger.warning(f"Stopped PDF extraction at {self.max_text_chars} characters")
+                        metadata["text_truncated"] = True
+                        break
+            finally:
+                for future in pending:
+                    future.cancel()
+                # Let cancelled or still-running tasks settle before the temp file goes away
+                await asyncio.gather(*pending, return_exceptions=True)
+        finally:
+            if tmp_path:
+                os.unlink(tmp_path)
+
+    async def _run(self, fn, *args):
+        """Run a parsing function in the process pool (or a thread when workers=0)"""
+        if self.workers <= 0:
+            return await asyncio.to_thread(fn, *args)
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context(WORKER_START_METHOD)
+            )
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def shutdown(self) -> None:
+        """Stop the extraction worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
     async def _extract_from_pdf(self, file_content: bytes) -> Tuple[str, dict]:
         """Extract text from PDF file"""
         try:
-            from PyPDF2 import PdfReader
+            import pypdf  # noqa: F401
         except ImportError:
-            logger.error("PyPDF2 not installed. Install with: pip install PyPDF2")
-            return "", {"error": "PDF support not available"}
+            try:
+                import PyPDF2  # noqa: F401
+            except ImportError:
+                logger.error("pypdf not installed. Install with: pip install pypdf")
+                return "", {"error": "PDF support not available"}
 
+        metadata: dict = {}
         try:
-            pdf_file = BytesIO(file_content)
-            reader = PdfReader(pdf_file)
-
-            metadata = {
-                "page_count": len(reader.pages),
-                "format": "pdf",
-            }
-
-            # Extract PDF metadata
-            if reader.metadata:
-                metadata["title"] = reader.metadata.get("/Title", "")
-                metadata["author"] = reader.metadata.get("/Author", "")
-                metadata["subject"] = reader.metadata.get("/Subject", "")
-
-            # Extract text from all pages
             text_parts = []
-            for page_num, page in enumerate(reader.pages, 1):
-                try:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_parts.append(f"--- Page {page_num} ---\n{page_text}")
-                except Exception as e:
-                    logger.warning(f"Error extracting page {page_num}: {e}")
+            async for page in self._iter_pdf_pages(file_content, metadata):
+                if page.text:
+                    text_parts.append(f"--- Page {page.page_number} ---\n{page.text}")
 
             text = "\n\n".join(text_parts)
             return text, metadata
@@ -137,27 +355,14 @@ class FileProcessor:
             return "", {"error": "OCR not available (pytesseract not installed)"}
 
         try:
-            import pytesseract
-            from PIL import Image
+            import pytesseract  # noqa: F401
+            from PIL import Image  # noqa: F401
         except ImportError:
             logger.error("Image processing libraries not installed. " "Install with: pip install Pillow pytesseract")
             return "", {"error": "Image processing not available"}
 
         try:
-            image = Image.open(BytesIO(file_content))
-
-            metadata = {
-                "format": "image",
-                "width": image.width,
-                "height": image.height,
-                "mode": image.mode,
-            }
-
-            # Perform OCR
-            text = pytesseract.image_to_string(image)
-            metadata["ocr_performed"] = True
-
-            return text, metadata
+            return await self._run(_extract_image_text, file_content, settings.FILE_PROCESSOR_MAX_IMAGE_PIXELS)
 
         except Exception as e:
             logger.error(f"Error processing image: {e}", exc_info=True)
@@ -166,38 +371,16 @@ class FileProcessor:
     async def _extract_from_docx(self, file_content: bytes) -> Tuple[str, dict]:
         """Extract text from DOCX file"""
         try:
-            from docx import Document
+            from docx import Document  # noqa: F401
         except ImportError:
             logger.error("python-docx not installed. Install with: pip install python-docx")
             return "", {"error": "DOCX support not available"}
 
         try:
-            doc = Document(BytesIO(file_content))
-
-            metadata = {
-                "format": "docx",
-                "paragraph_count": len(doc.paragraphs),
-            }
-
-            # Extract document properties
-            if doc.core_properties.title:
-                metadata["title"] = doc.core_properties.title
-            if doc.core_properties.author:
-                metadata["author"] = doc.core_properties.author
-
-            # Extract text from paragraphs
-            text_parts = []
-            for para in doc.paragraphs:
-                if para.text.strip():
-                    text_parts.append(para.text)
-
-            # Extract text from tables
-            for table in doc.tables:
-                for row in table.rows:
-                    row_text = [cell.text for cell in row.cells]
-                    text_parts.append(" | ".join(row_text))
-
-            text = "\n\n".join(text_parts)
+            text, metadata = await self._run(_extract_docx_text, file_content)
+            if len(text) > self.max_text_chars:
+                text = text[: self.max_text_chars]
+                metadata["text_truncated"] = True
             return text, metadata
 
         except Exception as e:
@@ -206,24 +389,10 @@ class FileProcessor:
 
     def get_supported_types(self) -> list:
         """Get list of supported MIME types"""
-        supported = [
-            "application/pdf",
-            "text/plain",
-            "text/markdown",
-            "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            "application/msword",
-        ]
+        supported = [PDF_MIME_TYPE, "text/plain", "text/markdown", *DOCX_MIME_TYPES]
 
         if self.ocr_available:
-            supported.extend(
-                [
-                    "image/png",
-                    "image/jpeg",
-                    "image/jpg",
-                    "image/tiff",
-                    "image/bmp",
-                ]
-            )
+            supported.extend(IMAGE_MIME_TYPES)
 
         return supported
 
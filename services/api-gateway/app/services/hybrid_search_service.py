@@ -11,25 +11,52 @@ Features:
 - Score normalization
 - Query-dependent strategy selection
 - Async execution with parallel search
+- Per-query latency budget: legs that miss their deadline are dropped from
+  fusion and their late results cached for the next identical query
 """
 
 from __future__ import annotations
 
 import asyncio
+import copy
 import logging
 import math
 import re
+import threading
+import time
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 
 import openai
+from app.core.business_metrics import safe_counter, safe_histogram
 from app.core.config import settings
 from app.services.cache_service import cache_service, generate_cache_key
 from qdrant_client.models import FieldCondition, Filter, MatchAny, MatchValue
 
 logger = logging.getLogger(__name__)
 
+search_leg_latency = safe_histogram(
+    "voiceassist_hybrid_search_leg_latency_seconds",
+    "Completion time of each hybrid search leg, including legs that missed their deadline",
+    ["component", "leg"],
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 15.0],
+)
+search_legs_dropped_total = safe_counter(
+    "voiceassist_hybrid_search_legs_dropped_total",
+    "Hybrid search legs left out of fusion",
+    ["component", "leg", "reason"],
+)
+
+# Legs still running after their query returned; held so they are not garbage collected
+_late_legs: Set[asyncio.Task] = set()
+
+# Cache keys this process wrote a late leg result under -> expiry (monotonic).
+# Only these are looked up, so legs that finish on time never wait on the cache
+_late_keys: Dict[str, float] = {}
+_LATE_KEYS_MAX = 10000
+
 
 class SearchStrategy(str, Enum):
     """Search strategy options."""
@@ -50,6 +77,7 @@ class SearchResult:
     score: float
     metadata: Dict[str, Any] = field(default_factory=dict)
     source: str = "unknown"  # vector, bm25, hybrid
+    embedding: Optional[List[float]] = None  # Stored chunk vector (when fetched with_vectors)
 
 
 @dataclass
@@ -62,6 +90,120 @@ class HybridSearchConfig:
     normalize_scores: bool = True
     min_score_threshold: float = 0.1
     max_results: int = 20
+    with_vectors: bool = False  # Return stored chunk vectors with vector results (for re-ranking)
+    latency_budget_ms: float = field(default_factory=lambda: settings.HYBRID_SEARCH_LATENCY_BUDGET_MS)
+    vector_deadline_ms: float = field(default_factory=lambda: settings.HYBRID_SEARCH_VECTOR_DEADLINE_MS)
+    bm25_deadline_ms: float = field(default_factory=lambda: settings.HYBRID_SEARCH_BM25_DEADLINE_MS)
+    late_leg_cache_ttl: int = field(default_factory=lambda: settings.HYBRID_SEARCH_LATE_LEG_CACHE_TTL)
+
+
+def leg_deadlines(budget_ms: float, deadlines_ms: Dict[str, float]) -> Dict[str, Optional[float]]:
+    """
+    Resolve per-leg deadlines in seconds.
+
+    Each leg gets its own deadline capped at the query budget; a leg without
+    one gets the whole budget. A budget of 0 disables deadlines (None).
+    """
+    if not budget_ms or budget_ms <= 0:
+        return {leg: None for leg in deadlines_ms}
+    return {leg: min(ms, budget_ms) / 1000 if ms and ms > 0 else budget_ms / 1000 for leg, ms in deadlines_ms.items()}
+
+
+def _remember_late_key(key: str, ttl: int) -> None:
+    _late_keys.pop(key, None)
+    _late_keys[key] = time.monotonic() + ttl
+    while len(_late_keys) > _LATE_KEYS_MAX:
+        del _late_keys[next(iter(_late_keys))]  # Oldest first
+
+
+def _has_late_result(key: str) -> bool:
+    expires = _late_keys.get(key)
+    if expires is None:
+        return False
+    if expires < time.monotonic():
+        del _late_keys[key]
+        return False
+    return True
+
+
+def _late_leg_done(component: str, leg: str, task: asyncio.Task) -> None:
+    _late_legs.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Late {component} search leg '{leg}' failed: {task.exception()}")
+
+
+async def gather_search_legs(
+    legs: Dict[str, Callable[[], Awaitable[List[Any]]]],
+    deadlines: Dict[str, Optional[float]],
+    component: str,
+    cache_keys: Optional[Dict[str, str]] = None,
+    cache_ttl: int = 300,
+) -> Dict[str, List[Any]]:
+    """
+    Run search legs concurrently and return those that finish in time.
+
+    A leg that misses its deadline (seconds from the start, None = no deadline)
+    or raises is left out of the returned dict so the caller can fuse whatever
+    arrived. A late leg keeps running; when it completes its results are written
+    under its cache key, and the next search with the same key is served from
+    the cache instead of running the leg again. The cache is only consulted for
+    keys this process wrote, so on-time legs cost no cache round trip.
+
+    Args:
+        legs: Leg name -> factory returning the leg's search coroutine
+        deadlines: Leg name -> deadline in seconds
+        component: Metric label for the calling search service
+        cache_keys: Leg name -> cache key for late-result reuse
+        cache_ttl: TTL in seconds for cached late results
+
+    Returns:
+        Leg name -> results, for legs that completed by their deadline
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    cache_keys = cache_keys or {}
+    late: Set[str] = set()
+
+    async def run_leg(name: str) -> List[Any]:
+        key = cache_keys.get(name)
+        if key and _has_late_result(key):
+            cached = await cache_service.get(key)
+            if cached is not None:
+                # Fusion rescores results in place; keep the cached copies intact
+                return [copy.copy(r) for r in cached]
+            _late_keys.pop(key, None)
+        results = await legs[name]()
+        search_leg_latency.labels(component=component, leg=name).observe(loop.time() - start)
+        if name in late and key and results and await cache_service.set(key, results, ttl=cache_ttl):
+            _remember_late_key(key, cache_ttl)
+        return results
+
+    tasks = {name: asyncio.create_task(run_leg(name)) for name in legs}
+    completed: Dict[str, List[Any]] = {}
+    try:
+        for name, task in tasks.items():
+            deadline = deadlines.get(name)
+            try:
+                if deadline is None or task.done():
+                    completed[name] = await task
+                else:
+                    remaining = max(deadline - (loop.time() - start), 0.0)
+                    completed[name] = await asyncio.wait_for(asyncio.shield(task), timeout=remaining)
+            except asyncio.TimeoutError:
+                late.add(name)
+                _late_legs.add(task)
+                task.add_done_callback(partial(_late_leg_done, component, name))
+                search_legs_dropped_total.labels(component=component, leg=name, reason="timeout").inc()
+                logger.warning(f"{component} search leg '{name}' missed its {deadline * 1000:.0f}ms deadline")
+            except Exception as e:
+                search_legs_dropped_total.labels(component=component, leg=name, reason="error").inc()
+                logger.error(f"{component} search leg '{name}' failed: {e}")
+    except asyncio.CancelledError:
+        for task in tasks.values():
+            task.cancel()
+        raise
+
+    return completed
 
 
 class BM25Index:
@@ -70,6 +212,9 @@ class BM25Index:
 
     In production, this would typically be backed by Elasticsearch
     or Meilisearch. This implementation uses an in-memory index for MVP.
+
+    search() runs in a worker thread while add_document() runs on the
+    event loop, so both hold a lock over the index structures.
     """
 
     def __init__(
@@ -85,6 +230,7 @@ class BM25Index:
         self.term_doc_freqs: Dict[str, int] = {}
         self.inverted_index: Dict[str, Dict[str, float]] = {}
         self._initialized = False
+        self._lock = threading.Lock()
 
     def _tokenize(self, text: str) -> List[str]:
         """Simple tokenization - lowercase and split on non-alphanumeric."""
@@ -104,26 +250,28 @@ class BM25Index:
     ) -> None:
         """Add document to the index."""
         tokens = self._tokenize(content)
-        self.documents[doc_id] = {
-            "content": content,
-            "tokens": tokens,
-            "metadata": metadata or {},
-        }
-        self.doc_lengths[doc_id] = len(tokens)
-
-        # Update inverted index
-        unique_terms = set(tokens)
-        for term in unique_terms:
-            if term not in self.inverted_index:
-                self.inverted_index[term] = {}
-                self.term_doc_freqs[term] = 0
-            self.term_doc_freqs[term] += 1
-            self.inverted_index[term][doc_id] = self._compute_tf(term, tokens)
-
-        # Update average document length
-        total_length = sum(self.doc_lengths.values())
-        self.avg_doc_length = total_length / len(self.doc_lengths) if self.doc_lengths else 0
-        self._initialized = True
+        term_freqs = {term: self._compute_tf(term, tokens) for term in set(tokens)}
+
+        with self._lock:
+            self.documents[doc_id] = {
+                "content": content,
+                "tokens": tokens,
+                "metadata": metadata or {},
+            }
+            self.doc_lengths[doc_id] = len(tokens)
+
+            # Update inverted index
+            for term, tf in term_freqs.items():
+                if term not in self.inverted_index:
+                    self.inverted_index[term] = {}
+                    self.term_doc_freqs[term] = 0
+                self.term_doc_freqs[term] += 1
+                self.inverted_index[term][doc_id] = tf
+
+            # Update average document length
+            total_length = sum(self.doc_lengths.values())
+            self.avg_doc_length = total_length / len(self.doc_lengths) if self.doc_lengths else 0
+            self._initialized = True
 
     def search(
         self,
@@ -140,26 +288,27 @@ class BM25Index:
 
         query_tokens = self._tokenize(query)
         scores: Dict[str, float] = {}
-        n_docs = len(self.documents)
 
-        for term in query_tokens:
-            if term not in self.inverted_index:
-                continue
+        with self._lock:
+            n_docs = len(self.documents)
+            for term in query_tokens:
+                if term not in self.inverted_index:
+                    continue
 
-            # IDF component
-            df = self.term_doc_freqs[term]
-            idf = math.log((n_docs - df + 0.5) / (df + 0.5) + 1)
+                # IDF component
+                df = self.term_doc_freqs[term]
+                idf = math.log((n_docs - df + 0.5) / (df + 0.5) + 1)
 
-            # Score each document containing this term
-            for doc_id, tf in self.inverted_index[term].items():
-                doc_len = self.doc_lengths[doc_id]
+                # Score each document containing this term
+                for doc_id, tf in self.inverted_index[term].items():
+                    doc_len = self.doc_lengths[doc_id]
 
-                # BM25 formula
-                numerator = tf * (self.k1 + 1)
-                denominator = tf + self.k1 * (1 - self.b + self.b * (doc_len / self.avg_doc_length))
-                term_score = idf * (numerator / denominator)
+                    # BM25 formula
+                    numerator = tf * (self.k1 + 1)
+                    denominator = tf + self.k1 * (1 - self.b + self.b * (doc_len / self.avg_doc_length))
+                    term_score = idf * (numerator / denominator)
 
-                scores[doc_id] = scores.get(doc_id, 0.0) + term_score
+                    scores[doc_id] = scores.get(doc_id, 0.0) + term_score
 
         # Sort by score and return top_k
         sorted_results = sorted(scores.items(), key=lambda x: x[1], reverse=True)
@@ -283,6 +432,7 @@ class HybridSearchService:
         top_k: int,
         score_threshold: float = 0.0,
         filters: Optional[Dict[str, Any]] = None,
+        with_vectors: Optional[bool] = None,
     ) -> List[SearchResult]:
         """Perform vector search using Qdrant."""
         if not self.qdrant_enabled or not self.qdrant_client:
@@ -302,6 +452,7 @@ class HybridSearchService:
                     limit=top_k,
                     score_threshold=score_threshold,
                     query_filter=search_filter,
+                    with_vectors=self.config.with_vectors if with_vectors is None else with_vectors,
                 ),
                 timeout=5,
             )
@@ -333,6 +484,7 @@ class HybridSearchService:
                             },
                         },
                         source="vector",
+                        embedding=result.vector if isinstance(result.vector, list) else None,
                     )
                 )
 
@@ -350,7 +502,8 @@ class HybridSearchService:
     ) -> List[SearchResult]:
         """Perform BM25 keyword search."""
         try:
-            results = self.bm25_index.search(query, top_k=top_k)
+            # Off the event loop so the leg's deadline can fire on large indexes
+            results = await asyncio.to_thread(self.bm25_index.search, query, top_k=top_k)
 
             search_results = []
             for doc_id, score in results:
@@ -420,8 +573,11 @@ class HybridSearchService:
                 rrf_score = 1.0 / (k + rank)
                 rrf_scores[result.chunk_id] = rrf_scores.get(result.chunk_id, 0.0) + rrf_score
                 # Keep the result with highest original score
-                if result.chunk_id not in result_lookup or result.score > result_lookup[result.chunk_id].score:
+                previous = result_lookup.get(result.chunk_id)
+                if previous is None or result.score > previous.score:
                     result_lookup[result.chunk_id] = result
+                    if previous is not None and result.embedding is None:
+                        result.embedding = previous.embedding
 
         # Create final results with RRF scores
         final_results = []
@@ -530,6 +686,8 @@ class HybridSearchService:
         strategy: SearchStrategy = SearchStrategy.AUTO,
         score_threshold: Optional[float] = None,
         filters: Optional[Dict[str, Any]] = None,
+        with_vectors: Optional[bool] = None,
+        latency_budget_ms: Optional[float] = None,
     ) -> List[SearchResult]:
         """
         Perform hybrid search.
@@ -539,6 +697,9 @@ class HybridSearchService:
             top_k: Number of results to return
             strategy: Search strategy to use
             score_threshold: Minimum score threshold
+            with_vectors: Return stored chunk vectors (defaults to config.with_vectors)
+            latency_budget_ms: Hybrid leg budget (defaults to config.latency_budget_ms);
+                legs that miss it are left out of fusion
 
         Returns:
             List of search results
@@ -552,22 +713,41 @@ class HybridSearchService:
 
         # Execute search based on strategy
         if strategy == SearchStrategy.VECTOR_ONLY:
-            results = await self._vector_search(query, top_k, threshold, filters)
+            results = await self._vector_search(query, top_k, threshold, filters, with_vectors)
 
         elif strategy == SearchStrategy.BM25_ONLY:
             results = await self._bm25_search(query, top_k, filters)
             results = [r for r in results if r.score >= threshold]
 
         elif strategy == SearchStrategy.HYBRID:
-            # Execute both searches in parallel
-            vector_task = self._vector_search(query, top_k * 2, 0.0, filters)
-            bm25_task = self._bm25_search(query, top_k * 2, filters)
-
-            vector_results, bm25_results = await asyncio.gather(vector_task, bm25_task)
+            # Execute both searches in parallel, fusing whichever finish within budget
+            budget = self.config.latency_budget_ms if latency_budget_ms is None else latency_budget_ms
+            vectors = self.config.with_vectors if with_vectors is None else with_vectors
+            legs = await gather_search_legs(
+                {
+                    "vector": partial(self._vector_search, query, top_k * 2, 0.0, filters, vectors),
+                    "bm25": partial(self._bm25_search, query, top_k * 2, filters),
+                },
+                leg_deadlines(budget, {"vector": self.config.vector_deadline_ms, "bm25": self.config.bm25_deadline_ms}),
+                component="hybrid_search",
+                cache_keys={
+                    leg: generate_cache_key(
+                        "hybrid_leg",
+                        self.collection_name,
+                        leg,
+                        query,
+                        top_k * 2,
+                        sorted((filters or {}).items()),
+                        with_vectors=vectors,
+                    )
+                    for leg in ("vector", "bm25")
+                },
+                cache_ttl=self.config.late_leg_cache_ttl,
+            )
 
             # Use RRF for fusion
             results = self._reciprocal_rank_fusion(
-                [vector_results, bm25_results],
+                [legs.get("vector", []), legs.get("bm25", [])],
                 k=self.config.rrf_k,
             )
 
@@ -16,13 +16,18 @@ Future enhancements:
 - Multi-format support (DOCX, HTML, etc.)
 """
 
+import asyncio
+import hashlib
 import logging
+import time
 import uuid
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import openai
+from app.core.config import settings
+from app.services.rag_cache import rag_cache
 from pypdf import PdfReader
 from qdrant_client import QdrantClient
 from qdrant_client.models import Distance, PointStruct, VectorParams
@@ -49,6 +54,9 @@ class IndexingResult:
     success: bool
     chunks_indexed: int
     error_message: Optional[str] = None
+    processing_time_ms: float = 0.0
+    chunks_embedded: int = 0
+    chunks_reused: int = 0
 
 
 class KBIndexer:
@@ -192,6 +200,190 @@ class KBIndexer:
             logger.error(f"Error generating embedding: {e}", exc_info=True)
             raise
 
+    async def generate_embeddings(self, texts: Sequence[str]) -> List[List[float]]:
+        """
+        Generate embedding vectors for several texts.
+
+        Texts are sent in requests of at most DOCUMENT_PIPELINE_EMBED_BATCH
+        inputs, keeping each request under the API's per-request input limit.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Embedding vectors in input order
+        """
+        batch_size = max(1, settings.DOCUMENT_PIPELINE_EMBED_BATCH)
+        embeddings: List[List[float]] = []
+        try:
+            for i in range(0, len(texts), batch_size):
+                response = await openai.embeddings.create(
+                    model=self.embedding_model, input=list(texts[i : i + batch_size])
+                )
+                embeddings.extend(item.embedding for item in sorted(response.data, key=lambda item: item.index))
+            return embeddings
+
+        except Exception as e:
+            logger.error(f"Error generating embeddings: {e}", exc_info=True)
+            raise
+
+    @staticmethod
+    def chunk_keys(chunks: Sequence[DocumentChunk]) -> List[str]:
+        """
+        Content keys for chunks: a hash of the text plus its occurrence number.
+
+        Keys are stable across re-indexing, so unchanged chunks can be matched
+        to their existing points even when their position in the document moves.
+
+        Chunks are still fixed-stride windows from ``chunk_text``, though: any
+        edit that changes the text length (an insertion or deletion) shifts
+        every later window, and those chunks get new keys. Reuse therefore
+        pays off for appended text and same-length in-place edits only.
+        """
+        seen: Dict[str, int] = {}
+        keys = []
+        for chunk in chunks:
+            digest = hashlib.sha256(chunk.content.encode("utf-8")).hexdigest()[:32]
+            seen[digest] = seen.get(digest, 0) + 1
+            keys.append(f"{digest}:{seen[digest]}")
+        return keys
+
+    @staticmethod
+    def chunk_point_id(document_id: str, key: str) -> str:
+        """Deterministic Qdrant point id for a document chunk key."""
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{document_id}#{key}"))
+
+    async def index_document_incremental(
+        self,
+        content: str,
+        document_id: str,
+        title: str,
+        source_type: str = "uploaded",
+        metadata: Optional[Dict[str, Any]] = None,
+        previous_chunk_keys: Optional[Sequence[str]] = None,
+    ) -> Tuple[IndexingResult, List[str]]:
+        """
+        Re-index a document, embedding only chunks whose content changed.
+
+        Chunks are keyed by content (see ``chunk_keys``) and stored under
+        deterministic point ids. Chunks present in ``previous_chunk_keys``
+        keep their stored vectors (payloads are refreshed), new chunks are
+        embedded in batched requests and chunks that disappeared are
+        deleted. Without previous keys, any existing points for the document
+        are removed first so the document is rebuilt from scratch. Only
+        chunks before the first length-changing edit can be reused (see
+        ``chunk_keys``).
+
+        Args:
+            content: Document text content
+            document_id: Unique document identifier
+            title: Document title
+            source_type: Type of source
+            metadata: Additional metadata
+            previous_chunk_keys: Chunk keys recorded by the last indexing run
+
+        Returns:
+            Tuple of IndexingResult and the chunk keys now stored
+        """
+        start = time.perf_counter()
+        try:
+            doc_metadata = {
+                "document_id": document_id,
+                "title": title,
+                "source_type": source_type,
+                "indexed_at": datetime.now(timezone.utc).isoformat(),
+                **(metadata or {}),
+            }
+            chunks = self.chunk_text(content, document_id, doc_metadata)
+            if not chunks:
+                return (
+                    IndexingResult(
+                        document_id=document_id,
+                        success=False,
+                        chunks_indexed=0,
+                        error_message="No chunks generated from document",
+                    ),
+                    list(previous_chunk_keys or []),
+                )
+
+            keys = self.chunk_keys(chunks)
+            point_ids = [self.chunk_point_id(document_id, key) for key in keys]
+            previous = set(previous_chunk_keys or [])
+
+            # Reuse stored vectors for unchanged chunks
+            vectors: Dict[str, List[float]] = {}
+            reusable = [pid for key, pid in zip(keys, point_ids) if key in previous]
+            if reusable:
+                try:
+                    records = await asyncio.to_thread(
+                        self.qdrant_client.retrieve,
+                        collection_name=self.collection_name,
+                        ids=reusable,
+                        with_vectors=True,
+                    )
+                    vectors = {str(record.id): record.vector for record in records if record.vector}
+                except Exception as e:
+                    logger.warning(f"Could not reuse stored vectors for {document_id}, re-embedding: {e}")
+
+            to_embed = [i for i, pid in enumerate(point_ids) if pid not in vectors]
+            embeddings = await self.generate_embeddings([chunks[i].content for i in to_embed])
+            for i, embedding in zip(to_embed, embeddings):
+                vectors[point_ids[i]] = embedding
+
+            points = [
+                PointStruct(
+                    id=pid,
+                    vector=vectors[pid],
+                    payload={
+                        "document_id": chunk.document_id,
+                        "content": chunk.content,
+                        "chunk_index": chunk.chunk_index,
+                        **chunk.metadata,
+                    },
+                )
+                for chunk, pid in zip(chunks, point_ids)
+            ]
+
+            if not previous:
+                await asyncio.to_thread(self.delete_document, document_id)
+            await asyncio.to_thread(self.qdrant_client.upsert, collection_name=self.collection_name, points=points)
+
+            stale = [self.chunk_point_id(document_id, key) for key in previous - set(keys)]
+            if stale:
+                await asyncio.to_thread(
+                    self.qdrant_client.delete, collection_name=self.collection_name, points_selector=stale
+                )
+            await rag_cache.invalidate_document(document_id)
+
+            logger.info(
+                f"Incrementally indexed document {document_id}: {len(to_embed)} chunks embedded, "
+                f"{len(points) - len(to_embed)} reused, {len(stale)} removed"
+            )
+
+            return (
+                IndexingResult(
+                    document_id=document_id,
+                    success=True,
+                    chunks_indexed=len(points),
+                    processing_time_ms=(time.perf_counter() - start) * 1000,
+                    chunks_embedded=len(to_embed),
+                    chunks_reused=len(points) - len(to_embed),
+                ),
+                keys,
+            )
+
+        except Exception as e:
+            logger.error(f"Error incrementally indexing document {document_id}: {e}", exc_info=True)
+            return (
+                IndexingResult(
+                    document_id=document_id,
+                    success=False,
+                    chunks_indexed=0,
+                    error_message=str(e),
+                ),
+                list(previous_chunk_keys or []),
+            )
+
     async def index_document(
         self,
         content: str,
@@ -213,6 +405,7 @@ class KBIndexer:
         Returns:
             IndexingResult with success status and details
         """
+        start = time.perf_counter()
         try:
             # Prepare metadata
             doc_metadata = {
@@ -255,10 +448,17 @@ class KBIndexer:
 
             # Upload to Qdrant
             self.qdrant_client.upsert(collection_name=self.collection_name, points=points)
+            await rag_cache.invalidate_document(document_id)
 
             logger.info(f"Successfully indexed document {document_id} with {len(points)} chunks")
 
-            return IndexingResult(document_id=document_id, success=True, chunks_indexed=len(points))
+            return IndexingResult(
+                document_id=document_id,
+                success=True,
+                chunks_indexed=len(points),
+                processing_time_ms=(time.perf_counter() - start) * 1000,
+                chunks_embedded=len(points),
+            )
 
         except Exception as e:
             logger.error(f"Error indexing document {document_id}: {e}", exc_info=True)
@@ -8,12 +8,17 @@ Provides medical-specific embeddings using specialized language models:
 
 These models provide better semantic understanding for medical queries
 compared to general-purpose embedding models.
+
+Batch embedding runs real padded batches on a dedicated inference pool:
+texts are tokenized once, sorted by length and bucketed so each forward
+pass pads only to its own longest text, bounded by a token budget.
 """
 
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Sequence
 
 from app.core.config import settings
 from app.core.logging import get_logger
@@ -96,6 +101,46 @@ class GenerationResult:
     metadata: Dict[str, Any]
 
 
+def plan_length_buckets(
+    lengths: Sequence[int],
+    batch_size: int,
+    max_tokens_per_batch: Optional[int] = None,
+) -> List[List[int]]:
+    """
+    Group texts into padded batches that waste little padding.
+
+    Indices are sorted by token length (longest first) and packed greedily;
+    a batch closes when it holds ``batch_size`` texts or when padding every
+    text to the batch's longest would exceed ``max_tokens_per_batch``.
+
+    Args:
+        lengths: Token count per text
+        batch_size: Maximum texts per batch
+        max_tokens_per_batch: Maximum padded tokens (texts x longest) per batch
+
+    Returns:
+        Lists of original indices, one per batch
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_max = 0
+
+    for idx in order:
+        if current:
+            padded = (len(current) + 1) * current_max  # Sorted: the first text is the longest
+            if len(current) >= batch_size or (max_tokens_per_batch and padded > max_tokens_per_batch):
+                batches.append(current)
+                current = []
+        if not current:
+            current_max = lengths[idx]
+        current.append(idx)
+
+    if current:
+        batches.append(current)
+    return batches
+
+
 class MedicalEmbeddingService:
     """
     Medical-specific embeddings using BioGPT and PubMedBERT.
@@ -112,19 +157,29 @@ class MedicalEmbeddingService:
     models are not available.
     """
 
-    def __init__(self, lazy_load: bool = True):
+    def __init__(
+        self,
+        lazy_load: bool = True,
+        max_tokens_per_batch: Optional[int] = None,
+        inference_workers: int = 1,
+    ):
         """
         Initialize the medical embedding service.
 
         Args:
             lazy_load: If True, models are loaded on first use.
                        If False, models are loaded immediately.
+            max_tokens_per_batch: Padded-token budget per forward pass in
+                       batch embedding (defaults to settings.MEDICAL_EMBEDDING_MAX_BATCH_TOKENS)
+            inference_workers: Threads running forward passes off the event loop
         """
         self._models: Dict[MedicalModelType, Dict[str, Any]] = {}
         self._models_loaded = False
         self._lazy_load = lazy_load
         self._device = "cuda" if self._check_cuda_available() else "cpu"
         self._fallback_enabled = True
+        self.max_tokens_per_batch = max_tokens_per_batch or settings.MEDICAL_EMBEDDING_MAX_BATCH_TOKENS
+        self._executor = ThreadPoolExecutor(max_workers=inference_workers, thread_name_prefix="medical-embed")
 
         logger.info(
             "MedicalEmbeddingService initialized",
@@ -332,31 +387,131 @@ class MedicalEmbeddingService:
         model_type: MedicalModelType = MedicalModelType.PUBMEDBERT,
         pooling: str = "cls",
         batch_size: int = 32,
+        max_tokens_per_batch: Optional[int] = None,
     ) -> List[EmbeddingResult]:
         """
         Generate embeddings for multiple texts in batches.
 
+        Texts are tokenized once, sorted by length and bucketed (see
+        ``plan_length_buckets``); each bucket is one padded forward pass on
+        the inference pool, so the event loop is never blocked.
+
         Args:
             texts: List of texts to embed
             model_type: Type of medical model to use
             pooling: Pooling strategy
-            batch_size: Number of texts to process per batch
+            batch_size: Maximum texts per forward pass
+            max_tokens_per_batch: Padded-token budget per forward pass
+                (defaults to the service setting)
 
         Returns:
-            List of EmbeddingResult objects
+            List of EmbeddingResult objects, in input order
         """
-        results = []
+        if not texts:
+            return []
+        if model_type not in MODEL_CONFIGS:
+            raise ValueError(f"Unsupported model type: {model_type}")
+        if pooling not in ("cls", "mean"):
+            raise ValueError(f"Unknown pooling strategy: {pooling}")
+
+        if model_type == MedicalModelType.BIOGPT:
+            logger.warning("BioGPT is not optimal for embeddings, falling back to PubMedBERT")
+            model_type = MedicalModelType.PUBMEDBERT
 
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i : i + batch_size]
+        if not self._ensure_model_loaded(model_type):
+            if self._fallback_enabled:
+                return await self._fallback_embeddings_batch(texts, model_type, batch_size)
+            raise RuntimeError(f"Failed to load model: {model_type.value}")
 
-            # Process batch in parallel
-            batch_results = await asyncio.gather(
-                *[self.generate_embedding(text, model_type, pooling) for text in batch]
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor,
+                self._embed_padded_batches,
+                list(texts),
+                model_type,
+                pooling,
+                batch_size,
+                max_tokens_per_batch or self.max_tokens_per_batch,
             )
-            results.extend(batch_results)
+        except Exception as e:
+            logger.error(
+                f"Batch embedding generation failed: {e}",
+                extra={"model": model_type.value, "texts": len(texts)},
+            )
+            if self._fallback_enabled:
+                return await self._fallback_embeddings_batch(texts, model_type, batch_size)
+            raise RuntimeError(f"Embedding generation failed: {e}")
+
+    def _embed_padded_batches(
+        self,
+        texts: List[str],
+        model_type: MedicalModelType,
+        pooling: str,
+        batch_size: int,
+        max_tokens_per_batch: int,
+    ) -> List[EmbeddingResult]:
+        """Length-bucketed padded inference (runs on the inference pool)."""
+        import torch
+
+        model_data = self._models[model_type]
+        tokenizer = model_data["tokenizer"]
+        model = model_data["model"]
+        config = MODEL_CONFIGS[model_type]
+
+        # Tokenize once without truncation so truncation can be reported, then
+        # cut to max_length keeping the closing [SEP] (PubMedBERT/SciBERT are BERT models)
+        encoded = tokenizer(texts, add_special_tokens=True, truncation=False, padding=False, verbose=False)
+        input_ids = encoded["input_ids"]
+        truncated = [len(ids) > config.max_length for ids in input_ids]
+        input_ids = [ids[: config.max_length - 1] + ids[-1:] if cut else ids for ids, cut in zip(input_ids, truncated)]
+
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+        padded_tokens = 0
+        buckets = plan_length_buckets([len(ids) for ids in input_ids], batch_size, max_tokens_per_batch)
+
+        for bucket in buckets:
+            # Dynamic padding: only to the longest text in this bucket
+            inputs = tokenizer.pad({"input_ids": [input_ids[i] for i in bucket]}, return_tensors="pt")
+            inputs = {k: v.to(self._device) for k, v in inputs.items()}
+            padded_tokens += int(inputs["input_ids"].numel())
+
+            with torch.inference_mode():
+                hidden = model(**inputs).last_hidden_state
+
+            if pooling == "cls":
+                pooled = hidden[:, 0, :]
+            else:
+                mask = inputs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+                pooled = (hidden * mask).sum(1) / torch.clamp(mask.sum(1), min=1e-9)
+
+            for idx, vector in zip(bucket, pooled.float().cpu().numpy()):
+                embeddings[idx] = vector.tolist()
+
+        logger.debug(
+            "Batch embeddings generated",
+            extra={
+                "texts": len(texts),
+                "batches": len(buckets),
+                "padding_ratio": round(1 - sum(len(ids) for ids in input_ids) / max(padded_tokens, 1), 3),
+            },
+        )
 
-        return results
+        return [
+            EmbeddingResult(
+                embedding=embedding,
+                model=config.name,
+                text_length=len(text),
+                truncated=cut,
+                metadata={
+                    "model_id": config.model_id,
+                    "pooling": pooling,
+                    "embedding_dim": len(embedding),
+                    "device": self._device,
+                },
+            )
+            for text, embedding, cut in zip(texts, embeddings, truncated)
+        ]
 
     async def generate_text(
         self,
@@ -493,6 +648,69 @@ class MedicalEmbeddingService:
             logger.error(f"Fallback embedding also failed: {e}")
             raise RuntimeError(f"All embedding methods failed: {e}")
 
+    async def _fallback_embeddings_batch(
+        self,
+        texts: List[str],
+        original_model: MedicalModelType,
+        batch_size: int = 32,
+    ) -> List[EmbeddingResult]:
+        """
+        Generate embeddings for several texts using the OpenAI API, one request per batch.
+
+        Args:
+            texts: Input texts
+            original_model: The model that was originally requested
+            batch_size: Texts per API request
+
+        Returns:
+            EmbeddingResult objects in input order
+        """
+        try:
+            import httpx
+
+            results: List[EmbeddingResult] = []
+            async with httpx.AsyncClient(timeout=30.0) as client:
+                for i in range(0, len(texts), batch_size):
+                    batch = texts[i : i + batch_size]
+                    response = await client.post(
+                        "https://api.openai.com/v1/embeddings",
+                        headers={
+                            "Authorization": f"Bearer {settings.OPENAI_API_KEY}",
+                            "Content-Type": "application/json",
+                        },
+                        json={
+                            "model": "text-embedding-3-small",
+                            "input": [text[:8000] for text in batch],  # Truncate if needed
+                        },
+                    )
+                    response.raise_for_status()
+                    data = sorted(response.json()["data"], key=lambda item: item["index"])
+
+                    for text, item in zip(batch, data):
+                        results.append(
+                            EmbeddingResult(
+                                embedding=item["embedding"],
+                                model="text-embedding-3-small (fallback)",
+                                text_length=len(text),
+                                truncated=len(text) > 8000,
+                                metadata={
+                                    "fallback": True,
+                                    "original_model": original_model.value,
+                                    "embedding_dim": len(item["embedding"]),
+                                },
+                            )
+                        )
+
+            logger.info(
+                "Used OpenAI fallback for batch embedding",
+                extra={"original_model": original_model.value, "texts": len(texts)},
+            )
+            return results
+
+        except Exception as e:
+            logger.error(f"Fallback embedding also failed: {e}")
+            raise RuntimeError(f"All embedding methods failed: {e}")
+
     def get_model_info(self, model_type: MedicalModelType) -> Dict[str, Any]:
         """Get information about a medical model."""
         config = MODEL_CONFIGS.get(model_type)
@@ -15,7 +15,9 @@ from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, Dict, List, Optional, Set, Tuple
 
+from app.core.config import settings
 from app.core.logging import get_logger
+from app.services.umls_concept_cache import ConceptRecord, UMLSConceptCache
 
 logger = get_logger(__name__)
 
@@ -151,22 +153,34 @@ class MedicalNERService:
     The service gracefully degrades when models are unavailable.
     """
 
-    def __init__(self, lazy_load: bool = True):
+    def __init__(
+        self,
+        lazy_load: bool = True,
+        concept_table_path: Optional[str] = None,
+        concept_cache_size: Optional[int] = None,
+    ):
         """
         Initialize the NER service.
 
         Args:
             lazy_load: If True, models are loaded on first use.
+            concept_table_path: Prebuilt UMLS concept table (defaults to
+                settings.UMLS_CONCEPT_TABLE_PATH)
+            concept_cache_size: In-process concept LRU size (defaults to
+                settings.UMLS_CONCEPT_CACHE_SIZE)
         """
         self._nlp = None
         self._nlp_loaded = False
         self._lazy_load = lazy_load
         self._abbreviation_cache: Dict[str, str] = {}
-        self._concept_cache: Dict[str, UMLSConcept] = {}
+        self._concept_cache = UMLSConceptCache(
+            maxsize=concept_cache_size or settings.UMLS_CONCEPT_CACHE_SIZE,
+            table_path=concept_table_path or settings.UMLS_CONCEPT_TABLE_PATH,
+        )
 
         logger.info(
             "MedicalNERService initialized",
-            extra={"lazy_load": lazy_load},
+            extra={"lazy_load": lazy_load, "concept_table": self._concept_cache.has_table},
         )
 
         if not lazy_load:
@@ -281,55 +295,33 @@ class MedicalNERService:
         if not hasattr(entity._, "kb_ents") or not entity._.kb_ents:
             return concepts
 
-        for kb_ent in entity._.kb_ents:
-            cui = kb_ent[0]
-            score = kb_ent[1]
+        kb = None
 
-            # Check cache first
-            if cui in self._concept_cache:
-                cached = self._concept_cache[cui]
-                concepts.append(
-                    UMLSConcept(
-                        cui=cui,
-                        name=cached.name,
-                        semantic_types=cached.semantic_types,
-                        score=score,
-                        definition=cached.definition,
-                        aliases=cached.aliases,
-                    )
-                )
-                continue
+        for cui, score in entity._.kb_ents:
+            # Check the concept cache (LRU, then mapped UMLS table) first
+            record = self._concept_cache.get(cui)
 
-            # Get concept info from linker
-            try:
-                linker = self._nlp.get_pipe("scispacy_linker")
-                kb = linker.kb
+            if record is None:
+                # Fall back to the linker knowledge base
+                try:
+                    if kb is None:
+                        kb = self._nlp.get_pipe("scispacy_linker").kb
 
-                if cui in kb.cui_to_entity:
-                    kb_entity = kb.cui_to_entity[cui]
-                    concept = UMLSConcept(
-                        cui=cui,
-                        name=kb_entity.canonical_name,
-                        semantic_types=list(kb_entity.types),
-                        score=score,
-                        definition=kb_entity.definition,
-                        aliases=list(kb_entity.aliases)[:10],  # Limit aliases
-                    )
-                    # Cache the concept
-                    self._concept_cache[cui] = concept
-                    concepts.append(concept)
-                else:
-                    # Basic concept without full info
-                    concepts.append(
-                        UMLSConcept(
+                    if cui in kb.cui_to_entity:
+                        kb_entity = kb.cui_to_entity[cui]
+                        record = ConceptRecord(
                             cui=cui,
-                            name=entity.text,
-                            semantic_types=[],
-                            score=score,
+                            name=kb_entity.canonical_name,
+                            semantic_types=tuple(kb_entity.types),
+                            definition=kb_entity.definition,
+                            aliases=tuple(list(kb_entity.aliases)[:10]),  # Limit aliases
                         )
-                    )
-            except Exception as e:
-                logger.debug(f"Could not get concept info for {cui}: {e}")
+                        self._concept_cache.put(record)
+                except Exception as e:
+                    logger.debug(f"Could not get concept info for {cui}: {e}")
+
+            if record is None:
+                # Basic concept without full info
                 concepts.append(
                     UMLSConcept(
                         cui=cui,
@@ -338,9 +330,24 @@ class MedicalNERService:
                         score=score,
                     )
                 )
+                continue
+
+            concepts.append(self._record_to_concept(record, score))
 
         return concepts
 
+    @staticmethod
+    def _record_to_concept(record: ConceptRecord, score: float) -> UMLSConcept:
+        """Build a UMLSConcept from a cached record with a mention-specific score."""
+        return UMLSConcept(
+            cui=record.cui,
+            name=record.name,
+            semantic_types=list(record.semantic_types),
+            score=score,
+            definition=record.definition,
+            aliases=list(record.aliases),
+        )
+
     async def extract_entities(
         self,
         text: str,
@@ -692,7 +699,8 @@ class MedicalNERService:
         """
         Look up ontology mapping for a CUI.
 
-        In production, this would query the UMLS API or a local database.
+        Mappings are served from the concept cache, which is backed by the
+        offline-built UMLS concept table when one is configured.
 
         Args:
             cui: UMLS CUI
@@ -701,25 +709,17 @@ class MedicalNERService:
         Returns:
             OntologyMapping if found, None otherwise
         """
-        # Check if we have the UMLS linker with KB
-        if not self._nlp or "scispacy_linker" not in self._nlp.pipe_names:
+        mapping = self._concept_cache.get_mapping(cui, ontology.value)
+        if mapping is None:
             return None
 
-        try:
-            linker = self._nlp.get_pipe("scispacy_linker")
-            kb = linker.kb
-
-            if cui not in kb.cui_to_entity:
-                return None
-
-            # The scispacy KB doesn't have direct ontology mappings,
-            # but in production you would query UMLS REST API here
-            # For now, return None to indicate mapping lookup needed
-            return None
-
-        except Exception as e:
-            logger.debug(f"Could not lookup mapping for {cui}: {e}")
-            return None
+        code, display_name, confidence = mapping
+        return OntologyMapping(
+            ontology=ontology,
+            code=code,
+            display_name=display_name,
+            confidence=confidence,
+        )
 
     async def extract_and_normalize(
         self,
@@ -773,10 +773,17 @@ class MedicalNERService:
         Returns:
             UMLSConcept if cached, None otherwise
         """
-        return self._concept_cache.get(cui)
+        record = self._concept_cache.get(cui)
+        if record is None:
+            return None
+        return self._record_to_concept(record, score=1.0)
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get concept cache statistics."""
+        return self._concept_cache.get_stats()
 
     def clear_cache(self):
-        """Clear all caches."""
+        """Clear in-process caches (the mapped concept table is read-only)."""
         self._abbreviation_cache.clear()
         self._concept_cache.clear()
 
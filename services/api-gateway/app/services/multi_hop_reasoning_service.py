@@ -14,10 +14,13 @@ questions that require combining information from multiple sources.
 import asyncio
 from dataclasses import dataclass, field
 from enum import Enum
+from functools import partial
 from typing import Any, Callable, Dict, List, Optional
 
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.services.cache_service import generate_cache_key
+from app.services.hybrid_search_service import gather_search_legs, leg_deadlines
 
 logger = get_logger(__name__)
 
@@ -128,6 +131,7 @@ class HybridSearchEngine:
         filters: Optional[Dict[str, Any]] = None,
         rerank: bool = True,
         expand_query: bool = True,
+        latency_budget_ms: Optional[float] = None,
     ) -> List[SearchResult]:
         """
         Perform hybrid search combining semantic and keyword search.
@@ -139,6 +143,8 @@ class HybridSearchEngine:
             filters: Metadata filters
             rerank: Whether to apply cross-encoder re-ranking
             expand_query: Whether to expand query with synonyms
+            latency_budget_ms: Leg budget (defaults to HYBRID_SEARCH_LATENCY_BUDGET_MS);
+                legs that miss it are left out of fusion
 
         Returns:
             List of SearchResult objects
@@ -151,14 +157,33 @@ class HybridSearchEngine:
         if expand_query:
             expanded_query = await self._expand_query(query)
 
-        # Run semantic and keyword search in parallel
-        semantic_task = self._semantic_search(expanded_query, top_k * 2, filters)
-        keyword_task = self._keyword_search(expanded_query, top_k * 2, filters)
-
-        semantic_results, keyword_results = await asyncio.gather(semantic_task, keyword_task)
+        # Run semantic and keyword search in parallel, fusing whichever finish within budget
+        if latency_budget_ms is None:
+            latency_budget_ms = settings.HYBRID_SEARCH_LATENCY_BUDGET_MS
+        legs = await gather_search_legs(
+            {
+                "semantic": partial(self._semantic_search, expanded_query, top_k * 2, filters),
+                "keyword": partial(self._keyword_search, expanded_query, top_k * 2, filters),
+            },
+            leg_deadlines(
+                latency_budget_ms,
+                {
+                    "semantic": settings.HYBRID_SEARCH_VECTOR_DEADLINE_MS,
+                    "keyword": settings.HYBRID_SEARCH_BM25_DEADLINE_MS,
+                },
+            ),
+            component="multi_hop",
+            cache_keys={
+                leg: generate_cache_key(
+                    "multi_hop_leg", leg, expanded_query, top_k * 2, sorted((filters or {}).items())
+                )
+                for leg in ("semantic", "keyword")
+            },
+            cache_ttl=settings.HYBRID_SEARCH_LATE_LEG_CACHE_TTL,
+        )
 
         # Fuse results using Reciprocal Rank Fusion
-        fused_results = self._reciprocal_rank_fusion(semantic_results, keyword_results, alpha=alpha)
+        fused_results = self._reciprocal_rank_fusion(legs.get("semantic", []), legs.get("keyword", []), alpha=alpha)
 
         # Re-rank with cross-encoder if available
         if rerank and fused_results:
@@ -12,23 +12,38 @@ MVP Implementation:
 - Indexed file tracking to prevent re-indexing
 - Manual trigger API for selective indexing
 
+Incremental crawl:
+- ETag / last-modified change detection against a persistent JSON manifest
+- Concurrent download and extraction with a bounded worker pool
+- Chunk-level re-embedding (unchanged chunks keep their vectors; fixed-size
+  windows mean this helps appends and same-length edits, see KBIndexer.chunk_keys)
+- Deleted files are removed from the index
+
 Future enhancements:
+- Content-defined chunk boundaries, so insertions do not shift later chunks
 - Real-time file watching with webhooks
-- Incremental sync and update detection
 - Metadata extraction from Nextcloud tags/comments
 - Multi-user file permissions and filtering
 """
 
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
-from dataclasses import dataclass
+import os
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Set
 
 # Import KB indexer from Phase 5
+from app.core.config import settings
 from app.services.kb_indexer import IndexingResult, KBIndexer
+from app.services.rag_cache import rag_cache
 from webdav3.client import Client as WebDAVClient
 from webdav3.exceptions import WebDavException
 
@@ -45,6 +60,97 @@ class NextcloudFile:
     modified: datetime
     content_type: Optional[str] = None
     is_directory: bool = False
+    etag: Optional[str] = None
+
+
+def _parse_modified(value: Optional[str]) -> datetime:
+    """Parse a WebDAV getlastmodified value (RFC 1123, or ISO 8601)."""
+    if not value:
+        return datetime.now(timezone.utc)
+    try:
+        return parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return datetime.fromisoformat(value)
+
+
+@dataclass
+class ManifestEntry:
+    """What the crawler last indexed for one Nextcloud file."""
+
+    document_id: str
+    watch_directory: str
+    etag: Optional[str]
+    modified: str
+    size: int
+    chunk_keys: List[str] = field(default_factory=list)
+    indexed_at: str = ""
+
+    def matches(self, file: NextcloudFile) -> bool:
+        """True if the file is unchanged since it was indexed."""
+        if self.etag and file.etag:
+            return self.etag == file.etag
+        return self.modified == file.modified.isoformat() and self.size == file.size
+
+
+class CrawlManifest:
+    """
+    Persistent record of indexed Nextcloud files, keyed by path.
+
+    Stored as JSON and replaced atomically on save; with no path the
+    manifest lives in memory only (the previous behaviour).
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.entries: Dict[str, ManifestEntry] = {}
+        if path:
+            self.load()
+
+    def load(self) -> None:
+        """Load entries from disk; a missing or unreadable manifest starts empty."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.entries = {path: ManifestEntry(**entry) for path, entry in data.get("files", {}).items()}
+            logger.info(f"Loaded crawl manifest with {len(self.entries)} files from {self.path}")
+        except FileNotFoundError:
+            self.entries = {}
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable crawl manifest {self.path}: {e}")
+            self.entries = {}
+
+    def save(self) -> None:
+        """Write entries to disk atomically."""
+        if not self.path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        payload = {"version": self.VERSION, "files": {path: asdict(entry) for path, entry in self.entries.items()}}
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".manifest-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def get(self, path: str) -> Optional[ManifestEntry]:
+        return self.entries.get(path)
+
+    def set(self, path: str, entry: ManifestEntry) -> None:
+        self.entries[path] = entry
+
+    def remove(self, path: str) -> Optional[ManifestEntry]:
+        return self.entries.pop(path, None)
+
+    def paths_in(self, watch_directory: str) -> List[str]:
+        return [path for path, entry in self.entries.items() if entry.watch_directory == watch_directory]
+
+    def __len__(self) -> int:
+        return len(self.entries)
 
 
 class NextcloudFileIndexer:
@@ -66,6 +172,8 @@ class NextcloudFileIndexer:
         qdrant_url: str = "http://qdrant:6333",
         collection_name: str = "medical_kb",
         watch_directories: Optional[List[str]] = None,
+        manifest_path: Optional[str] = None,
+        max_concurrency: int = 4,
     ):
         """
         Initialize Nextcloud file indexer.
@@ -77,6 +185,8 @@ class NextcloudFileIndexer:
             qdrant_url: Qdrant vector database URL
             collection_name: Qdrant collection for indexed documents
             watch_directories: List of directories to monitor (e.g., ['Medical Documents', 'Guidelines'])
+            manifest_path: JSON file recording indexed files between runs (in memory if None)
+            max_concurrency: Files downloaded, extracted and indexed at once during a crawl
         """
         self.webdav_url = webdav_url
         self.username = username
@@ -101,6 +211,22 @@ class NextcloudFileIndexer:
         # Track indexed files to prevent re-indexing
         self.indexed_files: Set[str] = set()
 
+        # Incremental crawl state
+        self.manifest = CrawlManifest(manifest_path)
+        self.max_concurrency = max(1, max_concurrency)
+
+    @classmethod
+    def from_settings(cls, **kwargs: Any) -> "NextcloudFileIndexer":
+        """Build an indexer for the admin user's files from the NEXTCLOUD_* settings."""
+        return cls(
+            webdav_url=settings.NEXTCLOUD_URL + "/remote.php/dav/files/" + settings.NEXTCLOUD_ADMIN_USER + "/",
+            username=settings.NEXTCLOUD_ADMIN_USER,
+            password=settings.NEXTCLOUD_ADMIN_PASSWORD,
+            manifest_path=settings.NEXTCLOUD_CRAWL_MANIFEST_PATH,
+            max_concurrency=settings.NEXTCLOUD_CRAWL_CONCURRENCY,
+            **kwargs,
+        )
+
     def connect(self) -> bool:
         """
         Test connection to Nextcloud WebDAV.
@@ -130,59 +256,57 @@ class NextcloudFileIndexer:
             List of NextcloudFile objects
         """
         try:
-            files = []
+            files = self._walk(directory, recursive)
+            logger.info(f"Found {len(files)} files in {directory}")
+            return files
 
-            # Get directory listing
-            items = self.webdav_client.list(directory, get_info=True)
+        except WebDavException as e:
+            logger.error(f"Error listing files in {directory}: {e}", exc_info=True)
+            return []
 
-            for item in items:
-                # Skip self-reference
-                if item["path"] == directory:
-                    continue
+    def _walk(self, directory: str, recursive: bool) -> List[NextcloudFile]:
+        """List files under a directory; raises WebDavException if any listing fails."""
+        files = []
+
+        # Get directory listing
+        items = self.webdav_client.list(directory, get_info=True)
+
+        for item in items:
+            # Skip self-reference
+            if item["path"] == directory:
+                continue
 
-                # Parse item info
-                is_dir = item.get("isdir", False)
-                file_path = item["path"]
-
-                if is_dir:
-                    # Recurse into subdirectory if requested
-                    if recursive:
-                        subfiles = self.list_files(file_path, recursive=True)
-                        files.extend(subfiles)
-                else:
-                    # Add file to list
-                    nextcloud_file = NextcloudFile(
+            file_path = item["path"]
+
+            if item.get("isdir", False):
+                # Recurse into subdirectory if requested
+                if recursive:
+                    files.extend(self._walk(file_path, recursive=True))
+            else:
+                files.append(
+                    NextcloudFile(
                         path=file_path,
                         name=Path(file_path).name,
-                        size=item.get("size", 0),
-                        modified=datetime.fromisoformat(item.get("modified", datetime.now().isoformat())),
+                        size=int(item.get("size") or 0),
+                        modified=_parse_modified(item.get("modified")),
                         content_type=item.get("content_type"),
                         is_directory=False,
+                        etag=(item.get("etag") or "").strip('"') or None,
                     )
-                    files.append(nextcloud_file)
-
-            logger.info(f"Found {len(files)} files in {directory}")
-            return files
+                )
 
-        except WebDavException as e:
-            logger.error(f"Error listing files in {directory}: {e}", exc_info=True)
-            return []
+        return files
 
-    def should_index_file(self, file: NextcloudFile) -> bool:
+    def is_supported_file(self, file: NextcloudFile) -> bool:
         """
-        Determine if a file should be indexed.
+        Check file type and size, regardless of indexing history.
 
         Args:
             file: NextcloudFile to check
 
         Returns:
-            True if file should be indexed, False otherwise
+            True if the file can be indexed
         """
-        # Skip if already indexed
-        if file.path in self.indexed_files:
-            logger.debug(f"File already indexed: {file.path}")
-            return False
-
         # Check file extension
         file_ext = Path(file.name).suffix.lower()
         if file_ext not in self.SUPPORTED_EXTENSIONS:
@@ -197,6 +321,23 @@ class NextcloudFileIndexer:
 
         return True
 
+    def should_index_file(self, file: NextcloudFile) -> bool:
+        """
+        Determine if a file should be indexed.
+
+        Args:
+            file: NextcloudFile to check
+
+        Returns:
+            True if file should be indexed, False otherwise
+        """
+        # Skip if already indexed
+        if file.path in self.indexed_files:
+            logger.debug(f"File already indexed: {file.path}")
+            return False
+
+        return self.is_supported_file(file)
+
     async def index_file(self, file: NextcloudFile, source_type: str = "note") -> Optional[IndexingResult]:
         """
         Index a single file into the knowledge base.
@@ -269,6 +410,9 @@ class NextcloudFileIndexer:
         """
         Scan watch directories and index all supported files.
 
+        Runs an incremental crawl (see ``crawl``): only new or changed files
+        are downloaded and indexed, and deleted files are removed.
+
         Args:
             source_type: Default source type for indexed documents
             force_reindex: If True, re-index files even if already indexed
@@ -276,54 +420,191 @@ class NextcloudFileIndexer:
         Returns:
             Summary dictionary with indexing statistics
         """
-        logger.info("Starting Nextcloud file scan and indexing")
+        return await self.crawl(source_type=source_type, force_reindex=force_reindex)
+
+    async def crawl(self, source_type: str = "note", force_reindex: bool = False) -> Dict[str, Any]:
+        """
+        Incrementally sync watch directories into the knowledge base.
 
-        total_files = 0
-        indexed_files = 0
-        skipped_files = 0
-        failed_files = 0
+        Files are compared with the manifest by ETag (or last-modified and
+        size when the server sends no ETag). New and changed files are
+        downloaded, extracted and indexed concurrently, at most
+        ``max_concurrency`` at a time, re-embedding only changed chunks.
+        Manifest files missing from a successfully listed directory are
+        deleted from the index. The manifest is saved at the end.
+
+        Args:
+            source_type: Default source type for indexed documents
+            force_reindex: If True, ignore the manifest and rebuild every file
+
+        Returns:
+            Summary dictionary with crawl statistics and throughput
+        """
+        logger.info("Starting incremental Nextcloud crawl")
+        start = time.perf_counter()
 
         if force_reindex:
             self.indexed_files.clear()
-            logger.info("Force re-index enabled: clearing indexed file cache")
+            logger.info("Force re-index enabled: ignoring crawl manifest")
+
+        stats = {
+            "total_files": 0,
+            "unsupported": 0,
+            "unchanged": 0,
+            "indexed": 0,
+            "failed": 0,
+            "deleted": 0,
+            "bytes": 0,
+            "chunks_embedded": 0,
+            "chunks_reused": 0,
+        }
+        failed_directories = []
+        pending = []
 
-        # Scan each watch directory
         for watch_dir in self.watch_directories:
             logger.info(f"Scanning directory: {watch_dir}")
+            try:
+                files = await asyncio.to_thread(self._walk, watch_dir, True)
+            except WebDavException as e:
+                # Without a complete listing we cannot tell deletions apart from errors
+                logger.error(f"Error listing files in {watch_dir}: {e}", exc_info=True)
+                failed_directories.append(watch_dir)
+                continue
 
-            # List files in directory
-            files = self.list_files(watch_dir, recursive=True)
-            total_files += len(files)
+            stats["total_files"] += len(files)
+            seen = {file.path for file in files}
 
-            # Index each file
             for file in files:
-                if not self.should_index_file(file):
-                    skipped_files += 1
+                if not self.is_supported_file(file):
+                    stats["unsupported"] += 1
+                    continue
+                entry = self.manifest.get(file.path)
+                if entry and entry.matches(file) and not force_reindex:
+                    stats["unchanged"] += 1
+                    self.indexed_files.add(file.path)
                     continue
+                pending.append((watch_dir, file))
+
+            for path in self.manifest.paths_in(watch_dir):
+                if path not in seen and await self._remove_deleted_file(path):
+                    stats["deleted"] += 1
 
-                result = await self.index_file(file, source_type=source_type)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
 
-                if result and result.success:
-                    indexed_files += 1
-                else:
-                    failed_files += 1
+        async def crawl_one(watch_dir: str, file: NextcloudFile) -> None:
+            async with semaphore:
+                result = await self._crawl_file(watch_dir, file, source_type, force_reindex, stats)
+            if result and result.success:
+                stats["indexed"] += 1
+                stats["chunks_embedded"] += result.chunks_embedded
+                stats["chunks_reused"] += result.chunks_reused
+            else:
+                stats["failed"] += 1
 
+        await asyncio.gather(*(crawl_one(watch_dir, file) for watch_dir, file in pending))
+
+        try:
+            await asyncio.to_thread(self.manifest.save)
+        except OSError as e:
+            logger.error(f"Failed to save crawl manifest {self.manifest.path}: {e}", exc_info=True)
+
+        elapsed = time.perf_counter() - start
         summary = {
             "scan_completed": datetime.now(timezone.utc).isoformat(),
             "watch_directories": self.watch_directories,
-            "total_files_found": total_files,
-            "files_indexed": indexed_files,
-            "files_skipped": skipped_files,
-            "files_failed": failed_files,
+            "total_files_found": stats["total_files"],
+            "files_indexed": stats["indexed"],
+            "files_skipped": stats["unsupported"] + stats["unchanged"],
+            "files_unchanged": stats["unchanged"],
+            "files_failed": stats["failed"],
+            "files_deleted": stats["deleted"],
+            "failed_directories": failed_directories,
+            "chunks_embedded": stats["chunks_embedded"],
+            "chunks_reused": stats["chunks_reused"],
+            "bytes_downloaded": stats["bytes"],
+            "duration_seconds": round(elapsed, 3),
+            "files_per_second": round(len(pending) / elapsed, 2) if elapsed > 0 else 0.0,
+            "bytes_per_second": round(stats["bytes"] / elapsed, 2) if elapsed > 0 else 0.0,
         }
 
         logger.info(
-            f"Indexing complete: {indexed_files}/{total_files} files indexed, "
-            f"{skipped_files} skipped, {failed_files} failed"
+            f"Crawl complete: {stats['indexed']}/{len(pending)} changed files indexed "
+            f"({stats['unchanged']} unchanged, {stats['deleted']} deleted, {stats['failed']} failed) "
+            f"at {summary['files_per_second']} files/s, {summary['bytes_per_second']:.0f} bytes/s"
         )
 
         return summary
 
+    async def _crawl_file(
+        self,
+        watch_dir: str,
+        file: NextcloudFile,
+        source_type: str,
+        force_reindex: bool,
+        stats: Dict[str, int],
+    ) -> Optional[IndexingResult]:
+        """Download, extract and incrementally index one new or changed file."""
+        document_id = f"nextcloud-{file.path}"
+        try:
+            file_bytes = await asyncio.to_thread(self.webdav_client.resource(file.path).read)
+            stats["bytes"] += len(file_bytes)
+
+            if Path(file.name).suffix.lower() == ".pdf":
+                content = await asyncio.to_thread(self.kb_indexer.extract_text_from_pdf, file_bytes)
+            else:
+                content = file_bytes.decode("utf-8", errors="ignore")
+
+            entry = None if force_reindex else self.manifest.get(file.path)
+            result, chunk_keys = await self.kb_indexer.index_document_incremental(
+                content=content,
+                document_id=document_id,
+                title=file.name,
+                source_type=source_type,
+                metadata={
+                    "nextcloud_path": file.path,
+                    "nextcloud_size": file.size,
+                    "nextcloud_modified": file.modified.isoformat(),
+                    "nextcloud_etag": file.etag,
+                },
+                previous_chunk_keys=entry.chunk_keys if entry else None,
+            )
+
+            if result.success:
+                self.indexed_files.add(file.path)
+                self.manifest.set(
+                    file.path,
+                    ManifestEntry(
+                        document_id=document_id,
+                        watch_directory=watch_dir,
+                        etag=file.etag,
+                        modified=file.modified.isoformat(),
+                        size=file.size,
+                        chunk_keys=chunk_keys,
+                        indexed_at=datetime.now(timezone.utc).isoformat(),
+                    ),
+                )
+            else:
+                logger.warning(f"Failed to index {file.name}: {result.error_message}")
+
+            return result
+
+        except Exception as e:
+            logger.error(f"Error crawling file {file.name}: {e}", exc_info=True)
+            return None
+
+    async def _remove_deleted_file(self, path: str) -> bool:
+        """Delete a file that disappeared from Nextcloud from the index and manifest."""
+        entry = self.manifest.get(path)
+        if entry is None:
+            return False
+        if not await asyncio.to_thread(self.kb_indexer.delete_document, entry.document_id):
+            return False
+        await rag_cache.invalidate_document(entry.document_id)
+        self.manifest.remove(path)
+        self.indexed_files.discard(path)
+        logger.info(f"Removed deleted Nextcloud file from index: {path}")
+        return True
+
     async def index_specific_file(self, file_path: str, source_type: str = "note") -> Optional[IndexingResult]:
         """
         Index a specific file by path.
@@ -342,10 +623,11 @@ class NextcloudFileIndexer:
             file = NextcloudFile(
                 path=file_path,
                 name=Path(file_path).name,
-                size=info.get("size", 0),
-                modified=datetime.fromisoformat(info.get("modified", datetime.now().isoformat())),
+                size=int(info.get("size") or 0),
+                modified=_parse_modified(info.get("modified")),
                 content_type=info.get("content_type"),
                 is_directory=False,
+                etag=(info.get("etag") or "").strip('"') or None,
             )
 
             # Index the file
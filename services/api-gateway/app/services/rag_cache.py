@@ -7,6 +7,7 @@ Implements intelligent caching with:
 - Search result caching with configurable TTL
 - Cache invalidation on document updates
 - Hit rate tracking and metrics
+- Semantic answer cache: near-duplicate queries reuse a prior answer
 
 Cache Strategy:
 - Query Embeddings: 24-hour TTL (embeddings rarely need regeneration)
@@ -25,14 +26,25 @@ Usage:
 
     # Invalidate on document update
     await rag_cache.invalidate_document(document_id)
+
+    # Semantic answer cache (in-process, keyed by query embedding; KB version shared via Redis)
+    await rag_cache.semantic_cache.sync_kb_version()
+    match = rag_cache.semantic_cache.lookup(embedding, permissions=["clinician"])
+    if match is None:
+        answer = await answer_query(query)
+        rag_cache.semantic_cache.store(query, embedding, answer, tokens=used, permissions=["clinician"])
 """
 
 from __future__ import annotations
 
 import hashlib
 import json
-from typing import Any, Dict, List, Optional, Tuple
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+import numpy as np
+from app.core.config import settings
 from app.core.logging import get_logger
 from app.services.cache_service import cache_service
 from prometheus_client import Counter, Histogram
@@ -61,6 +73,309 @@ rag_search_latency_saved = Histogram(
     buckets=[0.1, 0.5, 1.0, 2.0, 5.0, 10.0],
 )
 
+rag_semantic_cache_saved_tokens_total = Counter(
+    "rag_semantic_cache_saved_tokens_total",
+    "LLM tokens not spent because a semantic answer cache hit was served",
+)
+
+
+@dataclass
+class SemanticCacheEntry:
+    """A cached answer and the query it was generated for."""
+
+    query: str
+    payload: Dict[str, Any]
+    tokens: int
+    scope: str
+    created_at: float
+    hits: int = 0
+
+
+class SemanticAnswerCache:
+    """In-process near-duplicate cache for RAG answers.
+
+    Query embeddings of answered queries are kept unit-normalized in a
+    float32 matrix, so a lookup is one matrix-vector product (flat inner
+    product == cosine similarity). Each row is tagged with a scope id for
+    the (KB version, permission set) it was answered under; a lookup only
+    matches rows in the caller's scope. Bumping the KB version drops every
+    entry, since answers may cite documents that changed.
+
+    With a ``version_key`` the KB version lives in Redis, so a document
+    indexed or deleted by one worker invalidates answers cached by all of
+    them: ``sync_kb_version`` is awaited before each lookup and
+    ``publish_kb_version`` increments the shared counter.
+    """
+
+    PUBLIC_SCOPE = "public"
+    KB_VERSION_KEY = "rag_kb_version"
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.95,
+        max_entries: int = 2048,
+        ttl_seconds: float = 3600,
+        version_key: Optional[str] = None,
+    ):
+        """
+        Initialize the semantic answer cache.
+
+        Args:
+            similarity_threshold: Minimum cosine similarity for a hit
+            max_entries: Capacity; the least recently used entry is evicted when full
+            ttl_seconds: Entries older than this are treated as misses
+            version_key: Redis key holding the shared KB version (None keeps
+                the version in-process)
+        """
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version_key = version_key
+        self.kb_version = 0
+
+        self._vectors: Optional[np.ndarray] = None  # (max_entries, dim), allocated on first store
+        self._scope_ids = np.full(max_entries, -1, dtype=np.int64)  # -1 marks a free slot
+        self._last_used = np.zeros(max_entries, dtype=np.float64)
+        self._entries: List[Optional[SemanticCacheEntry]] = [None] * max_entries
+        self._scopes: Dict[str, int] = {}
+        self._size = 0  # Slots in use are all below this index
+
+        self.hits = 0
+        self.misses = 0
+        self.saved_tokens = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_settings(cls) -> "SemanticAnswerCache":
+        """Build a cache from the RAG_SEMANTIC_CACHE_* settings."""
+        return cls(
+            similarity_threshold=settings.RAG_SEMANTIC_CACHE_THRESHOLD,
+            max_entries=settings.RAG_SEMANTIC_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.RAG_SEMANTIC_CACHE_TTL,
+            version_key=cls.KB_VERSION_KEY,
+        )
+
+    @classmethod
+    def permission_scope(cls, permissions: Optional[Iterable[str]]) -> str:
+        """Canonical scope string for a set of roles/permissions."""
+        if not permissions:
+            return cls.PUBLIC_SCOPE
+        return ",".join(sorted(set(permissions)))
+
+    def _scope_id(self, permissions: Optional[Iterable[str]], create: bool) -> Optional[int]:
+        scope = f"{self.kb_version}|{self.permission_scope(permissions)}"
+        scope_id = self._scopes.get(scope)
+        if scope_id is None and create:
+            scope_id = self._scopes[scope] = len(self._scopes)
+        return scope_id
+
+    def _normalize(self, embedding: List[float]) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32)
+        if vector.ndim != 1 or (self._vectors is not None and vector.shape[0] != self._vectors.shape[1]):
+            return None
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0:
+            return None
+        return vector / norm
+
+    def _best_match(self, vector: np.ndarray, scope_id: int) -> Tuple[int, float]:
+        sims = self._vectors[: self._size] @ vector
+        sims[self._scope_ids[: self._size] != scope_id] = -np.inf
+        idx = int(np.argmax(sims))
+        return idx, float(sims[idx])
+
+    def _free(self, idx: int) -> None:
+        self._scope_ids[idx] = -1
+        self._entries[idx] = None
+        self._last_used[idx] = 0.0
+
+    def lookup(
+        self, embedding: List[float], permissions: Optional[Iterable[str]] = None
+    ) -> Optional[Tuple[SemanticCacheEntry, float]]:
+        """Find a cached answer for a near-duplicate query.
+
+        Args:
+            embedding: Query embedding
+            permissions: Caller's roles/permissions; only entries stored under
+                the same set (and current KB version) can match
+
+        Returns:
+            (entry, similarity) on a hit, otherwise None
+        """
+        scope_id = self._scope_id(permissions, create=False)
+        vector = self._normalize(embedding) if self._size else None
+        if scope_id is None or vector is None:
+            return self._miss()
+
+        idx, similarity = self._best_match(vector, scope_id)
+        if similarity < self.similarity_threshold:
+            return self._miss()
+
+        entry = self._entries[idx]
+        now = time.monotonic()
+        if now - entry.created_at > self.ttl_seconds:
+            self._free(idx)
+            return self._miss()
+
+        entry.hits += 1
+        self._last_used[idx] = now
+        self.hits += 1
+        self.saved_tokens += entry.tokens
+        rag_cache_hits_total.labels(cache_type="semantic_answer").inc()
+        rag_semantic_cache_saved_tokens_total.inc(entry.tokens)
+        return entry, similarity
+
+    def _miss(self) -> None:
+        self.misses += 1
+        rag_cache_misses_total.labels(cache_type="semantic_answer").inc()
+        return None
+
+    def store(
+        self,
+        query: str,
+        embedding: List[float],
+        payload: Dict[str, Any],
+        tokens: int = 0,
+        permissions: Optional[Iterable[str]] = None,
+        kb_version: Optional[int] = None,
+    ) -> bool:
+        """Cache an answer under the query's embedding.
+
+        A near-duplicate already cached in the same scope is replaced rather
+        than duplicated.
+
+        Args:
+            query: Query text (kept for debugging and traces)
+            embedding: Query embedding
+            payload: Answer data returned on later hits
+            tokens: LLM tokens the answer cost; counted as saved on each hit
+            permissions: Roles/permissions the answer was produced under
+            kb_version: KB version the answer was retrieved under; if the
+                cache has since moved on, the answer is stale and not stored
+
+        Returns:
+            True if stored, False if the embedding was unusable or the KB changed
+        """
+        if self.max_entries <= 0:
+            return False
+        if kb_version is not None and kb_version != self.kb_version:
+            return False
+        if self._vectors is None:
+            vector = np.asarray(embedding, dtype=np.float32)
+            if vector.ndim != 1 or not vector.shape[0]:
+                return False
+            self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+        vector = self._normalize(embedding)
+        if vector is None:
+            return False
+
+        scope_id = self._scope_id(permissions, create=True)
+        idx = None
+        if self._size:
+            best, similarity = self._best_match(vector, scope_id)
+            if similarity >= self.similarity_threshold:
+                idx = best
+        if idx is None:
+            idx = self._allocate_slot()
+
+        now = time.monotonic()
+        self._vectors[idx] = vector
+        self._scope_ids[idx] = scope_id
+        self._last_used[idx] = now
+        self._entries[idx] = SemanticCacheEntry(
+            query=query,
+            payload=payload,
+            tokens=tokens,
+            scope=self.permission_scope(permissions),
+            created_at=now,
+        )
+        return True
+
+    def _allocate_slot(self) -> int:
+        if self._size < self.max_entries:
+            self._size += 1
+            return self._size - 1
+
+        free = np.flatnonzero(self._scope_ids == -1)
+        if free.size:
+            return int(free[0])
+
+        idx = int(np.argmin(self._last_used))
+        self._free(idx)
+        self.evictions += 1
+        return idx
+
+    def bump_kb_version(self) -> int:
+        """Advance the KB version and drop all cached answers."""
+        self.kb_version += 1
+        self.clear()
+        return self.kb_version
+
+    def _adopt_kb_version(self, version: int) -> None:
+        if version != self.kb_version:
+            self.kb_version = version
+            self.clear()
+
+    async def sync_kb_version(self) -> bool:
+        """Pick up KB version bumps made by other workers.
+
+        Returns:
+            False if the shared version could not be read; the cache must
+            not be used then, since it may hold answers from an older KB
+        """
+        if self.version_key is None:
+            return True
+        try:
+            redis_client = await cache_service.get_redis_client()
+            raw = await redis_client.get(self.version_key)
+        except Exception as e:
+            logger.warning(f"Semantic answer cache bypassed, KB version unavailable: {e}")
+            return False
+        self._adopt_kb_version(int(raw or 0))
+        return True
+
+    async def publish_kb_version(self) -> int:
+        """Advance the shared KB version and drop all cached answers.
+
+        Falls back to a local bump if Redis is unreachable; other workers
+        then bypass their caches until it is back (see ``sync_kb_version``).
+        """
+        if self.version_key is None:
+            return self.bump_kb_version()
+        try:
+            redis_client = await cache_service.get_redis_client()
+            self._adopt_kb_version(int(await redis_client.incr(self.version_key)))
+        except Exception as e:
+            logger.error(f"Failed to publish KB version, bumping locally: {e}")
+            self.bump_kb_version()
+        return self.kb_version
+
+    def clear(self) -> None:
+        """Drop all entries (counters are kept)."""
+        self._scope_ids.fill(-1)
+        self._last_used.fill(0.0)
+        self._entries = [None] * self.max_entries
+        self._scopes.clear()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._scope_ids[: self._size] != -1))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit rate and LLM tokens saved."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "kb_version": self.kb_version,
+            "similarity_threshold": self.similarity_threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "saved_tokens": self.saved_tokens,
+            "evictions": self.evictions,
+        }
+
 
 class RAGCache:
     """Cache manager for RAG operations.
@@ -69,8 +384,9 @@ class RAGCache:
     - Query embeddings (to avoid redundant OpenAI API calls)
     - Search results (to avoid repeated vector database queries)
     - Document metadata (for quick access to document info)
+    - Answers to near-duplicate queries (SemanticAnswerCache, in-process)
 
-    All caches use the shared cache_service with appropriate namespaces and TTLs.
+    All other caches use the shared cache_service with appropriate namespaces and TTLs.
     """
 
     # Cache TTLs (in seconds)
@@ -82,10 +398,13 @@ class RAGCache:
     EMBEDDING_NAMESPACE = "rag_embedding"
     SEARCH_NAMESPACE = "rag_search"
     DOCUMENT_NAMESPACE = "rag_doc"
+    # Late search leg results cached by hybrid_search_service.gather_search_legs
+    LATE_LEG_NAMESPACES = ("hybrid_leg", "multi_hop_leg")
 
-    def __init__(self):
+    def __init__(self, semantic_cache: Optional[SemanticAnswerCache] = None):
         """Initialize RAG cache manager."""
         self.logger = get_logger(__name__)
+        self.semantic_cache = semantic_cache if semantic_cache is not None else SemanticAnswerCache.from_settings()
 
     def _normalize_query(self, query: str) -> str:
         """Normalize query text for consistent cache keys.
@@ -352,6 +671,8 @@ class RAGCache:
             # Invalidate all search results (they may contain this document)
             # This is aggressive but ensures consistency
             await cache_service.delete_pattern(f"{self.SEARCH_NAMESPACE}:*")
+            await self._invalidate_late_legs()
+            await self.semantic_cache.publish_kb_version()
 
             rag_cache_invalidations_total.labels(invalidation_type="document").inc()
 
@@ -365,6 +686,13 @@ class RAGCache:
             )
             return False
 
+    async def _invalidate_late_legs(self) -> int:
+        """Drop cached late search leg results; they may cite changed documents."""
+        count = 0
+        for namespace in self.LATE_LEG_NAMESPACES:
+            count += await cache_service.delete_pattern(f"{namespace}:*")
+        return count
+
     async def invalidate_search_results(self) -> int:
         """Invalidate all search result caches.
 
@@ -375,6 +703,8 @@ class RAGCache:
         """
         try:
             count = await cache_service.delete_pattern(f"{self.SEARCH_NAMESPACE}:*")
+            count += await self._invalidate_late_legs()
+            await self.semantic_cache.publish_kb_version()
 
             rag_cache_invalidations_total.labels(invalidation_type="pattern").inc()
 
@@ -394,7 +724,9 @@ class RAGCache:
         try:
             embeddings_count = await cache_service.delete_pattern(f"{self.EMBEDDING_NAMESPACE}:*")
             search_count = await cache_service.delete_pattern(f"{self.SEARCH_NAMESPACE}:*")
+            search_count += await self._invalidate_late_legs()
             documents_count = await cache_service.delete_pattern(f"{self.DOCUMENT_NAMESPACE}:*")
+            await self.semantic_cache.publish_kb_version()
 
             rag_cache_invalidations_total.labels(invalidation_type="all").inc()
 
@@ -432,6 +764,7 @@ class RAGCache:
                 "namespace": self.DOCUMENT_NAMESPACE,
                 "ttl_seconds": self.DOCUMENT_META_TTL,
             },
+            "semantic_answers": self.semantic_cache.get_stats(),
         }
 
 
@@ -22,8 +22,9 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import time
 from datetime import datetime, timezone
-from typing import Awaitable, Callable, List, Optional
+from typing import Awaitable, Callable, Iterable, List, Optional
 
 from app.core.config import settings
 from app.services.intent_classifier import IntentClassifier
@@ -33,6 +34,7 @@ from app.services.openai_realtime_client import OpenAIRealtimeClient
 from app.services.phi_detector import PHIDetector
 from app.services.prompt_service import prompt_service
 from app.services.query_expansion import QueryExpansionConfig, QueryExpansionService
+from app.services.rag_cache import SemanticAnswerCache, rag_cache
 from app.services.realtime_voice_service import realtime_voice_service
 from app.services.search_aggregator import SearchAggregator
 from pydantic import BaseModel, Field
@@ -125,6 +127,8 @@ class QueryOrchestrator:
         model_registry: ModelAdapterRegistry | None = None,
         enable_tools: bool = True,
         max_tool_iterations: int = 5,
+        enable_semantic_cache: bool | None = None,
+        semantic_cache: SemanticAnswerCache | None = None,
     ):
         """
         Initialize QueryOrchestrator with RAG support.
@@ -135,6 +139,9 @@ class QueryOrchestrator:
             rag_score_threshold: Minimum similarity score for results
             enable_tools: Whether to enable function calling/tools
             max_tool_iterations: Maximum number of tool execution loops
+            enable_semantic_cache: Serve near-duplicate queries from cached answers
+                (defaults to settings.RAG_SEMANTIC_CACHE_ENABLED)
+            semantic_cache: Answer cache to use (defaults to the shared rag_cache one)
         """
         self.llm_client = LLMClient(
             cloud_model="gpt-4o",
@@ -160,6 +167,11 @@ class QueryOrchestrator:
         self.model_registry = model_registry or ModelAdapterRegistry()
         self.enable_tools = enable_tools and TOOLS_AVAILABLE
         self.max_tool_iterations = max_tool_iterations
+        if enable_semantic_cache is None:
+            enable_semantic_cache = settings.RAG_SEMANTIC_CACHE_ENABLED
+        if semantic_cache is None and enable_semantic_cache:
+            semantic_cache = rag_cache.semantic_cache
+        self.semantic_cache = semantic_cache if enable_semantic_cache else None
 
     async def _execute_tool_call(
         self,
@@ -228,21 +240,27 @@ class QueryOrchestrator:
         sub_queries = [query]
         if self.enable_multi_hop and self.enable_query_decomposition:
             try:
-                sub_queries = await self.query_expander.decompose(query)
+                sub_queries = await self.query_expander.decompose(query) or [query]
             except Exception:
                 sub_queries = [query]
 
-        hop_traces: List[dict] = []
-        aggregated_results = []
-
-        for hop_idx, sub_query in enumerate(sub_queries, start=1):
-            hop_results = await self.search_aggregator.search(
-                query=sub_query,
+        if len(sub_queries) > 1:
+            aggregated_results, hop_traces = await self._run_multi_hop_retrieval(sub_queries)
+        else:
+            hop_start = time.perf_counter()
+            aggregated_results = await self.search_aggregator.search(
+                query=sub_queries[0],
                 top_k=self.rag_top_k,
                 score_threshold=self.rag_score_threshold,
             )
-            hop_traces.append({"hop": hop_idx, "query": sub_query, "results": len(hop_results)})
-            aggregated_results.extend(hop_results)
+            hop_traces = [
+                {
+                    "hop": 1,
+                    "query": sub_queries[0],
+                    "results": len(aggregated_results),
+                    "search_ms": round((time.perf_counter() - hop_start) * 1000, 2),
+                }
+            ]
 
         synthesized_context = ""
         if aggregated_results:
@@ -257,6 +275,139 @@ class QueryOrchestrator:
             self.search_aggregator.confidence_score(aggregated_results),
         )
 
+    async def _run_multi_hop_retrieval(self, sub_queries: List[str]) -> tuple[list, List[dict]]:
+        """Retrieve all hops concurrently from one batched embeddings call.
+
+        Chunks returned by more than one hop are kept once, at their best
+        score, and attributed to the first hop that found them.
+        """
+        embed_start = time.perf_counter()
+        try:
+            embeddings = await self.search_aggregator.generate_query_embeddings(sub_queries)
+        except Exception as e:
+            # Fall back to per-hop embedding inside search()
+            logging.warning(f"Batched sub-query embedding failed, embedding per hop: {e}")
+            embeddings = [None] * len(sub_queries)
+        embedding_ms = round((time.perf_counter() - embed_start) * 1000, 2)
+
+        async def run_hop(sub_query: str, embedding: Optional[List[float]]) -> tuple[list, float]:
+            hop_start = time.perf_counter()
+            hop_results = await self.search_aggregator.search(
+                query=sub_query,
+                top_k=self.rag_top_k,
+                score_threshold=self.rag_score_threshold,
+                query_embedding=embedding,
+            )
+            return hop_results, round((time.perf_counter() - hop_start) * 1000, 2)
+
+        hop_outputs = await asyncio.gather(*(run_hop(q, emb) for q, emb in zip(sub_queries, embeddings)))
+
+        hop_traces: List[dict] = []
+        by_chunk: dict = {}
+        for hop_idx, (sub_query, (hop_results, search_ms)) in enumerate(zip(sub_queries, hop_outputs), start=1):
+            new_results = 0
+            for result in hop_results:
+                existing = by_chunk.get(result.chunk_id)
+                if existing is None:
+                    by_chunk[result.chunk_id] = result
+                    new_results += 1
+                elif result.score > existing.score:
+                    by_chunk[result.chunk_id] = result
+            hop_traces.append(
+                {
+                    "hop": hop_idx,
+                    "query": sub_query,
+                    "results": len(hop_results),
+                    "new_results": new_results,
+                    "embedding_ms": embedding_ms,
+                    "search_ms": search_ms,
+                }
+            )
+
+        return list(by_chunk.values()), hop_traces
+
+    async def _lookup_semantic_cache(
+        self,
+        request: QueryRequest,
+        clinical_context: Optional[dict],
+        permissions: Optional[Iterable[str]],
+    ) -> tuple[Optional[List[float]], Optional[int], Optional[tuple]]:
+        """Return (query embedding, KB version, cache match) for queries eligible for the answer cache.
+
+        Patient-specific queries (clinical context or PHI in the text) are
+        never served from or written to the shared cache; for those the
+        embedding is None. The KB version is the one the lookup ran under,
+        so an answer generated while the KB changes is not stored as current.
+        """
+        if self.semantic_cache is None or not self.enable_rag or not self.search_aggregator:
+            return None, None, None
+        if clinical_context or request.clinical_context_id:
+            return None, None, None
+        if self.phi_detector.detect(text=request.query).contains_phi:
+            return None, None, None
+        if not await self.semantic_cache.sync_kb_version():
+            return None, None, None
+        kb_version = self.semantic_cache.kb_version
+
+        try:
+            # Cached by the aggregator, so the retrieval stage reuses it on a miss
+            embedding = await self.search_aggregator.generate_query_embedding(request.query)
+        except Exception as e:
+            logging.warning(f"Semantic cache lookup skipped, embedding failed: {e}")
+            return None, None, None
+        return embedding, kb_version, self.semantic_cache.lookup(embedding, permissions=permissions)
+
+    @staticmethod
+    def _response_from_cache(request: QueryRequest, match: tuple, message_id: str, now: datetime) -> QueryResponse:
+        """Build a QueryResponse from a semantic cache hit."""
+        entry, similarity = match
+        return QueryResponse(
+            session_id=request.session_id or "session-stub",
+            message_id=message_id,
+            created_at=now,
+            tokens=0,
+            reasoning_path=[
+                {
+                    "type": "semantic_cache",
+                    "similarity": round(similarity, 4),
+                    "cached_query": entry.query,
+                    "saved_tokens": entry.tokens,
+                }
+            ],
+            **entry.payload,
+        )
+
+    def _store_semantic_cache(
+        self,
+        request: QueryRequest,
+        embedding: Optional[List[float]],
+        response: QueryResponse,
+        permissions: Optional[Iterable[str]],
+        kb_version: Optional[int],
+    ) -> None:
+        """Cache a completed answer for near-duplicate queries, unless the KB changed meanwhile."""
+        if embedding is None or not response.answer:
+            return
+        payload = response.model_dump(
+            include={
+                "answer",
+                "citations",
+                "model",
+                "model_provider",
+                "model_confidence",
+                "retrieval_confidence",
+                "finish_reason",
+            }
+        )
+        self.semantic_cache.store(
+            request.query,
+            embedding,
+            payload,
+            tokens=response.tokens or 0,
+            permissions=permissions,
+            kb_version=kb_version,
+        )
+
     async def _prepare_llm_request(
         self,
         request: QueryRequest,
@@ -415,6 +566,7 @@ class QueryOrchestrator:
         clinical_context: Optional[dict] = None,
         trace_id: Optional[str] = None,
         user_id: Optional[str] = None,
+        permissions: Optional[Iterable[str]] = None,
     ) -> QueryResponse:
         """Handle a clinician query with full RAG pipeline and tool support.
 
@@ -431,6 +583,7 @@ class QueryOrchestrator:
             clinical_context: Optional clinical context dict with patient info
             trace_id: Trace ID for logging
             user_id: User identifier for tool execution context
+            permissions: Caller's roles; scopes the semantic answer cache
 
         Returns:
             QueryResponse with answer and citations
@@ -438,6 +591,13 @@ class QueryOrchestrator:
         now = datetime.now(timezone.utc)
         message_id = f"msg-{int(now.timestamp())}"
 
+        query_embedding, kb_version, cache_match = await self._lookup_semantic_cache(
+            request, clinical_context, permissions
+        )
+        if cache_match is not None:
+            logging.info(f"Semantic answer cache hit (similarity={cache_match[1]:.3f}), trace_id={trace_id}")
+            return self._response_from_cache(request, cache_match, message_id, now)
+
         (
             llm_request,
             search_results,
@@ -576,7 +736,7 @@ class QueryOrchestrator:
                     )
                 )
 
-        return QueryResponse(
+        response = QueryResponse(
             session_id=request.session_id or "session-stub",
             message_id=message_id,
             answer=llm_response.text,
@@ -590,6 +750,10 @@ class QueryOrchestrator:
             reasoning_path=reasoning_path,
             finish_reason=llm_response.finish_reason,
         )
+        # Tool results can be user-specific, so only plain answers are shared
+        if iteration == 0 and not llm_response.tool_calls:
+            self._store_semantic_cache(request, query_embedding, response, permissions, kb_version)
+        return response
 
     async def prepare_realtime_session(
         self,
@@ -618,6 +782,7 @@ class QueryOrchestrator:
         clinical_context: Optional[dict] = None,
         trace_id: Optional[str] = None,
         on_chunk: Optional[Callable[[str], Awaitable[None]]] = None,
+        permissions: Optional[Iterable[str]] = None,
     ) -> QueryResponse:
         """Stream a clinician query with RAG support.
 
@@ -626,6 +791,7 @@ class QueryOrchestrator:
             clinical_context: Optional clinical context dict with patient info
             trace_id: Trace ID for logging
             on_chunk: Callback invoked per text delta
+            permissions: Caller's roles; scopes the semantic answer cache
 
         Returns:
             QueryResponse with full answer and citations
@@ -633,6 +799,21 @@ class QueryOrchestrator:
         now = datetime.now(timezone.utc)
         message_id = f"msg-{int(now.timestamp())}"
 
+        async def _emit_chunk(text: str):
+            if on_chunk:
+                result = on_chunk(text)
+                if asyncio.iscoroutine(result):
+                    await result
+
+        query_embedding, kb_version, cache_match = await self._lookup_semantic_cache(
+            request, clinical_context, permissions
+        )
+        if cache_match is not None:
+            logging.info(f"Semantic answer cache hit (similarity={cache_match[1]:.3f}), trace_id={trace_id}")
+            response = self._response_from_cache(request, cache_match, message_id, now)
+            await _emit_chunk(response.answer)
+            return response
+
         (
             llm_request,
             search_results,
@@ -644,12 +825,6 @@ class QueryOrchestrator:
             retrieval_confidence,
         ) = await self._prepare_llm_request(request=request, clinical_context=clinical_context, trace_id=trace_id)
 
-        async def _emit_chunk(text: str):
-            if on_chunk:
-                result = on_chunk(text)
-                if asyncio.iscoroutine(result):
-                    await result
-
         llm_response: LLMResponse = await self.llm_client.stream_generate(llm_request, on_chunk=_emit_chunk)
 
         citations: List[Citation] = []
@@ -677,7 +852,7 @@ class QueryOrchestrator:
                     )
                 )
 
-        return QueryResponse(
+        response = QueryResponse(
             session_id=request.session_id or "session-stub",
             message_id=message_id,
             answer=llm_response.text,
@@ -691,3 +866,6 @@ class QueryOrchestrator:
             reasoning_path=reasoning_path,
             finish_reason=llm_response.finish_reason,
         )
+        if not llm_response.tool_calls:
+            self._store_semantic_cache(request, query_embedding, response, permissions, kb_version)
+        return response
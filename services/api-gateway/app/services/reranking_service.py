@@ -7,8 +7,10 @@ Features:
 - Cross-encoder scoring (query-document pair classification)
 - Multiple re-ranking strategies
 - Cohere Rerank API integration
-- Local cross-encoder model support (sentence-transformers)
+- Local cross-encoder model support (sentence-transformers, torch or ONNX),
+  micro-batched across concurrent queries on a shared inference thread
 - Score calibration and normalization
+- MMR diversity over embedding or SimHash similarity matrices
 
 Re-ranking improves precision by scoring each document
 against the query, rather than relying only on embedding similarity.
@@ -18,10 +20,15 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from enum import Enum
 from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 from app.core.config import settings
 from app.services.cache_service import cache_service, generate_cache_key
 from openai import AsyncOpenAI
@@ -50,6 +57,15 @@ class RerankerType(str, Enum):
     NONE = "none"  # No re-ranking
 
 
+class DiversityMethod(str, Enum):
+    """Pairwise similarity used for diversity (MMR) selection."""
+
+    AUTO = "auto"  # Embeddings when every candidate has one, else SimHash
+    EMBEDDING = "embedding"  # Cosine over chunk embedding vectors
+    SIMHASH = "simhash"  # 64-bit SimHash over content tokens (no vectors needed)
+    JACCARD = "jaccard"  # Word-set Jaccard (original behaviour)
+
+
 @dataclass
 class RerankedResult:
     """Result with re-ranking score."""
@@ -73,6 +89,7 @@ class RerankerConfig:
     score_weight: float = 0.7  # Weight for rerank score vs original
     min_relevance_score: float = 0.0
     cache_ttl: int = 3600  # Cache TTL in seconds
+    diversity_method: DiversityMethod = DiversityMethod.AUTO  # Similarity for rerank_with_diversity
 
 
 class CohereReranker:
@@ -156,46 +173,63 @@ class OpenAIReranker:
     between query and document embeddings. Less accurate than
     cross-encoders but doesn't require additional API calls if
     embeddings are cached.
+
+    All documents that need embedding go out in one batched request;
+    documents whose vectors came back with the search results (Qdrant
+    ``with_vectors``) are not re-embedded. Similarities are one
+    matrix-vector product.
     """
 
+    MAX_DOCUMENT_CHARS = 8000  # Truncate long docs before embedding
+
     def __init__(
         self,
         model: str = "text-embedding-3-small",
+        client: Optional[Any] = None,
     ):
+        """
+        Args:
+            model: OpenAI embedding model
+            client: Object exposing ``embeddings.create`` (defaults to the shared
+                AsyncOpenAI client; pass a stub for offline benchmarking)
+        """
         self.model = model
-
-    async def _get_embedding(self, text: str) -> List[float]:
-        """Get embedding for text."""
-        import openai
-
-        response = await openai.embeddings.create(
-            model=self.model,
-            input=text,
-        )
-        return response.data[0].embedding
-
-    def _cosine_similarity(
-        self,
-        vec1: List[float],
-        vec2: List[float],
-    ) -> float:
-        """Compute cosine similarity between two vectors."""
-        import math
-
-        dot_product = sum(a * b for a, b in zip(vec1, vec2))
-        norm1 = math.sqrt(sum(a * a for a in vec1))
-        norm2 = math.sqrt(sum(b * b for b in vec2))
-
-        if norm1 == 0 or norm2 == 0:
-            return 0.0
-
-        return dot_product / (norm1 * norm2)
+        self._client = client
+
+    async def _get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Embed several texts with a single API call."""
+        client = self._client or get_async_openai_client()
+        response = await client.embeddings.create(model=self.model, input=texts)
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+        for position, item in enumerate(response.data):
+            embeddings[getattr(item, "index", position)] = item.embedding
+        return embeddings
+
+    async def _get_query_embedding(self, query: str) -> List[float]:
+        """Query embedding, shared with SearchAggregator's embedding cache."""
+        cache_key = generate_cache_key("rag_embedding", query, model=self.model)
+        cached = await cache_service.get(cache_key)
+        if cached is not None:
+            return cached
+        embedding = (await self._get_embeddings([query]))[0]
+        await cache_service.set(cache_key, embedding, ttl=86400)
+        return embedding
+
+    @staticmethod
+    def _cosine_similarities(query_embedding: List[float], document_embeddings: List[List[float]]) -> np.ndarray:
+        """Cosine similarity of the query against every document row."""
+        matrix = np.asarray(document_embeddings, dtype=np.float32)
+        query_vec = np.asarray(query_embedding, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query_vec)
+        dots = matrix @ query_vec
+        return np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
 
     async def rerank(
         self,
         query: str,
         documents: List[str],
         top_n: int = 10,
+        document_embeddings: Optional[List[Optional[List[float]]]] = None,
     ) -> List[Tuple[int, float]]:
         """
         Re-rank using embedding similarity.
@@ -204,24 +238,34 @@ class OpenAIReranker:
             query: Search query
             documents: List of document texts
             top_n: Number of top results to return
+            document_embeddings: Optional precomputed vectors aligned with
+                ``documents``; None entries are embedded
 
         Returns:
             List of (original_index, score) tuples
         """
+        if not documents:
+            return []
+
         try:
-            # Get query embedding
-            query_embedding = await self._get_embedding(query)
+            embeddings = list(document_embeddings or [None] * len(documents))
+            missing = [i for i, emb in enumerate(embeddings) if emb is None]
+
+            if missing:
+                query_embedding, fetched = await asyncio.gather(
+                    self._get_query_embedding(query),
+                    self._get_embeddings([documents[i][: self.MAX_DOCUMENT_CHARS] for i in missing]),
+                )
+                for i, emb in zip(missing, fetched):
+                    embeddings[i] = emb
+            else:
+                query_embedding = await self._get_query_embedding(query)
 
-            # Get document embeddings (could batch this)
-            scores = []
-            for i, doc in enumerate(documents):
-                doc_embedding = await self._get_embedding(doc[:8000])  # Truncate long docs
-                similarity = self._cosine_similarity(query_embedding, doc_embedding)
-                scores.append((i, similarity))
+            similarities = self._cosine_similarities(query_embedding, embeddings)
 
-            # Sort by score
-            scores.sort(key=lambda x: x[1], reverse=True)
-            return scores[:top_n]
+            # Stable sort keeps original order among ties
+            order = np.argsort(-similarities, kind="stable")[:top_n]
+            return [(int(i), float(similarities[i])) for i in order]
 
         except Exception as e:
             logger.error(f"OpenAI rerank error: {e}")
@@ -293,42 +337,244 @@ Relevance score (0-10):"""
         return scores[:top_n]
 
 
-class CrossEncoderReranker:
-    """
-    Re-ranker using local cross-encoder model.
+@dataclass
+class _PendingPairs:
+    """Pairs from one rerank call waiting for a micro-batch."""
 
-    Uses sentence-transformers cross-encoder models for scoring.
-    Requires GPU for efficient inference.
+    pairs: List[Tuple[str, str]]
+    future: asyncio.Future
+    enqueued_at: float
 
-    Models:
-    - cross-encoder/ms-marco-MiniLM-L-6-v2: Fast, general purpose
-    - cross-encoder/ms-marco-MiniLM-L-12-v2: More accurate
-    - cross-encoder/ms-marco-TinyBERT-L-2-v2: Fastest, less accurate
+
+class CrossEncoderWorker:
+    """
+    Shared cross-encoder scoring worker.
+
+    The model is loaded once, on a dedicated inference thread, and every
+    predict call runs there, off the event loop. Pairs from concurrent
+    rerank calls are coalesced: the first request opens a short window
+    (``batch_window_ms``) and everything that arrives within it, up to
+    ``max_batch_pairs``, is scored in one predict call. A single inference
+    thread keeps the model from being run concurrently against itself;
+    torch and onnxruntime release the GIL while computing.
+
+    Backends:
+    - torch: sentence-transformers CrossEncoder
+    - onnx: the same model exported to ONNX (optionally a quantized file,
+      e.g. ``onnx/model_qint8_avx512.onnx``) for CPU inference
     """
 
     def __init__(
         self,
         model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
         device: str = "cpu",
+        backend: str = "torch",
+        onnx_file_name: Optional[str] = None,
+        batch_window_ms: float = 5.0,
+        max_batch_pairs: int = 256,
+        model: Optional[Any] = None,
     ):
+        """
+        Args:
+            model_name: Hugging Face cross-encoder model
+            device: Inference device
+            backend: "torch" or "onnx"
+            onnx_file_name: ONNX file within the model repo (quantized variants)
+            batch_window_ms: How long the first request waits for others to join
+            max_batch_pairs: Upper bound on pairs per predict call
+            model: Preloaded object exposing ``predict(pairs)`` (skips loading)
+        """
         self.model_name = model_name
         self.device = device
-        self._model = None
-
-    async def _get_model(self):
-        """Load cross-encoder model lazily."""
+        self.backend = backend
+        self.onnx_file_name = onnx_file_name
+        self.batch_window_ms = batch_window_ms
+        self.max_batch_pairs = max_batch_pairs
+        self._model = model
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cross-encoder")
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.batches = 0
+        self.pairs_scored = 0
+        self._queue_waits_ms: deque = deque(maxlen=1000)
+
+    def _load_model(self):
+        """Load the model (runs on the inference thread)."""
         if self._model is None:
             try:
                 from sentence_transformers import CrossEncoder
-
-                self._model = CrossEncoder(self.model_name, device=self.device)
             except ImportError:
                 logger.warning(
                     "sentence-transformers not installed. " "Install with: pip install sentence-transformers"
                 )
                 raise
+
+            kwargs: Dict[str, Any] = {"device": self.device}
+            if self.backend != "torch":
+                kwargs["backend"] = self.backend
+                if self.onnx_file_name:
+                    kwargs["model_kwargs"] = {"file_name": self.onnx_file_name}
+            self._model = CrossEncoder(self.model_name, **kwargs)
         return self._model
 
+    def _predict(self, pairs: List[Tuple[str, str]]) -> np.ndarray:
+        """Score pairs (runs on the inference thread)."""
+        model = self._load_model()
+        return np.asarray(model.predict(pairs), dtype=np.float32).reshape(-1)
+
+    def _ensure_running(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run())
+
+    async def score(self, pairs: List[Tuple[str, str]]) -> np.ndarray:
+        """
+        Score query-document pairs, batched with concurrent callers.
+
+        Args:
+            pairs: (query, document) pairs
+
+        Returns:
+            Raw model scores aligned with ``pairs``
+        """
+        if not pairs:
+            return np.zeros(0, dtype=np.float32)
+        self._ensure_running()
+        future = self._loop.create_future()
+        await self._queue.put(_PendingPairs(list(pairs), future, time.perf_counter()))
+        return await future
+
+    async def _run(self) -> None:
+        """Collect requests into micro-batches and score them."""
+        while True:
+            try:
+                batch = [await self._queue.get()]
+                size = len(batch[0].pairs)
+                deadline = time.perf_counter() + self.batch_window_ms / 1000
+
+                while size < self.max_batch_pairs:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    try:
+                        pending = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+                    except asyncio.TimeoutError:
+                        break
+                    batch.append(pending)
+                    size += len(pending.pairs)
+
+                await self._score_batch(batch)
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Cross-encoder worker error: {e}")
+
+    async def _score_batch(self, batch: List[_PendingPairs]) -> None:
+        started = time.perf_counter()
+        all_pairs = [pair for pending in batch for pair in pending.pairs]
+        try:
+            scores = await self._loop.run_in_executor(self._executor, self._predict, all_pairs)
+        except Exception as e:
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.pairs_scored += len(all_pairs)
+        offset = 0
+        for pending in batch:
+            n = len(pending.pairs)
+            self._queue_waits_ms.append((started - pending.enqueued_at) * 1000)
+            if not pending.future.done():
+                pending.future.set_result(scores[offset : offset + n])
+            offset += n
+
+    async def stop(self) -> None:
+        """Stop the batching task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Batching statistics."""
+        waits = sorted(self._queue_waits_ms)
+        return {
+            "backend": self.backend,
+            "batches": self.batches,
+            "pairs_scored": self.pairs_scored,
+            "avg_batch_pairs": self.pairs_scored / self.batches if self.batches else 0.0,
+            "queue_wait_ms_p99": waits[min(len(waits) - 1, int(len(waits) * 0.99))] if waits else 0.0,
+        }
+
+
+_cross_encoder_workers: Dict[Tuple[str, str, str, Optional[str]], CrossEncoderWorker] = {}
+
+
+def get_cross_encoder_worker(
+    model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+    device: str = "cpu",
+    backend: Optional[str] = None,
+    onnx_file_name: Optional[str] = None,
+) -> CrossEncoderWorker:
+    """Get the process-wide worker for a model, creating it on first use."""
+    backend = backend or settings.RERANKER_CROSS_ENCODER_BACKEND
+    onnx_file_name = onnx_file_name or settings.RERANKER_CROSS_ENCODER_ONNX_FILE
+    key = (model_name, device, backend, onnx_file_name)
+    worker = _cross_encoder_workers.get(key)
+    if worker is None:
+        worker = _cross_encoder_workers[key] = CrossEncoderWorker(
+            model_name=model_name,
+            device=device,
+            backend=backend,
+            onnx_file_name=onnx_file_name,
+            batch_window_ms=settings.RERANKER_BATCH_WINDOW_MS,
+            max_batch_pairs=settings.RERANKER_MAX_BATCH_PAIRS,
+        )
+    return worker
+
+
+class CrossEncoderReranker:
+    """
+    Re-ranker using local cross-encoder model.
+
+    Uses sentence-transformers cross-encoder models for scoring.
+    Scoring goes through a shared CrossEncoderWorker, so the model is
+    loaded once per process and concurrent queries are micro-batched.
+
+    Models:
+    - cross-encoder/ms-marco-MiniLM-L-6-v2: Fast, general purpose
+    - cross-encoder/ms-marco-MiniLM-L-12-v2: More accurate
+    - cross-encoder/ms-marco-TinyBERT-L-2-v2: Fastest, less accurate
+    """
+
+    def __init__(
+        self,
+        model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+        device: str = "cpu",
+        worker: Optional[CrossEncoderWorker] = None,
+    ):
+        self.model_name = model_name
+        self.device = device
+        self._worker = worker
+
+    @property
+    def worker(self) -> CrossEncoderWorker:
+        """Shared scoring worker for this model."""
+        if self._worker is None:
+            self._worker = get_cross_encoder_worker(self.model_name, self.device)
+        return self._worker
+
     async def rerank(
         self,
         query: str,
@@ -347,24 +593,13 @@ class CrossEncoderReranker:
             List of (original_index, score) tuples
         """
         try:
-            model = await self._get_model()
-
-            # Create query-document pairs
-            pairs = [[query, doc] for doc in documents]
-
-            # Score all pairs (run in thread to avoid blocking)
-            scores = await asyncio.to_thread(model.predict, pairs)
+            scores = await self.worker.score([(query, doc) for doc in documents])
 
             # Normalize scores to 0-1 using sigmoid
-            import math
-
-            normalized_scores = [1 / (1 + math.exp(-s)) for s in scores]
+            normalized_scores = 1.0 / (1.0 + np.exp(-scores))
 
-            # Create (index, score) tuples and sort
-            indexed_scores = list(enumerate(normalized_scores))
-            indexed_scores.sort(key=lambda x: x[1], reverse=True)
-
-            return indexed_scores[:top_n]
+            order = np.argsort(-normalized_scores, kind="stable")[:top_n]
+            return [(int(i), float(normalized_scores[i])) for i in order]
 
         except Exception as e:
             logger.error(f"Cross-encoder rerank error: {e}")
@@ -455,10 +690,18 @@ class RerankingService:
 
         try:
             # Perform re-ranking
+            rerank_kwargs: Dict[str, Any] = {}
+            if self.config.reranker_type == RerankerType.OPENAI:
+                # Reuse vectors fetched with the search results instead of re-embedding
+                embeddings = [r.get("embedding") for r in results]
+                if any(emb is not None for emb in embeddings):
+                    rerank_kwargs["document_embeddings"] = embeddings
+
             rerank_scores = await reranker.rerank(
                 query=query,
                 documents=documents,
                 top_n=self.config.top_n,
+                **rerank_kwargs,
             )
 
             # Build reranked results
@@ -544,7 +787,11 @@ class RerankingService:
         """
         Re-rank with diversity - avoid returning too similar documents.
 
-        Uses Maximal Marginal Relevance (MMR) style diversity.
+        Uses Maximal Marginal Relevance (MMR): each step picks the candidate
+        maximizing ``final_score - diversity_threshold * max_similarity`` to
+        the already selected ones. Pairwise similarities are computed once
+        as a matrix (see ``RerankerConfig.diversity_method``); chunk
+        embeddings are read from each result's ``embedding`` key.
         """
         # First, get standard reranked results
         reranked = await self.rerank(query, results, content_key)
@@ -552,35 +799,67 @@ class RerankingService:
         if len(reranked) <= 1:
             return reranked
 
-        # Apply diversity filter
-        selected = [reranked[0]]
-        candidates = reranked[1:]
-
-        while candidates and len(selected) < self.config.top_n:
-            best_candidate = None
-            best_score = -float("inf")
+        embeddings_by_chunk = {r.get("chunk_id", str(i)): r.get("embedding") for i, r in enumerate(results)}
+        similarity = self._similarity_matrix(reranked, [embeddings_by_chunk.get(r.chunk_id) for r in reranked])
+        relevance = np.array([r.final_score for r in reranked], dtype=np.float64)
+
+        order = self._mmr_select(relevance, similarity, diversity_threshold, self.config.top_n)
+        return [reranked[i] for i in order]
+
+    @staticmethod
+    def _mmr_select(
+        relevance: np.ndarray,
+        similarity: np.ndarray,
+        diversity_weight: float,
+        top_n: int,
+    ) -> List[int]:
+        """Greedy MMR over a precomputed similarity matrix; starts from the most relevant."""
+        n = len(relevance)
+        first = int(np.argmax(relevance))
+        selected = [first]
+        available = np.ones(n, dtype=bool)
+        available[first] = False
+        max_similarity = similarity[first].astype(np.float64, copy=True)
+
+        while len(selected) < min(top_n, n):
+            mmr = np.where(available, relevance - diversity_weight * max_similarity, -np.inf)
+            best = int(np.argmax(mmr))
+            selected.append(best)
+            available[best] = False
+            np.maximum(max_similarity, similarity[best], out=max_similarity)
 
-            for candidate in candidates:
-                # Check similarity to already selected
-                max_similarity = 0.0
-                for selected_doc in selected:
-                    similarity = self._text_similarity(candidate.content, selected_doc.content)
-                    max_similarity = max(max_similarity, similarity)
-
-                # MMR-style score: relevance - lambda * max_similarity
-                mmr_score = candidate.final_score - diversity_threshold * max_similarity
-
-                if mmr_score > best_score:
-                    best_score = mmr_score
-                    best_candidate = candidate
+        return selected
 
-            if best_candidate:
-                selected.append(best_candidate)
-                candidates.remove(best_candidate)
+    def _similarity_matrix(
+        self,
+        reranked: List[RerankedResult],
+        embeddings: List[Optional[List[float]]],
+    ) -> np.ndarray:
+        """Pairwise candidate similarity in [0, 1] using the configured method."""
+        method = self.config.diversity_method
+        if method == DiversityMethod.AUTO:
+            method = DiversityMethod.EMBEDDING if all(e is not None for e in embeddings) else DiversityMethod.SIMHASH
+
+        if method == DiversityMethod.EMBEDDING:
+            if any(e is None for e in embeddings):
+                logger.warning("Embedding diversity requested but some results lack vectors; using SimHash")
             else:
-                break
+                matrix = np.asarray(embeddings, dtype=np.float32)
+                norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                matrix = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+                return np.clip(matrix @ matrix.T, 0.0, 1.0)
+
+        if method == DiversityMethod.JACCARD:
+            n = len(reranked)
+            similarity = np.eye(n)
+            for i in range(n):
+                for j in range(i + 1, n):
+                    similarity[i, j] = similarity[j, i] = self._text_similarity(
+                        reranked[i].content, reranked[j].content
+                    )
+            return similarity
 
-        return selected
+        return _simhash_similarity([_simhash(r.content) for r in reranked])
 
     def _text_similarity(self, text1: str, text2: str) -> float:
         """Simple text similarity using Jaccard index."""
@@ -594,3 +873,36 @@ class RerankingService:
         union = len(words1 | words2)
 
         return intersection / union if union > 0 else 0.0
+
+
+_SIMHASH_BITS = 64
+_SIMHASH_BIT_MASKS = np.uint64(1) << np.arange(_SIMHASH_BITS, dtype=np.uint64)
+
+
+def _simhash(text: str) -> int:
+    """64-bit SimHash of a text's lowercased word tokens."""
+    tokens = text.lower().split()
+    if not tokens:
+        return 0
+    # Two differently seeded CRC32s per token: fast, and stable across processes
+    hashes = np.fromiter(
+        (zlib.crc32(t) | zlib.crc32(t, 0x9E3779B9) << 32 for t in (tok.encode() for tok in tokens)),
+        dtype=np.uint64,
+        count=len(tokens),
+    )
+    bits = (hashes[:, None] & _SIMHASH_BIT_MASKS) != 0
+    votes = bits.sum(axis=0) * 2 - len(tokens)
+    return int(np.bitwise_or.reduce(_SIMHASH_BIT_MASKS[votes > 0], initial=np.uint64(0)))
+
+
+def _simhash_similarity(fingerprints: List[int]) -> np.ndarray:
+    """Pairwise similarity from SimHash Hamming distances.
+
+    SimHash estimates the angle between token-count vectors as
+    ``pi * hamming / 64``; its cosine (clipped at 0) makes unrelated texts
+    score near 0 instead of the ~0.5 raw bit agreement.
+    """
+    values = np.array(fingerprints, dtype=np.uint64)
+    xor = values[:, None] ^ values[None, :]
+    hamming = np.unpackbits(xor.view(np.uint8).reshape(len(values), len(values), 8), axis=2).sum(axis=2)
+    return np.clip(np.cos(np.pi * hamming / _SIMHASH_BITS), 0.0, 1.0)
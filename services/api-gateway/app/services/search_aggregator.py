@@ -168,12 +168,79 @@ class SearchAggregator:
         # If all attempts fail, bubble up the last error
         raise RuntimeError(f"Failed to generate embedding after retries: {last_error}") from last_error
 
+    async def generate_query_embeddings(self, queries: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for several queries with a single API call.
+
+        Cached embeddings are reused; only the misses are sent to the
+        embeddings endpoint, as one batched request.
+
+        Args:
+            queries: Search query texts
+
+        Returns:
+            Embedding vectors in the same order as ``queries``
+        """
+        backoff_seconds = [1, 2, 4]
+
+        embeddings: List[Optional[List[float]]] = [None] * len(queries)
+        cache_keys = [generate_cache_key("rag_embedding", q, model=self.embedding_model) for q in queries]
+        missing: Dict[str, List[int]] = {}
+        for idx, (query, cache_key) in enumerate(zip(queries, cache_keys)):
+            cached_embedding = await cache_service.get(cache_key)
+            if cached_embedding is not None:
+                embeddings[idx] = cached_embedding
+            else:
+                missing.setdefault(query, []).append(idx)
+
+        if not missing:
+            return embeddings
+
+        inputs = list(missing)
+        last_error: Optional[Exception] = None
+        client = get_async_openai_client()
+        for attempt, delay in enumerate(backoff_seconds, start=1):
+            try:
+                start_time = time.time()
+                response = await asyncio.wait_for(
+                    client.embeddings.create(model=self.embedding_model, input=inputs),
+                    timeout=15,
+                )
+                rag_query_duration_seconds.labels(stage="embedding").observe(time.time() - start_time)
+                if getattr(response, "usage", None):
+                    rag_embedding_tokens_total.inc(response.usage.total_tokens)
+
+                # The API may return items out of order; each carries its input index
+                for position, item in enumerate(response.data):
+                    query = inputs[getattr(item, "index", position)]
+                    for idx in missing[query]:
+                        embeddings[idx] = item.embedding
+                    await cache_service.set(cache_keys[missing[query][0]], item.embedding, ttl=86400)
+                return embeddings
+
+            except asyncio.TimeoutError as exc:
+                last_error = exc
+                logger.error("Batch embedding generation timed out (attempt %d)", attempt)
+            except Exception as exc:
+                last_error = exc
+                logger.error(
+                    "Error generating batch embeddings (attempt %d): %s",
+                    attempt,
+                    exc,
+                    exc_info=True,
+                )
+
+            await asyncio.sleep(delay)
+
+        raise RuntimeError(f"Failed to generate embeddings after retries: {last_error}") from last_error
+
     async def search(
         self,
         query: str,
         top_k: int = 5,
         score_threshold: float = 0.7,
         filter_conditions: Optional[Dict[str, Any]] = None,
+        query_embedding: Optional[List[float]] = None,
     ) -> List[SearchResult]:
         """
         Perform semantic search against the knowledge base with caching.
@@ -183,6 +250,7 @@ class SearchAggregator:
             top_k: Number of top results to return
             score_threshold: Minimum similarity score (0-1)
             filter_conditions: Optional filters (e.g., source_type, document_id)
+            query_embedding: Precomputed embedding for ``query`` (skips the embeddings call)
 
         Returns:
             List of search results sorted by relevance
@@ -213,8 +281,9 @@ class SearchAggregator:
             try:
                 start_time = time.time()
 
-                # Generate query embedding
-                query_embedding = await self.generate_query_embedding(query)
+                # Generate query embedding unless the caller already batched it
+                if query_embedding is None:
+                    query_embedding = await self.generate_query_embedding(query)
 
                 # Prepare filter if specified
                 search_filter = None
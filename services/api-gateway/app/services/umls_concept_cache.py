@@ -0,0 +1,346 @@
+"""
+UMLS Concept Cache
+
+Two-level lookup layer for UMLS concept metadata and ontology mappings
+used by entity normalization:
+- L1: bounded in-process LRU (cachetools) of decoded concept records
+- L2: read-only memory-mapped table of CUI -> record, built offline from
+  the UMLS subset shipped with the deployment
+
+Normalizing a long note then costs dictionary lookups (L1) or a binary
+search over the mapped index (L2) instead of repeated linker calls.
+
+Table layout (little-endian):
+    header: magic (8s) | version (I) | count (I) | data_offset (Q)
+    index:  count x [cui (16s, NUL padded) | offset (Q) | length (I)], sorted by CUI
+    data:   UTF-8 JSON records
+
+Build a table with ``scripts/build_umls_concept_table.py``.
+"""
+
+import json
+import mmap
+import os
+import struct
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from app.core.logging import get_logger
+from cachetools import LRUCache
+
+logger = get_logger(__name__)
+
+TABLE_MAGIC = b"VAUMLS\x00\x01"
+TABLE_VERSION = 1
+
+_HEADER = struct.Struct("<8sIIQ")
+_INDEX_ENTRY = struct.Struct("<16sQI")
+_CUI_WIDTH = 16
+
+# Sentinel stored in L1 for CUIs known to be absent from the table
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class ConceptRecord:
+    """Cached UMLS concept metadata with its ontology cross-references"""
+
+    cui: str
+    name: str
+    semantic_types: Tuple[str, ...] = ()
+    definition: Optional[str] = None
+    aliases: Tuple[str, ...] = ()
+    # ontology value (e.g. "ICD-10") -> (code, display_name, confidence)
+    mappings: Dict[str, Tuple[str, str, float]] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ConceptRecord":
+        """Create a record from its JSON representation."""
+        mappings = {}
+        for mapping in data.get("mappings", []):
+            mappings[mapping["ontology"]] = (
+                mapping["code"],
+                mapping.get("display_name", data.get("name", "")),
+                float(mapping.get("confidence", 1.0)),
+            )
+        return cls(
+            cui=data["cui"],
+            name=data.get("name", data["cui"]),
+            semantic_types=tuple(data.get("semantic_types", [])),
+            definition=data.get("definition"),
+            aliases=tuple(data.get("aliases", [])),
+            mappings=mappings,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert record to its JSON representation."""
+        return {
+            "cui": self.cui,
+            "name": self.name,
+            "semantic_types": list(self.semantic_types),
+            "definition": self.definition,
+            "aliases": list(self.aliases),
+            "mappings": [
+                {
+                    "ontology": ontology,
+                    "code": code,
+                    "display_name": display_name,
+                    "confidence": confidence,
+                }
+                for ontology, (code, display_name, confidence) in self.mappings.items()
+            ],
+        }
+
+
+def _encode_cui(cui: str) -> bytes:
+    encoded = cui.encode("ascii")
+    if len(encoded) > _CUI_WIDTH:
+        raise ValueError(f"CUI too long for concept table: {cui}")
+    return encoded.ljust(_CUI_WIDTH, b"\x00")
+
+
+def build_concept_table(records: Iterable[Dict[str, Any]], path: str) -> int:
+    """
+    Build an on-disk concept table from UMLS concept records.
+
+    The file is written to a temporary path and atomically renamed so
+    readers never map a partially written table.
+
+    Args:
+        records: Iterable of concept dicts (see ConceptRecord.to_dict)
+        path: Destination file path
+
+    Returns:
+        Number of concepts written
+    """
+    payloads: Dict[str, bytes] = {}
+    for record in records:
+        normalized = ConceptRecord.from_dict(record)
+        payloads[normalized.cui] = json.dumps(normalized.to_dict(), separators=(",", ":")).encode("utf-8")
+
+    cuis = sorted(payloads, key=_encode_cui)
+    data_offset = _HEADER.size + _INDEX_ENTRY.size * len(cuis)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(TABLE_MAGIC, TABLE_VERSION, len(cuis), data_offset))
+        offset = 0
+        for cui in cuis:
+            f.write(_INDEX_ENTRY.pack(_encode_cui(cui), offset, len(payloads[cui])))
+            offset += len(payloads[cui])
+        for cui in cuis:
+            f.write(payloads[cui])
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+    return len(cuis)
+
+
+class UMLSConceptTable:
+    """
+    Read-only memory-mapped CUI -> ConceptRecord table.
+
+    Lookups binary-search the fixed-width index directly in the mapping,
+    so the table is shared through the page cache across workers and
+    never loaded into the Python heap as a whole.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open a concept table.
+
+        Args:
+            path: Path to a table built with build_concept_table()
+
+        Raises:
+            ValueError: If the file is not a valid concept table
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, count, data_offset = _HEADER.unpack_from(self._mm, 0)
+            if magic != TABLE_MAGIC or version != TABLE_VERSION:
+                raise ValueError(f"Not a UMLS concept table (or unsupported version): {path}")
+        except Exception:
+            self._file.close()
+            raise
+
+        self._count = count
+        self._data_offset = data_offset
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, cui: str) -> bool:
+        return self._find(cui) is not None
+
+    def _find(self, cui: str) -> Optional[Tuple[int, int]]:
+        """Binary search the index for a CUI, returning (offset, length)."""
+        try:
+            key = _encode_cui(cui)
+        except (UnicodeEncodeError, ValueError):
+            return None
+
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            pos = _HEADER.size + mid * _INDEX_ENTRY.size
+            entry_key = self._mm[pos : pos + _CUI_WIDTH]
+            if entry_key < key:
+                lo = mid + 1
+            elif entry_key > key:
+                hi = mid
+            else:
+                _, offset, length = _INDEX_ENTRY.unpack_from(self._mm, pos)
+                return self._data_offset + offset, length
+        return None
+
+    def get(self, cui: str) -> Optional[ConceptRecord]:
+        """
+        Look up a concept record.
+
+        Args:
+            cui: UMLS Concept Unique Identifier
+
+        Returns:
+            ConceptRecord if present, None otherwise
+        """
+        location = self._find(cui)
+        if location is None:
+            return None
+        offset, length = location
+        return ConceptRecord.from_dict(json.loads(self._mm[offset : offset + length]))
+
+    def close(self):
+        """Unmap the table and close the underlying file."""
+        self._mm.close()
+        self._file.close()
+
+
+class UMLSConceptCache:
+    """
+    Two-level concept cache: bounded LRU in front of an optional mapped table.
+
+    Records learned at runtime (e.g. from the scispacy linker KB) can be
+    added with put(); they live only in L1. The on-disk table is never
+    modified, so clear() only drops the in-process tier.
+    """
+
+    def __init__(self, maxsize: int = 50000, table_path: Optional[str] = None):
+        """
+        Initialize the concept cache.
+
+        Args:
+            maxsize: Maximum number of records held in the in-process LRU
+            table_path: Optional path to a prebuilt concept table
+        """
+        self._l1: LRUCache = LRUCache(maxsize=maxsize)
+        self._table: Optional[UMLSConceptTable] = None
+        self._stats = {"l1_hits": 0, "l2_hits": 0, "misses": 0}
+
+        if table_path:
+            try:
+                self._table = UMLSConceptTable(table_path)
+                logger.info(
+                    "UMLS concept table mapped",
+                    extra={"path": table_path, "concepts": len(self._table)},
+                )
+            except (OSError, ValueError) as e:
+                logger.warning(f"UMLS concept table unavailable ({table_path}): {e}")
+
+    @property
+    def has_table(self) -> bool:
+        """Whether an on-disk concept table is mapped."""
+        return self._table is not None
+
+    def get(self, cui: str) -> Optional[ConceptRecord]:
+        """
+        Look up a concept, checking the LRU first, then the mapped table.
+
+        Args:
+            cui: UMLS Concept Unique Identifier
+
+        Returns:
+            ConceptRecord if known, None otherwise
+        """
+        cached = self._l1.get(cui)
+        if cached is not None:
+            if cached is _MISSING:
+                self._stats["misses"] += 1
+                return None
+            self._stats["l1_hits"] += 1
+            return cached
+
+        record = self._table.get(cui) if self._table else None
+        if record is None:
+            self._stats["misses"] += 1
+            if self._table:
+                self._l1[cui] = _MISSING
+            return None
+
+        self._stats["l2_hits"] += 1
+        self._l1[cui] = record
+        return record
+
+    def put(self, record: ConceptRecord):
+        """
+        Add a runtime-resolved concept to the in-process tier.
+
+        Mappings already present in the mapped table are preserved.
+
+        Args:
+            record: Concept record to cache
+        """
+        if not record.mappings and self._table:
+            table_record = self._table.get(record.cui)
+            if table_record is not None and table_record.mappings:
+                record = ConceptRecord(
+                    cui=record.cui,
+                    name=record.name,
+                    semantic_types=record.semantic_types,
+                    definition=record.definition,
+                    aliases=record.aliases,
+                    mappings=table_record.mappings,
+                )
+        self._l1[record.cui] = record
+
+    def get_mapping(self, cui: str, ontology: str) -> Optional[Tuple[str, str, float]]:
+        """
+        Look up a single ontology mapping for a CUI.
+
+        Args:
+            cui: UMLS CUI
+            ontology: Ontology value (e.g. "ICD-10", "RxNorm")
+
+        Returns:
+            (code, display_name, confidence) if mapped, None otherwise
+        """
+        record = self.get(cui)
+        if record is None:
+            return None
+        return record.mappings.get(ontology)
+
+    def clear(self):
+        """Drop the in-process tier; the mapped table stays available."""
+        self._l1.clear()
+
+    def close(self):
+        """Clear the cache and unmap the on-disk table."""
+        self.clear()
+        if self._table:
+            self._table.close()
+            self._table = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        lookups = sum(self._stats.values())
+        hits = self._stats["l1_hits"] + self._stats["l2_hits"]
+        return {
+            **self._stats,
+            "l1_size": len(self._l1),
+            "l1_maxsize": self._l1.maxsize,
+            "table_concepts": len(self._table) if self._table else 0,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
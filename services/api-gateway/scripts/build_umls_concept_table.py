@@ -0,0 +1,57 @@
+"""Build the memory-mapped UMLS concept table used by medical NER normalization.
+
+Reads the UMLS subset we ship as JSON Lines (one concept per line) and writes
+the read-only CUI -> concept/mapping table consumed by
+app.services.umls_concept_cache.UMLSConceptTable.
+
+Input record format:
+    {"cui": "C0011849", "name": "Diabetes Mellitus", "semantic_types": ["T047"],
+     "definition": "...", "aliases": ["DM"],
+     "mappings": [{"ontology": "ICD-10", "code": "E11", "display_name": "...", "confidence": 1.0}]}
+
+Usage:
+    python scripts/build_umls_concept_table.py umls_subset.jsonl umls_concepts.bin
+
+Then point UMLS_CONCEPT_TABLE_PATH at the output file.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.umls_concept_cache import build_concept_table  # noqa: E402
+
+
+def iter_records(path: Path) -> Iterator[Dict[str, Any]]:
+    """Yield concept records from a JSON Lines file, skipping blank lines."""
+    with path.open("r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise SystemExit(f"{path}:{line_number}: invalid JSON: {e}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build the UMLS concept table")
+    parser.add_argument("source", type=Path, help="UMLS subset in JSON Lines format")
+    parser.add_argument("output", type=Path, help="Output table path")
+    args = parser.parse_args()
+
+    count = build_concept_table(iter_records(args.source), str(args.output))
+    print(f"Wrote {count} concepts to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
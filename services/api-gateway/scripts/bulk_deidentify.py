@@ -0,0 +1,74 @@
+"""De-identify a note corpus for research export.
+
+Streams a JSONL or CSV corpus through the clinical engine's de-identification
+pipeline with a worker pool and writes the result incrementally in the same
+format. Surrogates and date shifts are consistent per patient as long as the
+same secret is used.
+
+Usage:
+    python scripts/bulk_deidentify.py notes.jsonl notes.deid.jsonl --workers 8
+    DEID_SURROGATE_SECRET=... python scripts/bulk_deidentify.py notes.csv out.csv --method shift
+
+The secret is read from --secret-file or the DEID_SURROGATE_SECRET environment
+variable. Without one, surrogates are only consistent within a single run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.engines.clinical_engine.bulk_deidentification import BulkDeidentificationConfig, BulkDeidentifier  # noqa: E402
+from app.engines.clinical_engine.deidentification_service import DeidentificationMethod  # noqa: E402
+
+
+def load_secret(secret_file: Optional[Path]) -> Optional[bytes]:
+    """Load the surrogate secret from a file or the environment."""
+    if secret_file:
+        return secret_file.read_bytes().strip()
+    env_secret = os.environ.get("DEID_SURROGATE_SECRET")
+    return env_secret.encode("utf-8") if env_secret else None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Bulk de-identify a JSONL/CSV note corpus")
+    parser.add_argument("input", type=Path, help="Input corpus (.jsonl or .csv)")
+    parser.add_argument("output", type=Path, help="Output path (same format as input)")
+    parser.add_argument(
+        "--method",
+        choices=[m.value for m in DeidentificationMethod if m != DeidentificationMethod.TOKEN],
+        default=DeidentificationMethod.SURROGATE.value,
+    )
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="Input format (default: from extension)")
+    parser.add_argument("--text-field", default="text")
+    parser.add_argument("--patient-id-field", default="patient_id")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="0 = run in-process")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--confidence-threshold", type=float, default=0.5)
+    parser.add_argument("--secret-file", type=Path)
+    args = parser.parse_args()
+
+    config = BulkDeidentificationConfig(
+        method=DeidentificationMethod(args.method),
+        text_field=args.text_field,
+        patient_id_field=args.patient_id_field,
+        input_format=args.format,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        confidence_threshold=args.confidence_threshold,
+    )
+    stats = BulkDeidentifier(config, secret=load_secret(args.secret_file)).run(str(args.input), str(args.output))
+
+    print(json.dumps(stats.to_dict(), indent=2))
+    return 1 if stats.notes_failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
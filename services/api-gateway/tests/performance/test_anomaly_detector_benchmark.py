@@ -0,0 +1,75 @@
+"""Anomaly Detector Benchmark Tests.
+
+Compares the previous detector (mean/stddev recomputed over a 100-sample
+deque on every check) with running baselines, per sample and in batches,
+for a pod reporting a few hundred metric keys.
+"""
+
+import math
+import random
+import time
+from collections import deque
+
+import pytest
+from app.engines.analytics_engine import MetricSample
+from app.engines.analytics_engine.anomaly_detector import AnomalyDetector
+
+METRIC_KEYS = 300
+SAMPLES = 60_000
+BATCH_SIZE = 1000
+
+
+class WindowRecomputeDetector:
+    """The previous check(): append to a deque, recompute the baseline."""
+
+    def __init__(self):
+        self._samples = {}
+
+    async def check(self, sample):
+        window = self._samples.setdefault(sample.name, deque(maxlen=AnomalyDetector.BASELINE_WINDOW))
+        window.append(sample.value)
+        samples = list(window)
+        n = len(samples)
+        mean = sum(samples) / n
+        std_dev = math.sqrt(sum((x - mean) ** 2 for x in samples) / (n - 1)) if n > 1 else 0.0
+        min(samples), max(samples)
+        if n < AnomalyDetector.MIN_SAMPLES_FOR_DETECTION or not std_dev:
+            return None
+        return abs(sample.value - mean) / std_dev >= AnomalyDetector.SEVERITY_THRESHOLDS["low"] or None
+
+
+class TestAnomalyDetectorBenchmark:
+    """Per-sample cost of anomaly checks."""
+
+    @pytest.mark.asyncio
+    async def test_check_throughput(self):
+        rng = random.Random(3)
+        samples = [
+            MetricSample(name=f"latency_op_{rng.randrange(METRIC_KEYS)}", value=rng.lognormvariate(5, 0.4))
+            for _ in range(SAMPLES)
+        ]
+
+        legacy, detector, batched = WindowRecomputeDetector(), AnomalyDetector(), AnomalyDetector()
+
+        start = time.perf_counter()
+        for sample in samples:
+            await legacy.check(sample)
+        legacy_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for sample in samples:
+            await detector.check(sample)
+        running_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for offset in range(0, SAMPLES, BATCH_SIZE):
+            batched.check_batch(samples[offset : offset + BATCH_SIZE])
+        batch_elapsed = time.perf_counter() - start
+
+        print(f"\n[Benchmark] {SAMPLES:,} samples over {METRIC_KEYS} metric keys:")
+        print(f"  window recompute:  {legacy_elapsed * 1e6 / SAMPLES:.1f}us/sample")
+        print(f"  running baselines: {running_elapsed * 1e6 / SAMPLES:.1f}us/sample")
+        print(f"  batches of {BATCH_SIZE}:  {batch_elapsed * 1e6 / SAMPLES:.1f}us/sample")
+
+        assert running_elapsed < legacy_elapsed
+        assert batch_elapsed < legacy_elapsed
@@ -0,0 +1,78 @@
+"""Cross-Encoder Batching Benchmark Tests.
+
+Compares per-request cross-encoder scoring (one predict call per query,
+each in its own worker thread, contending for the model) with the shared
+micro-batching CrossEncoderWorker, for a burst of concurrent queries.
+The stub model costs a fixed overhead per predict call plus a per-pair
+cost, serialized on one compute resource like a CPU-bound model.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from app.services.reranking_service import CrossEncoderWorker
+
+CONCURRENT_QUERIES = 64
+PAIRS_PER_QUERY = 20
+CALL_OVERHEAD_S = 0.004
+PER_PAIR_S = 0.0001
+
+
+class StubModel:
+    def __init__(self):
+        self._compute = threading.Lock()
+
+    def predict(self, pairs):
+        with self._compute:
+            time.sleep(CALL_OVERHEAD_S + PER_PAIR_S * len(pairs))
+        return [0.0] * len(pairs)
+
+
+def p99(values):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * 0.99))]
+
+
+async def run_burst(score):
+    pairs = [("query", f"document {i}") for i in range(PAIRS_PER_QUERY)]
+    latencies = []
+
+    async def one():
+        start = time.perf_counter()
+        await score(pairs)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(CONCURRENT_QUERIES)))
+    return time.perf_counter() - start, latencies
+
+
+class TestCrossEncoderBatchingBenchmark:
+    """Throughput and tail latency under concurrent queries."""
+
+    @pytest.mark.asyncio
+    async def test_micro_batching_throughput(self):
+        model = StubModel()
+
+        async def per_request(pairs):
+            return await asyncio.to_thread(model.predict, pairs)
+
+        worker = CrossEncoderWorker(model=StubModel(), batch_window_ms=2, max_batch_pairs=256)
+
+        direct_elapsed, direct_latencies = await run_burst(per_request)
+        batched_elapsed, batched_latencies = await run_burst(worker.score)
+        stats = worker.get_stats()
+        await worker.stop()
+
+        total_pairs = CONCURRENT_QUERIES * PAIRS_PER_QUERY
+        print(
+            f"\n[Benchmark] CrossEncoder {CONCURRENT_QUERIES} concurrent queries x {PAIRS_PER_QUERY} pairs: "
+            f"per-request {total_pairs / direct_elapsed:,.0f} pairs/s, p99 {p99(direct_latencies) * 1000:.1f} ms; "
+            f"micro-batched {total_pairs / batched_elapsed:,.0f} pairs/s, p99 {p99(batched_latencies) * 1000:.1f} ms, "
+            f"{stats['batches']} batches, queue wait p99 {stats['queue_wait_ms_p99']:.1f} ms"
+        )
+
+        assert stats["pairs_scored"] == total_pairs
+        assert batched_elapsed < direct_elapsed
@@ -0,0 +1,237 @@
+"""FHIR Batch Bundle Benchmark Tests.
+
+Benchmarks patient chart loading (FHIRClient.get_patient_chart) against a
+local mock FHIR server:
+- One batch Bundle POST vs six concurrent GETs per chart
+- Rate-limit tokens consumed (one per HTTP request)
+- Fallback to concurrent requests when batch Bundles are rejected
+"""
+
+import asyncio
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app.integrations.fhir.fhir_client import FHIRBatchRequest, FHIRClient, FHIRClientConfig
+from app.integrations.fhir.fhir_models import FHIRPatient, FHIRResourceType
+
+REQUEST_LATENCY_SECONDS = 0.02
+OBSERVATION_PAGE_SIZE = 5
+OBSERVATIONS_PER_CATEGORY = 12
+CHARTS = 10
+
+
+class MockFHIRServer:
+    """Serves reads, searches and (optionally) batch Bundles with per-request latency."""
+
+    def __init__(
+        self,
+        batch_supported: bool = True,
+        observation_page_size: int = OBSERVATION_PAGE_SIZE,
+        batch_reject_status: int = 405,
+    ):
+        self.batch_supported = batch_supported
+        self.batch_reject_status = batch_reject_status
+        self.batch_posts = 0
+        self.observation_page_size = observation_page_size
+        self.http_requests = 0
+        self.server = None
+
+    def resolve(self, url: str):
+        """Resolve a relative request URL to (status, resource)."""
+        parts = urlsplit(url)
+        path = parts.path.strip("/").split("/")
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+
+        if path[0] == "Patient" and len(path) == 2:
+            if path[1] == "missing":
+                return 404, None
+            return 200, {"resourceType": "Patient", "id": path[1], "name": [{"family": "Test", "given": ["Pat"]}]}
+
+        resource_type = path[0]
+        patient = query.get("patient", "")
+        if resource_type == "Observation":
+            category = query.get("category", "")
+            total = OBSERVATIONS_PER_CATEGORY
+            resources = [
+                {
+                    "resourceType": "Observation",
+                    "id": f"{patient}-{category}-{i}",
+                    "status": "final",
+                    "code": {"text": category},
+                }
+                for i in range(total)
+            ]
+        else:
+            resources = [{"resourceType": resource_type, "id": f"{patient}-{resource_type}-{i}"} for i in range(3)]
+
+        count = int(query.get("_count", 50))
+        if resource_type == "Observation":
+            count = min(count, self.observation_page_size)
+        offset = int(query.get("_getpagesoffset", 0))
+        bundle = {
+            "resourceType": "Bundle",
+            "type": "searchset",
+            "link": [],
+            "entry": [{"resource": r} for r in resources[offset : offset + count]],
+        }
+        if offset + count < len(resources):
+            next_query = dict(query, _count=count, _getpagesoffset=offset + count)
+            next_url = self.server.make_url(f"/{resource_type}").with_query(next_query)
+            bundle["link"].append({"relation": "next", "url": str(next_url)})
+        return 200, bundle
+
+    async def handle_get(self, request: web.Request) -> web.Response:
+        self.http_requests += 1
+        await asyncio.sleep(REQUEST_LATENCY_SECONDS)
+        status, body = self.resolve(request.path_qs)
+        return web.json_response(body, status=status)
+
+    async def handle_batch(self, request: web.Request) -> web.Response:
+        self.http_requests += 1
+        self.batch_posts += 1
+        await asyncio.sleep(REQUEST_LATENCY_SECONDS)
+        if not self.batch_supported:
+            return web.Response(status=self.batch_reject_status)
+
+        bundle = await request.json()
+        entries = []
+        for entry in bundle["entry"]:
+            status, resource = self.resolve("/" + entry["request"]["url"])
+            response_entry = {"response": {"status": f"{status} {'OK' if status == 200 else 'Not Found'}"}}
+            if resource is not None:
+                response_entry["resource"] = resource
+            entries.append(response_entry)
+        return web.json_response({"resourceType": "Bundle", "type": "batch-response", "entry": entries})
+
+    async def __aenter__(self) -> "MockFHIRServer":
+        app = web.Application()
+        app.router.add_post("/", self.handle_batch)
+        app.router.add_get("/{path:.*}", self.handle_get)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.server.close()
+
+    def client(self, **overrides) -> FHIRClient:
+        config = FHIRClientConfig(
+            base_url=str(self.server.make_url("")).rstrip("/"),
+            max_retries=0,
+            retry_delay_seconds=0.0,
+            **overrides,
+        )
+        return FHIRClient(config)
+
+
+def chart_ids(chart):
+    return {
+        name: (
+            value.id if isinstance(value, FHIRPatient) else sorted(r.id if hasattr(r, "id") else r["id"] for r in value)
+        )
+        for name, value in chart.items()
+    }
+
+
+class TestFHIRBatch:
+    """Batch Bundle correctness, fallback and savings."""
+
+    @pytest.mark.asyncio
+    async def test_chart_matches_individual_requests(self):
+        async with MockFHIRServer() as server:
+            async with server.client(cache_enabled=False) as client:
+                batched = await client.get_patient_chart("p1")
+                batch_requests = server.http_requests
+
+            async with server.client(cache_enabled=False, batch_enabled=False) as client:
+                single = await client.get_patient_chart("p1")
+
+        assert chart_ids(batched) == chart_ids(single)
+        assert len(batched["labs"]) == OBSERVATIONS_PER_CATEGORY
+        # One Bundle POST plus the remaining Observation pages for vitals and labs
+        extra_pages = 2 * (OBSERVATIONS_PER_CATEGORY // OBSERVATION_PAGE_SIZE)
+        assert batch_requests == 1 + extra_pages
+
+    @pytest.mark.asyncio
+    async def test_entry_errors_are_per_request(self):
+        async with MockFHIRServer() as server:
+            async with server.client() as client:
+                results = await client.batch(
+                    [
+                        FHIRBatchRequest.read(FHIRResourceType.PATIENT, "missing"),
+                        FHIRBatchRequest.search(FHIRResourceType.CONDITION, {"patient": "p1"}),
+                    ]
+                )
+
+        assert results[0] is None
+        assert len(results[1]) == 3
+
+    @pytest.mark.asyncio
+    async def test_falls_back_when_batch_rejected(self):
+        async with MockFHIRServer(batch_supported=False) as server:
+            async with server.client(cache_enabled=False) as client:
+                first = await client.get_patient_chart("p1")
+                after_first = server.http_requests
+                await client.get_patient_chart("p2")
+
+        assert isinstance(first["patient"], FHIRPatient)
+        assert len(first["labs"]) == OBSERVATIONS_PER_CATEGORY
+        # The rejected POST is only attempted once
+        assert server.http_requests - after_first == after_first - 1
+
+    @pytest.mark.asyncio
+    async def test_other_rejections_are_re_probed(self):
+        async with MockFHIRServer(batch_supported=False, batch_reject_status=400) as server:
+            async with server.client(cache_enabled=False, batch_retry_seconds=0.5) as client:
+                await client.get_patient_chart("p1")
+                await client.get_patient_chart("p2")
+                assert server.batch_posts == 1  # Paused after the rejection
+
+                server.batch_supported = True
+                await asyncio.sleep(0.5)
+                before = server.http_requests
+                chart = await client.get_patient_chart("p3")
+
+        assert server.batch_posts == 2
+        assert server.http_requests - before < 6  # Batched again
+        assert isinstance(chart["patient"], FHIRPatient)
+
+    @pytest.mark.asyncio
+    async def test_batch_uses_cache(self):
+        async with MockFHIRServer() as server:
+            async with server.client() as client:
+                await client.get_patient_chart("p1")
+                before = server.http_requests
+                chart = await client.get_patient_chart("p1")
+
+        assert server.http_requests == before
+        assert isinstance(chart["patient"], FHIRPatient)
+
+    @pytest.mark.asyncio
+    async def test_chart_loading_savings(self):
+        """Benchmark: latency and rate-limit tokens for sequential chart loads."""
+        results = {}
+        for batch_enabled in (False, True):
+            async with MockFHIRServer(observation_page_size=50) as server:
+                async with server.client(
+                    cache_enabled=False,
+                    batch_enabled=batch_enabled,
+                    requests_per_second=50.0,
+                    burst_limit=5,
+                ) as client:
+                    start = time.perf_counter()
+                    for i in range(CHARTS):
+                        await client.get_patient_chart(f"p{i}")
+                    elapsed = time.perf_counter() - start
+                results[batch_enabled] = (elapsed, server.http_requests)
+
+        print(f"\n[Benchmark] FHIR chart loading, {CHARTS} patients (50 req/s limit):")
+        for batch_enabled, (elapsed, tokens) in results.items():
+            label = "batch Bundle" if batch_enabled else "concurrent GETs"
+            print(f"  {label}: {elapsed / CHARTS * 1000:.0f}ms/chart, {tokens} rate-limit tokens")
+
+        assert results[True][1] < results[False][1]
+        assert results[True][0] < results[False][0]
@@ -0,0 +1,115 @@
+"""FHIR Model Parsing Benchmark Tests.
+
+Benchmarks a 5,000-entry Observation searchset Bundle:
+- JSON body parsing: stdlib json vs loads_fhir_json (orjson when installed)
+- Eager FHIRObservation.from_fhir vs lazy ObservationView, reading the
+  fields the voice path uses (name and display value)
+- Peak memory (tracemalloc) of the parsed result lists
+"""
+
+import gc
+import json
+import time
+import tracemalloc
+
+import pytest
+from app.integrations.fhir.fhir_models import FHIRObservation
+from app.integrations.fhir.fhir_views import ORJSON_AVAILABLE, ObservationView, loads_fhir_json
+
+ENTRIES = 5_000
+
+
+def make_observation(index: int) -> dict:
+    return {
+        "resourceType": "Observation",
+        "id": f"obs-{index}",
+        "meta": {"versionId": "1", "lastUpdated": "2024-03-01T08:00:00Z"},
+        "status": "final",
+        "category": [
+            {
+                "coding": [
+                    {
+                        "system": "http://terminology.hl7.org/CodeSystem/observation-category",
+                        "code": "laboratory",
+                        "display": "Laboratory",
+                    }
+                ]
+            }
+        ],
+        "code": {
+            "coding": [{"system": "http://loinc.org", "code": "2345-7", "display": "Glucose"}],
+            "text": "Glucose",
+        },
+        "subject": {"reference": "Patient/p1", "display": "Test Patient"},
+        "effectiveDateTime": f"2024-03-{index % 28 + 1:02d}T08:00:00Z",
+        "issued": f"2024-03-{index % 28 + 1:02d}T09:30:00.000Z",
+        "performer": [{"reference": "Practitioner/pr1", "display": "Lab"}],
+        "valueQuantity": {"value": 70 + index % 60, "unit": "mg/dL", "system": "http://unitsofmeasure.org"},
+        "interpretation": [{"coding": [{"code": "H" if index % 60 > 29 else "N"}]}],
+        "referenceRange": [{"low": {"value": 70, "unit": "mg/dL"}, "high": {"value": 99, "unit": "mg/dL"}}],
+        "note": [{"text": "Fasting sample"}],
+    }
+
+
+@pytest.fixture(scope="module")
+def bundle_body():
+    bundle = {
+        "resourceType": "Bundle",
+        "type": "searchset",
+        "total": ENTRIES,
+        "entry": [{"resource": make_observation(i)} for i in range(ENTRIES)],
+    }
+    return json.dumps(bundle)
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def peak_memory(fn):
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak
+
+
+class TestFHIRModelParsing:
+    """Parse time and memory for a large Observation bundle."""
+
+    def test_parse_and_materialize(self, bundle_body):
+        """Benchmark: JSON parse + eager models vs lazy views."""
+        json_time, _ = timed(lambda: json.loads(bundle_body))
+        fast_time, bundle = timed(lambda: loads_fhir_json(bundle_body))
+        resources = [entry["resource"] for entry in bundle["entry"]]
+
+        def eager():
+            models = [FHIRObservation.from_fhir(r) for r in resources]
+            return models, [(m.observation_name, m.display_value) for m in models]
+
+        def lazy():
+            views = [ObservationView(r) for r in resources]
+            return views, [(v.observation_name, v.display_value) for v in views]
+
+        eager_time, (_, eager_fields) = timed(eager)
+        lazy_time, (_, lazy_fields) = timed(lazy)
+        eager_peak = peak_memory(eager)
+        lazy_peak = peak_memory(lazy)
+
+        size_mb = len(bundle_body) / (1024 * 1024)
+        parser = "orjson" if ORJSON_AVAILABLE else "json (orjson not installed)"
+        print(f"\n[Benchmark] {ENTRIES}-entry Observation bundle ({size_mb:.1f} MB):")
+        print(f"  json.loads: {json_time*1000:.0f}ms, loads_fhir_json [{parser}]: {fast_time*1000:.0f}ms")
+        print(f"  eager models: {eager_time*1000:.0f}ms, peak {eager_peak / 1024 / 1024:.1f} MB")
+        print(f"  lazy views:   {lazy_time*1000:.0f}ms, peak {lazy_peak / 1024 / 1024:.1f} MB")
+
+        assert lazy_fields == eager_fields
+        assert lazy_time < eager_time
+        assert lazy_peak < eager_peak
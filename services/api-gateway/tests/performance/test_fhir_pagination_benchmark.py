@@ -0,0 +1,178 @@
+"""FHIR Search Pagination Benchmark Tests.
+
+Benchmarks FHIRClient paginated search against a fake FHIR server:
+- Time-to-first-resource and total time, search() vs search_iter()
+- Next-page prefetch overlapping server latency with consumer work
+- Early termination stops paging and cancels in-flight requests
+
+The fake server serves Observation bundles with a fixed per-page latency,
+standing in for a slow EHR endpoint.
+"""
+
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app.integrations.fhir.fhir_client import FHIRClient, FHIRClientConfig, FHIRServerError
+from app.integrations.fhir.fhir_models import FHIRObservation, FHIRResourceType
+
+TOTAL_RESOURCES = 1_000
+PAGE_SIZE = 50
+PAGE_LATENCY_SECONDS = 0.02
+CONSUMER_SECONDS_PER_PAGE = 0.02
+
+
+def make_observation(index: int) -> dict:
+    return {
+        "resourceType": "Observation",
+        "id": f"obs-{index}",
+        "status": "final",
+        "code": {"coding": [{"system": "http://loinc.org", "code": "2345-7", "display": "Glucose"}]},
+        "valueQuantity": {"value": 90 + index % 40, "unit": "mg/dL"},
+        "effectiveDateTime": "2024-01-01T08:00:00Z",
+    }
+
+
+class FakeFHIRServer:
+    """Paginated Observation search endpoint with per-page latency."""
+
+    def __init__(self, total: int = TOTAL_RESOURCES, fail_page: int = -1):
+        self.total = total
+        self.fail_page = fail_page
+        self.requests = 0
+        self.completed = 0
+        self.server = None
+
+    async def handle_search(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        count = int(request.query.get("_count", PAGE_SIZE))
+        offset = int(request.query.get("_getpagesoffset", 0))
+        await asyncio.sleep(PAGE_LATENCY_SECONDS)
+        if offset // count == self.fail_page:
+            return web.Response(status=500)
+
+        bundle = {
+            "resourceType": "Bundle",
+            "type": "searchset",
+            "total": self.total,
+            "link": [],
+            "entry": [{"resource": make_observation(i)} for i in range(offset, min(offset + count, self.total))],
+        }
+        if offset + count < self.total:
+            next_url = self.server.make_url(f"/Observation?_count={count}&_getpagesoffset={offset + count}")
+            bundle["link"].append({"relation": "next", "url": str(next_url)})
+        self.completed += 1
+        return web.json_response(bundle)
+
+    async def __aenter__(self) -> "FakeFHIRServer":
+        app = web.Application()
+        app.router.add_get("/Observation", self.handle_search)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.server.close()
+
+    def client(self, **overrides) -> FHIRClient:
+        config = FHIRClientConfig(
+            base_url=str(self.server.make_url("")).rstrip("/"),
+            requests_per_second=1000.0,
+            burst_limit=1000,
+            max_retries=0,
+            retry_delay_seconds=0.0,
+            default_page_size=PAGE_SIZE,
+            **overrides,
+        )
+        return FHIRClient(config)
+
+
+@pytest.fixture
+async def fhir_server():
+    async with FakeFHIRServer() as server:
+        yield server
+
+
+class TestFHIRSearchPagination:
+    """Streaming pagination correctness and throughput."""
+
+    @pytest.mark.asyncio
+    async def test_search_iter_yields_all_resources_in_order(self, fhir_server):
+        async with fhir_server.client() as client:
+            results = [r async for r in client.search_iter(FHIRResourceType.OBSERVATION, {"patient": "p1"})]
+
+        assert [r.id for r in results] == [f"obs-{i}" for i in range(TOTAL_RESOURCES)]
+        assert all(isinstance(r, FHIRObservation) for r in results)
+        assert fhir_server.requests == TOTAL_RESOURCES // PAGE_SIZE
+
+    @pytest.mark.asyncio
+    async def test_search_matches_search_iter(self, fhir_server):
+        params = {"patient": "p1"}
+        async with fhir_server.client(cache_enabled=False) as client:
+            listed = await client.search(FHIRResourceType.OBSERVATION, params, max_results=120)
+            streamed = [r async for r in client.search_iter(FHIRResourceType.OBSERVATION, params, max_results=120)]
+
+        assert [r.id for r in listed] == [r.id for r in streamed]
+        assert len(listed) == 120
+        assert params == {"patient": "p1"}
+
+    @pytest.mark.asyncio
+    async def test_early_termination_stops_paging(self, fhir_server):
+        async with fhir_server.client() as client:
+            async for resource in client.search_iter(FHIRResourceType.OBSERVATION, {"patient": "p1"}):
+                if resource.id == "obs-10":
+                    break
+            await asyncio.sleep(PAGE_LATENCY_SECONDS * 3)
+
+        # First page plus at most prefetch_pages + 1 pages ahead
+        assert fhir_server.requests <= 3
+        assert fhir_server.completed < TOTAL_RESOURCES // PAGE_SIZE
+
+    @pytest.mark.asyncio
+    async def test_page_error_is_raised_to_consumer(self):
+        async with FakeFHIRServer(fail_page=3) as server:
+            async with server.client() as client:
+                received = []
+                with pytest.raises(FHIRServerError):
+                    async for resource in client.search_iter(FHIRResourceType.OBSERVATION, {"patient": "p1"}):
+                        received.append(resource)
+
+        assert len(received) == 3 * PAGE_SIZE
+
+    @pytest.mark.asyncio
+    async def test_streaming_throughput(self, fhir_server):
+        """Benchmark: time-to-first-resource and total time with per-page consumer work."""
+        timings = {}
+
+        async with fhir_server.client(cache_enabled=False) as client:
+            start = time.perf_counter()
+            results = await client.search(FHIRResourceType.OBSERVATION, {"patient": "p1"})
+            first = time.perf_counter() - start
+            for _ in range(0, len(results), PAGE_SIZE):
+                await asyncio.sleep(CONSUMER_SECONDS_PER_PAGE)
+            timings["search"] = (first, time.perf_counter() - start)
+
+            start = time.perf_counter()
+            first = None
+            async for index, _ in _aenumerate(client.search_iter(FHIRResourceType.OBSERVATION, {"patient": "p1"})):
+                if first is None:
+                    first = time.perf_counter() - start
+                if (index + 1) % PAGE_SIZE == 0:
+                    await asyncio.sleep(CONSUMER_SECONDS_PER_PAGE)
+            timings["search_iter"] = (first, time.perf_counter() - start)
+
+        print(f"\n[Benchmark] FHIR search, {TOTAL_RESOURCES} resources / {TOTAL_RESOURCES // PAGE_SIZE} pages:")
+        for name, (first, total) in timings.items():
+            print(f"  {name}: first resource {first*1000:.0f}ms, total {total*1000:.0f}ms")
+
+        assert timings["search_iter"][0] < timings["search"][0]
+        assert timings["search_iter"][1] < timings["search"][1]
+
+
+async def _aenumerate(iterator):
+    index = 0
+    async for item in iterator:
+        yield index, item
+        index += 1
@@ -0,0 +1,80 @@
+"""Medical Embedding Batch Benchmark Tests.
+
+Measures CPU throughput (texts/sec) of MedicalEmbeddingService batch
+inference for batch sizes 1-64. Uses a small randomly initialised BERT
+encoder and a whitespace tokenizer so it runs offline; requires torch and
+transformers.
+"""
+
+import random
+import time
+
+import pytest
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+from app.services.medical_embedding_service import MedicalEmbeddingService, MedicalModelType  # noqa: E402
+
+TEXTS = 256
+VOCAB = 2048
+BATCH_SIZES = [1, 4, 16, 32, 64]
+
+
+class WhitespaceTokenizer:
+    """Maps words to stable ids; pads with 0 like BertTokenizer."""
+
+    def __call__(self, texts, **kwargs):
+        return {"input_ids": [[101] + [hash(w) % (VOCAB - 200) + 200 for w in t.split()] + [102] for t in texts]}
+
+    def pad(self, encoded, return_tensors="pt"):
+        rows = encoded["input_ids"]
+        width = max(len(ids) for ids in rows)
+        return {
+            "input_ids": torch.tensor([ids + [0] * (width - len(ids)) for ids in rows]),
+            "attention_mask": torch.tensor([[1] * len(ids) + [0] * (width - len(ids)) for ids in rows]),
+        }
+
+
+def make_texts():
+    rng = random.Random(7)
+    words = ["warfarin", "dose", "renal", "patient", "bleeding", "risk", "inr", "therapy", "daily", "mg"]
+    return [" ".join(rng.choice(words) for _ in range(rng.randint(8, 200))) for _ in range(TEXTS)]
+
+
+class TestMedicalEmbeddingBatchBenchmark:
+    """Texts/sec for padded, length-bucketed batches."""
+
+    @pytest.mark.asyncio
+    async def test_batch_throughput(self):
+        torch.manual_seed(0)
+        config = transformers.BertConfig(
+            vocab_size=VOCAB, hidden_size=128, num_hidden_layers=2, num_attention_heads=2, intermediate_size=256
+        )
+        service = MedicalEmbeddingService(lazy_load=True)
+        service._device = "cpu"
+        service._models[MedicalModelType.PUBMEDBERT] = {
+            "tokenizer": WhitespaceTokenizer(),
+            "model": transformers.BertModel(config).eval(),
+        }
+        texts = make_texts()
+
+        throughput = {}
+        reference = None
+        for batch_size in BATCH_SIZES:
+            start = time.perf_counter()
+            results = await service.generate_embeddings_batch(texts, MedicalModelType.PUBMEDBERT, batch_size=batch_size)
+            throughput[batch_size] = len(texts) / (time.perf_counter() - start)
+
+            if reference is None:
+                reference = results
+            else:
+                for a, b in zip(reference, results):
+                    assert a.embedding == pytest.approx(b.embedding, abs=1e-4)
+
+        print(
+            f"\n[Benchmark] MedicalEmbeddingService CPU, {TEXTS} texts: "
+            + ", ".join(f"batch {size}: {rate:.0f} texts/s" for size, rate in throughput.items())
+        )
+
+        assert throughput[32] > throughput[1]
@@ -0,0 +1,83 @@
+"""Metrics Collector Percentile Benchmark Tests.
+
+Compares the previous list-based MetricsCollector (append, trim by slicing,
+sort per percentile query) with the sketch-backed one for a record-heavy
+workload with frequent p95 queries.
+"""
+
+import random
+import time
+from datetime import datetime
+
+import pytest
+from app.engines.analytics_engine import MetricSample
+from app.engines.analytics_engine.collector import MetricBucket, MetricsCollector
+
+SAMPLES = 100_000
+QUERY_EVERY = 50
+MAX_SAMPLES = 1000
+
+
+class ListHistogramCollector(MetricsCollector):
+    """The previous record/get_percentile: raw sample lists, sorted per query."""
+
+    def __init__(self):
+        super().__init__()
+        self._lists = {}
+        self._samples = {}
+
+    async def record(self, sample):
+        key = self._build_key(sample.name, sample.labels)
+        samples = self._lists.setdefault(key, [])
+        samples.append(sample.value)
+        if len(samples) > MAX_SAMPLES:
+            self._lists[key] = samples[-MAX_SAMPLES:]
+        self._samples.setdefault(key, []).append(sample.value)  # MetricBucket.samples
+        bucket = self._buckets.setdefault(key, MetricBucket())
+        bucket.count += 1
+        bucket.sum += sample.value
+        bucket.min_val = min(bucket.min_val, sample.value)
+        bucket.max_val = max(bucket.max_val, sample.value)
+        bucket.last_update = datetime.utcnow()
+
+    async def get_percentile(self, name, percentile, labels=None):
+        ordered = sorted(self._lists.get(self._build_key(name, labels or {}), []))
+        return ordered[min(int(len(ordered) * percentile / 100), len(ordered) - 1)] if ordered else None
+
+
+async def run_workload(collector, samples):
+    results = []
+    for i, sample in enumerate(samples):
+        await collector.record(sample)
+        if i % QUERY_EVERY == 0:
+            results.append(await collector.get_percentile("latency_e2e", 95))
+    return results
+
+
+class TestMetricsSketchBenchmark:
+    """Record + query throughput."""
+
+    @pytest.mark.asyncio
+    async def test_record_and_query_throughput(self):
+        rng = random.Random(11)
+        samples = [MetricSample(name="latency_e2e", value=rng.lognormvariate(5, 0.8)) for _ in range(SAMPLES)]
+
+        legacy, collector = ListHistogramCollector(), MetricsCollector()
+
+        start = time.perf_counter()
+        await run_workload(legacy, samples)
+        list_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await run_workload(collector, samples)
+        sketch_elapsed = time.perf_counter() - start
+
+        retained_samples = sum(len(v) for v in legacy._lists.values()) + sum(len(v) for v in legacy._samples.values())
+        retained_bins = collector._histograms["latency_e2e"].snapshot().bin_count
+
+        print(f"\n[Benchmark] {SAMPLES:,} records, p95 query every {QUERY_EVERY}:")
+        print(f"  lists + sort: {list_elapsed*1000:.0f}ms")
+        print(f"  sketches:     {sketch_elapsed*1000:.0f}ms")
+        print(f"  retained: {retained_samples:,} raw samples vs {retained_bins} sketch bins")
+
+        assert sketch_elapsed < list_elapsed
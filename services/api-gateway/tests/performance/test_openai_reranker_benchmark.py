@@ -0,0 +1,101 @@
+"""OpenAI Reranker Benchmark Tests.
+
+Compares the previous re-ranker (one awaited embeddings call per
+candidate, cosine similarity in Python) with the batched, vectorized
+OpenAIReranker. Runs offline against a stub embeddings client that adds
+a fixed per-request latency.
+"""
+
+import asyncio
+import hashlib
+import math
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from app.services.reranking_service import OpenAIReranker
+
+DIM = 1536
+CANDIDATES = 20
+REQUEST_LATENCY_S = 0.01
+ROUNDS = 5
+
+
+class OfflineEmbeddingsClient:
+    """Deterministic embeddings with a fixed per-request latency."""
+
+    def __init__(self):
+        self.requests = 0
+        self.embeddings = SimpleNamespace(create=self.create)
+
+    @staticmethod
+    def vector(text):
+        seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:4], "little")
+        return np.random.default_rng(seed).standard_normal(DIM).astype(np.float32).tolist()
+
+    async def create(self, model, input):
+        self.requests += 1
+        await asyncio.sleep(REQUEST_LATENCY_S)
+        texts = [input] if isinstance(input, str) else input
+        return SimpleNamespace(data=[SimpleNamespace(index=i, embedding=self.vector(t)) for i, t in enumerate(texts)])
+
+
+class SequentialReranker:
+    """The previous rerank(): embed each document in turn, cosine in Python."""
+
+    def __init__(self, client):
+        self.client = client
+
+    async def _embed(self, text):
+        return (await self.client.embeddings.create(model="m", input=text)).data[0].embedding
+
+    async def rerank(self, query, documents, top_n=10):
+        query_embedding = await self._embed(query)
+        scores = []
+        for i, doc in enumerate(documents):
+            doc_embedding = await self._embed(doc[:8000])
+            dot = sum(a * b for a, b in zip(query_embedding, doc_embedding))
+            norm = math.sqrt(sum(a * a for a in query_embedding)) * math.sqrt(sum(b * b for b in doc_embedding))
+            scores.append((i, dot / norm if norm else 0.0))
+        scores.sort(key=lambda x: x[1], reverse=True)
+        return scores[:top_n]
+
+
+class TestOpenAIRerankerBenchmark:
+    """Latency of a 20-candidate re-rank."""
+
+    @pytest.mark.asyncio
+    async def test_batched_rerank_latency(self):
+        documents = [f"candidate passage {i} about anticoagulation" for i in range(CANDIDATES)]
+
+        async def no_cache(*args, **kwargs):
+            return None
+
+        legacy_client, batched_client = OfflineEmbeddingsClient(), OfflineEmbeddingsClient()
+        legacy = SequentialReranker(legacy_client)
+        batched = OpenAIReranker(client=batched_client)
+
+        with patch("app.services.reranking_service.cache_service") as cache_service:
+            cache_service.get = cache_service.set = no_cache
+
+            start = time.perf_counter()
+            for _ in range(ROUNDS):
+                expected = await legacy.rerank("warfarin reversal", documents)
+            legacy_elapsed = (time.perf_counter() - start) / ROUNDS
+
+            start = time.perf_counter()
+            for _ in range(ROUNDS):
+                ranked = await batched.rerank("warfarin reversal", documents)
+            batched_elapsed = (time.perf_counter() - start) / ROUNDS
+
+        print(
+            f"\n[Benchmark] OpenAIReranker {CANDIDATES} candidates, {REQUEST_LATENCY_S * 1000:.0f} ms/request: "
+            f"sequential {legacy_elapsed * 1000:.1f} ms ({legacy_client.requests // ROUNDS} requests), "
+            f"batched {batched_elapsed * 1000:.1f} ms ({batched_client.requests // ROUNDS} requests)"
+        )
+
+        assert [i for i, _ in ranked] == [i for i, _ in expected]
+        assert batched_client.requests == 2 * ROUNDS
+        assert batched_elapsed < legacy_elapsed / 5
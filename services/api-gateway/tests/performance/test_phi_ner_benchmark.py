@@ -0,0 +1,103 @@
+"""PHI NER Chunked Inference Benchmark Tests.
+
+Benchmarks EnhancedPHIDetector._detect_ner on ~1 MB documents:
+- Sequential vs parallel chunk batch inference throughput
+- Exact document offsets after overlap-aware span stitching
+- No duplicate detections in chunk overlap regions
+
+The transformer pipeline is replaced by a stub that finds names with a
+regex and sleeps per batch to emulate GIL-releasing model inference.
+"""
+
+import re
+import time
+
+import pytest
+from app.engines.clinical_engine.enhanced_phi_detector import EnhancedPHIDetector
+
+NAME_RE = re.compile(r"John Smith")
+INFERENCE_SECONDS_PER_BATCH = 0.004
+
+# Filler deliberately mixes newlines and repeated spaces so offsets
+# would drift if chunks were rebuilt from split words.
+PARAGRAPH = (
+    "Patient   John Smith presented with chest pain.\n"
+    "Vitals stable;  no acute distress noted on exam.\n\n"
+    "Plan: follow up in clinic with cardiology in two weeks. "
+)
+
+
+class StubNERPipeline:
+    """Stand-in for a transformers NER pipeline."""
+
+    def __call__(self, texts, batch_size=1):
+        time.sleep(INFERENCE_SECONDS_PER_BATCH)
+        single = isinstance(texts, str)
+        outputs = []
+        for text in [texts] if single else texts:
+            outputs.append(
+                [
+                    {"word": m.group(), "entity_group": "PER", "start": m.start(), "end": m.end(), "score": 0.99}
+                    for m in NAME_RE.finditer(text)
+                ]
+            )
+        return outputs[0] if single else outputs
+
+
+def make_detector(max_parallel_batches: int) -> EnhancedPHIDetector:
+    detector = EnhancedPHIDetector()
+    detector._ner_pipelines = [StubNERPipeline() for _ in range(max_parallel_batches)]
+    detector._model_loaded = True
+    return detector
+
+
+@pytest.fixture(scope="module")
+def megabyte_document():
+    repeats = (1024 * 1024) // len(PARAGRAPH) + 1
+    return PARAGRAPH * repeats
+
+
+class TestPHINERChunkedInference:
+    """Chunked NER inference correctness and throughput."""
+
+    @pytest.mark.asyncio
+    async def test_stitched_offsets_are_exact_and_unique(self, megabyte_document):
+        """Every name is detected once, at its true document offset."""
+        detector = make_detector(max_parallel_batches=4)
+
+        detections = await detector._detect_ner(megabyte_document)
+
+        expected = [(m.start(), m.end()) for m in NAME_RE.finditer(megabyte_document)]
+        actual = sorted((d.start_pos, d.end_pos) for d in detections)
+        assert actual == expected
+        assert all(megabyte_document[d.start_pos : d.end_pos] == "John Smith" for d in detections)
+
+    def test_chunks_cover_text_with_overlap(self, megabyte_document):
+        """Chunks are slices of the source text and leave no gaps."""
+        detector = make_detector(max_parallel_batches=1)
+        chunks = detector._chunk_text(megabyte_document)
+
+        assert chunks[0][1] == 0
+        for (prev_text, prev_offset), (chunk_text, offset) in zip(chunks, chunks[1:]):
+            assert megabyte_document[offset : offset + len(chunk_text)] == chunk_text
+            assert offset < prev_offset + len(prev_text)
+        last_text, last_offset = chunks[-1]
+        assert last_offset + len(last_text) == len(megabyte_document)
+
+    @pytest.mark.asyncio
+    async def test_parallel_throughput(self, megabyte_document):
+        """Benchmark: 1 MB document, sequential vs parallel batches."""
+        size_mb = len(megabyte_document) / (1024 * 1024)
+        timings = {}
+
+        for parallel in (1, 4):
+            detector = make_detector(max_parallel_batches=parallel)
+            start = time.perf_counter()
+            await detector._detect_ner(megabyte_document)
+            timings[parallel] = time.perf_counter() - start
+
+        print("\n[Benchmark] PHI NER on 1 MB document:")
+        for parallel, elapsed in timings.items():
+            print(f"  parallel={parallel}: {elapsed*1000:.0f}ms ({size_mb / elapsed:.2f} MB/s)")
+
+        assert timings[4] < timings[1]
@@ -76,6 +76,22 @@ class TestBM25Index:
         tokens = index._tokenize("Heart Disease, Treatment! Options?")
         assert tokens == ["heart", "disease", "treatment", "options"]
 
+    def test_search_in_thread_while_documents_are_added(self):
+        """Test searching from a worker thread while the index grows."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        index = BM25Index()
+        index.add_document("doc0", "heart disease treatment")
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            searches = [pool.submit(index.search, "heart disease", 5) for _ in range(200)]
+            for i in range(1, 2000):
+                index.add_document(f"doc{i}", "heart disease treatment options")
+            results = [search.result() for search in searches]
+
+        assert all(result for result in results)
+        assert len(index.search("heart", top_k=3000)) == 2000
+
 
 # ===================================
 # Hybrid Search Service Tests
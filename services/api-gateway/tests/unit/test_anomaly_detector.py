@@ -0,0 +1,152 @@
+"""
+Anomaly detector tests.
+
+Covers running Welford/EWMA baselines, hour-of-day baselines, and batch
+scoring equivalence with per-sample checks.
+"""
+
+import random
+from datetime import datetime
+
+import numpy as np
+import pytest
+from app.engines.analytics_engine import MetricSample
+from app.engines.analytics_engine.anomaly_detector import AnomalyDetector
+
+
+def sample(name, value, hour=12):
+    return MetricSample(name=name, value=value, timestamp=datetime(2024, 1, 1, hour, 0))
+
+
+class TestRunningBaselines:
+    """Welford warm-up and EWMA steady state"""
+
+    @pytest.mark.asyncio
+    async def test_warm_up_matches_exact_statistics(self):
+        detector = AnomalyDetector()
+        rng = random.Random(1)
+        values = [rng.gauss(200, 15) for _ in range(80)]
+        for value in values:
+            await detector.check(sample("latency_stt", value))
+
+        baseline = await detector.get_baseline("latency_stt")
+
+        assert baseline.sample_count == 80
+        assert baseline.mean == pytest.approx(np.mean(values))
+        assert baseline.std_dev == pytest.approx(np.std(values, ddof=1))
+        assert baseline.min_val == min(values) and baseline.max_val == max(values)
+
+    @pytest.mark.asyncio
+    async def test_ewma_follows_level_shift(self):
+        detector = AnomalyDetector()
+        for i in range(300):
+            await detector.check(sample("latency_stt", 100.0 + i % 5))
+        for i in range(300):
+            await detector.check(sample("latency_stt", 300.0 + i % 5))
+
+        baseline = await detector.get_baseline("latency_stt")
+
+        assert baseline.mean == pytest.approx(302, abs=1)
+
+    @pytest.mark.asyncio
+    async def test_spike_scored_against_previous_baseline(self):
+        detector = AnomalyDetector()
+        for i in range(30):
+            assert await detector.check(sample("latency_stt", 100.0 + i % 3)) is None
+
+        alert = await detector.check(sample("latency_stt", 150.0))
+
+        assert alert.severity == "high"
+        assert alert.expected_value == pytest.approx(101, abs=0.1)
+        assert alert.deviation_percent == pytest.approx(48.5, abs=0.2)
+
+    @pytest.mark.asyncio
+    async def test_no_alerts_before_min_samples(self):
+        detector = AnomalyDetector()
+        for value in [1.0, 2.0, 1000.0]:
+            assert await detector.check(sample("latency_stt", value)) is None
+
+    @pytest.mark.asyncio
+    async def test_reset_baseline(self):
+        detector = AnomalyDetector()
+        for i in range(30):
+            await detector.check(sample("latency_stt", float(i)))
+
+        assert await detector.reset_baseline("latency_stt")
+        assert await detector.get_baseline("latency_stt") is None
+        assert await detector.get_baseline("latency_stt", hour=12) is None
+
+
+class TestSeasonalBaselines:
+    """Hour-of-day baselines"""
+
+    @pytest.mark.asyncio
+    async def test_daily_peak_is_not_anomalous(self):
+        detector = AnomalyDetector()
+        for i in range(40):
+            await detector.check(sample("queue_depth", 10.0 + i % 3, hour=3))
+            await detector.check(sample("queue_depth", 100.0 + i % 3, hour=15))
+
+        assert (await detector.get_baseline("queue_depth", hour=3)).mean == pytest.approx(11, abs=0.1)
+        assert await detector.check(sample("queue_depth", 101.0, hour=15)) is None
+        assert (await detector.check(sample("queue_depth", 101.0, hour=3))).severity == "high"
+
+    @pytest.mark.asyncio
+    async def test_global_baseline_without_seasonal(self):
+        detector = AnomalyDetector(seasonal=False)
+        for i in range(40):
+            await detector.check(sample("queue_depth", 10.0 + i % 3, hour=3))
+            await detector.check(sample("queue_depth", 100.0 + i % 3, hour=15))
+
+        # Bimodal global baseline: neither level stands out
+        assert await detector.check(sample("queue_depth", 101.0, hour=15)) is None
+        assert await detector.get_baseline("queue_depth", hour=15) is None
+
+
+class TestBatchMode:
+    """Vectorized batch scoring"""
+
+    @pytest.mark.asyncio
+    async def test_batch_matches_per_sample_checks(self):
+        rng = random.Random(5)
+        samples = []
+        for i in range(3000):
+            name = f"metric_{rng.randrange(40)}"
+            value = rng.gauss(100, 10) if rng.random() > 0.01 else rng.gauss(300, 10)
+            samples.append(sample(name, value, hour=i // 200 % 24))
+
+        sequential, batched = AnomalyDetector(), AnomalyDetector()
+        expected = []
+        for s in samples:
+            alert = await sequential.check(s)
+            if alert:
+                expected.append((alert.metric_name, alert.current_value, alert.severity))
+
+        alerts = []
+        for start in range(0, len(samples), 250):
+            alerts.extend(batched.check_batch(samples[start : start + 250]))
+
+        assert sorted((a.metric_name, a.current_value, a.severity) for a in alerts) == sorted(expected)
+        for i in range(40):
+            seq = await sequential.get_baseline(f"metric_{i}")
+            bat = await batched.get_baseline(f"metric_{i}")
+            assert bat.sample_count == seq.sample_count
+            assert bat.mean == pytest.approx(seq.mean)
+            assert bat.std_dev == pytest.approx(seq.std_dev)
+
+    @pytest.mark.asyncio
+    async def test_timer_dispatches_alerts_and_stop_flushes(self):
+        detector = AnomalyDetector(batch_interval_seconds=60)
+        received = []
+
+        async def on_alert(alert):
+            received.append(alert)
+
+        await detector.start(on_alert)
+        for i in range(30):
+            detector.enqueue(sample("latency_llm", 100.0 + i % 3))
+        detector.enqueue(sample("latency_llm", 500.0))
+        await detector.stop()
+
+        assert [a.current_value for a in received] == [500.0]
+        assert await detector.flush() == []
@@ -0,0 +1,240 @@
+"""
+Audit segment store tests.
+
+Covers indexed queries, durability across reopen (including a torn final
+record), retention compaction, the bulk sink, and AuditService on top of
+the store.
+"""
+
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from app.core.audit_service import AuditEvent, AuditEventType, AuditService
+from app.core.audit_store import AuditSegmentStore
+
+BASE = datetime(2024, 1, 1)
+
+
+def make_event(i, user="u1", session="s1", resource=None, event_type=AuditEventType.EHR_READ, days=0):
+    return AuditEvent(
+        event_type=event_type,
+        timestamp=BASE + timedelta(days=days, seconds=i),
+        user_id=user,
+        session_id=session,
+        resource_id=resource,
+        description=f"event {i}",
+    )
+
+
+class CountingDecode:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, record):
+        self.calls += 1
+        return AuditEvent.from_dict(record)
+
+
+class RecordingSink:
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+
+    async def write(self, records):
+        if self.fail:
+            raise ConnectionError("db down")
+        self.batches.append(list(records))
+
+
+class TestSegmentStoreQueries:
+    """Indexed and time-bucketed queries"""
+
+    @pytest.mark.asyncio
+    async def test_filters_and_limit_return_most_recent_in_order(self):
+        store = AuditSegmentStore(None, decode=AuditEvent.from_dict, segment_max_events=10)
+        for i in range(100):
+            store.append(make_event(i, user=f"u{i % 3}", session=f"s{i % 5}"))
+
+        events = store.query(user_id="u1", limit=5)
+        assert [e.description for e in events] == [f"event {i}" for i in (85, 88, 91, 94, 97)]
+
+        both = store.query(user_id="u0", session_id="s0", limit=None)
+        assert [int(e.description.split()[1]) for e in both] == list(range(0, 100, 15))
+
+        assert store.query(user_id="nobody") == []
+
+    @pytest.mark.asyncio
+    async def test_time_range_skips_segments_and_reads_only_candidates(self, tmp_path):
+        decode = CountingDecode()
+        store = AuditSegmentStore(str(tmp_path), decode=decode, segment_max_events=50, cached_segments=0)
+        await store.open()
+        for day in range(10):
+            for i in range(50):
+                store.append(make_event(i, user="u2" if i == 7 else "u1", days=day))
+        await store.stop()
+
+        start, end = BASE + timedelta(days=3), BASE + timedelta(days=4, hours=12)
+        events = store.query(start_time=start, end_time=end, user_id="u2", limit=None)
+
+        assert [e.timestamp for e in events] == [BASE + timedelta(days=d, seconds=7) for d in (3, 4)]
+        assert decode.calls == 2  # One indexed record in each of the two overlapping segments
+
+    @pytest.mark.asyncio
+    async def test_event_type_counts(self):
+        store = AuditSegmentStore(None, decode=AuditEvent.from_dict)
+        store.append(make_event(1, event_type=AuditEventType.PHI_ACCESS))
+        store.append(make_event(2))
+        store.append(make_event(3))
+
+        assert store.event_type_counts() == {"phi.access": 1, "ehr.read": 2}
+
+
+class TestSegmentStoreDurability:
+    """Reopen, torn writes and compaction"""
+
+    @pytest.mark.asyncio
+    async def test_reopen_rebuilds_indexes_and_truncates_torn_record(self, tmp_path):
+        store = AuditSegmentStore(str(tmp_path), decode=AuditEvent.from_dict, segment_max_events=40)
+        await store.start()
+        for i in range(100):
+            store.append(make_event(i, user=f"u{i % 2}"))
+        await store.stop()
+
+        last = sorted(os.listdir(tmp_path))[-1]
+        with open(tmp_path / last, "ab") as f:
+            f.write(b'{"id": "torn", "event_ty')
+
+        reopened = AuditSegmentStore(str(tmp_path), decode=AuditEvent.from_dict)
+        await reopened.open()
+
+        assert reopened.total_events == 100
+        assert len(reopened.query(user_id="u1", limit=None)) == 50
+        assert not (tmp_path / last).read_bytes().endswith(b"event_ty")
+
+        reopened.append(make_event(100, user="u1"))
+        assert reopened.query(user_id="u1", limit=1)[0].description == "event 100"
+        await reopened.stop()
+
+    @pytest.mark.asyncio
+    async def test_compaction_drops_and_rewrites_segments(self, tmp_path):
+        store = AuditSegmentStore(str(tmp_path), decode=AuditEvent.from_dict, segment_max_events=30)
+        await store.open()
+        for i in range(100):
+            store.append(make_event(i, days=i // 10))
+        await store.stop()
+
+        removed = await store.compact(BASE + timedelta(days=4))
+
+        assert removed == 40
+        assert store.total_events == 60
+        assert len(os.listdir(tmp_path)) == 3  # Segment 0-29 deleted, 30-59 rewritten
+        assert store.query(limit=1, start_time=BASE)[0].description == "event 99"
+        assert store.query(limit=None, end_time=BASE + timedelta(days=5))[0].description == "event 40"
+
+        reopened = AuditSegmentStore(str(tmp_path), decode=AuditEvent.from_dict)
+        await reopened.open()
+        assert reopened.total_events == 60
+
+
+class TestSharedDirectory:
+    """Several writer processes on one directory"""
+
+    @pytest.mark.asyncio
+    async def test_writers_use_own_segments_and_queries_merge(self, tmp_path):
+        a = AuditSegmentStore(str(tmp_path), decode=AuditEvent.from_dict, segment_max_events=7)
+        b = AuditSegmentStore(str(tmp_path), decode=AuditEvent.from_dict, segment_max_events=7)
+        await a.open()
+        await b.open()
+        for i in range(60):
+            (a if i % 2 else b).append(make_event(i, user=f"u{i % 3}"))
+
+        names = os.listdir(tmp_path)
+        assert {n.split("-")[1] for n in names} == {a.writer_id, b.writer_id}
+
+        # b's active segment is still growing and is followed from a
+        for reader in (a, b):
+            events = reader.query(user_id="u1", limit=5)
+            assert [e.description for e in events] == [f"event {i}" for i in (46, 49, 52, 55, 58)]
+            assert len(reader.query(limit=None)) == 60
+
+        b.append(make_event(60, user="u1"))
+        assert a.query(user_id="u1", limit=1)[0].description == "event 60"
+        await a.stop()
+        await b.stop()
+
+    @pytest.mark.asyncio
+    async def test_compaction_by_another_writer_is_picked_up(self, tmp_path):
+        a = AuditSegmentStore(str(tmp_path), decode=AuditEvent.from_dict, segment_max_events=30, cached_segments=0)
+        b = AuditSegmentStore(str(tmp_path), decode=AuditEvent.from_dict)
+        await a.open()
+        await b.open()
+        for i in range(100):
+            a.append(make_event(i, days=i // 10))
+        await a.stop()
+        assert len(b.query(limit=None)) == 100
+
+        assert await b.compact(BASE + timedelta(days=4)) == 40
+
+        assert [e.description for e in a.query(limit=3)] == ["event 97", "event 98", "event 99"]
+        assert a.query(limit=None, end_time=BASE + timedelta(days=5))[0].description == "event 40"
+        assert a.total_events == 60
+        await b.stop()
+
+
+class TestSegmentStoreSink:
+    """Bulk sink batching and retry"""
+
+    @pytest.mark.asyncio
+    async def test_records_are_shipped_in_batches(self):
+        sink = RecordingSink()
+        store = AuditSegmentStore(None, decode=AuditEvent.from_dict, sink=sink, sink_batch_size=1000)
+        for i in range(250):
+            store.append(make_event(i))
+
+        store.sink_batch_size = 100
+        assert await store.flush_sink() == 250
+        assert [len(b) for b in sink.batches] == [100, 100, 50]
+
+    @pytest.mark.asyncio
+    async def test_failed_writes_are_retried(self):
+        sink = RecordingSink(fail=True)
+        store = AuditSegmentStore(None, decode=AuditEvent.from_dict, sink=sink, sink_batch_size=1000)
+        for i in range(10):
+            store.append(make_event(i))
+
+        assert await store.flush_sink() == 0
+        sink.fail = False
+        assert await store.flush_sink() == 10
+        assert store.get_stats()["sink_errors"] == 1
+
+
+class TestAuditServiceOnStore:
+    """Accounting, PHI access log and retention through the store"""
+
+    @pytest.mark.asyncio
+    async def test_accounting_and_phi_log(self, tmp_path):
+        store = AuditSegmentStore(str(tmp_path), decode=AuditEvent.from_dict)
+        service = AuditService(store=store)
+
+        for i in range(150):
+            await service.log_disclosure("dr1", f"patient-{i % 3}", "insurer", "payment", f"claim {i}", ["name"])
+        await service.log_phi_access("dr1", "s1", "patient-1", "patient", ["mrn"])
+        await service.log_ehr_access("dr1", "s1", "read", "patient", "patient-1", {})
+
+        accounting = await service.get_accounting_of_disclosures("patient-1")
+        phi_log = await service.get_phi_access_log("patient-1")
+
+        assert len(accounting.disclosures) == 50
+        assert len(phi_log) == 51  # Disclosures + PHI access; the plain EHR read has no PHI
+        assert service.get_stats()["phi_resources_tracked"] == 3
+        await service.stop()
+
+    @pytest.mark.asyncio
+    async def test_cleanup_old_events_compacts(self):
+        service = AuditService(retention_days=30)
+        await service.log(AuditEvent(timestamp=datetime.utcnow() - timedelta(days=60)))
+        await service.log(AuditEvent())
+
+        assert await service.cleanup_old_events() == 1
+        assert service.get_stats()["total_events"] == 1
@@ -0,0 +1,117 @@
+"""
+Unit tests for bulk de-identification
+
+Tests for:
+- PatientSurrogateStore consistency
+- BulkDeidentifier streaming over JSONL and CSV corpora
+- Per-patient surrogate consistency across a worker pool
+"""
+
+import csv
+import json
+
+import pytest
+from app.engines.clinical_engine.bulk_deidentification import BulkDeidentificationConfig, BulkDeidentifier
+from app.engines.clinical_engine.deidentification_service import DeidentificationMethod, PatientSurrogateStore
+
+SECRET = b"test-surrogate-secret"
+
+
+def write_jsonl(path, records):
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class TestPatientSurrogateStore:
+    """Tests for the keyed surrogate mapping store"""
+
+    def test_date_shift_is_stable_per_patient(self):
+        store = PatientSurrogateStore(SECRET)
+        other = PatientSurrogateStore(SECRET)
+
+        assert store.date_shift("patient-1") == other.date_shift("patient-1")
+        assert 30 <= store.date_shift("patient-1") <= 365
+
+    def test_seeds_depend_on_secret_patient_and_value(self):
+        store = PatientSurrogateStore(SECRET)
+
+        seed = store.surrogate_seed("patient-1", "ssn", "123-45-6789")
+        assert seed == store.surrogate_seed("patient-1", "ssn", "123-45-6789")
+        assert seed != store.surrogate_seed("patient-2", "ssn", "123-45-6789")
+        assert seed != PatientSurrogateStore(b"other").surrogate_seed("patient-1", "ssn", "123-45-6789")
+
+    def test_empty_secret_rejected(self):
+        with pytest.raises(ValueError):
+            PatientSurrogateStore(b"")
+
+
+class TestBulkDeidentifier:
+    """Tests for streaming bulk de-identification"""
+
+    def test_jsonl_in_process(self, tmp_path):
+        source = tmp_path / "notes.jsonl"
+        output = tmp_path / "notes.deid.jsonl"
+        write_jsonl(
+            source,
+            [
+                {"note_id": "n1", "patient_id": "p1", "text": "SSN 123-45-6789 seen today."},
+                {"note_id": "n2", "patient_id": "p1", "text": "Repeat: SSN 123-45-6789."},
+                {"note_id": "n3", "patient_id": "p2", "text": "No identifiers here."},
+            ],
+        )
+
+        stats = BulkDeidentifier(BulkDeidentificationConfig(workers=0, batch_size=2), secret=SECRET).run(
+            str(source), str(output)
+        )
+
+        records = read_jsonl(output)
+        assert [r["note_id"] for r in records] == ["n1", "n2", "n3"]
+        assert all("123-45-6789" not in r["text"] for r in records)
+        surrogate_1 = records[0]["text"].split()[1]
+        assert surrogate_1 in records[1]["text"]  # Same patient value -> same surrogate
+        assert stats.notes_read == 3
+        assert stats.notes_written == 3
+        assert stats.phi_replaced == 2
+        assert stats.notes_per_second > 0
+        assert stats.peak_memory_mb > 0
+
+    def test_csv_redaction(self, tmp_path):
+        source = tmp_path / "notes.csv"
+        output = tmp_path / "notes.deid.csv"
+        with open(source, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=["patient_id", "text"])
+            writer.writeheader()
+            writer.writerow({"patient_id": "p1", "text": "Contact jane.doe@example.org"})
+
+        config = BulkDeidentificationConfig(workers=0, method=DeidentificationMethod.REDACT)
+        BulkDeidentifier(config, secret=SECRET).run(str(source), str(output))
+
+        with open(output, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        assert rows == [{"patient_id": "p1", "text": "Contact [EMAIL]"}]
+
+    def test_worker_pool_keeps_patient_surrogates_consistent(self, tmp_path):
+        source = tmp_path / "notes.jsonl"
+        output = tmp_path / "notes.deid.jsonl"
+        write_jsonl(
+            source,
+            [{"patient_id": "p1", "text": f"Note {i}: SSN 123-45-6789"} for i in range(8)],
+        )
+
+        config = BulkDeidentificationConfig(workers=2, batch_size=1)
+        stats = BulkDeidentifier(config, secret=SECRET).run(str(source), str(output))
+
+        records = read_jsonl(output)
+        assert [r["text"].split(":")[0] for r in records] == [f"Note {i}" for i in range(8)]
+        assert len({r["text"].split("SSN ")[1] for r in records}) == 1
+        assert stats.notes_written == 8
+
+    def test_token_method_rejected(self):
+        with pytest.raises(ValueError):
+            BulkDeidentifier(BulkDeidentificationConfig(method=DeidentificationMethod.TOKEN), secret=SECRET)
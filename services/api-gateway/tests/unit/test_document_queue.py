@@ -0,0 +1,212 @@
+"""
+Document processing queue tests.
+
+Covers priority lanes on enqueue (Nextcloud crawls in the bulk lane), the
+streaming chunker, and the staged extract -> chunk -> embed -> upsert
+pipeline run by process_document.
+"""
+
+import asyncio
+import random
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from app.services.document_queue import (
+    QUEUE_NAMES,
+    BulkWorkerSettings,
+    DocumentPipeline,
+    DocumentPriority,
+    DocumentProcessingQueue,
+    StreamingChunker,
+    WorkerSettings,
+    crawl_nextcloud,
+    process_document,
+)
+from app.services.file_processor import FileProcessor
+from app.services.kb_indexer import KBIndexer
+
+
+class FakeQdrant:
+    def __init__(self):
+        self.upserts = []
+        self.points = {}
+
+    def upsert(self, collection_name, points):
+        self.upserts.append(points)
+        self.points.update((p.id, p) for p in points)
+
+
+class FakeKBIndexer:
+    chunk_size = 100
+    chunk_overlap = 20
+    collection_name = "medical_kb"
+
+    def __init__(self, embed_delay=0.0, fail=False, fail_after=None):
+        self.qdrant_client = FakeQdrant()
+        self.embed_delay = embed_delay
+        self.fail = fail
+        self.fail_after = fail_after  # Embedding calls that succeed before failing
+        self.embed_calls = []
+        self.events = []
+
+    async def generate_embeddings(self, texts):
+        self.events.append("embed")
+        if self.fail or (self.fail_after is not None and len(self.embed_calls) >= self.fail_after):
+            raise RuntimeError("embeddings unavailable")
+        self.embed_calls.append(len(texts))
+        await asyncio.sleep(self.embed_delay)
+        return [[float(len(t))] for t in texts]
+
+    def delete_document(self, document_id):
+        self.qdrant_client.points = {
+            pid: p for pid, p in self.qdrant_client.points.items() if p.payload["document_id"] != document_id
+        }
+        return True
+
+
+class SlowPages:
+    """FileProcessor stand-in that yields pages with a delay between them."""
+
+    def __init__(self, pages, events, delay=0.01):
+        self.pages = pages
+        self.events = events
+        self.delay = delay
+
+    async def iter_pages(self, file_content, filename, mime_type=None):
+        for i, text in enumerate(self.pages, 1):
+            await asyncio.sleep(self.delay)
+            self.events.append("page")
+            yield SimpleNamespace(page_number=i, text=text)
+
+
+def make_pipeline(kb_indexer, file_processor=None, embed_batch_size=4):
+    return DocumentPipeline(
+        kb_indexer=kb_indexer,
+        file_processor=file_processor or FileProcessor(workers=0),
+        embed_batch_size=embed_batch_size,
+        queue_size=2,
+    )
+
+
+class TestPriorityLanes:
+    """Interactive and bulk queues"""
+
+    @pytest.mark.asyncio
+    async def test_bulk_jobs_use_their_own_queue(self):
+
+        redis = SimpleNamespace(
+            enqueue_job=AsyncMock(return_value=SimpleNamespace(job_id="job-1")),
+            zcard=AsyncMock(side_effect=[3, 5000]),
+        )
+        queue = DocumentProcessingQueue()
+        queue._redis_pool = redis
+
+        await queue.enqueue_document("doc-1", b"text", ".txt", "Upload", "uploaded", {})
+        await queue.enqueue_document("doc-2", b"text", ".txt", "Import", "guideline", {}, priority="bulk")
+
+        lanes = [call.kwargs["_queue_name"] for call in redis.enqueue_job.await_args_list]
+        assert lanes == [QUEUE_NAMES[DocumentPriority.INTERACTIVE], QUEUE_NAMES[DocumentPriority.BULK]]
+        assert lanes[0] != lanes[1]
+        assert await queue.get_queue_depths() == {"interactive": 3, "bulk": 5000}
+
+    @pytest.mark.asyncio
+    async def test_nextcloud_crawls_go_to_the_bulk_lane(self):
+        redis = SimpleNamespace(enqueue_job=AsyncMock(return_value=SimpleNamespace(job_id="job-1")))
+        queue = DocumentProcessingQueue()
+        queue._redis_pool = redis
+
+        assert await queue.enqueue_nextcloud_crawl(["Guidelines"], force_reindex=True) == "job-1"
+
+        call = redis.enqueue_job.await_args
+        assert call.args == ("crawl_nextcloud", ["Guidelines"], "note", True)
+        assert call.kwargs["_queue_name"] == QUEUE_NAMES[DocumentPriority.BULK]
+        assert crawl_nextcloud in BulkWorkerSettings.functions
+
+    def test_worker_settings_serve_separate_lanes(self):
+
+        assert WorkerSettings.queue_name != BulkWorkerSettings.queue_name
+        assert WorkerSettings.functions == BulkWorkerSettings.functions
+
+
+class TestStreamingChunker:
+    """Incremental chunking matches KBIndexer.chunk_text"""
+
+    def test_matches_chunk_text_over_joined_pages(self):
+
+        rng = random.Random(3)
+        pages = ["".join(rng.choice("abcde ") for _ in range(rng.randint(0, 260))) for _ in range(9)]
+        indexer = KBIndexer.__new__(KBIndexer)
+        indexer.chunk_size, indexer.chunk_overlap = 100, 20
+        expected = indexer.chunk_text("\n".join(pages), "doc", {"title": "t"})
+
+        chunker = StreamingChunker(100, 20, "doc", {"title": "t"})
+        streamed = [c for page in pages for c in chunker.feed(page)] + chunker.finish()
+
+        assert [(c.content, c.chunk_index, c.metadata) for c in streamed] == [
+            (c.content, c.chunk_index, c.metadata) for c in expected
+        ]
+
+
+class TestDocumentPipeline:
+    """Staged, overlapping processing"""
+
+    @pytest.mark.asyncio
+    async def test_text_document_is_chunked_embedded_and_upserted(self):
+        kb_indexer = FakeKBIndexer()
+        pipeline = make_pipeline(kb_indexer)
+
+        indexed, stages = await pipeline.run("doc-1", b"x" * 1000, ".txt", "Notes", "uploaded", {"k": "v"})
+
+        points = [p for batch in kb_indexer.qdrant_client.upserts for p in batch]
+        assert indexed == len(points) == 12  # 13 windows; the 40-char tail is dropped
+        assert kb_indexer.embed_calls == [4, 4, 4]
+        assert points[0].payload["document_id"] == "doc-1" and points[0].payload["k"] == "v"
+        assert stages["extract"]["items"] == 1 and stages["upsert"]["items"] == 12
+
+    @pytest.mark.asyncio
+    async def test_embedding_starts_before_extraction_finishes(self):
+        kb_indexer = FakeKBIndexer(embed_delay=0.01)
+        pages = SlowPages(["p" * 200] * 10, kb_indexer.events)
+        pipeline = make_pipeline(kb_indexer, file_processor=pages, embed_batch_size=2)
+
+        indexed, _ = await pipeline.run("doc-1", b"%PDF", ".pdf", "Guide", "guideline", {})
+
+        assert indexed > 0
+        assert kb_indexer.events.index("embed") < len(kb_indexer.events) - 1 - kb_indexer.events[::-1].index("page")
+
+    @pytest.mark.asyncio
+    async def test_stage_failure_fails_the_job(self):
+
+        ctx = {"kb_indexer": FakeKBIndexer(fail=True), "file_processor": FileProcessor(workers=0)}
+
+        result = await process_document(ctx, "doc-1", b"x" * 1000, ".txt", "Notes", "uploaded", {})
+
+        assert result == {"success": False, "document_id": "doc-1", "error": "embeddings unavailable"}
+
+    @pytest.mark.asyncio
+    async def test_failed_run_removes_partial_document_and_retry_reuses_ids(self):
+        kb_indexer = FakeKBIndexer(fail_after=2)
+        pipeline = make_pipeline(kb_indexer, embed_batch_size=2)
+
+        with pytest.raises(RuntimeError):
+            await pipeline.run("doc-1", b"x" * 1000, ".txt", "Notes", "uploaded", {})
+
+        assert kb_indexer.qdrant_client.upserts and kb_indexer.qdrant_client.points == {}
+
+        kb_indexer.fail_after = None
+        await pipeline.run("doc-1", b"x" * 1000, ".txt", "Notes", "uploaded", {})
+        await pipeline.run("doc-1", b"x" * 1000, ".txt", "Notes", "uploaded", {})
+
+        assert len(kb_indexer.qdrant_client.points) == 12
+
+    @pytest.mark.asyncio
+    async def test_unsupported_and_empty_documents_fail(self):
+
+        ctx = {"kb_indexer": FakeKBIndexer(), "file_processor": FileProcessor(workers=0)}
+
+        unsupported = await process_document(ctx, "doc-1", b"data", ".exe", "Tool", "uploaded", {})
+        empty = await process_document(ctx, "doc-2", b"short", ".txt", "Stub", "uploaded", {})
+
+        assert unsupported["success"] is False and "Unsupported" in unsupported["error"]
+        assert empty["success"] is False and empty["error"] == "No chunks generated from document"
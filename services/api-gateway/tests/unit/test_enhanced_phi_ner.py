@@ -0,0 +1,111 @@
+"""
+Enhanced PHI detector NER tests.
+
+Covers chunked inference on per-thread pipelines, failing closed when the
+model errors, and stitching of entities cut by chunk boundaries.
+"""
+
+import re
+import threading
+import time
+
+import pytest
+from app.engines.clinical_engine.enhanced_phi_detector import EnhancedPHIDetector, PHIDetectionError
+
+NAME_RE = re.compile(r"John Smith")
+
+
+class BorrowCheckingPipeline:
+    """NER pipeline stub that fails like a fast tokenizer when used from two threads at once."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.lock = threading.Lock()
+        self.calls = 0
+
+    def __call__(self, texts, batch_size=1):
+        if not self.lock.acquire(blocking=False):
+            raise RuntimeError("Already borrowed")
+        try:
+            if self.fail:
+                raise RuntimeError("CUDA out of memory")
+            self.calls += 1
+            time.sleep(0.002)
+            return [
+                [
+                    {"word": m.group(), "entity_group": "PER", "start": m.start(), "end": m.end(), "score": 0.99}
+                    for m in NAME_RE.finditer(text)
+                ]
+                for text in texts
+            ]
+        finally:
+            self.lock.release()
+
+
+def make_detector(pipelines):
+    detector = EnhancedPHIDetector()
+    detector._ner_pipelines = pipelines
+    detector._model_loaded = True
+    return detector
+
+
+DOCUMENT = "Patient John Smith seen today for follow up.  " * 400
+
+
+class TestNERInference:
+    """Per-thread pipelines and failure handling"""
+
+    @pytest.mark.asyncio
+    async def test_pipelines_are_never_shared_between_threads(self):
+        pipelines = [BorrowCheckingPipeline() for _ in range(3)]
+        detector = make_detector(pipelines)
+
+        detections = await detector._detect_ner(DOCUMENT)
+
+        assert len(detections) == 400
+        chunks = len(detector._chunk_text(DOCUMENT))
+        assert sum(p.calls for p in pipelines) == -(-chunks // detector.BATCH_SIZE)
+
+    @pytest.mark.asyncio
+    async def test_inference_failure_is_not_reported_as_no_phi(self):
+        detector = make_detector([BorrowCheckingPipeline(fail=True)])
+
+        with pytest.raises(PHIDetectionError):
+            await detector._detect_ner(DOCUMENT)
+
+
+ADDRESS_RE = re.compile(r"Q\w+(?:[ ,]+Q\w+)*")
+ADDRESS = ", ".join(f"Q{i}street" for i in range(20))  # ~200 chars, wider than the chunk overlap
+
+
+class AddressPipeline:
+    """Tags every run of Q-words, including the part of an address a chunk cuts off."""
+
+    def __call__(self, texts, batch_size=1):
+        return [
+            [
+                {"word": m.group(), "entity_group": "ADDRESS", "start": m.start(), "end": m.end(), "score": 0.9}
+                for m in ADDRESS_RE.finditer(text)
+            ]
+            for text in texts
+        ]
+
+
+class TestSpanStitching:
+    """Entities crossing chunk boundaries"""
+
+    @pytest.mark.asyncio
+    async def test_long_spans_across_boundaries_are_reported_whole_once(self):
+        detector = make_detector([AddressPipeline()])
+        document = "".join(
+            f"Lives at {ADDRESS} since {year}. " + "Stable vitals, no distress. " * 7 for year in range(12)
+        )
+
+        detections = await detector._detect_ner(document)
+
+        expected = [(m.start(), m.end()) for m in re.finditer(re.escape(ADDRESS), document)]
+        assert sorted((d.start_pos, d.end_pos) for d in detections) == expected
+        assert all(d.text == ADDRESS for d in detections)
+
+        boundaries = [offset for _, offset in detector._chunk_text(document)[1:]]
+        assert any(start < b < end for start, end in expected for b in boundaries)
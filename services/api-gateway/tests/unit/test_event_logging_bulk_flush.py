@@ -0,0 +1,275 @@
+"""
+Event logging bulk flush tests.
+
+Covers batched writes, spill-to-disk and replay when the database is
+unavailable, dead-lettering of rejected rows, per-process spill
+directories, backpressure at the high-water mark, and the COPY writer.
+"""
+
+import asyncio
+import json
+import os
+import uuid
+
+import pytest
+from app.models.session_event import EventType
+from app.services.event_logging_service import SESSION_EVENT_COLUMNS, EventLoggingService, SessionEventBulkWriter
+
+
+class ForeignKeyViolation(Exception):
+    sqlstate = "23503"
+
+
+class FakeWriter:
+    def __init__(self):
+        self.batches = []
+        self.fail = False
+        self.gate = None
+        self.reject = set()
+
+    async def write(self, rows):
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.fail:
+            raise ConnectionError("database unavailable")
+        if any(row[6]["i"] in self.reject for row in rows):
+            raise ForeignKeyViolation("conversation_id is not present in table conversations")
+        self.batches.append(list(rows))
+
+    @property
+    def rows(self):
+        return [row for batch in self.batches for row in batch]
+
+
+class TestBulkFlush:
+    """Batched writes and throughput stats"""
+
+    @pytest.mark.asyncio
+    async def test_buffer_flushes_in_bulk(self, tmp_path):
+        writer = FakeWriter()
+        service = EventLoggingService(buffer_size=50, spill_dir=str(tmp_path), writer=writer)
+        conversation_id = uuid.uuid4()
+
+        for i in range(120):
+            await service.log_event(conversation_id, EventType.TRANSCRIPT_PARTIAL, payload={"i": i})
+        await service.stop()
+
+        rows = writer.rows
+        assert len(rows) == 120
+        assert len(writer.batches) <= 3
+        assert rows[0][1] == conversation_id and rows[0][5] == "transcript.partial"
+        assert [row[6]["i"] for row in rows] == list(range(120))
+
+        stats = service.get_stats()
+        assert stats["events_written"] == 120
+        assert stats["events_per_sec"] > 0
+        assert stats["flush_latency_ms_p95"] >= 0
+
+
+class TestSpillToDisk:
+    """Database outages"""
+
+    @pytest.mark.asyncio
+    async def test_failed_batches_spill_and_replay_in_order(self, tmp_path):
+        writer = FakeWriter()
+        writer.fail = True
+        service = EventLoggingService(buffer_size=1000, spill_dir=str(tmp_path), writer=writer)
+        user_id = uuid.uuid4()
+
+        for i in range(30):
+            await service.log_event(uuid.uuid4(), "custom", payload={"i": i}, user_id=user_id)
+        await service._flush_buffer()
+
+        assert service.get_stats()["events_spilled"] == 30
+        assert len(os.listdir(tmp_path)) == 1
+
+        writer.fail = False
+        for i in range(30, 40):
+            await service.log_event(uuid.uuid4(), "custom", payload={"i": i})
+        await service._flush_buffer()
+
+        assert os.listdir(tmp_path) == []
+        rows = writer.rows
+        assert sorted(row[6]["i"] for row in rows) == list(range(40))
+        replayed = [row for row in rows if row[6]["i"] < 30]
+        assert replayed[0][4] == user_id and isinstance(replayed[0][0], uuid.UUID)
+        assert service.get_stats()["events_replayed"] == 30
+
+    @pytest.mark.asyncio
+    async def test_rejected_rows_are_dead_lettered(self, tmp_path):
+        writer = FakeWriter()
+        writer.reject = {7}
+        service = EventLoggingService(buffer_size=1000, spill_dir=str(tmp_path), writer=writer)
+
+        for i in range(20):
+            await service.log_event(uuid.uuid4(), "custom", payload={"i": i})
+        await service._flush_buffer()
+
+        assert sorted(row[6]["i"] for row in writer.rows) == [i for i in range(20) if i != 7]
+        assert service._spill_files() == []
+        (name,) = os.listdir(service.dead_letter_dir)
+        with open(os.path.join(service.dead_letter_dir, name)) as f:
+            assert [json.loads(line)[6]["i"] for line in f] == [7]
+        stats = service.get_stats()
+        assert stats["events_rejected"] == 1 and stats["events_spilled"] == 0
+
+    @pytest.mark.asyncio
+    async def test_replay_continues_past_rejected_rows(self, tmp_path):
+        writer = FakeWriter()
+        writer.fail = True
+        service = EventLoggingService(buffer_size=1000, spill_dir=str(tmp_path), writer=writer)
+
+        for batch in range(2):
+            for i in range(batch * 10, batch * 10 + 10):
+                await service.log_event(uuid.uuid4(), "custom", payload={"i": i})
+            await service._flush_buffer()
+        assert len(service._spill_files()) == 2
+
+        # The oldest file holds a row whose conversation has since been deleted
+        writer.fail = False
+        writer.reject = {3}
+        await service._flush_buffer()
+
+        assert service._spill_files() == []
+        assert sorted(row[6]["i"] for row in writer.rows) == [i for i in range(20) if i != 3]
+        stats = service.get_stats()
+        assert stats["events_replayed"] == 19 and stats["events_rejected"] == 1
+
+
+class TestSpillDirectory:
+    """Per-process spill directories"""
+
+    @pytest.mark.asyncio
+    async def test_default_dir_is_per_process_and_adopts_exited_workers(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(EventLoggingService, "DEFAULT_SPILL_ROOT", str(tmp_path))
+        row = json.dumps(
+            [
+                str(uuid.uuid4()),
+                str(uuid.uuid4()),
+                None,
+                None,
+                None,
+                "custom",
+                {"i": 0},
+                None,
+                None,
+                "2026-01-01T00:00:00",
+            ]
+        )
+        exited = tmp_path / "999999999"  # Above any pid_max, so never a live process
+        exited.mkdir()
+        (exited / "spill-1-000001.jsonl").write_text(row + "\n")
+        (tmp_path / "spill-2-000001.jsonl").write_text(row + "\n")  # Shared-directory leftover
+
+        writer = FakeWriter()
+        service = EventLoggingService(writer=writer)
+        await service.start()
+        try:
+            assert service.spill_dir == os.path.join(str(tmp_path), str(os.getpid()))
+            assert service._spill_files() == ["spill-1-000001.jsonl", "spill-2-000001.jsonl"]
+            assert not exited.exists()
+        finally:
+            await service.stop()
+
+
+class TestBackpressure:
+    """High-water mark"""
+
+    @pytest.mark.asyncio
+    async def test_producers_wait_for_flush_then_spill(self, tmp_path):
+        writer = FakeWriter()
+        writer.gate = asyncio.Event()
+        service = EventLoggingService(
+            buffer_size=10,
+            high_water_mark=20,
+            backpressure_timeout_seconds=0.05,
+            spill_dir=str(tmp_path),
+            writer=writer,
+        )
+
+        # The first flush takes 20 rows and blocks in the writer; 20 more fill the buffer again
+        for i in range(41):
+            await service.log_event(uuid.uuid4(), "custom", payload={"i": i})
+
+        stats = service.get_stats()
+        assert stats["backpressure_waits"] >= 1
+        assert stats["overflow_pending"] == 1
+        assert stats["buffered"] == 20
+
+        writer.gate.set()
+        await service.stop()
+        assert sorted(row[6]["i"] for row in writer.rows) == list(range(41))
+
+    @pytest.mark.asyncio
+    async def test_overflow_events_share_spill_files(self, tmp_path):
+        writer = FakeWriter()
+        writer.gate = asyncio.Event()
+        service = EventLoggingService(
+            buffer_size=10,
+            high_water_mark=10,
+            backpressure_timeout_seconds=0.001,
+            spill_dir=str(tmp_path),
+            writer=writer,
+        )
+        service.OVERFLOW_SPILL_SECONDS = 0.05
+
+        # The first flush blocks with 10 rows; 10 more fill the buffer, 25 overflow
+        for i in range(45):
+            await service.log_event(uuid.uuid4(), "custom", payload={"i": i})
+
+        assert len(os.listdir(tmp_path)) == 2  # Two full overflow batches
+        await asyncio.sleep(0.1)
+        assert len(os.listdir(tmp_path)) == 3  # The remainder, once it is old enough
+        assert service.get_stats()["events_spilled"] == 25
+
+        writer.gate.set()
+        await service.stop()
+        assert sorted(row[6]["i"] for row in writer.rows) == list(range(45))
+
+
+class FakeDriver:
+    def __init__(self):
+        self.calls = []
+
+    async def copy_records_to_table(self, table, records, columns):
+        self.calls.append((table, records, columns))
+
+
+class FakeConnection:
+    def __init__(self, driver):
+        self.driver = driver
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def get_raw_connection(self):
+        return type("Raw", (), {"driver_connection": self.driver})()
+
+
+class FakeEngine:
+    def __init__(self):
+        self.driver = FakeDriver()
+
+    def connect(self):
+        return FakeConnection(self.driver)
+
+
+class TestBulkWriter:
+    """COPY path"""
+
+    @pytest.mark.asyncio
+    async def test_copy_encodes_jsonb_payload(self):
+        engine = FakeEngine()
+        writer = SessionEventBulkWriter(engine=engine)
+        row = (uuid.uuid4(), uuid.uuid4(), "s1", None, None, "custom", {"a": 1}, "backend", None, None)
+
+        await writer.write([row, row[:6] + (None,) + row[7:]])
+
+        table, records, columns = engine.driver.calls[0]
+        assert table == "session_events"
+        assert columns == SESSION_EVENT_COLUMNS
+        assert json.loads(records[0][6]) == {"a": 1}
+        assert records[1][6] is None
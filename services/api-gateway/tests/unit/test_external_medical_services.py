@@ -797,7 +797,10 @@ class TestAPIEndpoints:
         mock_qdrant_instance = MagicMock()
         mock_qdrant_instance.get_collections.return_value = MagicMock(collections=[])
 
-        with patch("qdrant_client.QdrantClient", return_value=mock_qdrant_instance):
+        with (
+            patch("qdrant_client.QdrantClient", return_value=mock_qdrant_instance),
+            patch("app.services.kb_indexer.QdrantClient", return_value=mock_qdrant_instance),
+        ):
             # Need to reimport app after mocking
             import importlib
 
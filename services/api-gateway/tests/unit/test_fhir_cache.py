@@ -0,0 +1,142 @@
+"""Tests for the FHIR client response cache."""
+
+import time
+
+import pytest
+from app.integrations.fhir.fhir_client import FHIRCache, FHIRClient, FHIRClientConfig
+from app.integrations.fhir.fhir_models import FHIRResourceType
+
+
+class InMemoryRedis:
+    """Minimal async Redis stand-in shared by several caches (one per "pod")."""
+
+    def __init__(self):
+        self.values = {}
+
+    async def incr(self, key):
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
+
+    async def expire(self, key, seconds):
+        return True
+
+    async def mget(self, keys):
+        return [self.values.get(k) for k in keys]
+
+
+class TestFHIRCache:
+    """TTL-LRU, size accounting and invalidation"""
+
+    def test_get_refreshes_recency(self):
+        cache = FHIRCache(max_entries=2)
+        cache.set("a", {"id": "a"})
+        cache.set("b", {"id": "b"})
+        cache.get("a")
+        cache.set("c", {"id": "c"})
+
+        assert cache.get("a") == {"id": "a"}
+        assert cache.get("b") is None
+        assert cache.evictions == 1
+
+    def test_byte_limit_evicts_lru(self):
+        payload = {"text": "x" * 1000}
+        cache = FHIRCache(max_entries=100, max_bytes=3000)
+        for key in "abcd":
+            cache.set(key, payload)
+
+        assert len(cache) == 2
+        assert cache.size_bytes <= 3000
+        assert cache.get("a") is None and cache.get("d") == payload
+
+    def test_expired_entries_are_dropped(self, monkeypatch):
+        cache = FHIRCache(ttl_seconds=10)
+        cache.set("a", [1])
+        clock = time.monotonic() + 11
+        monkeypatch.setattr("app.integrations.fhir.fhir_client.time.monotonic", lambda: clock)
+
+        assert cache.get("a") is None
+        assert cache.size_bytes == 0
+
+    def test_patient_invalidation_uses_index(self):
+        cache = FHIRCache()
+        cache.set("Patient/p1", {"id": "p1"}, patient_ids=["p1"])
+        cache.set("search:Condition?patient=p1", [], patient_ids=["p1"])
+        cache.set("search:Condition?patient=p2", [], patient_ids=["p2"])
+
+        assert cache.invalidate_patient("p1") == 2
+        assert cache.get("search:Condition?patient=p1") is None
+        assert cache.get("search:Condition?patient=p2") == []
+
+    def test_fetch_started_before_invalidation_is_not_cached(self):
+        cache = FHIRCache()
+        stamps = cache.stamp(["p1"])
+        cache.invalidate_patient("p1")
+        cache.set("Patient/p1", {"id": "p1", "stale": True}, patient_ids=["p1"], stamps=stamps)
+
+        assert cache.get("Patient/p1") is None
+
+    @pytest.mark.asyncio
+    async def test_write_on_one_instance_invalidates_others(self):
+        redis = InMemoryRedis()
+        pod_a = FHIRCache(redis_client=redis, version_check_seconds=0)
+        pod_b = FHIRCache(redis_client=redis, version_check_seconds=0)
+        await pod_b.refresh_versions(["p1"])
+        pod_b.set("Patient/p1", {"id": "p1"}, patient_ids=["p1"])
+
+        await pod_a.publish_patient_write("p1")
+        await pod_b.refresh_versions(["p1"])
+
+        assert pod_b.get("Patient/p1") is None
+
+
+class TestFHIRClientCacheInvalidation:
+    """Client writes invalidate only the affected patient"""
+
+    @pytest.mark.asyncio
+    async def test_update_invalidates_patient_searches(self, monkeypatch):
+        client = FHIRClient(FHIRClientConfig(base_url="https://fhir.test/R4"))
+
+        async def fake_write_request(*args, **kwargs):
+            return None, {}
+
+        monkeypatch.setattr(client, "_write_request", fake_write_request)
+        cache = client._cache
+        cache.set("search:Condition?patient=p1", ["c1"], patient_ids=["p1"])
+        cache.set("search:Condition?patient=p2", ["c2"], patient_ids=["p2"])
+        cache.set("search:Condition?code=E11", ["c3"], tags=["unscoped:Condition"])
+
+        await client.update(
+            FHIRResourceType.CONDITION,
+            "c1",
+            {"subject": {"reference": "Patient/p1"}},
+            if_match=False,
+        )
+
+        assert cache.get("search:Condition?patient=p1") is None
+        assert cache.get("search:Condition?code=E11") is None
+        assert cache.get("search:Condition?patient=p2") == ["c2"]
+
+
+class TestClinicalEngineCacheWiring:
+    """The Epic adapter built by the clinical engine shares invalidations"""
+
+    @pytest.mark.asyncio
+    async def test_epic_adapter_gets_shared_redis_client(self, monkeypatch):
+        from app.engines.clinical_engine import ClinicalEngine
+        from app.integrations.fhir import EpicAdapter
+        from app.services.cache_service import cache_service
+
+        redis = InMemoryRedis()
+
+        async def get_redis_client():
+            return redis
+
+        async def initialize(self):
+            return True
+
+        monkeypatch.setattr(cache_service, "get_redis_client", get_redis_client)
+        monkeypatch.setattr(EpicAdapter, "initialize", initialize)
+        engine = ClinicalEngine()
+        await engine._initialize_phase6_components()
+
+        assert engine.get_epic_adapter()._cache.redis_client is redis
@@ -0,0 +1,427 @@
+"""
+Incremental FHIR sync tests.
+
+Covers watermark-driven delta refresh and in-place merge in EHRDataService,
+merging of subscription notifications, and the coalesced per-patient
+poller in FHIRSubscriptionService.
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import pytest
+from app.integrations.fhir.ehr_data_service import EHRDataService, EHRDataStatus
+from app.integrations.fhir.fhir_client import FHIRClient, FHIRClientConfig
+from app.integrations.fhir.fhir_models import FHIRCondition, FHIRMedication, FHIRObservation, FHIRPatient
+from app.services.fhir_subscription_service import (
+    FHIRConfig,
+    FHIRResourceType,
+    FHIRSubscription,
+    FHIRSubscriptionService,
+    SubscriptionStatus,
+)
+
+
+def meta(last_updated: str, version: str = "1") -> Dict[str, Any]:
+    return {"versionId": version, "lastUpdated": last_updated}
+
+
+def medication(med_id: str, status: str, last_updated: str, version: str = "1") -> FHIRMedication:
+    return FHIRMedication.from_fhir(
+        {
+            "resourceType": "MedicationRequest",
+            "id": med_id,
+            "status": status,
+            "meta": meta(last_updated, version),
+            "medicationCodeableConcept": {"text": f"Drug {med_id}"},
+        }
+    )
+
+
+def vital_resource(obs_id: str, value: float, last_updated: str, version: str = "1") -> Dict[str, Any]:
+    return {
+        "resourceType": "Observation",
+        "id": obs_id,
+        "status": "final",
+        "meta": meta(last_updated, version),
+        "category": [{"coding": [{"code": "vital-signs"}]}],
+        "code": {"coding": [{"system": "http://loinc.org", "code": "8867-4", "display": "Heart rate"}]},
+        "valueQuantity": {"value": value, "unit": "bpm"},
+    }
+
+
+class FakeChartAdapter:
+    """Stands in for EpicAdapter.get_patient_chart, returning queued charts."""
+
+    def __init__(self):
+        self.calls: List[Optional[Dict[str, str]]] = []
+        self.charts: List[Dict[str, Any]] = []
+        self.delay = 0.0
+
+    async def get_patient_chart(self, patient_id: str, since: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        self.calls.append(dict(since) if since is not None else None)
+        await asyncio.sleep(self.delay)
+        chart = self.charts.pop(0)
+        if isinstance(chart, Exception):
+            raise chart
+        return chart
+
+    def is_healthy(self) -> bool:
+        return True
+
+
+def full_chart() -> Dict[str, Any]:
+    return {
+        "patient": FHIRPatient.from_fhir({"resourceType": "Patient", "id": "p1", "meta": meta("2024-01-01T00:00:00Z")}),
+        "medications": [
+            medication("m1", "active", "2024-01-02T00:00:00Z"),
+            medication("m2", "active", "2024-01-03T00:00:00Z"),
+        ],
+        "conditions": [],
+        "allergies": [],
+        "vitals": [FHIRObservation.from_fhir(vital_resource("v1", 70, "2024-01-04T00:00:00Z"))],
+        "labs": [],
+    }
+
+
+async def loaded_service(sessions=("s1",)) -> tuple:
+    adapter = FakeChartAdapter()
+    service = EHRDataService(epic_adapter=adapter)
+    for session_id in sessions:
+        adapter.charts.append(full_chart())
+        await service.initialize_session(session_id)
+        await service.set_patient(session_id, "p1")
+    return service, adapter
+
+
+class TestEHRIncrementalRefresh:
+    """Watermarks, delta merge and coalescing in EHRDataService"""
+
+    @pytest.mark.asyncio
+    async def test_full_load_sets_section_watermarks(self):
+        service, _ = await loaded_service()
+        context = await service.get_session_context("s1")
+
+        assert context.sync_watermarks == {
+            "patient": "2024-01-01T00:00:00Z",
+            "medications": "2024-01-03T00:00:00Z",
+            "vitals": "2024-01-04T00:00:00Z",
+        }
+        assert not context.needs_full_sync
+
+    @pytest.mark.asyncio
+    async def test_refresh_fetches_and_merges_only_changes(self):
+        service, adapter = await loaded_service()
+        context = await service.get_session_context("s1")
+        medications = context.medications
+
+        adapter.charts.append(
+            {
+                "medications": [
+                    medication("m2", "active", "2024-01-03T00:00:00Z"),  # Boundary resource, unchanged
+                    medication("m1", "stopped", "2024-02-01T00:00:00Z", version="2"),
+                    medication("m3", "active", "2024-02-02T00:00:00Z"),
+                ],
+                "conditions": [FHIRCondition.from_fhir({"resourceType": "Condition", "id": "c1"})],
+                "allergies": [],
+                "vitals": [],
+                "labs": [],
+            }
+        )
+        await service.refresh_session_data("s1")
+
+        assert adapter.calls[-1] == {
+            "patient": "2024-01-01T00:00:00Z",
+            "medications": "2024-01-03T00:00:00Z",
+            "vitals": "2024-01-04T00:00:00Z",
+        }
+        # Merged in place: stopped m1 dropped, m3 appended, unsectioned lists replaced
+        assert context.medications is medications
+        assert [m.id for m in context.medications] == ["m2", "m3"]
+        assert [c.id for c in context.conditions] == ["c1"]
+        assert [v.id for v in context.vitals] == ["v1"]
+        assert context.sync_watermarks["medications"] == "2024-02-02T00:00:00Z"
+        assert context.sync_lag_seconds is not None
+        assert service.get_stats()["resources_merged"] == 3
+
+    @pytest.mark.asyncio
+    async def test_concurrent_refreshes_share_one_fetch(self):
+        service, adapter = await loaded_service(sessions=("s1", "s2"))
+        adapter.delay = 0.01
+        adapter.charts.append(
+            {
+                "medications": [],
+                "conditions": [],
+                "allergies": [],
+                "vitals": [FHIRObservation.from_fhir(vital_resource("v2", 88, "2024-03-01T00:00:00Z"))],
+                "labs": [],
+            }
+        )
+        fetches_before = len(adapter.calls)
+
+        await asyncio.gather(service.refresh_session_data("s1"), service.refresh_session_data("s2"))
+
+        assert len(adapter.calls) == fetches_before + 1
+        for session_id in ("s1", "s2"):
+            context = await service.get_session_context(session_id)
+            assert [v.id for v in context.vitals] == ["v1", "v2"]
+        stats = service.get_stats()
+        assert stats["coalesced_refreshes"] == 1
+        assert stats["incremental_refreshes"] == 1
+
+    @pytest.mark.asyncio
+    async def test_errors_reflect_only_the_latest_refresh(self):
+        service, adapter = await loaded_service()
+        context = await service.get_session_context("s1")
+        empty = {section: [] for section in ("medications", "conditions", "allergies", "vitals", "labs")}
+
+        adapter.charts.append({**empty, "labs": TimeoutError("labs timed out")})
+        await service.refresh_session_data("s1")
+        assert context.errors == ["Labs fetch error: labs timed out"]
+        assert context.status == EHRDataStatus.PARTIAL
+
+        adapter.charts.append(ConnectionError("EHR unreachable"))
+        await service.refresh_session_data("s1")
+        assert context.errors == ["EHR unreachable"]
+
+        adapter.charts.append(dict(empty))
+        await service.refresh_session_data("s1")
+        assert context.errors == [] and context.status == EHRDataStatus.LOADED
+
+    @pytest.mark.asyncio
+    async def test_full_sync_when_interval_elapsed(self):
+        service, adapter = await loaded_service()
+        context = await service.get_session_context("s1")
+        context.last_full_sync = datetime(2000, 1, 1)
+
+        adapter.charts.append(full_chart())
+        await service.refresh_session_data("s1")
+
+        assert adapter.calls[-1] is None
+        assert service.get_stats()["full_refreshes"] == 2
+
+    @pytest.mark.asyncio
+    async def test_pushed_updates_merge_into_sessions(self):
+        service, _ = await loaded_service(sessions=("s1", "s2"))
+
+        updated = await service.apply_resource_updates(
+            "p1",
+            [
+                vital_resource("v1", 120, "2024-05-01T00:00:00Z", version="2"),
+                {"resourceType": "MedicationRequest", "id": "m2", "status": "entered-in-error"},
+            ],
+        )
+
+        assert updated == 2
+        context = await service.get_session_context("s2")
+        assert context.vitals[0].value_quantity.value == 120
+        assert [m.id for m in context.medications] == ["m1"]
+        assert context.sync_watermarks["vitals"] == "2024-05-01T00:00:00Z"
+
+    @pytest.mark.asyncio
+    async def test_subscription_notifications_merge_into_sessions(self, subscription_service):
+        async def subscribe(patient_id, resource_types=None, session_id=None):
+            return add_subscription(subscription_service, "sub-1")
+
+        subscription_service.subscribe_to_patient = subscribe
+        adapter = FakeChartAdapter()
+        adapter.charts.append(full_chart())
+        service = EHRDataService(epic_adapter=adapter, subscription_service=subscription_service)
+        await service.initialize_session("s1")
+        await service.set_patient("s1", "p1")
+        await asyncio.sleep(0.01)
+
+        observation = subscription_service._parse_observation(
+            vital_resource("v1", 95, "2024-05-01T00:00:00Z", version="2"), "p1"
+        )
+        subscription_service._emit_patient_event([subscription_service._subscriptions["sub-1"]], observation)
+        await asyncio.sleep(0.01)
+
+        context = await service.get_session_context("s1")
+        assert context.vitals[0].value_quantity.value == 95
+        stats = service.get_stats()
+        assert stats["pushed_updates"] == 1 and stats["followed_patients"] == 1
+        assert "pollers" in stats["subscription_sync"]
+
+        service.clear_session("s1")
+        await asyncio.sleep(0.01)
+        assert subscription_service._subscriptions == {}
+
+
+class TestIncrementalChartRequests:
+    """get_patient_chart(since=...) request shaping"""
+
+    @pytest.mark.asyncio
+    async def test_since_sections_use_inclusive_watermark_without_status_filters(self, monkeypatch):
+        client = FHIRClient(FHIRClientConfig(base_url="https://fhir.test/R4"))
+        captured = {}
+
+        async def fake_batch(requests, use_cache=True):
+            captured["requests"] = requests
+            captured["use_cache"] = use_cache
+            return [[] for _ in requests]
+
+        monkeypatch.setattr(client, "batch", fake_batch)
+
+        chart = await client.get_patient_chart(
+            "p1", since={"patient": "2024-01-01T00:00:00Z", "medications": "2024-01-02T00:00:00Z"}
+        )
+
+        assert "patient" not in chart
+        requests = dict(zip(chart.keys(), captured["requests"]))
+        assert requests["medications"].params == {"patient": "p1", "_lastUpdated": "ge2024-01-02T00:00:00Z"}
+        assert requests["conditions"].params == {"patient": "p1", "clinical-status": "active"}
+        assert captured["use_cache"] is False
+
+
+class FakeResponse:
+    def __init__(self, bundle: Dict[str, Any], status_code: int = 200, headers: Optional[Dict[str, str]] = None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self._bundle = bundle
+        self.text = ""
+
+    def json(self) -> Dict[str, Any]:
+        return self._bundle
+
+
+class FakeHTTPClient:
+    """Records poll requests and serves queued bundles"""
+
+    def __init__(self):
+        self.requests: List[Dict[str, Any]] = []
+        self.responses: List[FakeResponse] = []
+
+    async def get(self, url, params=None, headers=None, timeout=None):
+        self.requests.append({"url": url, "params": dict(params or {}), "headers": dict(headers or {})})
+        return self.responses.pop(0)
+
+
+def bundle(*resources: Dict[str, Any], next_url: Optional[str] = None) -> Dict[str, Any]:
+    return {
+        "resourceType": "Bundle",
+        "entry": [{"resource": r} for r in resources],
+        "link": [{"relation": "next", "url": next_url}] if next_url else [],
+    }
+
+
+@pytest.fixture
+def subscription_service():
+    return FHIRSubscriptionService(
+        FHIRConfig(fhir_server_url="https://fhir.example.com", subscription_channel="polling")
+    )
+
+
+def add_subscription(service, sub_id: str, resource_types=None) -> FHIRSubscription:
+    subscription = FHIRSubscription(
+        subscription_id=sub_id,
+        patient_id="p1",
+        resource_types=resource_types or [FHIRResourceType.VITAL_SIGNS],
+        status=SubscriptionStatus.ACTIVE,
+    )
+    service._subscriptions[sub_id] = subscription
+    service._patient_subscriptions.setdefault("p1", set()).add(sub_id)
+    return subscription
+
+
+class TestCoalescedPolling:
+    """Watermark polling shared by a patient's subscriptions"""
+
+    @pytest.mark.asyncio
+    async def test_polls_deltas_after_snapshot_and_skips_boundary(self, subscription_service):
+        from app.services.fhir_subscription_service import PatientSyncState
+
+        subscriptions = [add_subscription(subscription_service, "a"), add_subscription(subscription_service, "b")]
+        events = []
+        subscription_service._register_callback("p1", events.append)
+        state = PatientSyncState(patient_id="p1")
+        client = FakeHTTPClient()
+        client.responses = [
+            FakeResponse(bundle(vital_resource("v1", 70, "2024-01-01T00:00:00Z"))),
+            FakeResponse(
+                bundle(
+                    vital_resource("v1", 70, "2024-01-01T00:00:00Z"),
+                    vital_resource("v2", 75, "2024-01-02T00:00:00Z"),
+                ),
+                headers={"ETag": 'W/"2"'},
+            ),
+            FakeResponse(bundle(vital_resource("v2", 75, "2024-01-02T00:00:00Z")), headers={"ETag": 'W/"2"'}),
+            FakeResponse(bundle(vital_resource("v2", 76, "2024-01-02T00:00:00Z", version="2"))),
+        ]
+
+        for _ in range(4):
+            await subscription_service._poll_observations(client, state, subscriptions)
+
+        first, second, third, fourth = client.requests
+        assert first["params"]["_sort"] == "-_lastUpdated"
+        assert "_lastUpdated" not in first["params"]
+        assert second["params"]["_lastUpdated"] == "ge2024-01-01T00:00:00Z"
+        assert second["params"]["_sort"] == "_lastUpdated"
+        assert third["params"]["_lastUpdated"] == "ge2024-01-02T00:00:00Z"
+        assert "If-None-Match" not in third["headers"]
+        assert fourth["headers"]["If-None-Match"] == 'W/"2"'
+
+        # v1 once, v2 once, then v2's amended version; each event delivered once
+        assert [(e.resource_id, e.observation.value_quantity) for e in events] == [
+            ("v1", 70),
+            ("v2", 75),
+            ("v2", 76),
+        ]
+        assert [s.event_count for s in subscriptions] == [3, 3]
+        assert state.changes == 3
+        assert state.lag_seconds is not None
+
+    @pytest.mark.asyncio
+    async def test_delta_poll_follows_next_pages(self, subscription_service):
+        from app.services.fhir_subscription_service import PatientSyncState
+
+        subscriptions = [add_subscription(subscription_service, "a")]
+        state = PatientSyncState(
+            patient_id="p1", watermarks={"Observation?category=vital-signs": "2024-01-01T00:00:00Z"}
+        )
+        client = FakeHTTPClient()
+        client.responses = [
+            FakeResponse(bundle(vital_resource("v1", 70, "2024-01-02T00:00:00Z"), next_url="https://next")),
+            FakeResponse(bundle(vital_resource("v2", 71, "2024-01-03T00:00:00Z"))),
+        ]
+
+        await subscription_service._poll_observations(client, state, subscriptions)
+
+        assert client.requests[1]["url"] == "https://next"
+        assert state.watermarks["Observation?category=vital-signs"] == "2024-01-03T00:00:00Z"
+        assert state.changes == 2
+
+    def test_categories_union_and_unfiltered(self, subscription_service):
+        vitals = add_subscription(subscription_service, "a", [FHIRResourceType.VITAL_SIGNS])
+        labs = add_subscription(subscription_service, "b", [FHIRResourceType.LAB_RESULT])
+        everything = add_subscription(subscription_service, "c", [FHIRResourceType.OBSERVATION])
+
+        assert subscription_service._polling_categories([vitals, labs]) == ["laboratory", "vital-signs"]
+        assert subscription_service._polling_categories([vitals, everything]) == []
+
+    @pytest.mark.asyncio
+    async def test_second_subscription_joins_running_poller(self, subscription_service):
+        first = add_subscription(subscription_service, "a")
+        second = add_subscription(subscription_service, "b")
+        polls = []
+
+        async def fake_poll(client, state, subscriptions):
+            polls.append([s.subscription_id for s in subscriptions])
+
+        subscription_service._poll_observations = fake_poll
+        subscription_service.config.polling_interval_seconds = 0.01
+
+        poller = asyncio.create_task(subscription_service._start_polling_subscription(first))
+        await asyncio.sleep(0)
+        await subscription_service._start_polling_subscription(second)  # Returns immediately
+        await asyncio.sleep(0.03)
+
+        assert subscription_service.get_sync_stats()["pollers"] == 1
+        assert sorted(polls[-1]) == ["a", "b"]
+
+        await subscription_service.unsubscribe("a")
+        await subscription_service.unsubscribe("b")
+        await asyncio.sleep(0)
+        assert poller.done()
+        assert subscription_service.get_sync_stats()["pollers"] == 0
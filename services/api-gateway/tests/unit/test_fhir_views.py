@@ -0,0 +1,129 @@
+"""Tests for lazy FHIR resource views."""
+
+import gc
+import json
+
+import pytest
+from app.integrations.fhir.fhir_client import FHIRClient, FHIRClientConfig
+from app.integrations.fhir.fhir_models import (
+    FHIRAllergyIntolerance,
+    FHIRCondition,
+    FHIRMedication,
+    FHIRObservation,
+    FHIRResourceType,
+)
+from app.integrations.fhir.fhir_views import (
+    AllergyIntoleranceView,
+    ConditionView,
+    MedicationView,
+    ObservationView,
+    loads_fhir_json,
+)
+
+OBSERVATIONS = [
+    {
+        "resourceType": "Observation",
+        "id": "glucose",
+        "status": "final",
+        "category": [{"coding": [{"code": "laboratory"}]}],
+        "code": {"coding": [{"system": "http://loinc.org", "code": "2345-7", "display": "Glucose"}]},
+        "valueQuantity": {"value": 182, "unit": "mg/dL"},
+        "referenceRange": [{"low": {"value": 70, "unit": "mg/dL"}, "high": {"value": 99, "unit": "mg/dL"}}],
+        "interpretation": [{"coding": [{"code": "H"}]}],
+        "effectiveDateTime": "2024-03-01T08:00:00Z",
+        "subject": {"reference": "Patient/p1"},
+        "note": [{"text": "fasting"}],
+    },
+    {
+        "resourceType": "Observation",
+        "id": "smoking",
+        "status": "amended",
+        "code": {"text": "Smoking status"},
+        "valueCodeableConcept": {"coding": [{"code": "8517006", "display": "Former smoker"}]},
+        "referenceRange": [{"text": "n/a"}],
+    },
+    {"resourceType": "Observation", "id": "bare", "status": "final"},
+]
+
+MEDICATION = {
+    "resourceType": "MedicationRequest",
+    "id": "m1",
+    "status": "active",
+    "medicationCodeableConcept": {
+        "coding": [{"system": "http://www.nlm.nih.gov/research/umls/rxnorm", "code": "860975", "display": "Metformin"}]
+    },
+    "dosageInstruction": [{"text": "500 mg twice daily", "timing": {"repeat": {"frequency": 2, "period": 1}}}],
+    "authoredOn": "2023-01-05",
+}
+
+CONDITION = {
+    "resourceType": "Condition",
+    "id": "c1",
+    "clinicalStatus": {"coding": [{"code": "remission"}]},
+    "code": {"coding": [{"system": "http://hl7.org/fhir/sid/icd-10-cm", "code": "E11.9", "display": "T2DM"}]},
+    "onsetDateTime": "2019-06-01",
+}
+
+ALLERGY = {
+    "resourceType": "AllergyIntolerance",
+    "id": "a1",
+    "code": {"text": "Penicillin"},
+    "criticality": "high",
+    "category": ["medication"],
+    "reaction": [{"manifestation": [{"text": "Hives"}]}],
+}
+
+
+class TestLazyViews:
+    """Views match the dataclass models"""
+
+    @pytest.mark.parametrize("resource", OBSERVATIONS, ids=lambda r: r["id"])
+    def test_observation_matches_model(self, resource):
+        view = ObservationView(resource)
+        model = FHIRObservation.from_fhir(resource)
+
+        assert view.to_dict() == model.to_dict()
+        assert view.is_abnormal == model.is_abnormal
+
+    @pytest.mark.parametrize(
+        "view_class,model_class,resource",
+        [
+            (MedicationView, FHIRMedication, MEDICATION),
+            (ConditionView, FHIRCondition, CONDITION),
+            (AllergyIntoleranceView, FHIRAllergyIntolerance, ALLERGY),
+        ],
+    )
+    def test_other_views_match_models(self, view_class, model_class, resource):
+        assert view_class(resource).to_dict() == model_class.from_fhir(resource).to_dict()
+
+    def test_hot_fields_do_not_build_model(self):
+        view = ObservationView(OBSERVATIONS[0])
+
+        assert view.observation_name == "Glucose"
+        assert view.display_value == "182 mg/dL"
+        assert view.is_lab
+        assert view._model is None
+
+        assert view.notes == ["fasting"]
+        assert isinstance(view.model, FHIRObservation)
+
+    def test_view_wraps_without_copying(self):
+        resource = dict(OBSERVATIONS[0])
+        assert ObservationView(resource)._raw is resource
+
+    def test_loads_fhir_json(self):
+        body = json.dumps({"resourceType": "Bundle", "entry": OBSERVATIONS * 5000})
+        gc.disable()
+        try:
+            assert loads_fhir_json(body) == loads_fhir_json(body.encode()) == json.loads(body)
+            assert not gc.isenabled()  # Process-wide GC state is left alone
+        finally:
+            gc.enable()
+
+    def test_search_returns_models_unless_lazy_opted_in(self):
+        resource = OBSERVATIONS[0]
+        eager = FHIRClient(FHIRClientConfig(base_url="https://fhir.example"))
+        lazy = FHIRClient(FHIRClientConfig(base_url="https://fhir.example", lazy_models=True))
+
+        assert isinstance(eager._parse_search_resource(FHIRResourceType.OBSERVATION, resource), FHIRObservation)
+        assert isinstance(lazy._parse_search_resource(FHIRResourceType.OBSERVATION, resource), ObservationView)
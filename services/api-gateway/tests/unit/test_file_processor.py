@@ -0,0 +1,136 @@
+"""
+File processor tests.
+
+Covers off-loop PDF extraction (thread and process pool), in-order page
+streaming, and the file size, page and text caps.
+"""
+
+import asyncio
+import os
+
+import pytest
+from app.services.file_processor import FileProcessor
+
+
+def make_pdf(pages):
+    """Build a minimal PDF with one line of Helvetica text per page."""
+    font_id = 3
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        font_id: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    kids = []
+    for i, text in enumerate(pages):
+        page_id, content_id = 4 + 2 * i, 5 + 2 * i
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+        objects[content_id] = b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        objects[page_id] = (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (font_id, content_id)
+        )
+        kids.append(b"%d 0 R" % page_id)
+    objects[2] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(pages))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for obj_id in sorted(objects):
+        offsets[obj_id] = len(out)
+        out += b"%d 0 obj\n%s\nendobj\n" % (obj_id, objects[obj_id])
+    xref = len(out)
+    size = max(objects) + 1
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % size
+    for obj_id in range(1, size):
+        out += b"%010d 00000 n \n" % offsets[obj_id]
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref)
+    return bytes(out)
+
+
+PAGES = [f"Page {i} warfarin dosing" for i in range(1, 13)]
+
+
+class TestPdfExtraction:
+    """Off-loop, page-parallel extraction"""
+
+    @pytest.mark.asyncio
+    async def test_extract_text_keeps_page_format(self):
+        processor = FileProcessor(workers=0, pages_per_task=5)
+
+        text, metadata = await processor.extract_text(make_pdf(PAGES[:3]), "guide.pdf")
+
+        assert metadata["page_count"] == 3 and metadata["format"] == "pdf"
+        assert text.split("\n\n") == [f"--- Page {i} ---\n{PAGES[i - 1]}" for i in range(1, 4)]
+
+    @pytest.mark.asyncio
+    async def test_process_pool_streams_pages_in_order(self):
+        processor = FileProcessor(workers=2, pages_per_task=3)
+        try:
+            pages = [page async for page in processor.iter_pages(make_pdf(PAGES), "guide.pdf")]
+        finally:
+            processor.shutdown()
+
+        assert [p.page_number for p in pages] == list(range(1, 13))
+        assert [p.text for p in pages] == PAGES
+
+    def test_workers_are_not_forked(self):
+        processor = FileProcessor(workers=1)
+        try:
+            assert asyncio.run(processor._run(os.getpid)) != os.getpid()
+            assert processor._executor._mp_context.get_start_method() in ("forkserver", "spawn")
+        finally:
+            processor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_event_loop_keeps_running_during_extraction(self):
+        processor = FileProcessor(workers=0, pages_per_task=1)
+        ticks = 0
+        done = False
+
+        async def ticker():
+            nonlocal ticks
+            while not done:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(ticker())
+        await processor.extract_text(make_pdf(PAGES), "guide.pdf")
+        done = True
+        await task
+
+        assert ticks > len(PAGES)
+
+    def test_non_pdf_yields_single_page(self):
+        processor = FileProcessor(workers=0)
+
+        async def collect():
+            return [page async for page in processor.iter_pages(b"plain notes", "notes.txt")]
+
+        assert [(p.page_number, p.text) for p in asyncio.run(collect())] == [(1, "plain notes")]
+
+
+class TestExtractionLimits:
+    """Memory caps for huge files"""
+
+    @pytest.mark.asyncio
+    async def test_oversized_files_are_rejected(self):
+        processor = FileProcessor(workers=0, max_file_mb=1)
+
+        text, metadata = await processor.extract_text(b"x" * (1024 * 1024 + 1), "big.txt")
+
+        assert text == "" and "limit" in metadata["error"]
+        with pytest.raises(ValueError):
+            async for _ in processor.iter_pages(b"x" * (1024 * 1024 + 1), "big.pdf"):
+                pass
+
+    @pytest.mark.asyncio
+    async def test_page_and_text_caps(self):
+        pdf = make_pdf(PAGES)
+
+        text, metadata = await FileProcessor(workers=0, max_pages=4).extract_text(pdf, "guide.pdf")
+        assert metadata["page_count"] == 12 and metadata["pages_truncated"] is True
+        assert text.count("--- Page") == 4
+
+        text, metadata = await FileProcessor(workers=0, pages_per_task=2, max_text_chars=50).extract_text(
+            pdf, "guide.pdf"
+        )
+        assert metadata["text_truncated"] is True
+        assert text.count("--- Page") == 3  # Stops at the page that crosses the cap
@@ -0,0 +1,190 @@
+"""
+Hybrid search latency budget tests.
+
+Covers partial-result fusion when a leg misses its deadline, caching of late
+leg results for the next identical query (dropped when the KB changes),
+and the same budget in the multi-hop HybridSearchEngine.
+"""
+
+import asyncio
+import fnmatch
+import time
+from unittest.mock import patch
+
+import pytest
+from app.services.hybrid_search_service import (
+    HybridSearchConfig,
+    HybridSearchService,
+    SearchResult,
+    SearchStrategy,
+    leg_deadlines,
+    search_legs_dropped_total,
+)
+from app.services.multi_hop_reasoning_service import HybridSearchEngine
+from app.services.multi_hop_reasoning_service import SearchResult as EngineResult
+from app.services.rag_cache import RAGCache, SemanticAnswerCache
+
+
+class FakeCache:
+    def __init__(self):
+        self.data = {}
+        self.gets = 0
+
+    async def get(self, key):
+        self.gets += 1
+        return self.data.get(key)
+
+    async def set(self, key, value, ttl=None):
+        self.data[key] = value
+        return True
+
+    async def delete(self, key):
+        return self.data.pop(key, None) is not None
+
+    async def delete_pattern(self, pattern):
+        keys = [key for key in self.data if fnmatch.fnmatch(key, pattern)]
+        for key in keys:
+            del self.data[key]
+        return len(keys)
+
+
+def dropped(component, leg, reason="timeout"):
+    return search_legs_dropped_total.labels(component=component, leg=leg, reason=reason)._value.get()
+
+
+@pytest.fixture
+def cache():
+    fake = FakeCache()
+    with patch("app.services.hybrid_search_service.cache_service", fake), patch(
+        "app.services.rag_cache.cache_service", fake
+    ), patch.dict("app.services.hybrid_search_service._late_keys", clear=True):
+        yield fake
+
+
+def make_service(budget_ms=100.0):
+    service = HybridSearchService(
+        config=HybridSearchConfig(
+            min_score_threshold=0.0,
+            latency_budget_ms=budget_ms,
+            vector_deadline_ms=budget_ms,
+            bm25_deadline_ms=budget_ms,
+        )
+    )
+    service.bm25_index.add_document("bm25-1", "warfarin dosing in renal impairment", {"document_id": "doc-1"})
+    service.vector_calls = 0
+
+    async def slow_vector_search(query, top_k, score_threshold=0.0, filters=None, with_vectors=None):
+        service.vector_calls += 1
+        await asyncio.sleep(0.3)
+        return [SearchResult("vec-1", "doc-2", "anticoagulation guideline", 0.9, source="vector")]
+
+    service._vector_search = slow_vector_search
+    return service
+
+
+class TestHybridSearchBudget:
+    """Partial fusion and late-leg caching"""
+
+    @pytest.mark.asyncio
+    async def test_slow_leg_is_dropped_then_served_from_cache(self, cache):
+        service = make_service()
+        before = dropped("hybrid_search", "vector")
+
+        start = time.perf_counter()
+        first = await service.search("warfarin renal", top_k=5, strategy=SearchStrategy.HYBRID)
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.25
+        assert [r.chunk_id for r in first] == ["bm25-1"]
+        assert dropped("hybrid_search", "vector") == before + 1
+
+        # The dropped leg finishes in the background and fills the cache
+        await asyncio.sleep(0.35)
+        assert len(cache.data) == 1
+
+        second = await service.search("warfarin renal", top_k=5, strategy=SearchStrategy.HYBRID)
+
+        assert sorted(r.chunk_id for r in second) == ["bm25-1", "vec-1"]
+        assert service.vector_calls == 1
+        assert cache.gets == 1  # Only the leg that was late is looked up
+        cached = next(iter(cache.data.values()))
+        assert cached[0].score == 0.9 and cached[0].source == "vector"  # Fusion rescored a copy
+
+    @pytest.mark.asyncio
+    async def test_document_invalidation_drops_late_results(self, cache):
+        service = make_service()
+        await service.search("warfarin renal", top_k=5, strategy=SearchStrategy.HYBRID)
+        await asyncio.sleep(0.35)
+        assert len(cache.data) == 1
+
+        await RAGCache(SemanticAnswerCache()).invalidate_document("doc-2")
+
+        assert cache.data == {}
+        await service.search("warfarin renal", top_k=5, strategy=SearchStrategy.HYBRID)
+        assert service.vector_calls == 2
+
+    @pytest.mark.asyncio
+    async def test_zero_budget_waits_for_every_leg(self, cache):
+        service = make_service(budget_ms=0)
+
+        results = await service.search("warfarin renal", top_k=5, strategy=SearchStrategy.HYBRID)
+
+        assert sorted(r.chunk_id for r in results) == ["bm25-1", "vec-1"]
+        assert cache.data == {}
+        assert cache.gets == 0  # No late results, so no cache lookups
+
+    @pytest.mark.asyncio
+    async def test_failed_leg_is_dropped(self, cache):
+        service = make_service(budget_ms=0)
+        before = dropped("hybrid_search", "vector", "error")
+
+        async def broken_vector_search(*args, **kwargs):
+            raise RuntimeError("qdrant unavailable")
+
+        service._vector_search = broken_vector_search
+
+        results = await service.search("warfarin renal", top_k=5, strategy=SearchStrategy.HYBRID)
+
+        assert [r.chunk_id for r in results] == ["bm25-1"]
+        assert dropped("hybrid_search", "vector", "error") == before + 1
+
+    def test_leg_deadlines_are_capped_by_budget(self):
+
+        assert leg_deadlines(200, {"vector": 500, "bm25": 50, "other": 0}) == {
+            "vector": 0.2,
+            "bm25": 0.05,
+            "other": 0.2,
+        }
+        assert leg_deadlines(0, {"vector": 500}) == {"vector": None}
+
+
+class TestMultiHopSearchBudget:
+    """HybridSearchEngine legs share the budget"""
+
+    @pytest.mark.asyncio
+    async def test_keyword_results_returned_without_slow_semantic_leg(self, cache):
+        engine = HybridSearchEngine(lazy_load=True)
+        engine._loaded = True
+        before = dropped("multi_hop", "semantic")
+
+        async def slow_semantic(query, top_k, filters):
+            await asyncio.sleep(0.3)
+            return [EngineResult("sem-1", "semantic hit", 0.9, {}, "semantic")]
+
+        async def keyword(query, top_k, filters):
+            return [EngineResult("kw-1", "keyword hit", 3.2, {}, "keyword")]
+
+        engine._semantic_search = slow_semantic
+        engine._keyword_search = keyword
+
+        start = time.perf_counter()
+        results = await engine.search("warfarin", rerank=False, latency_budget_ms=100)
+
+        assert time.perf_counter() - start < 0.25
+        assert [r.doc_id for r in results] == ["kw-1"]
+        assert dropped("multi_hop", "semantic") == before + 1
+
+        await asyncio.sleep(0.35)
+        results = await engine.search("warfarin", rerank=False, latency_budget_ms=100)
+
+        assert sorted(r.doc_id for r in results) == ["kw-1", "sem-1"]
@@ -0,0 +1,114 @@
+"""
+Unit tests for LabTrendingService columnar trending
+
+Tests for:
+- LabTimeSeriesStore ordering and per-test series
+- Vectorized analyze_patient_trends against per-test analyze_trend
+- Trend cache invalidation on new observations
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from app.engines.clinical_engine.lab_trending import LabTrendingService, LabValue, TrendDirection
+
+START = datetime(2024, 1, 1, 8, 0)
+
+
+def make_labs(test_name, values, unit="", step_days=30, **kwargs):
+    return [
+        LabValue(test_name=test_name, value=v, unit=unit, timestamp=START + timedelta(days=i * step_days), **kwargs)
+        for i, v in enumerate(values)
+    ]
+
+
+class TestLabTimeSeriesStore:
+    """Tests for the columnar lab store"""
+
+    def test_series_sorted_by_time_per_normalized_name(self):
+        service = LabTrendingService()
+        labs = make_labs("K", [4.0, 4.5, 5.2])
+        service.record_values("p1", [labs[2], labs[0]])
+        service.record_values("p1", [labs[1]] + make_labs("Na", [140.0, 138.0]))
+
+        timestamps, values = service.get_lab_series("p1", "potassium")
+
+        assert list(values) == [4.0, 4.5, 5.2]
+        assert list(timestamps) == sorted(timestamps)
+        assert list(service.get_lab_series("p1", "sodium")[1]) == [140.0, 138.0]
+        assert service.get_lab_series("p1", "glucose") is None
+        assert service.get_lab_series("p2", "potassium") is None
+
+
+class TestAnalyzePatientTrends:
+    """Tests for vectorized all-test trend analysis"""
+
+    @pytest.mark.asyncio
+    async def test_matches_per_test_analysis(self):
+        service = LabTrendingService()
+        series = {
+            "creatinine": make_labs("cr", [1.0, 1.2, 1.5, 2.1], unit="mg/dL"),
+            "hemoglobin": make_labs("hgb", [13.0, 11.0, 12.5, 12.0, 13.5], unit="g/dL"),
+            "sodium": make_labs("sodium", [140.0, 141.0], unit="mEq/L"),
+            "tsh": make_labs("tsh", [2.0, 2.0, 2.0], unit="mIU/L"),
+        }
+        service.record_values("p1", [lab for labs in series.values() for lab in labs])
+
+        summaries = service.analyze_patient_trends("p1")
+
+        assert set(summaries) == set(series)
+        for name, labs in series.items():
+            expected = await service.analyze_trend(name, labs)
+            summary = summaries[name]
+            assert summary.direction == expected.direction
+            assert summary.percent_change == pytest.approx(expected.percent_change)
+            assert summary.time_span_days == expected.time_span_days
+            assert summary.is_significant == expected.is_significant
+            assert summary.count == len(labs)
+
+        assert summaries["creatinine"].direction == TrendDirection.INCREASING
+        assert summaries["hemoglobin"].direction == TrendDirection.FLUCTUATING
+        assert summaries["tsh"].slope_per_day == pytest.approx(0.0)
+
+    def test_slope_and_range_breaches(self):
+        service = LabTrendingService()
+        # Linear rise of 0.1 mEq/L per day; reference 3.5-5.0, critical >6.5
+        service.record_values("p1", make_labs("potassium", [4.0, 5.0, 6.0, 7.0], step_days=10))
+
+        summary = service.analyze_patient_trends("p1")["potassium"]
+
+        assert summary.slope_per_day == pytest.approx(0.1)
+        assert summary.recent_percent_change == pytest.approx(1 / 6)
+        assert summary.above_reference_count == 2
+        assert summary.below_reference_count == 0
+        assert summary.latest_out_of_range is True
+        assert summary.latest_critical is True
+
+    def test_reported_reference_bounds_override_defaults(self):
+        service = LabTrendingService()
+        service.record_values("p1", make_labs("custom_marker", [5.0, 12.0], reference_low=1.0, reference_high=10.0))
+
+        summary = service.analyze_patient_trends("p1")["custom_marker"]
+
+        assert summary.above_reference_count == 1
+        assert summary.latest_out_of_range is True
+        assert summary.latest_critical is False
+
+    def test_cache_invalidated_on_new_observations(self):
+        service = LabTrendingService()
+        service.record_values("p1", make_labs("glucose", [100.0, 110.0]))
+
+        first = service.analyze_patient_trends("p1")
+        assert service.analyze_patient_trends("p1") is first
+
+        service.record_values("p1", [LabValue("glucose", 250.0, "mg/dL", START + timedelta(days=90))])
+        second = service.analyze_patient_trends("p1")
+
+        assert second is not first
+        assert second["glucose"].last_value == 250.0
+        assert second["glucose"].count == 3
+
+    def test_unknown_patient(self):
+        service = LabTrendingService()
+        assert service.analyze_patient_trends("missing") == {}
+        assert service.clear_patient_history("missing") is False
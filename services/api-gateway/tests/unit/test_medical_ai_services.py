@@ -113,6 +113,93 @@ class TestMedicalEmbeddingService:
             assert result.model == "text-embedding-3-small (fallback)"
             assert result.metadata["fallback"] is True
 
+    def test_length_buckets_respect_size_and_token_budget(self):
+        """Test batch planning sorts by length and bounds padded tokens"""
+        from app.services.medical_embedding_service import plan_length_buckets
+
+        lengths = [5, 100, 7, 90, 3]
+
+        assert plan_length_buckets(lengths, batch_size=8) == [[1, 3, 2, 0, 4]]
+        assert plan_length_buckets(lengths, batch_size=2) == [[1, 3], [2, 0], [4]]
+        assert plan_length_buckets(lengths, batch_size=8, max_tokens_per_batch=200) == [[1, 3], [2, 0, 4]]
+        assert plan_length_buckets([], batch_size=8) == []
+
+    @pytest.mark.asyncio
+    async def test_batch_fallback_sends_one_request_per_batch(self):
+        """Test batch embedding without a local model batches the API fallback"""
+        from app.services.medical_embedding_service import MedicalEmbeddingService, MedicalModelType
+
+        service = MedicalEmbeddingService(lazy_load=True)
+        texts = ["aspirin", "warfarin", "heparin"]
+
+        with (
+            patch.object(service, "_ensure_model_loaded", return_value=False),
+            patch("httpx.AsyncClient") as mock_client,
+        ):
+
+            async def post(url, headers, json):
+                response = MagicMock()
+                # Returned out of order; each item carries its input index
+                response.json.return_value = {
+                    "data": [
+                        {"index": i, "embedding": [float(len(t))]} for i, t in reversed(list(enumerate(json["input"])))
+                    ]
+                }
+                return response
+
+            mock_client_instance = AsyncMock()
+            mock_client_instance.post = AsyncMock(side_effect=post)
+            mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
+            mock_client_instance.__aexit__ = AsyncMock()
+            mock_client.return_value = mock_client_instance
+
+            results = await service.generate_embeddings_batch(texts, MedicalModelType.PUBMEDBERT, batch_size=2)
+
+        assert mock_client_instance.post.await_count == 2
+        assert [r.embedding for r in results] == [[7.0], [8.0], [7.0]]
+        assert all(r.metadata["fallback"] for r in results)
+
+    @pytest.mark.asyncio
+    async def test_padded_batches_keep_input_order(self):
+        """Test padded batch inference returns per-text results in input order"""
+        torch = pytest.importorskip("torch")
+        from app.services.medical_embedding_service import MODEL_CONFIGS, MedicalEmbeddingService, MedicalModelType
+
+        class Tokenizer:
+            def __call__(self, texts, **kwargs):
+                return {"input_ids": [[101] + [len(w) for w in t.split()] + [102] for t in texts]}
+
+            def pad(self, encoded, return_tensors="pt"):
+                width = max(len(ids) for ids in encoded["input_ids"])
+                ids = [ids + [0] * (width - len(ids)) for ids in encoded["input_ids"]]
+                mask = [[1] * len(row) + [0] * (width - len(row)) for row in encoded["input_ids"]]
+                return {"input_ids": torch.tensor(ids), "attention_mask": torch.tensor(mask)}
+
+        class Model:
+            def __init__(self):
+                self.batch_shapes = []
+
+            def __call__(self, input_ids, attention_mask):
+                self.batch_shapes.append(tuple(input_ids.shape))
+                hidden = torch.stack([input_ids.float(), torch.ones_like(input_ids, dtype=torch.float)], dim=-1)
+                return MagicMock(last_hidden_state=hidden)
+
+        service = MedicalEmbeddingService(lazy_load=True)
+        model = Model()
+        service._models[MedicalModelType.PUBMEDBERT] = {"tokenizer": Tokenizer(), "model": model}
+        texts = ["a bb", "ccc dddd eeeee ffffff", "g", "long " * 600]
+
+        results = await service.generate_embeddings_batch(
+            texts, MedicalModelType.PUBMEDBERT, pooling="mean", batch_size=2
+        )
+
+        max_length = MODEL_CONFIGS[MedicalModelType.PUBMEDBERT].max_length
+        assert model.batch_shapes == [(2, max_length), (2, 4)]
+        assert [r.truncated for r in results] == [False, False, False, True]
+        assert results[0].embedding == pytest.approx([(101 + 1 + 2 + 102) / 4, 1.0])
+        assert results[2].embedding == pytest.approx([(101 + 1 + 102) / 3, 1.0])
+        assert results[1].text_length == len(texts[1])
+
 
 # Test MedicalNERService
 
@@ -283,6 +370,104 @@ class TestMedicalNERService:
         assert service._classify_entity_by_label("GENE") == EntityType.GENE
         assert service._classify_entity_by_label("UNKNOWN_LABEL") == EntityType.UNKNOWN
 
+    def test_concept_table_lookup(self, tmp_path):
+        """Test mapped UMLS concept table binary-search lookups"""
+        from app.services.umls_concept_cache import UMLSConceptTable, build_concept_table
+
+        path = str(tmp_path / "concepts.bin")
+        count = build_concept_table(
+            [
+                {"cui": "C0020538", "name": "Hypertensive disease", "semantic_types": ["T047"]},
+                {
+                    "cui": "C0011849",
+                    "name": "Diabetes Mellitus",
+                    "semantic_types": ["T047"],
+                    "mappings": [{"ontology": "ICD-10", "code": "E11", "display_name": "Type 2 diabetes"}],
+                },
+                {"cui": "C0025598", "name": "Metformin", "semantic_types": ["T121"]},
+            ],
+            path,
+        )
+
+        table = UMLSConceptTable(path)
+        try:
+            assert count == 3
+            assert len(table) == 3
+            assert "C0025598" in table
+            assert "C9999999" not in table
+            record = table.get("C0011849")
+            assert record.name == "Diabetes Mellitus"
+            assert record.mappings["ICD-10"] == ("E11", "Type 2 diabetes", 1.0)
+        finally:
+            table.close()
+
+    def test_concept_cache_lru_and_table_tiers(self, tmp_path):
+        """Test two-level concept cache hit accounting and clear()"""
+        from app.services.umls_concept_cache import ConceptRecord, UMLSConceptCache, build_concept_table
+
+        path = str(tmp_path / "concepts.bin")
+        build_concept_table([{"cui": "C0011849", "name": "Diabetes Mellitus"}], path)
+
+        cache = UMLSConceptCache(maxsize=2, table_path=path)
+        assert cache.get("C0011849").name == "Diabetes Mellitus"  # L2
+        assert cache.get("C0011849").name == "Diabetes Mellitus"  # L1
+        assert cache.get("C0000000") is None
+
+        cache.put(ConceptRecord(cui="C0020538", name="Hypertensive disease"))
+        stats = cache.get_stats()
+        assert stats["l2_hits"] == 1
+        assert stats["l1_hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["l1_size"] == 2
+
+        # Clearing drops the LRU but the mapped table still answers
+        cache.clear()
+        assert cache.get("C0020538") is None
+        assert cache.get("C0011849") is not None
+        cache.close()
+
+    @pytest.mark.asyncio
+    async def test_ontology_mapping_from_concept_table(self, tmp_path):
+        """Test ontology normalization served from the concept table"""
+        from app.services.medical_ner_service import (
+            EntityType,
+            MedicalEntity,
+            MedicalNERService,
+            OntologyType,
+            UMLSConcept,
+        )
+        from app.services.umls_concept_cache import build_concept_table
+
+        path = str(tmp_path / "concepts.bin")
+        build_concept_table(
+            [
+                {
+                    "cui": "C0011849",
+                    "name": "Diabetes Mellitus",
+                    "semantic_types": ["T047"],
+                    "mappings": [
+                        {"ontology": "ICD-10", "code": "E11", "display_name": "Type 2 diabetes"},
+                        {"ontology": "SNOMED-CT", "code": "44054006", "display_name": "Diabetes mellitus type 2"},
+                    ],
+                }
+            ],
+            path,
+        )
+        service = MedicalNERService(lazy_load=True, concept_table_path=path)
+
+        entity = MedicalEntity(
+            text="diabetes",
+            entity_type=EntityType.DISEASE,
+            start_char=0,
+            end_char=8,
+            umls_concepts=[UMLSConcept(cui="C0011849", name="Diabetes Mellitus", semantic_types=["T047"], score=0.9)],
+        )
+        normalized = await service.normalize_entities([entity], [OntologyType.ICD10, OntologyType.SNOMED])
+
+        codes = {m.ontology: m.code for m in normalized[0].ontology_mappings}
+        assert codes == {OntologyType.ICD10: "E11", OntologyType.SNOMED: "44054006"}
+        assert service.get_concept_info("C0011849").name == "Diabetes Mellitus"
+
 
 # Test MultiHopReasoner
 
@@ -0,0 +1,153 @@
+"""
+Multi-hop retrieval tests.
+
+Covers batched sub-query embedding, concurrent per-hop search, chunk
+deduplication across hops and per-hop traces in QueryOrchestrator, plus
+SearchAggregator.generate_query_embeddings.
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from app.services.rag_service import QueryOrchestrator
+from app.services.search_aggregator import SearchAggregator, SearchResult
+
+
+def make_result(chunk_id, score, document_id="doc-1"):
+    return SearchResult(chunk_id=chunk_id, document_id=document_id, content=chunk_id, score=score, metadata={})
+
+
+class FakeAggregator:
+    def __init__(self, results_by_query, delay=0.0, fail_batch=False):
+        self.results_by_query = results_by_query
+        self.delay = delay
+        self.fail_batch = fail_batch
+        self.batch_calls = []
+        self.search_calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate_query_embeddings(self, queries):
+        self.batch_calls.append(list(queries))
+        if self.fail_batch:
+            raise RuntimeError("embeddings unavailable")
+        return [[float(i)] for i in range(len(queries))]
+
+    async def search(self, query, top_k=5, score_threshold=0.7, query_embedding=None):
+        self.search_calls.append((query, query_embedding))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        return self.results_by_query.get(query, [])
+
+    def synthesize_across_documents(self, results):
+        return {"context": " ".join(r.content for r in results)}
+
+    def format_context_for_rag(self, results):
+        return ""
+
+    def confidence_score(self, results):
+        return 0.9
+
+
+def make_orchestrator(aggregator, sub_queries):
+    expander = SimpleNamespace(decompose=AsyncMock(return_value=sub_queries))
+    with patch("app.services.rag_service.LLMClient"):
+        return QueryOrchestrator(
+            enable_multi_hop=True,
+            enable_query_decomposition=True,
+            search_aggregator=aggregator,
+            query_expansion_service=expander,
+        )
+
+
+class TestMultiHopRetrieval:
+    """Batched, concurrent hops"""
+
+    @pytest.mark.asyncio
+    async def test_hops_share_one_embedding_call_and_run_concurrently(self):
+        aggregator = FakeAggregator(
+            {
+                "a": [make_result("c1", 0.9), make_result("c2", 0.8)],
+                "b": [make_result("c2", 0.95), make_result("c3", 0.7)],
+                "c": [make_result("c1", 0.6)],
+            },
+            delay=0.05,
+        )
+        orchestrator = make_orchestrator(aggregator, ["a", "b", "c"])
+
+        results, context, hop_traces, confidence = await orchestrator._run_retrieval("question")
+
+        assert aggregator.batch_calls == [["a", "b", "c"]]
+        assert [emb for _, emb in aggregator.search_calls] == [[0.0], [1.0], [2.0]]
+        assert aggregator.max_in_flight == 3
+
+        assert {r.chunk_id: r.score for r in results} == {"c1": 0.9, "c2": 0.95, "c3": 0.7}
+        assert [t["results"] for t in hop_traces] == [2, 2, 1]
+        assert [t["new_results"] for t in hop_traces] == [2, 1, 0]
+        assert all(t["search_ms"] >= 40 for t in hop_traces)
+        assert context and confidence == 0.9
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_embedding_falls_back_to_per_hop(self):
+        aggregator = FakeAggregator({"a": [make_result("c1", 0.9)]}, fail_batch=True)
+        orchestrator = make_orchestrator(aggregator, ["a", "b"])
+
+        results, _, hop_traces, _ = await orchestrator._run_retrieval("question")
+
+        assert aggregator.search_calls == [("a", None), ("b", None)]
+        assert [r.chunk_id for r in results] == ["c1"]
+        assert len(hop_traces) == 2
+
+    @pytest.mark.asyncio
+    async def test_single_query_keeps_plain_search(self):
+        aggregator = FakeAggregator({"question": [make_result("c1", 0.9)]})
+        orchestrator = make_orchestrator(aggregator, ["question"])
+
+        results, _, hop_traces, _ = await orchestrator._run_retrieval("question")
+
+        assert aggregator.batch_calls == []
+        assert aggregator.search_calls == [("question", None)]
+        assert hop_traces[0]["hop"] == 1 and "search_ms" in hop_traces[0]
+
+
+class TestBatchedQueryEmbeddings:
+    """SearchAggregator.generate_query_embeddings"""
+
+    @pytest.mark.asyncio
+    async def test_only_cache_misses_are_sent_in_one_call(self):
+        cache = {}
+
+        async def cache_get(key):
+            return cache.get(key)
+
+        async def cache_set(key, value, ttl=None):
+            cache[key] = value
+
+        created = []
+
+        async def create(model, input):
+            created.append(list(input))
+            # Returned out of order; each item carries its input index
+            data = [SimpleNamespace(index=i, embedding=[float(len(text))]) for i, text in enumerate(input)]
+            return SimpleNamespace(data=list(reversed(data)), usage=None)
+
+        client = SimpleNamespace(embeddings=SimpleNamespace(create=create))
+        aggregator = SearchAggregator.__new__(SearchAggregator)
+        aggregator.embedding_model = "test-model"
+
+        with (
+            patch("app.services.search_aggregator.cache_service") as cache_service,
+            patch("app.services.search_aggregator.get_async_openai_client", return_value=client),
+        ):
+            cache_service.get, cache_service.set = cache_get, cache_set
+
+            first = await aggregator.generate_query_embeddings(["aa", "bbb", "aa"])
+            second = await aggregator.generate_query_embeddings(["bbb", "c"])
+
+        assert first == [[2.0], [3.0], [2.0]]
+        assert second == [[3.0], [1.0]]
+        assert created == [["aa", "bbb"], ["c"]]
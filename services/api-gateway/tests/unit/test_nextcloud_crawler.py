@@ -0,0 +1,266 @@
+"""
+Incremental Nextcloud crawl tests.
+
+Covers ETag change detection against a persistent manifest, concurrent
+fetching, deletions, listing failures, and chunk-level re-embedding in
+KBIndexer.index_document_incremental.
+"""
+
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from webdav3.exceptions import WebDavException
+
+# app.services.kb_indexer is imported lazily: other suites patch QdrantClient
+# before its first import
+
+
+class FakeWebDAV:
+    """In-memory WebDAV tree; resource reads are slow and counted."""
+
+    def __init__(self, files, read_delay=0.0):
+        self.files = dict(files)  # path -> (etag, content bytes)
+        self.read_delay = read_delay
+        self.reads = []
+        self.fail_listing = False
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def list(self, directory="/", get_info=False):
+        if self.fail_listing:
+            raise WebDavException()
+        return [{"path": directory, "isdir": True}] + [
+            {
+                "path": path,
+                "isdir": False,
+                "size": str(len(content)),
+                "modified": "Mon, 20 Jan 2025 10:30:00 GMT",
+                "etag": f'"{etag}"',
+            }
+            for path, (etag, content) in self.files.items()
+        ]
+
+    def resource(self, path):
+        def read():
+            with self.lock:
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            threading.Event().wait(self.read_delay)
+            with self.lock:
+                self.in_flight -= 1
+                self.reads.append(path)
+            return self.files[path][1]
+
+        return SimpleNamespace(read=read)
+
+
+class FakeKBIndexer:
+    def __init__(self):
+        self.indexed = []
+        self.deleted = []
+
+    def extract_text_from_pdf(self, pdf_bytes):
+        return pdf_bytes.decode()
+
+    async def index_document_incremental(self, content, document_id, title, source_type, metadata, previous_chunk_keys):
+        from app.services.kb_indexer import IndexingResult
+
+        self.indexed.append((document_id, previous_chunk_keys))
+        return IndexingResult(document_id=document_id, success=True, chunks_indexed=1, chunks_embedded=1), [content]
+
+    def delete_document(self, document_id):
+        self.deleted.append(document_id)
+        return True
+
+
+def make_indexer(webdav, manifest_path=None, max_concurrency=4):
+    from app.services.nextcloud_file_indexer import NextcloudFileIndexer
+
+    with (
+        patch("app.services.nextcloud_file_indexer.WebDAVClient", return_value=webdav),
+        patch("app.services.nextcloud_file_indexer.KBIndexer", return_value=FakeKBIndexer()),
+    ):
+        return NextcloudFileIndexer(
+            webdav_url="https://nextcloud.local/remote.php/dav/files/admin/",
+            username="admin",
+            password="secret",
+            watch_directories=["/Guidelines"],
+            manifest_path=manifest_path,
+            max_concurrency=max_concurrency,
+        )
+
+
+class TestIncrementalCrawl:
+    """Change detection, concurrency and deletions"""
+
+    @pytest.mark.asyncio
+    async def test_second_crawl_only_fetches_changed_files(self, tmp_path):
+        manifest_path = str(tmp_path / "manifest.json")
+        webdav = FakeWebDAV(
+            {
+                "/Guidelines/a.txt": ("e1", b"alpha"),
+                "/Guidelines/b.md": ("e2", b"beta"),
+                "/Guidelines/scan.png": ("e3", b"image"),
+            }
+        )
+
+        first = await make_indexer(webdav, manifest_path).crawl()
+        assert first["files_indexed"] == 2 and first["files_skipped"] == 1
+        assert first["bytes_downloaded"] == 9
+
+        # A new process picks up the manifest from disk
+        webdav.files["/Guidelines/b.md"] = ("e2-v2", b"beta v2")
+        webdav.reads.clear()
+        indexer = make_indexer(webdav, manifest_path)
+        second = await indexer.crawl()
+
+        assert webdav.reads == ["/Guidelines/b.md"]
+        assert second["files_indexed"] == 1 and second["files_unchanged"] == 1
+        assert indexer.kb_indexer.indexed == [("nextcloud-/Guidelines/b.md", ["beta"])]
+        from app.services.nextcloud_file_indexer import CrawlManifest
+
+        assert CrawlManifest(manifest_path).get("/Guidelines/b.md").etag == "e2-v2"
+
+    @pytest.mark.asyncio
+    async def test_files_are_fetched_concurrently_within_bound(self):
+        webdav = FakeWebDAV({f"/Guidelines/{i}.txt": (str(i), b"text") for i in range(8)}, read_delay=0.05)
+        indexer = make_indexer(webdav, max_concurrency=3)
+
+        summary = await indexer.crawl()
+
+        assert summary["files_indexed"] == 8
+        assert webdav.max_in_flight == 3
+        assert summary["files_per_second"] > 0 and summary["bytes_per_second"] > 0
+
+    @pytest.mark.asyncio
+    async def test_deleted_files_are_removed_from_index(self, tmp_path):
+        manifest_path = str(tmp_path / "manifest.json")
+        webdav = FakeWebDAV({"/Guidelines/a.txt": ("e1", b"alpha"), "/Guidelines/b.txt": ("e2", b"beta")})
+        await make_indexer(webdav, manifest_path).crawl()
+
+        del webdav.files["/Guidelines/a.txt"]
+        indexer = make_indexer(webdav, manifest_path)
+        summary = await indexer.crawl()
+
+        assert summary["files_deleted"] == 1
+        assert indexer.kb_indexer.deleted == ["nextcloud-/Guidelines/a.txt"]
+        from app.services.nextcloud_file_indexer import CrawlManifest
+
+        assert CrawlManifest(manifest_path).get("/Guidelines/a.txt") is None
+
+    @pytest.mark.asyncio
+    async def test_failed_listing_does_not_delete(self):
+        webdav = FakeWebDAV({"/Guidelines/a.txt": ("e1", b"alpha")})
+        indexer = make_indexer(webdav)
+        await indexer.crawl()
+
+        webdav.fail_listing = True
+        summary = await indexer.crawl()
+
+        assert summary["failed_directories"] == ["/Guidelines"]
+        assert summary["files_deleted"] == 0 and indexer.kb_indexer.deleted == []
+        assert len(indexer.manifest) == 1
+
+
+class FakeQdrant:
+    def __init__(self):
+        self.points = {}
+
+    def retrieve(self, collection_name, ids, with_vectors):
+        return [SimpleNamespace(id=i, vector=self.points[i].vector) for i in ids if i in self.points]
+
+    def upsert(self, collection_name, points):
+        self.points.update({p.id: p for p in points})
+
+    def delete(self, collection_name, points_selector):
+        if isinstance(points_selector, list):
+            for point_id in points_selector:
+                self.points.pop(point_id, None)
+        else:
+            self.points.clear()
+
+
+class TestIncrementalChunkIndexing:
+    """KBIndexer.index_document_incremental"""
+
+    @pytest.fixture
+    def kb_indexer(self):
+        from app.services.kb_indexer import KBIndexer
+
+        indexer = KBIndexer.__new__(KBIndexer)
+        indexer.qdrant_client = FakeQdrant()
+        indexer.collection_name = "medical_kb"
+        indexer.chunk_size = 100
+        indexer.chunk_overlap = 0
+        indexer.embedded = []
+
+        async def generate_embeddings(texts):
+            indexer.embedded.append(list(texts))
+            return [[float(len(t))] for t in texts]
+
+        indexer.generate_embeddings = generate_embeddings
+        return indexer
+
+    @pytest.mark.asyncio
+    async def test_only_changed_chunks_are_embedded(self, kb_indexer):
+        paragraphs = [c * 100 for c in "abc"]
+
+        first, keys = await kb_indexer.index_document_incremental("".join(paragraphs), "doc", "Doc")
+        assert first.chunks_embedded == 3 and len(kb_indexer.qdrant_client.points) == 3
+
+        edited = paragraphs[0] + "x" * 100 + paragraphs[2]
+        second, new_keys = await kb_indexer.index_document_incremental(edited, "doc", "Doc", previous_chunk_keys=keys)
+
+        assert kb_indexer.embedded[-1] == ["x" * 100]
+        assert second.chunks_embedded == 1 and second.chunks_reused == 2
+        assert len(kb_indexer.qdrant_client.points) == 3
+        assert sorted(p.payload["content"][0] for p in kb_indexer.qdrant_client.points.values()) == ["a", "c", "x"]
+        assert new_keys[0] == keys[0] and new_keys[2] == keys[2]
+
+    @pytest.mark.asyncio
+    async def test_insertion_re_embeds_every_later_window(self, kb_indexer):
+        paragraphs = [c * 100 for c in "abc"]
+        _, keys = await kb_indexer.index_document_incremental("".join(paragraphs), "doc", "Doc")
+
+        edited = paragraphs[0] + "inserted" + paragraphs[1] + paragraphs[2]
+        result, _ = await kb_indexer.index_document_incremental(edited, "doc", "Doc", previous_chunk_keys=keys)
+
+        # Fixed-stride windows: only chunks before the insertion keep their vectors
+        assert result.chunks_reused == 1 and result.chunks_embedded == 2
+
+    def test_repeated_chunks_get_distinct_keys(self):
+        from app.services.kb_indexer import KBIndexer
+
+        chunks = [SimpleNamespace(content="same"), SimpleNamespace(content="same")]
+
+        keys = KBIndexer.chunk_keys(chunks)
+
+        assert keys[0] != keys[1]
+        assert KBIndexer.chunk_point_id("doc", keys[0]) == KBIndexer.chunk_point_id("doc", keys[0])
+
+    @pytest.mark.asyncio
+    async def test_embeddings_are_requested_in_sub_batches(self):
+        from app.services.kb_indexer import KBIndexer
+
+        indexer = KBIndexer.__new__(KBIndexer)
+        indexer.embedding_model = "text-embedding-3-small"
+        requests = []
+
+        async def create(model, input):
+            requests.append(len(input))
+            data = [SimpleNamespace(index=i, embedding=[float(len(t))]) for i, t in enumerate(input)]
+            return SimpleNamespace(data=data[::-1])
+
+        texts = ["x" * n for n in range(1, 151)]
+        # A stub module, so the test never builds openai's default client (which needs an API key)
+        openai_stub = SimpleNamespace(embeddings=SimpleNamespace(create=create))
+        with patch("app.services.kb_indexer.openai", openai_stub), patch(
+            "app.services.kb_indexer.settings.DOCUMENT_PIPELINE_EMBED_BATCH", 64
+        ):
+            vectors = await indexer.generate_embeddings(texts)
+
+        assert requests == [64, 64, 22]
+        assert vectors == [[float(n)] for n in range(1, 151)]
@@ -0,0 +1,184 @@
+"""
+Quantile sketch tests.
+
+Covers QuantileSketch accuracy and merging, WindowedSketch rotation, and
+MetricsCollector percentiles backed by sketches.
+"""
+
+import random
+
+import pytest
+from app.engines.analytics_engine import MetricSample
+from app.engines.analytics_engine.collector import MetricsCollector
+from app.engines.analytics_engine.sketch import QuantileSketch, WindowedSketch, merge_sketches
+
+
+def exact_quantile(values, q):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestQuantileSketch:
+    """DDSketch accuracy, merging and serialization"""
+
+    @pytest.mark.parametrize("q", [0.0, 0.5, 0.9, 0.95, 0.99, 1.0])
+    def test_quantiles_within_relative_accuracy(self, q):
+        rng = random.Random(7)
+        values = [rng.lognormvariate(4, 1.2) for _ in range(20_000)]
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        for value in values:
+            sketch.add(value)
+
+        expected = exact_quantile(values, q)
+        assert sketch.quantile(q) == pytest.approx(expected, rel=0.01)
+
+    def test_handles_zero_and_negative_values(self):
+        sketch = QuantileSketch()
+        for value in [-10.0, -1.0, 0.0, 0.0, 5.0]:
+            sketch.add(value)
+
+        assert sketch.quantile(0.0) == -10.0
+        assert sketch.quantile(0.2) == pytest.approx(-1.0, rel=0.01)
+        assert sketch.quantile(0.5) == 0.0
+        assert sketch.quantile(1.0) == 5.0
+        assert sketch.mean == pytest.approx(-1.2)
+
+    def test_merge_matches_single_sketch(self):
+        rng = random.Random(3)
+        values = [rng.expovariate(0.01) for _ in range(5000)]
+        whole = QuantileSketch()
+        parts = [QuantileSketch() for _ in range(3)]
+        for i, value in enumerate(values):
+            whole.add(value)
+            parts[i % 3].add(value)
+
+        merged = parts[0].copy().merge(parts[1]).merge(parts[2])
+
+        assert merged.count == whole.count
+        for q in (0.5, 0.95, 0.99):
+            assert merged.quantile(q) == whole.quantile(q)
+
+    def test_round_trip_and_merge_exports(self):
+        a, b = QuantileSketch(), QuantileSketch()
+        for value in range(1, 101):
+            a.add(value)
+            b.add(value + 100)
+
+        merged = merge_sketches([{"latency": a.to_dict()}, {"latency": b.to_dict()}])["latency"]
+
+        assert merged.count == 200
+        assert merged.min == 1 and merged.max == 200
+        assert merged.quantile(0.5) == pytest.approx(101, rel=0.01)
+
+    def test_merge_rejects_different_accuracy(self):
+        with pytest.raises(ValueError):
+            QuantileSketch(0.01).merge(QuantileSketch(0.02))
+
+    def test_bins_are_bounded(self):
+        sketch = QuantileSketch(relative_accuracy=0.01, max_bins=64)
+        values = [step * 10.0**exponent for exponent in range(-6, 9) for step in range(1, 10)]
+        for value in values:
+            sketch.add(value)
+
+        assert sketch.bin_count <= 64
+        # Collapsing only folds the smallest values; the upper tail stays accurate
+        assert sketch.quantile(1.0) == 9e8
+        assert sketch.quantile(0.95) == pytest.approx(exact_quantile(values, 0.95), rel=0.01)
+
+
+class TestWindowedSketch:
+    """Time-windowed rotation"""
+
+    def test_values_expire_with_window(self):
+        clock = FakeClock()
+        window = WindowedSketch(window_seconds=60, slots=6, clock=clock)
+
+        window.add(100.0)
+        clock.now += 30
+        window.add(200.0)
+        assert window.snapshot().count == 2
+
+        clock.now += 35  # First value's slot has left the window
+        snapshot = window.snapshot()
+        assert snapshot.count == 1
+        assert snapshot.quantile(0.5) == pytest.approx(200.0, rel=0.01)
+
+        clock.now += 60
+        assert window.quantile(0.5) is None
+
+    def test_snapshot_reflects_current_slot_after_caching(self):
+        clock = FakeClock()
+        window = WindowedSketch(window_seconds=60, slots=6, clock=clock)
+        window.add(1.0)
+        clock.now += 10
+        window.add(2.0)
+        assert window.snapshot().count == 2  # Caches the closed slot
+
+        window.add(3.0)
+        assert window.snapshot().count == 3
+
+
+class TestMetricsCollectorSketches:
+    """MetricsCollector percentiles and stats"""
+
+    @pytest.mark.asyncio
+    async def test_percentiles_and_stats(self):
+        collector = MetricsCollector()
+        for value in range(1, 1001):
+            await collector.record(MetricSample(name="latency_e2e", value=float(value), labels={"op": "stt"}))
+
+        p95 = await collector.get_percentile("latency_e2e", 95, labels={"op": "stt"})
+        stats = await collector.get_stats("latency_e2e", labels={"op": "stt"})
+
+        assert p95 == pytest.approx(951, rel=0.01)
+        assert stats["count"] == 1000
+        assert stats["min"] == 1 and stats["max"] == 1000
+        assert stats["p50"] == pytest.approx(501, rel=0.01)
+        assert await collector.get_percentile("missing", 95) is None
+
+    @pytest.mark.asyncio
+    async def test_empty_window_falls_back_to_cumulative(self):
+        clock = FakeClock()
+        collector = MetricsCollector()
+        await collector.record(MetricSample(name="latency_e2e", value=100.0))
+        histogram = collector._histograms["latency_e2e"]
+        clock.now = histogram._clock()
+        histogram._clock = clock
+
+        assert (await collector.get_stats("latency_e2e"))["percentile_window"] == "window"
+
+        clock.now += 120  # Quiet period: nothing left in the window
+        stats = await collector.get_stats("latency_e2e")
+
+        assert await collector.get_percentile("latency_e2e", 95) == pytest.approx(100.0, rel=0.01)
+        assert stats["p50"] == pytest.approx(100.0, rel=0.01)
+        assert stats["percentile_window"] == "cumulative"
+
+    @pytest.mark.asyncio
+    async def test_export_merges_across_collectors(self):
+        pods = [MetricsCollector(), MetricsCollector()]
+        for i, pod in enumerate(pods):
+            for value in range(100):
+                await pod.record(MetricSample(name="latency_e2e", value=float(value + 100 * i)))
+
+        fleet = merge_sketches(pod.export_sketches() for pod in pods)
+
+        assert fleet["latency_e2e"].count == 200
+        assert fleet["latency_e2e"].quantile(0.99) == pytest.approx(198, rel=0.01)
+
+    @pytest.mark.asyncio
+    async def test_reset_clears_histograms(self):
+        collector = MetricsCollector()
+        await collector.record(MetricSample(name="latency_e2e", value=5.0))
+        await collector.reset()
+
+        assert await collector.get_percentile("latency_e2e", 50) is None
+        assert (await collector.get_stats("latency_e2e"))["count"] == 0
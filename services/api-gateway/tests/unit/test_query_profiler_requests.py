@@ -0,0 +1,128 @@
+"""
+Request-scoped query profiling tests.
+
+Covers statement normalization, per-request query counting with N+1 and
+budget detection, sampling, and QueryProfilingMiddleware on a FastAPI app.
+"""
+
+import pytest
+from app.core.middleware import QueryProfilingMiddleware
+from app.core.query_profiler import QueryProfiler, classify_statement, get_current_request_stats
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+
+class RecordingProfiler(QueryProfiler):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.finished = []
+
+    def _finish_request(self, stats):
+        self.finished.append(stats)
+        super()._finish_request(stats)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+        conn.execute(text("INSERT INTO items (id, name) VALUES (1, 'a'), (2, 'b'), (3, 'c')"))
+    return engine
+
+
+def run_item_queries(engine, n):
+    with engine.connect() as conn:
+        conn.execute(text("SELECT id FROM items")).all()
+        for i in range(n):
+            conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": i}).all()
+
+
+class TestClassifyStatement:
+    """Cached statement normalization"""
+
+    def test_values_and_in_lists_collapse(self):
+        a = classify_statement("SELECT * FROM users WHERE id IN ($1, $2, $3) AND name = 'bob'")
+        b = classify_statement("select *  from users\n where id in ($1) and name = 'o''neil'")
+
+        assert a == b == ("SELECT", "SELECT * FROM USERS WHERE ID IN (?) AND NAME = ?")
+
+    def test_distinct_queries_on_one_table_stay_distinct(self):
+        by_id = classify_statement("SELECT name FROM users WHERE id = %(id_1)s")[1]
+        by_email = classify_statement("SELECT name FROM users WHERE email = %(email_1)s")[1]
+
+        assert by_id != by_email
+
+    def test_query_types(self):
+        assert classify_statement("  insert into t values (1)")[0] == "INSERT"
+        assert classify_statement("COMMIT")[0] == "COMMIT"
+        assert classify_statement("WITH x AS (SELECT 1) SELECT * FROM x")[0] == "OTHER"
+
+
+class TestProfileRequest:
+    """Per-request counting, N+1 and budget"""
+
+    def test_counts_queries_and_flags_n_plus_one(self, engine):
+        profiler = RecordingProfiler(n_plus_one_threshold=5, query_budget=8)
+        profiler.setup(engine)
+
+        with profiler.profile_request("GET", "/items") as stats:
+            run_item_queries(engine, 10)
+
+        assert stats.query_count == 11
+        assert stats.query_time > 0
+        assert stats.n_plus_one == ["SELECT NAME FROM ITEMS WHERE ID = ?"]
+        assert get_current_request_stats() is None
+
+    def test_unsampled_requests_skip_pattern_tracking(self, engine):
+        profiler = RecordingProfiler(n_plus_one_threshold=5, sample_rate=0.0)
+        profiler.setup(engine)
+
+        with profiler.profile_request("GET", "/items") as stats:
+            run_item_queries(engine, 10)
+
+        assert stats.query_count == 11
+        assert not stats.sampled and stats.patterns == {} and stats.n_plus_one == []
+
+    def test_queries_outside_requests_are_only_tracked_in_a_window(self, engine):
+        profiler = QueryProfiler(n_plus_one_threshold=5)
+        profiler.setup(engine)
+
+        run_item_queries(engine, 3)
+        assert profiler._query_patterns == {}
+
+        with profiler.track_request_queries("job-1"):
+            run_item_queries(engine, 3)
+            assert sum(profiler._query_patterns.values()) == 4
+        assert profiler._query_patterns == {}
+
+
+class TestQueryProfilingMiddleware:
+    """Route attribution and Server-Timing header"""
+
+    def test_route_template_and_db_time_header(self, engine):
+        profiler = RecordingProfiler(n_plus_one_threshold=5)
+        profiler.setup(engine)
+
+        app = FastAPI()
+        app.add_middleware(QueryProfilingMiddleware, profiler=profiler, db_time_header=True)
+
+        @app.get("/items/{count}")
+        def list_items(count: int):  # Sync endpoint: runs in the threadpool
+            run_item_queries(engine, count)
+            return {"ok": True}
+
+        response = TestClient(app).get("/items/6")
+
+        assert response.status_code == 200
+        assert response.headers["Server-Timing"].startswith("db;dur=")
+        assert 'desc="7 queries"' in response.headers["Server-Timing"]
+
+        stats = profiler.finished[-1]
+        assert stats.route_label == "GET /items/{count}"
+        assert stats.n_plus_one == ["SELECT NAME FROM ITEMS WHERE ID = ?"]
+
+        TestClient(app).get("/no/such/path")
+        assert profiler.finished[-1].route_label == "GET <unmatched>"
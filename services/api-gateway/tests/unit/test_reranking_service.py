@@ -0,0 +1,227 @@
+"""
+Re-ranking service tests.
+
+Covers the batched OpenAI embedding re-ranker (one embeddings request,
+reuse of stored chunk vectors, vectorized cosine scoring), the
+micro-batched cross-encoder worker, and MMR diversity selection over
+embedding and SimHash similarity matrices.
+"""
+
+import asyncio
+import math
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from app.services.reranking_service import (
+    CrossEncoderReranker,
+    CrossEncoderWorker,
+    DiversityMethod,
+    OpenAIReranker,
+    RerankerConfig,
+    RerankerType,
+    RerankingService,
+    _simhash,
+    _simhash_similarity,
+)
+
+VECTORS = {
+    "query": [1.0, 0.0, 0.0],
+    "aspirin dosing": [0.9, 0.1, 0.0],
+    "aspirin bleeding risk": [0.6, 0.8, 0.0],
+    "unrelated": [0.0, 0.0, 1.0],
+}
+
+
+class StubEmbeddingsClient:
+    """Offline stand-in for AsyncOpenAI: records calls, returns fixed vectors."""
+
+    def __init__(self):
+        self.calls = []
+        self.embeddings = SimpleNamespace(create=self.create)
+
+    async def create(self, model, input):
+        self.calls.append(list(input))
+        data = [SimpleNamespace(index=i, embedding=VECTORS[text]) for i, text in enumerate(input)]
+        return SimpleNamespace(data=list(reversed(data)))
+
+
+@pytest.fixture(autouse=True)
+def no_shared_cache():
+    with patch("app.services.reranking_service.cache_service") as cache_service:
+
+        async def get(key):
+            return None
+
+        async def set(key, value, ttl=None):
+            return True
+
+        cache_service.get, cache_service.set = get, set
+        yield cache_service
+
+
+class TestOpenAIReranker:
+    """Batched embedding re-ranking"""
+
+    @pytest.mark.asyncio
+    async def test_documents_are_embedded_in_one_request(self):
+        client = StubEmbeddingsClient()
+        reranker = OpenAIReranker(client=client)
+
+        ranked = await reranker.rerank("query", ["unrelated", "aspirin bleeding risk", "aspirin dosing"], top_n=2)
+
+        assert [i for i, _ in ranked] == [2, 1]
+        assert ranked[0][1] == pytest.approx(0.9 / (0.81 + 0.01) ** 0.5)
+        assert sorted(len(call) for call in client.calls) == [1, 3]  # Query + one batch of documents
+
+    @pytest.mark.asyncio
+    async def test_stored_vectors_are_not_re_embedded(self):
+        client = StubEmbeddingsClient()
+        reranker = OpenAIReranker(client=client)
+
+        ranked = await reranker.rerank(
+            "query",
+            ["unrelated", "aspirin dosing"],
+            document_embeddings=[None, [1.0, 0.0, 0.0]],
+        )
+
+        assert ranked[0] == (1, pytest.approx(1.0))
+        assert ["unrelated"] in client.calls and ["aspirin dosing"] not in client.calls
+
+    @pytest.mark.asyncio
+    async def test_zero_vectors_score_zero(self):
+        reranker = OpenAIReranker(client=StubEmbeddingsClient())
+
+        ranked = await reranker.rerank("query", ["a", "b"], document_embeddings=[[0.0, 0.0, 0.0], [0.5, 0.0, 0.0]])
+
+        assert ranked == [(1, pytest.approx(1.0)), (0, 0.0)]
+
+    @pytest.mark.asyncio
+    async def test_service_passes_result_embeddings(self):
+        client = StubEmbeddingsClient()
+        service = RerankingService(config=RerankerConfig(reranker_type=RerankerType.OPENAI, score_weight=1.0))
+        service._rerankers[RerankerType.OPENAI] = OpenAIReranker(client=client)
+        results = [
+            {"chunk_id": "a", "content": "unrelated", "score": 0.9, "embedding": [0.0, 0.0, 1.0]},
+            {"chunk_id": "b", "content": "aspirin dosing", "score": 0.5, "embedding": [1.0, 0.0, 0.0]},
+        ]
+
+        reranked = await service.rerank("query", results)
+
+        assert [r.chunk_id for r in reranked] == ["b", "a"]
+        assert client.calls == [["query"]]
+
+
+class StubCrossEncoder:
+    """Scores a pair by document length; records batch sizes and threads."""
+
+    def __init__(self, fail=False):
+        self.batches = []
+        self.threads = set()
+        self.fail = fail
+
+    def predict(self, pairs):
+        self.threads.add(threading.get_ident())
+        if self.fail:
+            raise RuntimeError("model crashed")
+        self.batches.append(len(pairs))
+        return [float(len(doc)) - 5.0 for _, doc in pairs]
+
+
+class TestCrossEncoderWorker:
+    """Micro-batching off the event loop"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_predict(self):
+        model = StubCrossEncoder()
+        worker = CrossEncoderWorker(model=model, batch_window_ms=20)
+        rerankers = [CrossEncoderReranker(worker=worker) for _ in range(4)]
+
+        results = await asyncio.gather(
+            *(r.rerank(f"q{i}", ["a", "abcdefgh", "abcd"], top_n=2) for i, r in enumerate(rerankers))
+        )
+
+        assert model.batches == [12]
+        assert model.threads and threading.get_ident() not in model.threads
+        for ranked in results:
+            assert [i for i, _ in ranked] == [1, 2]
+            assert ranked[0][1] == pytest.approx(1 / (1 + math.exp(-3)))
+        assert worker.get_stats()["avg_batch_pairs"] == 12
+        await worker.stop()
+
+    @pytest.mark.asyncio
+    async def test_batches_are_capped(self):
+        model = StubCrossEncoder()
+        worker = CrossEncoderWorker(model=model, batch_window_ms=20, max_batch_pairs=4)
+
+        await asyncio.gather(*(worker.score([("q", "doc")] * 3) for _ in range(3)))
+
+        assert sum(model.batches) == 9 and max(model.batches) <= 6
+        await worker.stop()
+
+    @pytest.mark.asyncio
+    async def test_model_errors_fall_back_to_original_order(self):
+        worker = CrossEncoderWorker(model=StubCrossEncoder(fail=True), batch_window_ms=1)
+
+        ranked = await CrossEncoderReranker(worker=worker).rerank("q", ["a", "b", "c"], top_n=2)
+
+        assert ranked == [(0, 1.0), (1, 1.0)]
+        await worker.stop()
+
+
+def diversity_service(method, top_n=3):
+    return RerankingService(
+        config=RerankerConfig(reranker_type=RerankerType.NONE, top_n=top_n, diversity_method=method)
+    )
+
+
+CANDIDATES = [
+    {"chunk_id": "a", "content": "warfarin reversal with vitamin k", "score": 0.95, "embedding": [1.0, 0.0, 0.0]},
+    {"chunk_id": "b", "content": "warfarin reversal using vitamin k", "score": 0.94, "embedding": [0.99, 0.1, 0.0]},
+    {"chunk_id": "c", "content": "prothrombin complex concentrate dosing", "score": 0.8, "embedding": [0.3, 0.95, 0]},
+    {"chunk_id": "d", "content": "fresh frozen plasma transfusion volume", "score": 0.7, "embedding": [0.2, 0.2, 0.95]},
+]
+
+
+class TestDiversityReranking:
+    """MMR over similarity matrices"""
+
+    @pytest.mark.asyncio
+    async def test_embedding_mmr_skips_near_duplicate(self):
+        service = diversity_service(DiversityMethod.EMBEDDING)
+
+        selected = await service.rerank_with_diversity("q", CANDIDATES, diversity_threshold=0.5)
+
+        assert [r.chunk_id for r in selected] == ["a", "c", "d"]
+
+    @pytest.mark.asyncio
+    async def test_auto_falls_back_to_simhash_without_vectors(self):
+        service = diversity_service(DiversityMethod.AUTO)
+        content_only = [{k: v for k, v in c.items() if k != "embedding"} for c in CANDIDATES]
+        content_only[1]["content"] = "Warfarin  reversal with Vitamin K"  # Same text, different case/spacing
+
+        selected = await service.rerank_with_diversity("q", content_only, diversity_threshold=0.5)
+
+        assert [r.chunk_id for r in selected][:2] == ["a", "c"]
+
+    @pytest.mark.asyncio
+    async def test_jaccard_matches_original_selection(self):
+        service = diversity_service(DiversityMethod.JACCARD, top_n=4)
+
+        selected = await service.rerank_with_diversity("q", CANDIDATES, diversity_threshold=0.8)
+
+        assert [r.chunk_id for r in selected] == ["a", "c", "d", "b"]
+
+    def test_simhash_similarity_tracks_overlap(self):
+        fingerprints = [
+            _simhash("the patient was started on apixaban five milligrams twice daily for atrial fibrillation"),
+            _simhash("the patient was started on apixaban five milligrams twice daily for atrial flutter"),
+            _simhash("renal dosing adjustments for vancomycin in dialysis"),
+        ]
+
+        similarity = _simhash_similarity(fingerprints)
+
+        assert np.allclose(np.diag(similarity), 1.0)
+        assert similarity[0, 1] > 0.6 > similarity[0, 2]
@@ -0,0 +1,262 @@
+"""
+Semantic answer cache tests.
+
+Covers near-duplicate lookups, scoping by KB version and permissions,
+eviction and stats on SemanticAnswerCache, the KB version shared between
+workers through Redis, and answer reuse in QueryOrchestrator.handle_query.
+"""
+
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+import pytest
+from app.services.llm_client import LLMResponse
+from app.services.rag_cache import RAGCache, SemanticAnswerCache
+from app.services.rag_service import QueryOrchestrator, QueryRequest
+
+
+def unit(*values):
+    vector = np.asarray(values, dtype=np.float32)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+class TestSemanticAnswerCache:
+    """Lookup, scoping and eviction"""
+
+    def test_near_duplicate_hits_and_distinct_query_misses(self):
+        cache = SemanticAnswerCache(similarity_threshold=0.95)
+        cache.store("metformin dose", [1.0, 0.0, 0.0], {"answer": "500 mg"}, tokens=120)
+
+        match = cache.lookup([0.98, 0.05, 0.0])
+        assert match is not None
+        entry, similarity = match
+        assert entry.payload == {"answer": "500 mg"} and similarity > 0.99
+
+        assert cache.lookup([0.0, 1.0, 0.0]) is None
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5 and stats["saved_tokens"] == 120
+
+    def test_scoped_by_permissions_and_kb_version(self):
+        cache = SemanticAnswerCache()
+        cache.store("q", [1.0, 0.0], {"answer": "clinician"}, permissions=["clinician", "admin"])
+
+        assert cache.lookup([1.0, 0.0], permissions=["admin", "clinician"]) is not None
+        assert cache.lookup([1.0, 0.0], permissions=["patient"]) is None
+        assert cache.lookup([1.0, 0.0]) is None
+
+        cache.bump_kb_version()
+        assert cache.lookup([1.0, 0.0], permissions=["clinician", "admin"]) is None
+        assert len(cache) == 0
+
+    def test_user_roles_scope_the_cache(self):
+        from types import SimpleNamespace
+
+        from app.core.dependencies import get_user_roles
+
+        admin = SimpleNamespace(admin_role="user", is_admin=True)
+        user = SimpleNamespace(admin_role="user", is_admin=False)
+        cache = SemanticAnswerCache()
+        cache.store("q", [1.0, 0.0], {"answer": "admin only"}, permissions=get_user_roles(admin))
+
+        assert get_user_roles(admin) == ["admin", "user"]
+        assert cache.lookup([1.0, 0.0], permissions=get_user_roles(user)) is None
+
+    def test_near_duplicates_replace_and_lru_evicts(self):
+        cache = SemanticAnswerCache(similarity_threshold=0.9, max_entries=2)
+        cache.store("a", unit(1, 0, 0), {"answer": "a1"})
+        cache.store("a again", unit(1, 0.01, 0), {"answer": "a2"})
+        assert len(cache) == 1
+
+        cache.store("b", unit(0, 1, 0), {"answer": "b"})
+        cache.lookup(unit(1, 0, 0))  # Touch "a" so "b" is least recently used
+        cache.store("c", unit(0, 0, 1), {"answer": "c"})
+
+        assert cache.lookup(unit(1, 0, 0))[0].payload == {"answer": "a2"}
+        assert cache.lookup(unit(0, 1, 0)) is None
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_expired_entries_miss(self):
+        cache = SemanticAnswerCache(ttl_seconds=0)
+        cache.store("q", [1.0, 0.0], {"answer": "a"})
+
+        assert cache.lookup([1.0, 0.0]) is None
+        assert len(cache) == 0
+
+
+class FakeAggregator:
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+        self.searches = 0
+
+    async def generate_query_embedding(self, query):
+        return self.embeddings[query]
+
+    async def search(self, query, top_k=5, score_threshold=0.7, query_embedding=None):
+        self.searches += 1
+        return []
+
+    def confidence_score(self, results):
+        return 0.0
+
+
+def make_orchestrator(aggregator, cache):
+    with patch("app.services.rag_service.LLMClient"):
+        orchestrator = QueryOrchestrator(
+            enable_multi_hop=False,
+            enable_tools=False,
+            search_aggregator=aggregator,
+            enable_semantic_cache=True,
+            semantic_cache=cache,
+        )
+    orchestrator.llm_client.has_local_model = False
+    orchestrator.llm_client.generate = AsyncMock(
+        return_value=LLMResponse(
+            text="Start at 500 mg twice daily.",
+            model_name="gpt-4o",
+            model_family="cloud",
+            used_tokens=300,
+            latency_ms=10.0,
+            finish_reason="stop",
+        )
+    )
+    return orchestrator
+
+
+@pytest.fixture(autouse=True)
+def offline_prompt_service():
+    with patch("app.services.rag_service.prompt_service") as prompt_service:
+        prompt_service.get_rag_instructions = AsyncMock(return_value="Answer from context.")
+        prompt_service.get_prompt_with_settings = AsyncMock(return_value=None)
+        yield prompt_service
+
+
+class TestOrchestratorSemanticCache:
+    """Answer reuse in handle_query"""
+
+    @pytest.mark.asyncio
+    async def test_paraphrase_is_served_from_cache(self):
+        cache = SemanticAnswerCache(similarity_threshold=0.95)
+        aggregator = FakeAggregator(
+            {
+                "what's the dose of metformin": unit(1, 0.02, 0),
+                "metformin dosage?": unit(1, 0.03, 0),
+            }
+        )
+        orchestrator = make_orchestrator(aggregator, cache)
+
+        first = await orchestrator.handle_query(QueryRequest(query="what's the dose of metformin"))
+        second = await orchestrator.handle_query(QueryRequest(query="metformin dosage?"))
+
+        assert orchestrator.llm_client.generate.await_count == 1
+        assert aggregator.searches == 1
+        assert second.answer == first.answer and second.tokens == 0
+        assert second.reasoning_path[0]["type"] == "semantic_cache"
+        assert cache.get_stats()["saved_tokens"] == 300
+
+    @pytest.mark.asyncio
+    async def test_patient_specific_queries_bypass_cache(self):
+        cache = SemanticAnswerCache()
+        aggregator = FakeAggregator({"metformin dose": unit(1, 0, 0)})
+        orchestrator = make_orchestrator(aggregator, cache)
+
+        await orchestrator.handle_query(QueryRequest(query="metformin dose"), clinical_context={"age": 70})
+        await orchestrator.handle_query(QueryRequest(query="metformin dose"), clinical_context={"age": 70})
+
+        assert orchestrator.llm_client.generate.await_count == 2
+        assert len(cache) == 0 and cache.get_stats()["misses"] == 0
+
+    @pytest.mark.asyncio
+    async def test_permissions_scope_answers(self):
+        cache = SemanticAnswerCache()
+        aggregator = FakeAggregator({"metformin dose": unit(1, 0, 0)})
+        orchestrator = make_orchestrator(aggregator, cache)
+
+        await orchestrator.handle_query(QueryRequest(query="metformin dose"), permissions=["clinician"])
+        await orchestrator.handle_query(QueryRequest(query="metformin dose"), permissions=["student"])
+        await orchestrator.handle_query(QueryRequest(query="metformin dose"), permissions=["clinician"])
+
+        assert orchestrator.llm_client.generate.await_count == 2
+        assert cache.get_stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_answer_is_not_stored_if_kb_changes_during_generation(self):
+        cache = SemanticAnswerCache()
+        aggregator = FakeAggregator({"metformin dose": unit(1, 0, 0)})
+        orchestrator = make_orchestrator(aggregator, cache)
+        answer = orchestrator.llm_client.generate.return_value
+
+        async def generate_while_kb_changes(*args, **kwargs):
+            cache.bump_kb_version()  # e.g. another worker's bump adopted by sync_kb_version
+            return answer
+
+        orchestrator.llm_client.generate.side_effect = generate_while_kb_changes
+        await orchestrator.handle_query(QueryRequest(query="metformin dose"))
+
+        assert len(cache) == 0
+        assert not cache.store("q", [1.0, 0.0], {"answer": "old"}, kb_version=0)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.down = False
+
+    async def get(self, key):
+        if self.down:
+            raise ConnectionError("redis unavailable")
+        return self.data.get(key)
+
+    async def incr(self, key):
+        if self.down:
+            raise ConnectionError("redis unavailable")
+        self.data[key] = str(int(self.data.get(key, 0)) + 1).encode()
+        return int(self.data[key])
+
+    async def delete(self, *keys):
+        return 0
+
+    async def scan_iter(self, match=None):
+        for key in []:
+            yield key
+
+
+@pytest.fixture
+def redis():
+    fake = FakeRedis()
+    with patch("app.services.rag_cache.cache_service.get_redis_client", AsyncMock(return_value=fake)):
+        yield fake
+
+
+class TestSharedKBVersion:
+    """KB version bumps reach every worker"""
+
+    @pytest.mark.asyncio
+    async def test_bump_in_one_worker_clears_the_others(self, redis):
+        indexer = RAGCache(SemanticAnswerCache(version_key="kb"))
+        worker = SemanticAnswerCache(version_key="kb")
+        assert await worker.sync_kb_version()
+        worker.store("q", [1.0, 0.0], {"answer": "old"})
+
+        await indexer.invalidate_document("doc-1")
+
+        assert redis.data["kb"] == b"1"
+        assert await worker.sync_kb_version()
+        assert worker.kb_version == 1 and worker.lookup([1.0, 0.0]) is None
+
+    @pytest.mark.asyncio
+    async def test_unreadable_version_bypasses_the_cache(self, redis):
+        cache = SemanticAnswerCache(version_key="kb")
+        aggregator = FakeAggregator({"metformin dose": unit(1, 0, 0)})
+        orchestrator = make_orchestrator(aggregator, cache)
+        await orchestrator.handle_query(QueryRequest(query="metformin dose"))
+
+        redis.down = True
+        await orchestrator.handle_query(QueryRequest(query="metformin dose"))
+
+        assert orchestrator.llm_client.generate.await_count == 2
+        assert cache.get_stats()["hits"] == 0
+
+        assert await cache.publish_kb_version() == 1  # Local fallback still drops this worker's answers
+        assert len(cache) == 0